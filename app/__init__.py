@@ -3,14 +3,20 @@ from flask import Flask, Response, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from config.config import Config
-from app.di_container import register_dependencies
+from app.di_container import register_dependencies, container
 from typing import Type
 from app.controllers.loyalty_controller import bp as loyalty_bp
 from app.controllers.product_controller import bp as product_bp
 from app.controllers.customer_controller import bp as customer_bp
+from app.controllers.metrics_controller import bp as metrics_bp
+from app.controllers.admin_controller import bp as admin_bp
 from app.utils.error_handlers import (
-    handle_validation_error, handle_value_error
+    handle_validation_error, handle_value_error, handle_conflict_error
 )
+from app.utils.exceptions import ConflictError
+from app.utils.scheduler import PeriodicTask
+from app.workers.checkout_worker_pool import CheckoutWorkerPool
+from app.commands import register_commands
 from pydantic import ValidationError
 import logging
 from logging.config import dictConfig
@@ -42,6 +48,8 @@ def create_app(config_class: Type[Config] = Config) -> Flask:
 
     app: Flask = Flask(__name__)
     app.config.from_object(config_class)
+    # Kept for worker processes, which create their own application.
+    app.extensions['config_class'] = config_class
 
     db.init_app(app)
     migrate.init_app(app, db)
@@ -53,10 +61,40 @@ def create_app(config_class: Type[Config] = Config) -> Flask:
     app.register_blueprint(loyalty_bp)
     app.register_blueprint(product_bp)
     app.register_blueprint(customer_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(admin_bp)
 
     # Register error handlers
     app.register_error_handler(ValidationError, handle_validation_error)
     app.register_error_handler(ValueError, handle_value_error)
+    app.register_error_handler(ConflictError, handle_conflict_error)
+
+    # Register CLI commands
+    register_commands(app)
+
+    # Start background jobs
+    container.resolve('cart_store').start()
+    purge_interval = app.config.get('IDEMPOTENCY_PURGE_INTERVAL_SECONDS')
+    if purge_interval:
+        idempotency_service = container.resolve('idempotency_service')
+        PeriodicTask(app, 'idempotency-purge', purge_interval,
+                     idempotency_service.purge_expired).start()
+    sweep_interval = app.config.get('CART_SWEEP_INTERVAL_SECONDS')
+    if sweep_interval:
+        cart_sweeper_service = container.resolve('cart_sweeper_service')
+        PeriodicTask(app, 'cart-sweep', sweep_interval,
+                     cart_sweeper_service.sweep).start()
+    if app.config.get('CHECKOUT_ASYNC_ENABLED'):
+        checkout_worker_pool = CheckoutWorkerPool(
+            app,
+            config_class,
+            workers=app.config['CHECKOUT_WORKERS'],
+            mode=app.config['CHECKOUT_WORKER_MODE'],
+            poll_interval=app.config['CHECKOUT_POLL_INTERVAL_SECONDS'],
+            job_timeout=app.config['CHECKOUT_JOB_TIMEOUT_SECONDS']
+        )
+        checkout_worker_pool.start()
+        container.register('checkout_worker_pool', checkout_worker_pool)
 
     @app.errorhandler(401)
     def unauthorized(error):
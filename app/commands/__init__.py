@@ -0,0 +1,24 @@
+# app/commands/__init__.py
+from flask import Flask
+
+
+def register_commands(app: Flask) -> None:
+    """
+    Register the application's CLI command groups.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    from app.commands.carts import carts_cli
+    from app.commands.idempotency import idempotency_cli
+    from app.commands.ledger import ledger_cli
+    from app.commands.rollup import rollup_cli
+    from app.commands.rules import rules_cli
+    from app.commands.settlement import settlement_cli
+
+    app.cli.add_command(carts_cli)
+    app.cli.add_command(idempotency_cli)
+    app.cli.add_command(ledger_cli)
+    app.cli.add_command(rollup_cli)
+    app.cli.add_command(rules_cli)
+    app.cli.add_command(settlement_cli)
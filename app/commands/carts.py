@@ -0,0 +1,68 @@
+# app/commands/carts.py
+from typing import Optional
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from app.di_container import container
+from app.repositories.cart_store import MemoryCartStore
+from app.repositories.cart_store_server import (
+    CartStoreServer,
+    parse_address,
+    parse_authkey
+)
+
+carts_cli = AppGroup('carts', help='Manage the shopping cart store.')
+
+
+@carts_cli.command('serve')
+def serve() -> None:
+    """
+    Serve the cart store to the application processes run with
+    CART_STORE=server, writing the edits to the database behind them.
+    """
+    config = current_app.config
+    try:
+        authkey = parse_authkey(config['CART_STORE_AUTHKEY'])
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    store = MemoryCartStore(
+        current_app._get_current_object(),
+        container.resolve('shopping_cart_repository'),
+        config['CART_JOURNAL_DIR'],
+        journal_fsync=config['CART_JOURNAL_FSYNC'],
+        flush_interval=config['CART_FLUSH_INTERVAL_SECONDS'],
+        batch_size=config['CART_FLUSH_BATCH_SIZE']
+    )
+    server = CartStoreServer(
+        store,
+        parse_address(config['CART_STORE_ADDRESS']),
+        authkey
+    )
+    click.echo(f"Serving the cart store on {config['CART_STORE_ADDRESS']}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        click.echo("Stopped the cart store")
+
+
+@carts_cli.command('flush')
+def flush() -> None:
+    """Write the buffered cart edits of the configured store."""
+    flushed = container.resolve('cart_store').flush()
+    click.echo(f"Flushed {flushed} carts")
+
+
+@carts_cli.command('sweep')
+@click.option('--ttl-seconds', type=float, default=None,
+              help='Seconds after its last change from which a cart is '
+                   'deleted. Defaults to CART_TTL_SECONDS.')
+@click.option('--batch-size', type=int, default=None,
+              help='Carts deleted per transaction. Defaults to '
+                   'CART_SWEEP_BATCH_SIZE.')
+def sweep(ttl_seconds: Optional[float], batch_size: Optional[int]) -> None:
+    """Delete the abandoned shopping carts and their items."""
+    cart_sweeper_service = container.resolve('cart_sweeper_service')
+    result = cart_sweeper_service.sweep(
+        ttl_seconds=ttl_seconds, batch_size=batch_size)
+    click.echo(f"Swept {result.carts} carts and {result.items} items in "
+               f"{result.batches} batches, {result.seconds:.3f}s")
@@ -0,0 +1,15 @@
+# app/commands/idempotency.py
+import click
+from flask.cli import AppGroup
+from app.di_container import container
+
+idempotency_cli = AppGroup(
+    'idempotency', help='Manage stored Idempotency-Keys.')
+
+
+@idempotency_cli.command('purge')
+def purge() -> None:
+    """Delete expired Idempotency-Keys."""
+    idempotency_service = container.resolve('idempotency_service')
+    purged = idempotency_service.purge_expired()
+    click.echo(f"Purged {purged} expired idempotency keys")
@@ -0,0 +1,61 @@
+# app/commands/ledger.py
+from datetime import date, datetime, timezone
+from typing import Optional, TextIO
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from app.di_container import container
+
+ledger_cli = AppGroup(
+    'ledger', help='Archive and inspect the point transaction ledger.')
+
+
+@ledger_cli.command('archive')
+@click.option('--before', 'before', type=click.DateTime(formats=['%Y-%m']),
+              default=None,
+              help='First month kept in the table (YYYY-MM). Defaults to '
+                   'the oldest of the last LEDGER_HOT_MONTHS months.')
+def archive(before: Optional[datetime]) -> None:
+    """Move the point transactions of old months to the archive."""
+    if before is None:
+        today = datetime.now(timezone.utc).date()
+        months = today.year * 12 + today.month - \
+            current_app.config['LEDGER_HOT_MONTHS']
+        cutoff = date(months // 12, months % 12 + 1, 1)
+    else:
+        cutoff = before.date()
+    point_transaction_repository = container.resolve(
+        'point_transaction_repository')
+    for archived in point_transaction_repository.archive_before(cutoff):
+        click.echo(f"Archived {archived.month:%Y-%m}: "
+                   f"{archived.row_count} transactions")
+
+
+@ledger_cli.command('archives')
+def archives() -> None:
+    """List the archived months."""
+    point_transaction_repository = container.resolve(
+        'point_transaction_repository')
+    for archived in point_transaction_repository.find_archives():
+        click.echo(f"{archived.month:%Y-%m}\t{archived.row_count}\t"
+                   f"{archived.points_earned}\t{archived.path}")
+
+
+@ledger_cli.command('export')
+@click.argument('start_date', type=click.DateTime())
+@click.argument('end_date', type=click.DateTime())
+@click.option('--format', 'format', type=click.Choice(['ndjson', 'csv']),
+              default='ndjson', show_default=True)
+@click.option('--cursor', default=None,
+              help='Resume after the transaction with this cursor.')
+@click.option('--output', type=click.File('w'), default='-',
+              help='File to write to. Defaults to standard output.')
+def export(start_date: datetime, end_date: datetime, format: str,
+           cursor: Optional[str], output: TextIO) -> None:
+    """
+    Export the point transactions from START_DATE to END_DATE, inclusive.
+    """
+    export_service = container.resolve('point_transaction_export_service')
+    for chunk in export_service.export(
+            start_date, end_date, format=format, cursor=cursor):
+        output.write(chunk)
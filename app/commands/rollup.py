@@ -0,0 +1,17 @@
+# app/commands/rollup.py
+import click
+from flask.cli import AppGroup
+from app.di_container import container
+
+rollup_cli = AppGroup(
+    'rollup', help='Maintain the daily points rollups.')
+
+
+@rollup_cli.command('rebuild')
+@click.option('--batch-size', type=int, default=500, show_default=True,
+              help='Loyalty accounts rebuilt per transaction.')
+def rebuild(batch_size: int) -> None:
+    """Recompute the daily points rollups from the point transactions."""
+    rollup_repository = container.resolve('point_daily_rollup_repository')
+    written = rollup_repository.rebuild(batch_size=batch_size)
+    click.echo(f"Rebuilt {written} daily points rollups")
@@ -0,0 +1,56 @@
+# app/commands/rules.py
+import json
+from datetime import datetime
+from typing import List, Optional, TextIO
+import click
+from flask.cli import AppGroup
+from pydantic import ValidationError
+from app.di_container import container
+from app.mappers.point_earning_rule_mapper import PointEarningRuleMapper
+from app.models.domain.point_earning_rule import PointEarningRule
+from app.schemas.point_earning_rule import PointEarningRuleCreateDto
+
+rules_cli = AppGroup('rules', help='Try out point earning rules.')
+
+
+def _read_rules(rules_file: TextIO) -> List[PointEarningRule]:
+    """Parses a JSON array of point earning rules."""
+    try:
+        return [
+            PointEarningRuleMapper.from_create_dto(
+                PointEarningRuleCreateDto.model_validate(item))
+            for item in json.load(rules_file)
+        ]
+    except (ValueError, TypeError, ValidationError) as e:
+        raise click.BadParameter(str(e), param_hint='RULES_FILE')
+
+
+@rules_cli.command('simulate')
+@click.argument('rules_file', type=click.File('r'))
+@click.option('--start-date', type=click.DateTime(formats=['%Y-%m-%d']),
+              required=True, help='First day to replay.')
+@click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']),
+              required=True, help='Last day to replay.')
+@click.option('--replace', is_flag=True,
+              help='Replay against the candidate rules only, instead of '
+                   'adding them to the current rules.')
+@click.option('--workers', type=int, default=None,
+              help='Worker processes; 0 replays in this process.')
+@click.option('--output', type=click.File('w'), default='-',
+              help='File to write to. Defaults to standard output.')
+def simulate(rules_file: TextIO, start_date: datetime, end_date: datetime,
+             replace: bool, workers: Optional[int], output: TextIO) -> None:
+    """
+    Replay the point transactions against the candidate rules in
+    RULES_FILE, a JSON array of rules, and print the actual and simulated
+    points per category and per day as JSON.
+    """
+    simulation_service = container.resolve('rule_simulation_service')
+    try:
+        report = simulation_service.simulate(
+            _read_rules(rules_file), start_date.date(), end_date.date(),
+            replace=replace, workers=workers)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    output.write(json.dumps(report.model_dump(mode='json'), indent=2))
+    output.write('\n')
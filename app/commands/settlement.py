@@ -0,0 +1,36 @@
+# app/commands/settlement.py
+import json
+from typing import Iterator, TextIO
+import click
+from flask.cli import AppGroup
+from app.di_container import container
+from app.serialization.loyalty_serializer import LoyaltySerializer
+
+settlement_cli = AppGroup(
+    'settlement', help='Check out many carts at once.')
+
+
+def _read_ids(ids_file: TextIO) -> Iterator[int]:
+    """Parses one customer ID per non-empty line."""
+    for line in ids_file:
+        if line.strip():
+            yield int(line)
+
+
+@settlement_cli.command('run')
+@click.argument('ids_file', type=click.File('r'), default='-')
+@click.option('--chunk-size', type=int, default=None,
+              help='Customers per transaction.')
+@click.option('--workers', type=int, default=None,
+              help='Worker processes; 0 settles in this process.')
+def run(ids_file: TextIO, chunk_size: int, workers: int) -> None:
+    """
+    Check out the carts of the customers listed in IDS_FILE, one ID per
+    line (standard input by default), and print one NDJSON result per
+    customer.
+    """
+    settlement_service = container.resolve('settlement_service')
+    for result in settlement_service.settle(
+            _read_ids(ids_file), chunk_size=chunk_size, workers=workers):
+        click.echo(json.dumps(
+            LoyaltySerializer.serialize_settlement_result(result)))
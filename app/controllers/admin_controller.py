@@ -0,0 +1,100 @@
+# app/controllers/admin_controller.py
+import json
+from datetime import datetime, time
+from typing import Iterable, Iterator
+from flask import Blueprint, request, g, Response, stream_with_context
+from app.guards.admin_guard import AdminGuard
+from app.schemas.settlement import SettlementRequestDto
+from app.serialization.loyalty_serializer import LoyaltySerializer
+import logging
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+NDJSON_MIMETYPE: str = 'application/x-ndjson'
+EXPORT_MIMETYPES = {'ndjson': NDJSON_MIMETYPE, 'csv': 'text/csv'}
+
+
+@bp.route('/settlements', methods=['POST'])
+@AdminGuard.admin_required
+def settle_carts() -> Response:
+    """
+    Checks out the carts of many customers at once.
+
+    The customer IDs are either sent as a JSON object with a `customer_ids`
+    list, or streamed as NDJSON with one ID per line. The results are
+    streamed back as NDJSON, one SettlementResultDto per customer, in the
+    order of the IDs. The optional `chunk_size` and `workers` query
+    parameters override the configured defaults.
+
+    Returns:
+        Response: A streamed NDJSON response.
+    """
+    settlement_service = g.container.resolve('settlement_service')
+    chunk_size = request.args.get('chunk_size', type=int)
+    workers = request.args.get('workers', type=int)
+    if request.mimetype == NDJSON_MIMETYPE:
+        customer_ids: Iterable[int] = _read_ndjson_ids(request.stream)
+    else:
+        customer_ids = SettlementRequestDto(**request.json).customer_ids
+
+    def generate() -> Iterator[str]:
+        for result in settlement_service.settle(
+                customer_ids, chunk_size=chunk_size, workers=workers):
+            yield json.dumps(
+                LoyaltySerializer.serialize_settlement_result(result)) + '\n'
+
+    return Response(stream_with_context(generate()),
+                    mimetype=NDJSON_MIMETYPE)
+
+
+@bp.route('/point-transactions', methods=['GET'])
+@AdminGuard.admin_required
+def export_point_transactions() -> Response:
+    """
+    Streams the point transactions within a date range, archived ones
+    included, in (transaction_date, id) order.
+
+    The 'start_date' and 'end_date' query parameters are ISO 8601 dates or
+    times; a date alone as 'end_date' includes the whole day. 'format' is
+    'ndjson' (the default) or 'csv'. Every transaction carries a 'cursor';
+    pass the last one received as the 'cursor' parameter to resume an
+    interrupted export.
+
+    Returns:
+        Response: A streamed NDJSON or CSV response.
+    """
+    export_service = g.container.resolve('point_transaction_export_service')
+    format = request.args.get('format', 'ndjson')
+    chunks = export_service.export(
+        _parse_datetime_arg('start_date'),
+        _parse_datetime_arg('end_date', end_of_day=True),
+        format=format,
+        cursor=request.args.get('cursor'))
+    return Response(stream_with_context(chunks),
+                    mimetype=EXPORT_MIMETYPES[format])
+
+
+def _parse_datetime_arg(name: str, end_of_day: bool = False) -> datetime:
+    """
+    Parses a required ISO 8601 date or time query parameter. With
+    `end_of_day`, a date alone stands for the last moment of that day.
+    """
+    value = request.args.get(name)
+    if not value:
+        raise ValueError(f"{name} is required")
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 date or time")
+    if end_of_day and len(value) == len('YYYY-MM-DD'):
+        parsed = datetime.combine(parsed.date(), time.max)
+    return parsed
+
+
+def _read_ndjson_ids(lines: Iterable[bytes]) -> Iterator[int]:
+    """Parses one customer ID per non-empty line."""
+    for line in lines:
+        if line.strip():
+            yield int(json.loads(line))
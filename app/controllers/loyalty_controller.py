@@ -1,16 +1,31 @@
 # app/controllers/loyalty_controller.py
-from typing import List, Dict, Any
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional
 from flask import render_template
 from flask import (Blueprint, request, jsonify, g, make_response, abort,
-                   Response)
+                   Response, current_app, url_for)
 from app.serialization.loyalty_serializer import LoyaltySerializer
 from app.guards.auth_guard import AuthGuard
+from app.schemas.shopping_cart import (
+    AddToCartDto,
+    CartMutationResponseDto,
+    CartPatchDto,
+    UpdateCartItemDto
+)
+from app.utils.metrics import metrics
 import logging
 
 logger = logging.getLogger(__name__)
 
 bp = Blueprint('loyalty', __name__)
 
+IDEMPOTENCY_HEADER: str = 'Idempotency-Key'
+MAX_IDEMPOTENCY_KEY_LENGTH: int = 255
+DEFAULT_DAILY_POINTS_DAYS: int = 30
+# The value of the `return` query parameter that makes a cart change answer
+# with the resulting cart and its quote.
+RETURN_CART: str = 'cart'
+
 
 @bp.route('/')
 def index() -> str:
@@ -83,21 +98,116 @@ def checkout() -> Response:
     Processes a checkout request, applying loyalty points based on the
     customer's ID stored in cookies.
 
+    If the request carries an Idempotency-Key header, the response is stored
+    under that key and a retry with the same key gets the stored response
+    back, marked with an Idempotent-Replayed header, without running the
+    checkout again.
+
     Returns:
         make_response: A JSON response with checkout data and HTTP status code.
     """
+    customer_id = int(g.customer_id)
+    idempotency_key: Optional[str] = request.headers.get(IDEMPOTENCY_HEADER)
+    if idempotency_key is None:
+        return _checkout(customer_id)
+
+    if not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise ValueError(f"{IDEMPOTENCY_HEADER} must be 1 to "
+                         f"{MAX_IDEMPOTENCY_KEY_LENGTH} characters long")
+    idempotency_service = g.container.resolve('idempotency_service')
+    stored = idempotency_service.begin(customer_id, idempotency_key)
+    if stored is not None:
+        response = make_response(stored.response_body, stored.status_code)
+        response.mimetype = 'application/json'
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+    try:
+        response = _checkout(customer_id)
+    except Exception:
+        idempotency_service.abandon(customer_id, idempotency_key)
+        raise
+    idempotency_service.complete(
+        customer_id, idempotency_key, response.status_code,
+        response.get_data(as_text=True))
+    return response
+
+
+def _checkout(customer_id: int) -> Response:
+    """
+    Runs the checkout, which clears the cart if it succeeded. In
+    asynchronous mode the checkout is queued for the worker pool instead.
+
+    Args:
+        customer_id (int): The ID of the customer checking out.
+
+    Returns:
+        Response: A JSON response with the serialized CheckoutResponseDto,
+        or with the serialized CheckoutJobDto and status 202 in
+        asynchronous mode.
+    """
+    if current_app.config.get('CHECKOUT_ASYNC_ENABLED'):
+        checkout_job_service = g.container.resolve('checkout_job_service')
+        job = checkout_job_service.enqueue(customer_id)
+        g.container.resolve('checkout_worker_pool').notify()
+        response = make_response(
+            jsonify(LoyaltySerializer.serialize_checkout_job(job)), 202)
+        response.headers['Location'] = url_for(
+            'loyalty.get_checkout_job', job_id=job.job_id)
+        return response
+
     loyalty_service = g.container.resolve('loyalty_service')
-    customer_id = g.customer_id
-    result = loyalty_service.checkout(int(customer_id))
+    result = loyalty_service.checkout(customer_id)
     serialized: Dict[str, Any] = LoyaltySerializer. \
         serialize_checkout_response(result)
     logger.debug(f"serialized: {serialized}")
-    if serialized.get('success', False):
-        shopping_cart_service = g.container.resolve('shopping_cart_service')
-        shopping_cart_service.clear_cart(int(customer_id))
     return make_response(jsonify(serialized), 200)
 
 
+@bp.route('/checkout/<int:job_id>', methods=['GET'])
+@AuthGuard.auth_required
+def get_checkout_job(job_id) -> Response:
+    """
+    Retrieves the status and, once finished, the result of a queued
+    checkout.
+    """
+    checkout_job_service = g.container.resolve('checkout_job_service')
+    job = checkout_job_service.get_job(job_id, int(g.customer_id))
+    if not job:
+        abort(404, description="Checkout job not found")
+    serialized = LoyaltySerializer.serialize_checkout_job(job)
+    return make_response(jsonify(serialized), 200)
+
+
+def _not_modified(etag: Optional[str],
+                  weak: bool = False) -> Optional[Response]:
+    """
+    Returns a 304 response if the request's If-None-Match holds the given
+    tag, or None if the resource has to be sent. If-None-Match compares
+    tags weakly, so a weak and a strong tag of the same value match.
+    """
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+    metrics.increment('http.not_modified')
+    return _with_etag(make_response('', 304), etag, weak=weak)
+
+
+def _with_etag(response: Response, etag: Optional[str],
+               weak: bool = False) -> Response:
+    """
+    Sets an ETag on a response, weak if asked, and lets browsers keep it,
+    as long as they revalidate it on every use.
+
+    The tag is read before the resource, so a change made in between gives
+    a body newer than its tag; the next request then gets the resource
+    again rather than a 304 for a body the client does not have.
+    """
+    if etag is not None:
+        response.set_etag(etag, weak=weak)
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 @bp.route('/points', methods=['GET'])
 @AuthGuard.auth_required
 def get_points() -> Response:
@@ -105,13 +215,92 @@ def get_points() -> Response:
     Retrieves the loyalty points for a customer based on their ID stored in
     cookies.
 
+    The response carries an ETag. A request whose If-None-Match holds the
+    current tag gets a 304, answered from the account's version alone.
+
     Returns:
         make_response: A JSON response with points data and HTTP status code.
     """
     loyalty_service = g.container.resolve('loyalty_service')
     customer_id = g.customer_id
+    etag = loyalty_service.get_points_etag(int(customer_id))
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
     points = loyalty_service.get_customer_points(int(customer_id))
     serialized = LoyaltySerializer.serialize_points(points)
+    return _with_etag(make_response(jsonify(serialized), 200), etag)
+
+
+@bp.route('/points/daily', methods=['GET'])
+@AuthGuard.auth_required
+def get_daily_points() -> Response:
+    """
+    Retrieves the loyalty points a customer earned per day.
+
+    The optional 'start_date' and 'end_date' query parameters (YYYY-MM-DD,
+    inclusive) select the days. They default to the last 30 days, today
+    included.
+
+    Returns:
+        make_response: A JSON response with the daily points and HTTP status
+        code.
+    """
+    loyalty_service = g.container.resolve('loyalty_service')
+    customer_id = g.customer_id
+    end_date = _parse_date_arg('end_date') or \
+        datetime.now(timezone.utc).date()
+    start_date = _parse_date_arg('start_date') or \
+        end_date - timedelta(days=DEFAULT_DAILY_POINTS_DAYS - 1)
+    report = loyalty_service.get_daily_points(
+        int(customer_id), start_date, end_date)
+    serialized = LoyaltySerializer.serialize_daily_points(report)
+    return make_response(jsonify(serialized), 200)
+
+
+def _parse_date_arg(name: str) -> Optional[date]:
+    """Parses an optional YYYY-MM-DD query parameter."""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a date in YYYY-MM-DD format")
+
+
+def _returns_cart() -> bool:
+    """
+    Returns whether a cart change asked for the resulting cart with
+    `?return=cart`. Read before the change, so that an invalid value does
+    not change the cart.
+    """
+    value = request.args.get('return')
+    if value is None:
+        return False
+    if value != RETURN_CART:
+        raise ValueError(f"return must be '{RETURN_CART}'")
+    return True
+
+
+def _cart_changed(customer_id: int, returns_cart: bool) -> Response:
+    """
+    Answers a cart change. With `?return=cart`, the response holds the
+    resulting cart and the points a checkout of it would earn, so the client
+    does not read them again. The cart is loaded once and priced as loaded;
+    an empty cart has no quote.
+    """
+    if not returns_cart:
+        return make_response(jsonify({'success': True}), 200)
+    shopping_cart_service = g.container.resolve('shopping_cart_service')
+    loyalty_service = g.container.resolve('loyalty_service')
+    cart = shopping_cart_service.find_cart(customer_id)
+    mutation = CartMutationResponseDto(cart=None, quote=None)
+    if cart is not None:
+        mutation.cart = shopping_cart_service.build_cart_response(cart)
+        if cart.items:
+            mutation.quote = loyalty_service.quote_cart(cart)
+    serialized = LoyaltySerializer.serialize_cart_mutation(mutation)
     return make_response(jsonify(serialized), 200)
 
 
@@ -119,16 +308,17 @@ def get_points() -> Response:
 @AuthGuard.auth_required
 def add_to_cart() -> Response:
     """
-    Adds an item to the shopping cart.
+    Adds an item to the shopping cart. With `?return=cart`, answers with
+    the resulting cart and its quote.
     """
     shopping_cart_service = g.container.resolve('shopping_cart_service')
     customer_id = g.customer_id
+    returns_cart = _returns_cart()
     logger.debug(f"request: {request.json}")
-    product_id = request.json.get('productId')
-    quantity = request.json.get('quantity')
+    item = AddToCartDto(**request.json)
     shopping_cart_service.add_item(
-        int(customer_id), int(product_id), int(quantity))
-    return make_response(jsonify({'success': True}), 200)
+        int(customer_id), item.product_id, item.quantity)
+    return _cart_changed(int(customer_id), returns_cart)
 
 
 @bp.route('/cart', methods=['GET'])
@@ -136,13 +326,58 @@ def add_to_cart() -> Response:
 def get_cart() -> Response:
     """
     Retrieves the shopping cart for a customer.
+
+    The response carries a weak ETag, since the cart's products can change
+    without changing its tag. A request whose If-None-Match holds the
+    current tag gets a 304, answered from the cart's version alone.
     """
     shopping_cart_service = g.container.resolve('shopping_cart_service')
     customer_id = g.customer_id
+    etag = shopping_cart_service.get_cart_etag(int(customer_id))
+    not_modified = _not_modified(etag, weak=True)
+    if not_modified is not None:
+        return not_modified
     cart = shopping_cart_service.get_cart(int(customer_id))
     serialized = LoyaltySerializer.serialize_shopping_cart(cart)
     if not cart:
         abort(404, description="Shopping cart not found")
+    return _with_etag(make_response(jsonify(serialized), 200), etag,
+                      weak=True)
+
+
+@bp.route('/cart', methods=['PATCH'])
+@AuthGuard.auth_required
+def patch_cart() -> Response:
+    """
+    Applies a batch of add, update and remove operations to the shopping
+    cart in one transaction, and returns the resulting cart.
+
+    The body is a JSON object with an `operations` list, e.g.
+    ``{"operations": [{"op": "add", "product_id": 1, "quantity": 2},
+    {"op": "remove", "product_id": 3}]}``.
+    """
+    shopping_cart_service = g.container.resolve('shopping_cart_service')
+    customer_id = g.customer_id
+    operations = CartPatchDto(**request.json).operations
+    cart = shopping_cart_service.apply_operations(
+        int(customer_id), operations)
+    if not cart:
+        abort(404, description="Shopping cart not found")
+    serialized = LoyaltySerializer.serialize_shopping_cart(cart)
+    return make_response(jsonify(serialized), 200)
+
+
+@bp.route('/cart/quote', methods=['GET'])
+@AuthGuard.auth_required
+def get_cart_quote() -> Response:
+    """
+    Retrieves the points a checkout of the customer's cart would earn,
+    without checking out.
+    """
+    loyalty_service = g.container.resolve('loyalty_service')
+    customer_id = g.customer_id
+    quote = loyalty_service.quote(int(customer_id))
+    serialized = LoyaltySerializer.serialize_checkout_response(quote)
     return make_response(jsonify(serialized), 200)
 
 
@@ -150,26 +385,30 @@ def get_cart() -> Response:
 @AuthGuard.auth_required
 def update_cart_item(product_id) -> Response:
     """
-    Updates a cart item's quantity.
+    Updates a cart item's quantity. With `?return=cart`, answers with the
+    resulting cart and its quote.
     """
     shopping_cart_service = g.container.resolve('shopping_cart_service')
     customer_id = g.customer_id
-    quantity = request.json.get('quantity')
+    returns_cart = _returns_cart()
+    quantity = UpdateCartItemDto(**request.json).quantity
     shopping_cart_service.update_item_quantity(
-        int(customer_id), product_id, int(quantity))
-    return make_response(jsonify({'success': True}), 200)
+        int(customer_id), product_id, quantity)
+    return _cart_changed(int(customer_id), returns_cart)
 
 
 @bp.route('/cart/<int:product_id>', methods=['DELETE'])
 @AuthGuard.auth_required
 def remove_from_cart(product_id) -> Response:
     """
-    Removes an item from the shopping cart.
+    Removes an item from the shopping cart. With `?return=cart`, answers
+    with the resulting cart and its quote.
     """
     shopping_cart_service = g.container.resolve('shopping_cart_service')
     customer_id = g.customer_id
+    returns_cart = _returns_cart()
     shopping_cart_service.remove_item(int(customer_id), product_id)
-    return make_response(jsonify({'success': True}), 200)
+    return _cart_changed(int(customer_id), returns_cart)
 
 
 @bp.route('/cart', methods=['DELETE'])
@@ -0,0 +1,19 @@
+# app/controllers/metrics_controller.py
+from flask import Blueprint, jsonify, make_response, Response
+from app.guards.admin_guard import AdminGuard
+from app.utils.metrics import metrics
+
+bp = Blueprint('metrics', __name__)
+
+
+@bp.route('/metrics', methods=['GET'])
+@AdminGuard.admin_required
+def get_metrics() -> Response:
+    """
+    Exports the process-local counters, gauges and histograms. They expose
+    the application's internals, so they require the admin token.
+
+    Returns:
+        make_response: A JSON response with the metrics and HTTP status code.
+    """
+    return make_response(jsonify(metrics.snapshot()), 200)
@@ -55,18 +55,96 @@ def register_dependencies(app):
     from app.repositories.shopping_cart_repository import (
         ShoppingCartRepository
     )
+    from app.repositories.point_earning_rule_repository import (
+        PointEarningRuleRepository
+    )
+    from app.repositories.point_earning_rule_index import (
+        PointEarningRuleIndex
+    )
+    from app.repositories.point_transaction_repository import (
+        PointTransactionRepository
+    )
+    from app.repositories.point_daily_rollup_repository import (
+        PointDailyRollupRepository
+    )
+    from app.repositories.point_transaction_archive_store import (
+        PointTransactionArchiveStore
+    )
+    from app.repositories.idempotency_key_repository import (
+        IdempotencyKeyRepository
+    )
+    from app.repositories.checkout_job_repository import (
+        CheckoutJobRepository
+    )
+    from app.repositories.cart_store import CartStore, MemoryCartStore
+    from app.repositories.cart_store_server import (
+        RemoteCartStore, parse_address, parse_authkey
+    )
+    from app.services.checkout_job_service import CheckoutJobService
     from app.services.customer_service import CustomerService
+    from app.services.cart_sweeper_service import CartSweeperService
+    from app.services.idempotency_service import IdempotencyService
+    from app.services.settlement_service import SettlementService
     from app.services.loyalty_service import LoyaltyService
+    from app.services.point_transaction_export_service import (
+        PointTransactionExportService
+    )
     from app.services.product_service import ProductService
+    from app.services.rule_simulation_service import RuleSimulationService
     from app.services.shopping_cart_service import ShoppingCartService
 
+    # Register caches shared between repositories
+    container.register('point_earning_rule_index', PointEarningRuleIndex(
+        max_age=app.config.get('RULE_INDEX_MAX_AGE_SECONDS')
+    ))
+
     # Register repositories
     container.register('customer_repository', CustomerRepository())
-    container.register('loyalty_account_repository',
-                       LoyaltyAccountRepository())
+    container.register('point_daily_rollup_repository',
+                       PointDailyRollupRepository())
+    container.register('point_transaction_repository',
+                       PointTransactionRepository(
+                           PointTransactionArchiveStore(
+                               app.config['LEDGER_ARCHIVE_DIR']),
+                           container.resolve('point_daily_rollup_repository')
+                       ))
+    container.register('loyalty_account_repository', LoyaltyAccountRepository(
+        container.resolve('point_earning_rule_index'),
+        container.resolve('point_transaction_repository'),
+        container.resolve('point_daily_rollup_repository')
+    ))
     container.register('product_repository', ProductRepository())
     container.register('category_repository', CategoryRepository())
     container.register('shopping_cart_repository', ShoppingCartRepository())
+    container.register('point_earning_rule_repository',
+                       PointEarningRuleRepository(
+                           container.resolve('point_earning_rule_index')
+                       ))
+    container.register('idempotency_key_repository',
+                       IdempotencyKeyRepository())
+    container.register('checkout_job_repository', CheckoutJobRepository())
+
+    # Register the cart store
+    cart_store_mode = app.config.get('CART_STORE', 'database')
+    if cart_store_mode == 'memory':
+        cart_store = MemoryCartStore(
+            app,
+            container.resolve('shopping_cart_repository'),
+            app.config['CART_JOURNAL_DIR'],
+            journal_fsync=app.config['CART_JOURNAL_FSYNC'],
+            flush_interval=app.config['CART_FLUSH_INTERVAL_SECONDS'],
+            batch_size=app.config['CART_FLUSH_BATCH_SIZE']
+        )
+    elif cart_store_mode == 'server':
+        cart_store = RemoteCartStore(
+            parse_address(app.config['CART_STORE_ADDRESS']),
+            parse_authkey(app.config['CART_STORE_AUTHKEY'])
+        )
+    elif cart_store_mode == 'database':
+        cart_store = CartStore(container.resolve('shopping_cart_repository'))
+    else:
+        raise ValueError(f"Unknown cart store: {cart_store_mode}")
+    container.register('cart_store', cart_store)
 
     # Register services
     container.register('customer_service', CustomerService(
@@ -74,7 +152,14 @@ def register_dependencies(app):
         container.resolve('loyalty_account_repository')
     ))
     container.register('loyalty_service', LoyaltyService(
-        container.resolve('loyalty_account_repository')
+        container.resolve('loyalty_account_repository'),
+        container.resolve('shopping_cart_repository'),
+        container.resolve('point_daily_rollup_repository'),
+        quote_cache_size=app.config['QUOTE_CACHE_SIZE'],
+        max_conflict_retries=app.config['CONFLICT_MAX_RETRIES'],
+        slow_checkout_seconds=app.config['CHECKOUT_SLOW_SECONDS'],
+        trace_checkouts=app.config['CHECKOUT_TRACE_ENABLED'],
+        cart_store=container.resolve('cart_store')
     ))
     container.register('product_service', ProductService(
         container.resolve('product_repository'),
@@ -82,7 +167,47 @@ def register_dependencies(app):
     ))
     container.register('shopping_cart_service', ShoppingCartService(
         container.resolve('shopping_cart_repository'),
-        container.resolve('product_repository')
+        container.resolve('product_repository'),
+        container.resolve('cart_store')
+    ))
+    container.register('cart_sweeper_service', CartSweeperService(
+        container.resolve('shopping_cart_repository'),
+        container.resolve('cart_store'),
+        ttl_seconds=app.config['CART_TTL_SECONDS'],
+        batch_size=app.config['CART_SWEEP_BATCH_SIZE']
+    ))
+
+    container.register('idempotency_service', IdempotencyService(
+        container.resolve('idempotency_key_repository'),
+        ttl_seconds=app.config['IDEMPOTENCY_KEY_TTL_SECONDS'],
+        cache_size=app.config['IDEMPOTENCY_CACHE_SIZE'],
+        processing_timeout_seconds=app.config[
+            'IDEMPOTENCY_PROCESSING_TIMEOUT_SECONDS']
+    ))
+    container.register('checkout_job_service', CheckoutJobService(
+        container.resolve('checkout_job_repository'),
+        container.resolve('loyalty_service'),
+        container.resolve('cart_store')
+    ))
+    container.register('point_transaction_export_service',
+                       PointTransactionExportService(
+                           container.resolve('point_transaction_repository'),
+                           page_size=app.config['EXPORT_PAGE_SIZE']
+                       ))
+    container.register('settlement_service', SettlementService(
+        container.resolve('loyalty_account_repository'),
+        chunk_size=app.config['SETTLEMENT_CHUNK_SIZE'],
+        workers=app.config['SETTLEMENT_WORKERS'],
+        config_class=app.extensions.get('config_class'),
+        cart_store=container.resolve('cart_store')
+    ))
+    container.register('rule_simulation_service', RuleSimulationService(
+        container.resolve('point_transaction_repository'),
+        container.resolve('point_earning_rule_repository'),
+        container.resolve('product_repository'),
+        chunk_days=app.config['SIMULATION_CHUNK_DAYS'],
+        workers=app.config['SIMULATION_WORKERS'],
+        config_class=app.extensions.get('config_class')
     ))
 
     # Add the container to the app context
@@ -0,0 +1,37 @@
+# app/guards/admin_guard.py
+
+import hmac
+from functools import wraps
+from flask import request, jsonify, current_app, Response
+from typing import Callable, Any, TypeVar
+
+T = TypeVar('T', bound=Callable[..., Any])
+
+ADMIN_TOKEN_HEADER: str = 'X-Admin-Token'
+
+
+class AdminGuard:
+    @staticmethod
+    def admin_required(f: T) -> T:
+        """
+        Decorator to ensure that the request carries the admin token
+        configured in ADMIN_TOKEN. Admin routes are disabled while no token
+        is configured.
+
+        Args:
+            f (Callable[..., Any]): The function to be decorated.
+
+        Returns:
+            Callable[..., Any]: The decorated function which now includes
+            the admin token check.
+        """
+        @wraps(f)
+        def decorated_function(*args: Any, **kwargs: Any) -> Response:
+            admin_token = current_app.config.get('ADMIN_TOKEN')
+            if not admin_token:
+                return jsonify({'error': 'Admin API is disabled'}), 403
+            token = request.headers.get(ADMIN_TOKEN_HEADER, '')
+            if not hmac.compare_digest(token.encode(), admin_token.encode()):
+                return jsonify({'error': 'Invalid admin token'}), 403
+            return f(*args, **kwargs)
+        return decorated_function
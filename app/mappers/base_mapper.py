@@ -18,6 +18,9 @@ class BaseMapper(Generic[T]):
         """
         Convert an object to a dictionary.
 
+        Objects declaring `__slots__` are converted from their public slots
+        and properties.
+
         Args:
             obj (Any): The object to convert.
 
@@ -27,6 +30,15 @@ class BaseMapper(Generic[T]):
         if hasattr(obj, '__dict__'):
             return {k: v for k, v in obj.__dict__.items()
                     if not k.startswith('_')}
+        if hasattr(obj, '__slots__'):
+            names = [
+                name for cls in reversed(type(obj).__mro__)
+                for name in list(getattr(cls, '__slots__', ())) + [
+                    key for key, value in vars(cls).items()
+                    if isinstance(value, property)]
+                if not name.startswith('_')
+            ]
+            return {name: getattr(obj, name) for name in dict.fromkeys(names)}
         return dict(obj)
 
     @classmethod
@@ -0,0 +1,86 @@
+# app/mappers/checkout_job_mapper.py
+
+from typing import Dict, Any
+from app.mappers.base_mapper import BaseMapper
+from app.models.domain.checkout_job import CheckoutJob
+from app.models.database.checkout_job import CheckoutJobTable
+
+
+class CheckoutJobMapper(BaseMapper[CheckoutJob]):
+    """
+    Mapper class for the CheckoutJob entity. Handles conversions between
+    domain model and database model.
+    """
+
+    @classmethod
+    def to_domain(cls, data: Dict[str, Any]) -> CheckoutJob:
+        """
+        Convert a dictionary to a CheckoutJob domain model instance.
+
+        Args:
+            data (Dict[str, Any]): The dictionary containing checkout job
+                data.
+
+        Returns:
+            CheckoutJob: An instance of the CheckoutJob domain model.
+        """
+        return CheckoutJob(
+            id=data.get('id'),
+            customer_id=data['customer_id'],
+            status=data['status'],
+            result=data.get('result'),
+            error=data.get('error'),
+            created_at=data.get('created_at'),
+            started_at=data.get('started_at'),
+            finished_at=data.get('finished_at')
+        )
+
+    @classmethod
+    def from_persistence(cls, db_model: CheckoutJobTable) -> CheckoutJob:
+        """
+        Convert a CheckoutJobTable database model to a CheckoutJob domain
+        model.
+
+        Args:
+            db_model (CheckoutJobTable): The database model instance.
+
+        Returns:
+            CheckoutJob: An instance of the CheckoutJob domain model.
+        """
+        return CheckoutJob(
+            id=db_model.id,
+            customer_id=db_model.customer_id,
+            status=db_model.status,
+            result=db_model.result,
+            error=db_model.error,
+            created_at=db_model.created_at,
+            started_at=db_model.started_at,
+            finished_at=db_model.finished_at
+        )
+
+    @classmethod
+    def to_persistence_model(
+        cls, domain_model: CheckoutJob
+    ) -> CheckoutJobTable:
+        """
+        Convert a CheckoutJob domain model to a CheckoutJobTable database
+        model.
+
+        Args:
+            domain_model (CheckoutJob): The CheckoutJob domain model
+                instance.
+
+        Returns:
+            CheckoutJobTable: An instance of the CheckoutJobTable database
+                model.
+        """
+        return CheckoutJobTable(
+            id=domain_model.id,
+            customer_id=domain_model.customer_id,
+            status=domain_model.status,
+            result=domain_model.result,
+            error=domain_model.error,
+            created_at=domain_model.created_at,
+            started_at=domain_model.started_at,
+            finished_at=domain_model.finished_at
+        )
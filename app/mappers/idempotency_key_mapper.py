@@ -0,0 +1,88 @@
+# app/mappers/idempotency_key_mapper.py
+
+from typing import Dict, Any
+from app.mappers.base_mapper import BaseMapper
+from app.models.domain.idempotency_key import IdempotencyKey
+from app.models.database.idempotency_key import IdempotencyKeyTable
+
+
+class IdempotencyKeyMapper(BaseMapper[IdempotencyKey]):
+    """
+    Mapper class for the IdempotencyKey entity. Handles conversions between
+    domain model and database model.
+    """
+
+    @classmethod
+    def to_domain(cls, data: Dict[str, Any]) -> IdempotencyKey:
+        """
+        Convert a dictionary to an IdempotencyKey domain model instance.
+
+        Args:
+            data (Dict[str, Any]): The dictionary containing idempotency
+                key data.
+
+        Returns:
+            IdempotencyKey: An instance of the IdempotencyKey domain model.
+        """
+        return IdempotencyKey(
+            id=data.get('id'),
+            customer_id=data['customer_id'],
+            key=data['key'],
+            status=data['status'],
+            expires_at=data['expires_at'],
+            status_code=data.get('status_code'),
+            response_body=data.get('response_body'),
+            created_at=data.get('created_at')
+        )
+
+    @classmethod
+    def from_persistence(
+        cls, db_model: IdempotencyKeyTable
+    ) -> IdempotencyKey:
+        """
+        Convert an IdempotencyKeyTable database model to an IdempotencyKey
+        domain model.
+
+        Args:
+            db_model (IdempotencyKeyTable): The database model instance.
+
+        Returns:
+            IdempotencyKey: An instance of the IdempotencyKey domain model.
+        """
+        return IdempotencyKey(
+            id=db_model.id,
+            customer_id=db_model.customer_id,
+            key=db_model.key,
+            status=db_model.status,
+            expires_at=db_model.expires_at,
+            status_code=db_model.status_code,
+            response_body=db_model.response_body,
+            created_at=db_model.created_at
+        )
+
+    @classmethod
+    def to_persistence_model(
+        cls, domain_model: IdempotencyKey
+    ) -> IdempotencyKeyTable:
+        """
+        Convert an IdempotencyKey domain model to an IdempotencyKeyTable
+        database model.
+
+        Args:
+            domain_model (IdempotencyKey): The IdempotencyKey domain model
+                instance.
+
+        Returns:
+            IdempotencyKeyTable: An instance of the IdempotencyKeyTable
+                database model.
+        """
+        return IdempotencyKeyTable(
+            id=domain_model.id,
+            customer_id=domain_model.customer_id,
+            key=domain_model.key,
+            status=domain_model.status,
+            status_code=domain_model.status_code,
+            response_body=domain_model.response_body,
+            created_at=domain_model.created_at,
+            expires_at=domain_model.expires_at
+        )
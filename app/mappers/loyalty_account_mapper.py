@@ -29,7 +29,8 @@ class LoyaltyAccountMapper(BaseMapper[LoyaltyAccount]):
             id=data.get('id'),
             customer_id=data['customer_id'],
             points=data['points'],
-            transactions=data.get('transactions', [])
+            transactions=data.get('transactions', []),
+            version=data.get('version', 0)
         )
 
     @classmethod
@@ -62,7 +63,8 @@ class LoyaltyAccountMapper(BaseMapper[LoyaltyAccount]):
             id=db_model.id,
             customer_id=db_model.customer_id,
             points=db_model.points,
-            transactions=[]  # Transactions would typically be loaded separately or lazily # noqa: E501
+            transactions=[],  # Transactions would typically be loaded separately or lazily # noqa: E501
+            version=db_model.version or 0
         )
 
     @classmethod
@@ -82,7 +84,8 @@ class LoyaltyAccountMapper(BaseMapper[LoyaltyAccount]):
         return LoyaltyAccountTable(
             id=domain_model.id,
             customer_id=domain_model.customer_id,
-            points=domain_model.points
+            points=domain_model.points,
+            version=domain_model.version
         )
 
     @classmethod
@@ -0,0 +1,94 @@
+# app/mappers/point_daily_rollup_mapper.py
+
+from typing import Dict, Any
+from app.mappers.base_mapper import BaseMapper
+from app.models.domain.point_daily_rollup import PointDailyRollup
+from app.models.database.point_daily_rollup import PointDailyRollupTable
+from app.schemas.points import DailyPointsDto
+
+
+class PointDailyRollupMapper(BaseMapper[PointDailyRollup]):
+    """
+    Mapper class for the PointDailyRollup entity. Handles conversions
+    between domain model, database model, and DTOs.
+    """
+
+    @classmethod
+    def to_domain(cls, data: Dict[str, Any]) -> PointDailyRollup:
+        """
+        Convert a dictionary to a PointDailyRollup domain model instance.
+
+        Args:
+            data (Dict[str, Any]): The dictionary containing rollup data.
+
+        Returns:
+            PointDailyRollup: An instance of the PointDailyRollup domain
+                model.
+        """
+        return PointDailyRollup(
+            loyalty_account_id=data['loyalty_account_id'],
+            day=data['day'],
+            points_earned=data['points_earned'],
+            transaction_count=data['transaction_count']
+        )
+
+    @classmethod
+    def to_dto(cls, domain_model: PointDailyRollup) -> DailyPointsDto:
+        """
+        Convert a PointDailyRollup domain model to a DailyPointsDto.
+
+        Args:
+            domain_model (PointDailyRollup): The PointDailyRollup domain
+                model instance.
+
+        Returns:
+            DailyPointsDto: The data transfer object of the day.
+        """
+        return DailyPointsDto(
+            day=domain_model.day,
+            points_earned=domain_model.points_earned,
+            transaction_count=domain_model.transaction_count
+        )
+
+    @classmethod
+    def from_persistence(
+        cls, db_model: PointDailyRollupTable
+    ) -> PointDailyRollup:
+        """
+        Convert a PointDailyRollupTable database model to a PointDailyRollup
+        domain model.
+
+        Args:
+            db_model (PointDailyRollupTable): The database model instance.
+
+        Returns:
+            PointDailyRollup: An instance of the PointDailyRollup domain
+                model.
+        """
+        return PointDailyRollup(
+            loyalty_account_id=db_model.loyalty_account_id,
+            day=db_model.day,
+            points_earned=db_model.points_earned,
+            transaction_count=db_model.transaction_count
+        )
+
+    @classmethod
+    def to_persistence(
+        cls, domain_model: PointDailyRollup
+    ) -> Dict[str, Any]:
+        """
+        Convert a PointDailyRollup domain model to a row for bulk writes.
+
+        Args:
+            domain_model (PointDailyRollup): The PointDailyRollup domain
+                model instance.
+
+        Returns:
+            Dict[str, Any]: Column values of the point_daily_rollups row.
+        """
+        return {
+            'loyalty_account_id': domain_model.loyalty_account_id,
+            'day': domain_model.day,
+            'points_earned': domain_model.points_earned,
+            'transaction_count': domain_model.transaction_count
+        }
@@ -1,9 +1,13 @@
 # app/mappers/point_earning_rule_mapper.py
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union
 from datetime import date
 from app.mappers.base_mapper import BaseMapper
-from app.models.domain.point_earning_rule import PointEarningRule
+from app.models.domain.point_earning_rule import (
+    RATE,
+    PointEarningRule,
+    PointEarningRuleTimeline
+)
 from app.models.database.point_earning_rule import PointEarningRuleTable
 from app.schemas.point_earning_rule import (
     PointEarningRuleCreateDto,
@@ -34,10 +38,14 @@ class PointEarningRuleMapper(BaseMapper[PointEarningRule]):
             id=data.get('id'),
             category=CategoryMapper.to_domain(
                 data['category']) if data.get('category') else None,
-            category_id=data['category_id'],
+            category_id=data.get('category_id'),
             points_per_dollar=data['points_per_dollar'],
             start_date=data['start_date'],
-            end_date=data.get('end_date')
+            end_date=data.get('end_date'),
+            rule_type=data.get('rule_type') or RATE,
+            multiplier=data.get('multiplier'),
+            min_spend=data.get('min_spend'),
+            max_points=data.get('max_points')
         )
 
     @classmethod
@@ -59,7 +67,11 @@ class PointEarningRuleMapper(BaseMapper[PointEarningRule]):
             category_id=domain_model.category_id,
             points_per_dollar=domain_model.points_per_dollar,
             start_date=domain_model.start_date,
-            end_date=domain_model.end_date
+            end_date=domain_model.end_date,
+            rule_type=domain_model.rule_type,
+            multiplier=domain_model.multiplier,
+            min_spend=domain_model.min_spend,
+            max_points=domain_model.max_points
         )
 
     @classmethod
@@ -82,7 +94,11 @@ class PointEarningRuleMapper(BaseMapper[PointEarningRule]):
             category_id=dto.category_id,
             points_per_dollar=dto.points_per_dollar,
             start_date=dto.start_date,
-            end_date=dto.end_date
+            end_date=dto.end_date,
+            rule_type=dto.rule_type,
+            multiplier=dto.multiplier,
+            min_spend=dto.min_spend,
+            max_points=dto.max_points
         )
 
     @classmethod
@@ -104,7 +120,11 @@ class PointEarningRuleMapper(BaseMapper[PointEarningRule]):
             category_id=db_model.category_id,
             points_per_dollar=db_model.points_per_dollar,
             start_date=db_model.start_date,
-            end_date=db_model.end_date
+            end_date=db_model.end_date,
+            rule_type=db_model.rule_type,
+            multiplier=db_model.multiplier,
+            min_spend=db_model.min_spend,
+            max_points=db_model.max_points
         )
 
     @classmethod
@@ -126,7 +146,11 @@ class PointEarningRuleMapper(BaseMapper[PointEarningRule]):
             category_id=domain_model.category_id,
             points_per_dollar=domain_model.points_per_dollar,
             start_date=domain_model.start_date,
-            end_date=domain_model.end_date
+            end_date=domain_model.end_date,
+            rule_type=domain_model.rule_type,
+            multiplier=domain_model.multiplier,
+            min_spend=domain_model.min_spend,
+            max_points=domain_model.max_points
         )
 
     @classmethod
@@ -146,22 +170,26 @@ class PointEarningRuleMapper(BaseMapper[PointEarningRule]):
         return [cls.to_dto(rule) for rule in rules]
 
     @classmethod
-    def find_active_rule(cls, rules: List[PointEarningRule], current_date: date) -> PointEarningRule:  # noqa: E501
+    def find_active_rule(
+        cls,
+        rules: Union[List[PointEarningRule], PointEarningRuleTimeline],
+        current_date: date
+    ) -> Optional[PointEarningRule]:
         """
         Find the active rule from a list of PointEarningRule domain models fo
         a given date.
 
         Args:
-            rules (List[PointEarningRule]): A list of PointEarningRule
-                domain models.
+            rules (Union[List[PointEarningRule], PointEarningRuleTimeline]):
+                A list of PointEarningRule domain models, or a timeline
+                already built from such a list.
             current_date (date): The date to check for active rules.
 
         Returns:
-            PointEarningRule: The active PointEarningRule for the given date,
-                or None if no active rule is found.
+            Optional[PointEarningRule]: The active PointEarningRule for the
+                given date, or None if no active rule is found. When several
+                rules are active, the first one in the list wins.
         """
-        for rule in rules:
-            if rule.start_date <= current_date and \
-                    (rule.end_date is None or rule.end_date >= current_date):
-                return rule
-        return None
+        if not isinstance(rules, PointEarningRuleTimeline):
+            rules = PointEarningRuleTimeline(rules)
+        return rules.find(current_date)
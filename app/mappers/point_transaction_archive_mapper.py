@@ -0,0 +1,98 @@
+# app/mappers/point_transaction_archive_mapper.py
+
+from typing import Dict, Any
+from app.mappers.base_mapper import BaseMapper
+from app.models.domain.point_transaction_archive import (
+    PointTransactionArchive
+)
+from app.models.database.point_transaction_archive import (
+    PointTransactionArchiveTable
+)
+
+
+class PointTransactionArchiveMapper(BaseMapper[PointTransactionArchive]):
+    """
+    Mapper class for the PointTransactionArchive entity. Handles conversions
+    between domain model and database model.
+    """
+
+    @classmethod
+    def to_domain(cls, data: Dict[str, Any]) -> PointTransactionArchive:
+        """
+        Convert a dictionary to a PointTransactionArchive domain model
+        instance.
+
+        Args:
+            data (Dict[str, Any]): The dictionary containing archive data.
+
+        Returns:
+            PointTransactionArchive: An instance of the
+                PointTransactionArchive domain model.
+        """
+        return PointTransactionArchive(
+            id=data.get('id'),
+            month=data['month'],
+            path=data['path'],
+            row_count=data['row_count'],
+            points_earned=data['points_earned'],
+            min_loyalty_account_id=data['min_loyalty_account_id'],
+            max_loyalty_account_id=data['max_loyalty_account_id'],
+            checksum=data['checksum'],
+            archived_at=data.get('archived_at')
+        )
+
+    @classmethod
+    def from_persistence(
+        cls, db_model: PointTransactionArchiveTable
+    ) -> PointTransactionArchive:
+        """
+        Convert a PointTransactionArchiveTable database model to a
+        PointTransactionArchive domain model.
+
+        Args:
+            db_model (PointTransactionArchiveTable): The database model
+                instance.
+
+        Returns:
+            PointTransactionArchive: An instance of the
+                PointTransactionArchive domain model.
+        """
+        return PointTransactionArchive(
+            id=db_model.id,
+            month=db_model.month,
+            path=db_model.path,
+            row_count=db_model.row_count,
+            points_earned=db_model.points_earned,
+            min_loyalty_account_id=db_model.min_loyalty_account_id,
+            max_loyalty_account_id=db_model.max_loyalty_account_id,
+            checksum=db_model.checksum,
+            archived_at=db_model.archived_at
+        )
+
+    @classmethod
+    def to_persistence_model(
+        cls, domain_model: PointTransactionArchive
+    ) -> PointTransactionArchiveTable:
+        """
+        Convert a PointTransactionArchive domain model to a
+        PointTransactionArchiveTable database model.
+
+        Args:
+            domain_model (PointTransactionArchive): The
+                PointTransactionArchive domain model instance.
+
+        Returns:
+            PointTransactionArchiveTable: An instance of the
+                PointTransactionArchiveTable database model.
+        """
+        return PointTransactionArchiveTable(
+            id=domain_model.id,
+            month=domain_model.month,
+            path=domain_model.path,
+            row_count=domain_model.row_count,
+            points_earned=domain_model.points_earned,
+            min_loyalty_account_id=domain_model.min_loyalty_account_id,
+            max_loyalty_account_id=domain_model.max_loyalty_account_id,
+            checksum=domain_model.checksum,
+            archived_at=domain_model.archived_at
+        )
@@ -34,7 +34,8 @@ class PointTransactionMapper(BaseMapper[PointTransaction]):
             product=ProductMapper.to_domain(
                 data['product']) if data.get('product') else None,
             points_earned=data['points_earned'],
-            transaction_date=data['transaction_date']
+            transaction_date=data['transaction_date'],
+            quantity=data.get('quantity')
         )
 
     @classmethod
@@ -78,9 +79,31 @@ class PointTransactionMapper(BaseMapper[PointTransaction]):
             product=ProductMapper.from_persistence(
                 db_model.product) if db_model.product else None,
             points_earned=db_model.points_earned,
-            transaction_date=db_model.transaction_date
+            transaction_date=db_model.transaction_date,
+            quantity=db_model.quantity
         )
 
+    @classmethod
+    def to_persistence(
+            cls, domain_model: PointTransaction
+    ) -> Dict[str, Any]:
+        """
+        Convert PointTransaction model to a row for bulk inserts.
+
+        Args:
+            domain_model (PointTransaction): Domain model instance.
+
+        Returns:
+            Dict[str, Any]: Column values of the point_transactions row.
+        """
+        return {
+            'loyalty_account_id': domain_model.loyalty_account.id if domain_model.loyalty_account else None,  # noqa: E501
+            'product_id': domain_model.product.id if domain_model.product else None,  # noqa: E501
+            'points_earned': domain_model.points_earned,
+            'transaction_date': domain_model.transaction_date,
+            'quantity': domain_model.quantity
+        }
+
     @classmethod
     def to_persistence_model(
             cls, domain_model: PointTransaction
@@ -99,7 +122,8 @@ class PointTransactionMapper(BaseMapper[PointTransaction]):
             loyalty_account_id=domain_model.loyalty_account.id if domain_model.loyalty_account else None,  # noqa: E501
             product_id=domain_model.product.id if domain_model.product else None,  # noqa: E501
             points_earned=domain_model.points_earned,
-            transaction_date=domain_model.transaction_date
+            transaction_date=domain_model.transaction_date,
+            quantity=domain_model.quantity
         )
 
     @classmethod
@@ -35,7 +35,9 @@ class ShoppingCartMapper(BaseMapper[ShoppingCart]):
         return ShoppingCart(
             id=data.get('id'),
             customer_id=data['customer_id'],
-            items=[cls._item_to_domain(item) for item in data.get('items', [])]
+            items=[cls._item_to_domain(item)
+                   for item in data.get('items', [])],
+            version=data.get('version', 0)
         )
 
     @classmethod
@@ -72,7 +74,9 @@ class ShoppingCartMapper(BaseMapper[ShoppingCart]):
         return ShoppingCart(
             id=db_model.id,
             customer_id=db_model.customer_id,
-            items=[cls._item_from_persistence(item) for item in db_model.items]
+            items=[cls._item_from_persistence(item)
+                   for item in db_model.items],
+            version=db_model.version or 0
         )
 
     @classmethod
@@ -95,7 +99,8 @@ class ShoppingCartMapper(BaseMapper[ShoppingCart]):
             id=domain_model.id,
             customer_id=domain_model.customer_id,
             items=[cls._item_to_persistence_model(
-                item) for item in domain_model.items]
+                item) for item in domain_model.items],
+            version=domain_model.version
         )
 
     @classmethod
@@ -0,0 +1,44 @@
+# app/models/database/checkout_job.py
+from app import db
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Mapped
+
+
+class CheckoutJobTable(db.Model):
+    """
+    Represents a queued checkout in the database.
+
+    This model defines the structure of the 'checkout_jobs' table, which is
+    the durable queue of checkouts run by the worker pool when asynchronous
+    checkout is enabled.
+
+    Attributes:
+        id (int): The primary key of the checkout job record.
+        customer_id (int): The foreign key referencing the customer checking
+            out.
+        status (str): 'queued', 'running', 'succeeded' or 'failed'.
+        result (Optional[str]): The serialized CheckoutResponseDto once the
+            job succeeded.
+        error (Optional[str]): The error message if the job failed.
+        created_at (datetime): The timestamp when the job was queued.
+        started_at (Optional[datetime]): The timestamp when a worker claimed
+            the job.
+        finished_at (Optional[datetime]): The timestamp when the job
+            finished.
+    """
+
+    __tablename__: str = 'checkout_jobs'
+    __table_args__ = (
+        db.Index('ix_checkout_jobs_status_id', 'status', 'id'),
+    )
+    id: Mapped[int] = db.Column(db.Integer, primary_key=True)
+    customer_id: Mapped[int] = db.Column(db.Integer, db.ForeignKey(
+        'customers.id'), nullable=False)
+    status: Mapped[str] = db.Column(db.String(20), nullable=False)
+    result: Mapped[Optional[str]] = db.Column(db.Text)
+    error: Mapped[Optional[str]] = db.Column(db.Text)
+    created_at: Mapped[datetime] = db.Column(
+        db.DateTime, default=datetime.utcnow)
+    started_at: Mapped[Optional[datetime]] = db.Column(db.DateTime)
+    finished_at: Mapped[Optional[datetime]] = db.Column(db.DateTime)
@@ -0,0 +1,46 @@
+# app/models/database/idempotency_key.py
+from app import db
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Mapped
+
+
+class IdempotencyKeyTable(db.Model):
+    """
+    Represents a stored Idempotency-Key in the database.
+
+    This model defines the structure of the 'idempotency_keys' table, which
+    records the response of a request made with an Idempotency-Key header so
+    that retries of the same request can be answered without running it
+    again.
+
+    Attributes:
+        id (int): The primary key of the idempotency key record.
+        customer_id (int): The foreign key referencing the customer who sent
+            the request. Keys are unique per customer.
+        key (str): The value of the Idempotency-Key header.
+        status (str): 'processing' while the first request is running,
+            'completed' once its response has been stored.
+        status_code (Optional[int]): The HTTP status code of the stored
+            response.
+        response_body (Optional[str]): The serialized response body.
+        created_at (datetime): The timestamp when the key was first seen.
+        expires_at (datetime): The timestamp after which the key is purged.
+    """
+
+    __tablename__: str = 'idempotency_keys'
+    __table_args__ = (
+        db.UniqueConstraint('customer_id', 'key',
+                            name='uq_idempotency_keys_customer_id_key'),
+    )
+    id: Mapped[int] = db.Column(db.Integer, primary_key=True)
+    customer_id: Mapped[int] = db.Column(db.Integer, db.ForeignKey(
+        'customers.id'), nullable=False)
+    key: Mapped[str] = db.Column(db.String(255), nullable=False)
+    status: Mapped[str] = db.Column(db.String(20), nullable=False)
+    status_code: Mapped[Optional[int]] = db.Column(db.Integer)
+    response_body: Mapped[Optional[str]] = db.Column(db.Text)
+    created_at: Mapped[datetime] = db.Column(
+        db.DateTime, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = db.Column(
+        db.DateTime, nullable=False, index=True)
@@ -23,6 +23,9 @@ class LoyaltyAccountTable(db.Model):
         customer_id (int): The foreign key referencing the associated
             customer's id.
         points (int): The current balance of loyalty points for this account.
+        version (int): Incremented on every change of the account, and
+            checked on every ORM update, so that concurrent updates based on
+            the same read are detected instead of overwriting each other.
         created_at (datetime): The timestamp when the loyalty account record
             was created.
         updated_at (datetime): The timestamp when the loyalty account record
@@ -38,6 +41,8 @@ class LoyaltyAccountTable(db.Model):
     customer_id: Mapped[int] = db.Column(
         db.Integer, db.ForeignKey('customers.id'), nullable=False)
     points: Mapped[int] = db.Column(db.Integer, default=0)
+    version: Mapped[int] = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
     created_at: Mapped[datetime] = db.Column(
         db.DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = db.Column(
@@ -48,3 +53,5 @@ class LoyaltyAccountTable(db.Model):
         "CustomerTable", back_populates="loyalty_account", uselist=False)
     transactions: Mapped[List["PointTransactionTable"]] = relationship(
         "PointTransactionTable", back_populates="loyalty_account")
+
+    __mapper_args__ = {'version_id_col': version}
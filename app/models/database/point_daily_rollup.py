@@ -0,0 +1,33 @@
+# app/models/database/point_daily_rollup.py
+from app import db
+from datetime import date
+from sqlalchemy.orm import Mapped
+
+
+class PointDailyRollupTable(db.Model):
+    """
+    Represents the points a loyalty account earned on one day.
+
+    This model defines the structure of the 'point_daily_rollups' table,
+    which summarizes the 'point_transactions' ledger per account and day.
+    Checkouts update it in the same transaction that writes the ledger, so
+    daily reports read one row per day instead of every transaction.
+
+    Attributes:
+        loyalty_account_id (int): The foreign key referencing the loyalty
+            account. Part of the primary key.
+        day (date): The UTC date of the transactions. Part of the primary
+            key.
+        points_earned (int): The points earned by the account on that day.
+        transaction_count (int): The number of point transactions of the
+            account on that day.
+    """
+
+    __tablename__: str = 'point_daily_rollups'
+    loyalty_account_id: Mapped[int] = db.Column(
+        db.Integer, db.ForeignKey('loyalty_accounts.id'), primary_key=True)
+    day: Mapped[date] = db.Column(db.Date, primary_key=True)
+    points_earned: Mapped[int] = db.Column(
+        db.Integer, nullable=False, default=0)
+    transaction_count: Mapped[int] = db.Column(
+        db.Integer, nullable=False, default=0)
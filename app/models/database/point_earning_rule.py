@@ -19,12 +19,20 @@ class PointEarningRuleTable(db.Model):
 
     Attributes:
         id (int): The primary key of the point earning rule record.
-        category_id (int): The foreign key referencing the associated
-            category's id.
+        category_id (Optional[int]): The foreign key referencing the
+            associated category's id, or None for rules that apply to all
+            categories.
         points_per_dollar (int): The number of points earned per dollar spent.
         start_date (date): The date when the rule becomes effective.
         end_date (Optional[date]): The date when the rule expires,
         if applicable.
+        rule_type (str): The kind of rule: 'rate', 'bonus', 'tier',
+            'multiplier' or 'cap'.
+        multiplier (Optional[float]): The factor of a multiplier rule.
+        min_spend (Optional[float]): The order amount from which a tier rule
+            applies.
+        max_points (Optional[int]): The most points per order allowed by a
+            cap rule.
         created_at (datetime): The timestamp when the rule record was created.
         updated_at (datetime): The timestamp when the rule record
         was last updated.
@@ -34,11 +42,17 @@ class PointEarningRuleTable(db.Model):
 
     __tablename__: str = 'point_earning_rules'
     id: Mapped[int] = db.Column(db.Integer, primary_key=True)
-    category_id: Mapped[int] = db.Column(db.Integer, db.ForeignKey(
-        'categories.id'), nullable=False)
+    category_id: Mapped[Optional[int]] = db.Column(db.Integer, db.ForeignKey(
+        'categories.id'))
     points_per_dollar: Mapped[int] = db.Column(db.Integer, nullable=False)
     start_date: Mapped[date] = db.Column(db.Date, nullable=False)
     end_date: Mapped[Optional[date]] = db.Column(db.Date)
+    rule_type: Mapped[str] = db.Column(
+        db.String(20), nullable=False, default='rate',
+        server_default='rate')
+    multiplier: Mapped[Optional[float]] = db.Column(db.Float)
+    min_spend: Mapped[Optional[float]] = db.Column(db.Float)
+    max_points: Mapped[Optional[int]] = db.Column(db.Integer)
     created_at: Mapped[datetime] = db.Column(
         db.DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = db.Column(
@@ -1,6 +1,6 @@
 # app/models/database/point_transaction.py
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 from app import db
 from datetime import datetime
 from sqlalchemy.orm import Mapped, relationship
@@ -27,13 +27,21 @@ class PointTransactionTable(db.Model):
             product's id.
         points_earned (int): The number of points earned in this transaction.
         transaction_date (datetime): The timestamp when
-            the transaction occurred.
+            the transaction occurred. Indexed, together with the loyalty
+            account, so that date ranges and account histories are read
+            with index range scans.
+        quantity (Optional[int]): The quantity of the product bought, or
+            None for transactions recorded before quantities were kept.
         loyalty_account (LoyaltyAccountTable): The loyalty account associated
         with this transaction.
         product (ProductTable): The product associated with this transaction.
     """
 
     __tablename__: str = 'point_transactions'
+    __table_args__ = (
+        db.Index('ix_point_transactions_loyalty_account_id_transaction_date',
+                 'loyalty_account_id', 'transaction_date'),
+    )
     id: Mapped[int] = db.Column(db.Integer, primary_key=True)
     loyalty_account_id: Mapped[int] = db.Column(db.Integer, db.ForeignKey(
         'loyalty_accounts.id'), nullable=False)
@@ -41,7 +49,8 @@ class PointTransactionTable(db.Model):
         'products.id'), nullable=False)
     points_earned: Mapped[int] = db.Column(db.Integer, nullable=False)
     transaction_date: Mapped[datetime] = db.Column(
-        db.DateTime, default=datetime.utcnow)
+        db.DateTime, default=datetime.utcnow, index=True)
+    quantity: Mapped[Optional[int]] = db.Column(db.Integer)
 
     # Relationships
     loyalty_account: Mapped["LoyaltyAccountTable"] = relationship(
@@ -0,0 +1,43 @@
+# app/models/database/point_transaction_archive.py
+from app import db
+from datetime import date, datetime
+from sqlalchemy.orm import Mapped
+
+
+class PointTransactionArchiveTable(db.Model):
+    """
+    Represents an archived month of the point transaction ledger.
+
+    This model defines the structure of the 'point_transaction_archives'
+    table, the catalog of the months that were moved out of
+    'point_transactions' into the compressed archive. Queries use it to skip
+    the archive files that cannot contain matching transactions.
+
+    Attributes:
+        id (int): The primary key of the archive record.
+        month (date): The first day of the archived month.
+        path (str): The location of the archive file.
+        row_count (int): The number of transactions in the file.
+        points_earned (int): The total points of the transactions in the
+            file.
+        min_loyalty_account_id (int): The smallest loyalty account ID in the
+            file.
+        max_loyalty_account_id (int): The largest loyalty account ID in the
+            file.
+        checksum (str): The SHA-256 digest of the file.
+        archived_at (datetime): When the month was last archived.
+    """
+
+    __tablename__: str = 'point_transaction_archives'
+    id: Mapped[int] = db.Column(db.Integer, primary_key=True)
+    month: Mapped[date] = db.Column(db.Date, nullable=False, unique=True)
+    path: Mapped[str] = db.Column(db.String(500), nullable=False)
+    row_count: Mapped[int] = db.Column(db.Integer, nullable=False)
+    points_earned: Mapped[int] = db.Column(db.Integer, nullable=False)
+    min_loyalty_account_id: Mapped[int] = db.Column(
+        db.Integer, nullable=False)
+    max_loyalty_account_id: Mapped[int] = db.Column(
+        db.Integer, nullable=False)
+    checksum: Mapped[str] = db.Column(db.String(64), nullable=False)
+    archived_at: Mapped[datetime] = db.Column(
+        db.DateTime, default=datetime.utcnow)
@@ -22,10 +22,16 @@ class ShoppingCartTable(db.Model):
         id (int): The primary key of the shopping cart record.
         customer_id (int): The foreign key referencing the associated
             customer's id.
+        version (int): Incremented on every change of the cart's items, so
+            that data derived from the cart can be cached per version. It is
+            also checked on every ORM update, so that concurrent updates
+            based on the same read are detected instead of overwriting each
+            other.
         created_at (datetime): The timestamp when the shopping cart record
             was created.
         updated_at (datetime): The timestamp when the shopping cart record
-            was last updated.
+            was last updated, which every change of its items also sets.
+            Indexed, so that abandoned carts are found without a scan.
         customer (CustomerTable): The customer associated with this
             shopping cart.
         items (List[ShoppingCartItemTable]): The items in this shopping cart.
@@ -34,11 +40,14 @@ class ShoppingCartTable(db.Model):
     __tablename__: str = 'shopping_carts'
     id: Mapped[int] = db.Column(db.Integer, primary_key=True)
     customer_id: Mapped[int] = db.Column(db.Integer, db.ForeignKey(
-        'customers.id'), nullable=False)
+        'customers.id'), nullable=False, index=True)
+    version: Mapped[int] = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
     created_at: Mapped[datetime] = db.Column(
         db.DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = db.Column(
-        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow,
+        index=True)
 
     # Relationships
     customer: Mapped["CustomerTable"] = relationship(
@@ -49,6 +58,8 @@ class ShoppingCartTable(db.Model):
         cascade='all, delete-orphan'
     )
 
+    __mapper_args__ = {'version_id_col': version}
+
 
 class ShoppingCartItemTable(db.Model):
     """
@@ -56,7 +67,8 @@ class ShoppingCartItemTable(db.Model):
 
     This model defines the structure of the 'shopping_cart_items' table in the
     database, including fields for item identification, associated cart
-    and product, and quantity.
+    and product, and quantity. A cart holds at most one item per product,
+    so that items can be upserted by (cart_id, product_id).
 
     Attributes:
         id (int): The primary key of the shopping cart item record.
@@ -70,6 +82,11 @@ class ShoppingCartItemTable(db.Model):
     """
 
     __tablename__: str = 'shopping_cart_items'
+    __table_args__ = (
+        db.UniqueConstraint(
+            'cart_id', 'product_id',
+            name='uq_shopping_cart_items_cart_id_product_id'),
+    )
     id: Mapped[int] = db.Column(db.Integer, primary_key=True)
     cart_id: Mapped[int] = db.Column(db.Integer, db.ForeignKey(
         'shopping_carts.id'), nullable=False)
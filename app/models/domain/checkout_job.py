@@ -0,0 +1,71 @@
+# app/models/domain/checkout_job.py
+from datetime import datetime
+from typing import Optional
+
+
+class CheckoutJob:
+    """
+    Represents a queued checkout in the domain model.
+
+    Attributes:
+        id (int): The unique identifier for the job.
+        customer_id (int): The identifier of the customer checking out.
+        status (str): QUEUED, RUNNING, SUCCEEDED or FAILED.
+        result (Optional[str]): The serialized checkout response.
+        error (Optional[str]): The error message of a failed job.
+        created_at (datetime): When the job was queued.
+        started_at (Optional[datetime]): When a worker claimed the job.
+        finished_at (Optional[datetime]): When the job finished.
+    """
+
+    QUEUED: str = 'queued'
+    RUNNING: str = 'running'
+    SUCCEEDED: str = 'succeeded'
+    FAILED: str = 'failed'
+
+    def __init__(
+        self,
+        id: int,
+        customer_id: int,
+        status: str,
+        result: Optional[str] = None,
+        error: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+        started_at: Optional[datetime] = None,
+        finished_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Initializes a new CheckoutJob instance.
+
+        Args:
+            id (int): The unique identifier for the job.
+            customer_id (int): The identifier of the customer checking out.
+            status (str): QUEUED, RUNNING, SUCCEEDED or FAILED.
+            result (Optional[str], optional): The serialized checkout
+                response. Defaults to None.
+            error (Optional[str], optional): The error message of a failed
+                job. Defaults to None.
+            created_at (Optional[datetime], optional): When the job was
+                queued. Defaults to None.
+            started_at (Optional[datetime], optional): When a worker claimed
+                the job. Defaults to None.
+            finished_at (Optional[datetime], optional): When the job
+                finished. Defaults to None.
+        """
+        self.id: int = id
+        self.customer_id: int = customer_id
+        self.status: str = status
+        self.result: Optional[str] = result
+        self.error: Optional[str] = error
+        self.created_at: datetime = created_at or datetime.utcnow()
+        self.started_at: Optional[datetime] = started_at
+        self.finished_at: Optional[datetime] = finished_at
+
+    def is_finished(self) -> bool:
+        """
+        Checks whether the job has finished, successfully or not.
+
+        Returns:
+            bool: True if the job succeeded or failed.
+        """
+        return self.status in (self.SUCCEEDED, self.FAILED)
@@ -0,0 +1,83 @@
+# app/models/domain/idempotency_key.py
+from datetime import datetime
+from typing import Optional
+
+
+class IdempotencyKey:
+    """
+    Represents a stored Idempotency-Key in the domain model.
+
+    Attributes:
+        id (int): The unique identifier for the record.
+        customer_id (int): The identifier of the customer who sent the
+            request.
+        key (str): The value of the Idempotency-Key header.
+        status (str): PROCESSING while the first request is running,
+            COMPLETED once its response has been stored.
+        status_code (Optional[int]): The HTTP status code of the stored
+            response.
+        response_body (Optional[str]): The serialized response body.
+        created_at (datetime): When the key was first seen.
+        expires_at (datetime): When the key expires.
+    """
+
+    PROCESSING: str = 'processing'
+    COMPLETED: str = 'completed'
+
+    def __init__(
+        self,
+        id: int,
+        customer_id: int,
+        key: str,
+        status: str,
+        expires_at: datetime,
+        status_code: Optional[int] = None,
+        response_body: Optional[str] = None,
+        created_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Initializes a new IdempotencyKey instance.
+
+        Args:
+            id (int): The unique identifier for the record.
+            customer_id (int): The identifier of the customer who sent the
+                request.
+            key (str): The value of the Idempotency-Key header.
+            status (str): PROCESSING or COMPLETED.
+            expires_at (datetime): When the key expires.
+            status_code (Optional[int], optional): The HTTP status code of
+                the stored response. Defaults to None.
+            response_body (Optional[str], optional): The serialized response
+                body. Defaults to None.
+            created_at (Optional[datetime], optional): When the key was
+                first seen. Defaults to None.
+        """
+        self.id: int = id
+        self.customer_id: int = customer_id
+        self.key: str = key
+        self.status: str = status
+        self.expires_at: datetime = expires_at
+        self.status_code: Optional[int] = status_code
+        self.response_body: Optional[str] = response_body
+        self.created_at: datetime = created_at or datetime.utcnow()
+
+    def is_completed(self) -> bool:
+        """
+        Checks whether the response of the request has been stored.
+
+        Returns:
+            bool: True if the record holds a response, False otherwise.
+        """
+        return self.status == self.COMPLETED
+
+    def is_expired(self, current_time: datetime) -> bool:
+        """
+        Checks whether the key has expired.
+
+        Args:
+            current_time (datetime): The time to check against.
+
+        Returns:
+            bool: True if the key expired before `current_time`.
+        """
+        return self.expires_at <= current_time
@@ -21,6 +21,7 @@ class LoyaltyAccount:
         points (int): The current point balance of the account.
         transactions (List[PointTransaction]): A list of point transactions
         associated with this account.
+        version (int): The version of the account when it was read.
     """
 
     def __init__(
@@ -28,7 +29,8 @@ class LoyaltyAccount:
         id: int,
         customer_id: int,
         points: int,
-        transactions: Optional[List[PointTransaction]] = None
+        transactions: Optional[List[PointTransaction]] = None,
+        version: int = 0
     ) -> None:
         """
         Initializes a new LoyaltyAccount instance.
@@ -41,11 +43,14 @@ class LoyaltyAccount:
             transactions (Optional[List[PointTransaction]], optional):
             A list of point transactions
                 associated with this account. Defaults to None.
+            version (int, optional): The version of the account when it was
+                read. Defaults to 0 for new accounts.
         """
         self.id: int = id
         self.customer_id: int = customer_id
         self.points: int = points
         self.transactions: List[PointTransaction] = transactions or []
+        self.version: int = version
 
     def add_points(self, points: int) -> None:
         """
@@ -0,0 +1,37 @@
+# app/models/domain/point_daily_rollup.py
+from datetime import date
+
+
+class PointDailyRollup:
+    """
+    Represents the points a loyalty account earned on one day.
+
+    Attributes:
+        loyalty_account_id (int): The identifier of the loyalty account.
+        day (date): The UTC date of the transactions.
+        points_earned (int): The points earned on that day.
+        transaction_count (int): The number of point transactions on that
+            day.
+    """
+
+    def __init__(
+        self,
+        loyalty_account_id: int,
+        day: date,
+        points_earned: int,
+        transaction_count: int
+    ) -> None:
+        """
+        Initializes a new PointDailyRollup instance.
+
+        Args:
+            loyalty_account_id (int): The identifier of the loyalty account.
+            day (date): The UTC date of the transactions.
+            points_earned (int): The points earned on that day.
+            transaction_count (int): The number of point transactions on
+                that day.
+        """
+        self.loyalty_account_id: int = loyalty_account_id
+        self.day: date = day
+        self.points_earned: int = points_earned
+        self.transaction_count: int = transaction_count
@@ -1,8 +1,20 @@
 # app/models/domain/point_earning_rule.py
+import math
+from bisect import bisect_right
 from datetime import date
-from typing import Optional
+from typing import List, Optional, Tuple
 from app.models.domain.category import Category
 
+# The kinds of point earning rules. Rules of all kinds that are active on the
+# same day stack: a line earns the rate of its category (or the base rate),
+# plus the bonuses and the spend tier, times the multipliers, up to the caps.
+RATE: str = 'rate'
+BONUS: str = 'bonus'
+TIER: str = 'tier'
+MULTIPLIER: str = 'multiplier'
+CAP: str = 'cap'
+RULE_TYPES: Tuple[str, ...] = (RATE, BONUS, TIER, MULTIPLIER, CAP)
+
 
 class PointEarningRule:
     """
@@ -12,25 +24,42 @@ class PointEarningRule:
     earning rule, including its identification, associated category,
     points per dollar, and effective dates.
 
+    Rules without a category apply to all categories: a rate rule without a
+    category is the base rate of the categories that have no rate of their
+    own, and a cap without a category limits the points of the whole order.
+
     Attributes:
         id (int): The unique identifier for the point earning rule.
         category (Category): The category associated with this rule.
-        category_id (int): The identifier of the category associated
-            with this rule.
-        points_per_dollar (int): The number of points earned per dollar spent.
+        category_id (Optional[int]): The identifier of the category
+            associated with this rule, or None for all categories.
+        points_per_dollar (int): The number of points earned per dollar
+            spent. For bonus and tier rules, the points earned on top of the
+            rate.
         start_date (date): The date when the rule becomes effective.
         end_date (Optional[date]): The date when the rule expires,
             if applicable.
+        rule_type (str): One of RULE_TYPES.
+        multiplier (Optional[float]): The factor applied to the points of a
+            multiplier rule.
+        min_spend (Optional[float]): The order amount from which a tier rule
+            applies.
+        max_points (Optional[int]): The most points per order allowed by a
+            cap rule.
     """
 
     def __init__(
         self,
         id: int,
         category: Category,
-        category_id: int,
+        category_id: Optional[int],
         points_per_dollar: int,
         start_date: date,
-        end_date: Optional[date] = None
+        end_date: Optional[date] = None,
+        rule_type: str = RATE,
+        multiplier: Optional[float] = None,
+        min_spend: Optional[float] = None,
+        max_points: Optional[int] = None
     ):
         """
         Initializes a new PointEarningRule instance.
@@ -38,20 +67,31 @@ class PointEarningRule:
         Args:
             id (int): The unique identifier for the point earning rule.
             category (Category): The category associated with this rule.
-            category_id (int): The identifier of the category associated
-                with this rule.
+            category_id (Optional[int]): The identifier of the category
+                associated with this rule, or None for all categories.
             points_per_dollar (int): The number of points earned per dollar
                 spent.
             start_date (date): The date when the rule becomes effective.
             end_date (Optional[date], optional): The date when the rule
                 expires, if applicable. Defaults to None.
+            rule_type (str, optional): One of RULE_TYPES. Defaults to RATE.
+            multiplier (Optional[float], optional): The factor of a
+                multiplier rule. Defaults to None.
+            min_spend (Optional[float], optional): The order amount from
+                which a tier rule applies. Defaults to None.
+            max_points (Optional[int], optional): The most points per order
+                allowed by a cap rule. Defaults to None.
         """
         self.id: int = id
         self.category: Category = category
-        self.category_id: int = category_id
+        self.category_id: Optional[int] = category_id
         self.points_per_dollar: int = points_per_dollar
         self.start_date: date = start_date
         self.end_date: Optional[date] = end_date
+        self.rule_type: str = rule_type
+        self.multiplier: Optional[float] = multiplier
+        self.min_spend: Optional[float] = min_spend
+        self.max_points: Optional[int] = max_points
 
     def is_active(self, current_date: date) -> bool:
         """
@@ -66,3 +106,109 @@ class PointEarningRule:
         """
         return (self.start_date <= current_date and
                 (self.end_date is None or current_date <= self.end_date))
+
+    def validate(self) -> None:
+        """
+        Checks that the rule has the fields its type needs.
+
+        Raises:
+            ValueError: If the rule type is unknown, or a field required by
+                the rule type is missing or out of range.
+        """
+        if self.rule_type not in RULE_TYPES:
+            raise ValueError(
+                f"rule_type must be one of {', '.join(RULE_TYPES)}")
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValueError("The end date must not be before the start date")
+        if self.points_per_dollar is None or self.points_per_dollar < 0:
+            raise ValueError("points_per_dollar must not be negative")
+        if self.rule_type == TIER:
+            if self.category_id is not None:
+                raise ValueError("Tier rules apply to the whole order")
+            if self.min_spend is None or self.min_spend < 0:
+                raise ValueError("Tier rules need a non-negative min_spend")
+        if self.rule_type == MULTIPLIER and (
+                self.multiplier is None or self.multiplier < 0):
+            raise ValueError("Multiplier rules need a non-negative multiplier")
+        if self.rule_type == CAP and (
+                self.max_points is None or self.max_points < 0):
+            raise ValueError("Cap rules need a non-negative max_points")
+
+
+class PointEarningRuleTimeline:
+    """
+    Sorted, non-overlapping date intervals of the point earning rules of a
+    single category.
+
+    Overlapping rules are resolved when the timeline is built: on any given
+    day the rule that came first in the input list wins, which matches the
+    behaviour of scanning the list for the first active rule. Looking up
+    the rule for a date is a binary search over the interval starts.
+
+    Attributes:
+        starts (List[int]): Ordinal of the first day of each interval.
+        ends (List[float]): Ordinal of the day after the last day of each
+            interval, or infinity for open-ended intervals.
+        rules (List[PointEarningRule]): The rule active in each interval.
+    """
+
+    def __init__(self, rules: Optional[List[PointEarningRule]] = None):
+        """
+        Builds the timeline from a list of rules.
+
+        Args:
+            rules (Optional[List[PointEarningRule]], optional): The rules of
+                one category, in order of precedence. Defaults to None.
+        """
+        self.starts: List[int] = []
+        self.ends: List[float] = []
+        self.rules: List[PointEarningRule] = []
+
+        rules = rules or []
+        spans = [
+            (rule.start_date.toordinal(),
+             rule.end_date.toordinal() + 1 if rule.end_date else math.inf)
+            for rule in rules
+        ]
+        boundaries = sorted(
+            {start for start, _ in spans} |
+            {end for _, end in spans if end != math.inf}
+        )
+
+        for position, segment_start in enumerate(boundaries):
+            segment_end = (boundaries[position + 1]
+                           if position + 1 < len(boundaries) else math.inf)
+            winner = next(
+                (rule for rule, (start, end) in zip(rules, spans)
+                 if start <= segment_start and segment_start < end),
+                None
+            )
+            if winner is None:
+                continue
+            if (self.rules and self.rules[-1] is winner and
+                    self.ends[-1] == segment_start):
+                self.ends[-1] = segment_end
+                continue
+            self.starts.append(segment_start)
+            self.ends.append(segment_end)
+            self.rules.append(winner)
+
+    def find(self, current_date: date) -> Optional[PointEarningRule]:
+        """
+        Finds the rule active on the given date.
+
+        Args:
+            current_date (date): The date to look up.
+
+        Returns:
+            Optional[PointEarningRule]: The active rule, or None if no rule
+            is active on that date.
+        """
+        ordinal = current_date.toordinal()
+        position = bisect_right(self.starts, ordinal) - 1
+        if position >= 0 and ordinal < self.ends[position]:
+            return self.rules[position]
+        return None
+
+    def __len__(self) -> int:
+        return len(self.rules)
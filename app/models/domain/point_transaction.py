@@ -21,6 +21,8 @@ class PointTransaction:
         points_earned (int): The number of points earned in this transaction.
         transaction_date (datetime): The timestamp when the transaction
         occurred.
+        quantity (Optional[int]): The quantity of the product bought, or
+            None for transactions recorded before quantities were kept.
     """
 
     def __init__(
@@ -29,7 +31,8 @@ class PointTransaction:
         loyalty_account: LoyaltyAccount,
         product: Product,
         points_earned: int,
-        transaction_date: Optional[datetime] = None
+        transaction_date: Optional[datetime] = None,
+        quantity: Optional[int] = None
     ):
         """
         Initializes a new PointTransaction instance.
@@ -43,9 +46,12 @@ class PointTransaction:
                 in this transaction.
             transaction_date (Optional[datetime], optional): The timestamp when
                 the transaction occurred. Defaults to None.
+            quantity (Optional[int], optional): The quantity of the product
+                bought. Defaults to None.
         """
         self.id: int = id
         self.loyalty_account: LoyaltyAccount = loyalty_account
         self.product: Product = product
         self.points_earned: int = points_earned
         self.transaction_date: datetime = transaction_date or datetime.utcnow()
+        self.quantity: Optional[int] = quantity
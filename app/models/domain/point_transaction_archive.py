@@ -0,0 +1,77 @@
+# app/models/domain/point_transaction_archive.py
+from datetime import date, datetime
+from typing import Optional
+
+
+class PointTransactionArchive:
+    """
+    Represents an archived month of the point transaction ledger.
+
+    Attributes:
+        id (int): The unique identifier for the archive record.
+        month (date): The first day of the archived month.
+        path (str): The location of the archive file.
+        row_count (int): The number of transactions in the file.
+        points_earned (int): The total points of the transactions in the
+            file.
+        min_loyalty_account_id (int): The smallest loyalty account ID in the
+            file.
+        max_loyalty_account_id (int): The largest loyalty account ID in the
+            file.
+        checksum (str): The SHA-256 digest of the file.
+        archived_at (datetime): When the month was last archived.
+    """
+
+    def __init__(
+        self,
+        id: int,
+        month: date,
+        path: str,
+        row_count: int,
+        points_earned: int,
+        min_loyalty_account_id: int,
+        max_loyalty_account_id: int,
+        checksum: str,
+        archived_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Initializes a new PointTransactionArchive instance.
+
+        Args:
+            id (int): The unique identifier for the archive record.
+            month (date): The first day of the archived month.
+            path (str): The location of the archive file.
+            row_count (int): The number of transactions in the file.
+            points_earned (int): The total points of the transactions in
+                the file.
+            min_loyalty_account_id (int): The smallest loyalty account ID in
+                the file.
+            max_loyalty_account_id (int): The largest loyalty account ID in
+                the file.
+            checksum (str): The SHA-256 digest of the file.
+            archived_at (Optional[datetime], optional): When the month was
+                last archived. Defaults to None.
+        """
+        self.id: int = id
+        self.month: date = month
+        self.path: str = path
+        self.row_count: int = row_count
+        self.points_earned: int = points_earned
+        self.min_loyalty_account_id: int = min_loyalty_account_id
+        self.max_loyalty_account_id: int = max_loyalty_account_id
+        self.checksum: str = checksum
+        self.archived_at: datetime = archived_at or datetime.utcnow()
+
+    def may_contain_account(self, loyalty_account_id: int) -> bool:
+        """
+        Checks whether the archive can hold transactions of an account.
+
+        Args:
+            loyalty_account_id (int): The ID of the loyalty account.
+
+        Returns:
+            bool: False if the account is outside the archive's account ID
+            range, True otherwise.
+        """
+        return (self.min_loyalty_account_id <= loyalty_account_id
+                <= self.max_loyalty_account_id)
@@ -0,0 +1,531 @@
+# app/models/domain/points_engine.py
+import math
+from datetime import date
+from typing import (
+    Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence
+)
+import numpy as np
+from app.models.domain.point_earning_rule import (
+    BONUS,
+    CAP,
+    MULTIPLIER,
+    RATE,
+    TIER,
+    PointEarningRule,
+    PointEarningRuleTimeline
+)
+
+# Largest category ID for which RuleTable keeps a dense lookup array.
+DENSE_LOOKUP_MAX_SIZE: int = 1 << 20
+
+
+class RuleTable:
+    """
+    Decision table of the point earning rules active on a date, compiled
+    into columns sorted by category ID for vectorized lookups.
+
+    Every category with a rule of its own has a row holding the outcome of
+    all rules that apply to it: its rate (or the base rate), the sum of its
+    bonuses, the product of its multipliers and its cap. Categories without
+    a row use the rules that apply to all categories. Spend tiers and the
+    order cap apply to the whole order.
+
+    Attributes:
+        category_ids (np.ndarray): Sorted category IDs (int64).
+        points_per_dollar (np.ndarray): Rate plus bonuses of each category
+            (int64), -1 for categories without a rate.
+        multipliers (np.ndarray): Product of the multipliers of each
+            category (float64).
+        max_points (np.ndarray): Most points per order of each category
+            (int64), -1 for categories without a cap.
+        tier_min_spend (np.ndarray): Ascending order amounts from which a
+            spend tier applies (float64).
+        tier_points_per_dollar (np.ndarray): Points per dollar added by each
+            spend tier (int64).
+        order_max_points (Optional[int]): Most points per order, or None.
+    """
+
+    def __init__(
+        self,
+        points_per_dollar: Mapping[Optional[int], int],
+        bonuses: Optional[Mapping[Optional[int], int]] = None,
+        multipliers: Optional[Mapping[Optional[int], float]] = None,
+        max_points: Optional[Mapping[int, int]] = None,
+        tiers: Optional[Mapping[float, int]] = None,
+        order_max_points: Optional[int] = None
+    ) -> None:
+        """
+        Compiles the table from the rules of each category.
+
+        The key None stands for all categories: its rate is the base rate of
+        categories without a rate of their own, while its bonus and
+        multiplier stack with those of every category.
+
+        Args:
+            points_per_dollar (Mapping[Optional[int], int]): Rates by
+                category ID. Categories without an active rule are left out.
+            bonuses (Optional[Mapping[Optional[int], int]], optional): Bonus
+                points per dollar by category ID. Defaults to None.
+            multipliers (Optional[Mapping[Optional[int], float]], optional):
+                Multipliers by category ID. Defaults to None.
+            max_points (Optional[Mapping[int, int]], optional): Most points
+                per order by category ID. Defaults to None.
+            tiers (Optional[Mapping[float, int]], optional): Points per
+                dollar added to every line by minimum order amount. Only the
+                highest tier reached applies. Defaults to None.
+            order_max_points (Optional[int], optional): Most points per
+                order. Defaults to None.
+        """
+        bonuses = bonuses or {}
+        multipliers = multipliers or {}
+        max_points = max_points or {}
+        tiers = tiers or {}
+
+        category_ids = sorted(
+            {*points_per_dollar, *bonuses, *multipliers, *max_points} -
+            {None})
+        self.category_ids: np.ndarray = np.array(category_ids, dtype=np.int64)
+        self.points_per_dollar: np.ndarray = np.array(
+            [self._rate(points_per_dollar, bonuses, category_id)
+             for category_id in category_ids], dtype=np.int64)
+        self.multipliers: np.ndarray = np.array(
+            [multipliers.get(None, 1.0) * multipliers.get(category_id, 1.0)
+             for category_id in category_ids], dtype=np.float64)
+        self.max_points: np.ndarray = np.array(
+            [max_points.get(category_id, -1) for category_id in category_ids],
+            dtype=np.int64)
+        self.tier_min_spend: np.ndarray = np.array(
+            sorted(tiers), dtype=np.float64)
+        self.tier_points_per_dollar: np.ndarray = np.array(
+            [tiers[min_spend] for min_spend in sorted(tiers)], dtype=np.int64)
+        self.order_max_points: Optional[int] = order_max_points
+
+        # The row of categories without rules of their own.
+        self._default_points_per_dollar: int = self._rate(
+            points_per_dollar, bonuses, None)
+        self._default_multiplier: float = multipliers.get(None, 1.0)
+
+        # Category IDs are usually small and dense, so index an array by
+        # category ID instead of binary searching when that array is small.
+        self._dense: Optional[np.ndarray] = None
+        if category_ids and 0 <= category_ids[0] and \
+                category_ids[-1] < DENSE_LOOKUP_MAX_SIZE:
+            self._dense = np.full(category_ids[-1] + 1, -1, dtype=np.int64)
+            self._dense[self.category_ids] = np.arange(len(category_ids))
+
+    @staticmethod
+    def _rate(
+        points_per_dollar: Mapping[Optional[int], int],
+        bonuses: Mapping[Optional[int], int],
+        category_id: Optional[int]
+    ) -> int:
+        """Returns the rate plus bonuses of a category, -1 without rate."""
+        rate = points_per_dollar.get(
+            category_id, points_per_dollar.get(None, -1))
+        if rate < 0:
+            return -1
+        return rate + bonuses.get(None, 0) + (
+            bonuses.get(category_id, 0) if category_id is not None else 0)
+
+    @classmethod
+    def from_timelines(
+        cls,
+        timelines: Mapping[Optional[int], PointEarningRuleTimeline],
+        current_date: date,
+        modifiers: Iterable[PointEarningRule] = ()
+    ) -> 'RuleTable':
+        """
+        Compiles the table of the rules active on a date.
+
+        Args:
+            timelines (Mapping[Optional[int], PointEarningRuleTimeline]): The
+                rate timelines by category ID, None for the base rate.
+            current_date (date): The date the rules must be active on.
+            modifiers (Iterable[PointEarningRule], optional): The bonus,
+                tier, multiplier and cap rules. Defaults to none.
+
+        Returns:
+            RuleTable: The rules active on `current_date`.
+        """
+        points_per_dollar: Dict[Optional[int], int] = {}
+        for category_id, timeline in timelines.items():
+            rule = timeline.find(current_date)
+            if rule is not None:
+                points_per_dollar[category_id] = rule.points_per_dollar
+
+        bonuses: Dict[Optional[int], int] = {}
+        multipliers: Dict[Optional[int], float] = {}
+        max_points: Dict[int, int] = {}
+        tiers: Dict[float, int] = {}
+        order_max_points: Optional[int] = None
+        for rule in modifiers:
+            if not rule.is_active(current_date):
+                continue
+            category_id = rule.category_id
+            if rule.rule_type == BONUS:
+                bonuses[category_id] = \
+                    bonuses.get(category_id, 0) + rule.points_per_dollar
+            elif rule.rule_type == MULTIPLIER:
+                multipliers[category_id] = \
+                    multipliers.get(category_id, 1.0) * rule.multiplier
+            elif rule.rule_type == TIER:
+                tiers[rule.min_spend] = max(
+                    tiers.get(rule.min_spend, 0), rule.points_per_dollar)
+            elif rule.rule_type == CAP and category_id is None:
+                order_max_points = (
+                    rule.max_points if order_max_points is None
+                    else min(order_max_points, rule.max_points))
+            elif rule.rule_type == CAP:
+                max_points[category_id] = min(
+                    max_points.get(category_id, rule.max_points),
+                    rule.max_points)
+        return cls(points_per_dollar, bonuses, multipliers, max_points,
+                   tiers, order_max_points)
+
+    def _select(
+        self, column: np.ndarray, category_ids: np.ndarray, default: Any
+    ) -> np.ndarray:
+        """
+        Looks up a column for many categories at once, using `default` for
+        categories without a row.
+        """
+        if not len(self.category_ids):
+            return np.full(len(category_ids), default, dtype=column.dtype)
+        if self._dense is not None:
+            in_range = (category_ids >= 0) & (category_ids < len(self._dense))
+            rows = np.where(
+                in_range,
+                self._dense[np.where(in_range, category_ids, 0)],
+                -1)
+        else:
+            positions = np.searchsorted(self.category_ids, category_ids)
+            positions = np.minimum(positions, len(self.category_ids) - 1)
+            found = self.category_ids[positions] == category_ids
+            rows = np.where(found, positions, -1)
+        return np.where(rows >= 0, column[np.maximum(rows, 0)], default)
+
+    def lookup(self, category_ids: np.ndarray) -> np.ndarray:
+        """
+        Looks up the points per dollar of many categories at once.
+
+        Args:
+            category_ids (np.ndarray): Category IDs (int64).
+
+        Returns:
+            np.ndarray: Rate plus bonuses of each category (int64), -1 for
+            categories without an active rate.
+        """
+        return self._select(
+            self.points_per_dollar, category_ids,
+            self._default_points_per_dollar)
+
+    def lookup_multipliers(self, category_ids: np.ndarray) -> np.ndarray:
+        """
+        Looks up the multipliers of many categories at once.
+
+        Args:
+            category_ids (np.ndarray): Category IDs (int64).
+
+        Returns:
+            np.ndarray: Product of the multipliers of each category
+            (float64), 1.0 for categories without multipliers.
+        """
+        return self._select(
+            self.multipliers, category_ids, self._default_multiplier)
+
+    def lookup_max_points(self, category_ids: np.ndarray) -> np.ndarray:
+        """
+        Looks up the per-order caps of many categories at once.
+
+        Args:
+            category_ids (np.ndarray): Category IDs (int64).
+
+        Returns:
+            np.ndarray: Most points per order of each category (int64), -1
+            for categories without a cap.
+        """
+        return self._select(self.max_points, category_ids, -1)
+
+    def tier_bonus(self, spend: np.ndarray) -> np.ndarray:
+        """
+        Looks up the points per dollar added by the highest spend tier that
+        each order amount reaches.
+
+        Args:
+            spend (np.ndarray): Order amounts (float64).
+
+        Returns:
+            np.ndarray: Points per dollar of the tier of each amount
+            (int64), 0 below the first tier.
+        """
+        if not len(self.tier_min_spend):
+            return np.zeros(len(spend), dtype=np.int64)
+        positions = np.searchsorted(
+            self.tier_min_spend, spend, side='right') - 1
+        return np.where(
+            positions >= 0,
+            self.tier_points_per_dollar[np.maximum(positions, 0)],
+            0)
+
+    @property
+    def has_caps(self) -> bool:
+        """Whether any category or the order has a cap."""
+        return (self.order_max_points is not None or
+                bool((self.max_points >= 0).any()))
+
+    def __len__(self) -> int:
+        return len(self.category_ids)
+
+
+class RuleSet:
+    """
+    The point earning rules of all dates, compiled lazily into one RuleTable
+    per date bucket.
+
+    A date bucket is a span of days between two days on which any rule
+    starts or ends, so the same rules are active on all of its days.
+
+    Attributes:
+        timelines (Mapping[Optional[int], PointEarningRuleTimeline]): The
+            rate timelines by category ID, None for the base rate.
+        modifiers (List[PointEarningRule]): The bonus, tier, multiplier and
+            cap rules.
+        boundaries (np.ndarray): Sorted ordinals of the days on which any
+            rule starts or ends (int64).
+        compiles (int): RuleTables compiled so far.
+    """
+
+    def __init__(
+        self,
+        timelines: Mapping[Optional[int], PointEarningRuleTimeline],
+        modifiers: Iterable[PointEarningRule] = ()
+    ) -> None:
+        """
+        Initializes the rule set.
+
+        Args:
+            timelines (Mapping[Optional[int], PointEarningRuleTimeline]): The
+                rate timelines by category ID, None for the base rate.
+            modifiers (Iterable[PointEarningRule], optional): The bonus,
+                tier, multiplier and cap rules. Defaults to none.
+        """
+        self.timelines: Mapping[Optional[int], PointEarningRuleTimeline] = \
+            timelines
+        self.modifiers: List[PointEarningRule] = list(modifiers)
+        boundaries = set()
+        for timeline in timelines.values():
+            boundaries.update(timeline.starts)
+            boundaries.update(
+                end for end in timeline.ends if end != math.inf)
+        for rule in self.modifiers:
+            boundaries.add(rule.start_date.toordinal())
+            if rule.end_date is not None:
+                boundaries.add(rule.end_date.toordinal() + 1)
+        self.boundaries: np.ndarray = np.array(
+            sorted(boundaries), dtype=np.int64)
+        self.compiles: int = 0
+        self._tables: Dict[int, RuleTable] = {}
+
+    @classmethod
+    def from_rules(cls, rules: Iterable[PointEarningRule]) -> 'RuleSet':
+        """
+        Builds a rule set from a list of rules of any type.
+
+        Args:
+            rules (Iterable[PointEarningRule]): The rules, in order of
+                precedence: on any day, the first active rate rule of a
+                category wins.
+
+        Returns:
+            RuleSet: The rule set.
+        """
+        rates: Dict[Optional[int], List[PointEarningRule]] = {}
+        modifiers: List[PointEarningRule] = []
+        for rule in rules:
+            if rule.rule_type == RATE:
+                rates.setdefault(rule.category_id, []).append(rule)
+            else:
+                modifiers.append(rule)
+        return cls({
+            category_id: PointEarningRuleTimeline(category_rules)
+            for category_id, category_rules in rates.items()
+        }, modifiers)
+
+    def buckets(self, ordinals: np.ndarray) -> np.ndarray:
+        """
+        Finds the date bucket of many days at once.
+
+        Args:
+            ordinals (np.ndarray): Ordinals of the days (int64).
+
+        Returns:
+            np.ndarray: The bucket of each day (int64).
+        """
+        return np.searchsorted(self.boundaries, ordinals, side='right')
+
+    def rule_table(self, current_date: date) -> RuleTable:
+        """
+        Returns the rules active on a date, compiling the table of its date
+        bucket on first use.
+
+        Args:
+            current_date (date): The date the rules must be active on.
+
+        Returns:
+            RuleTable: The rules active on `current_date`.
+        """
+        bucket = int(self.buckets(
+            np.array([current_date.toordinal()]))[0])
+        rule_table = self._tables.get(bucket)
+        if rule_table is None:
+            rule_table = RuleTable.from_timelines(
+                self.timelines, current_date, self.modifiers)
+            self._tables[bucket] = rule_table
+            self.compiles += 1
+        return rule_table
+
+
+class PointsBreakdown(NamedTuple):
+    """
+    Points earned per line item, with the reason a line earned nothing.
+
+    Every mask is a boolean array with one entry per line; each line is in
+    exactly one of `earned`, `missing_product`, `missing_category` and
+    `missing_rule`.
+    """
+    points: np.ndarray
+    earned: np.ndarray
+    missing_product: np.ndarray
+    missing_category: np.ndarray
+    missing_rule: np.ndarray
+
+    @property
+    def total(self) -> int:
+        """The points earned by all lines."""
+        return int(self.points.sum())
+
+
+class PointsEngine:
+    """
+    Vectorized evaluation of the points formula
+    ``int(price * points_per_dollar * quantity * multiplier)`` over columnar
+    line items, followed by the caps of each order.
+
+    The points per dollar of a line are its category's rate plus bonuses
+    plus the spend tier reached by its order. The products are evaluated in
+    the same order and in float64 like the scalar formula, and then
+    truncated toward zero like int(), so with plain rates the results are
+    identical to evaluating ``int(price * points_per_dollar * quantity)``
+    line by line.
+    """
+
+    @staticmethod
+    def compute(
+        price: np.ndarray,
+        quantity: np.ndarray,
+        category_id: np.ndarray,
+        rule_table: RuleTable,
+        missing_product: Optional[np.ndarray] = None,
+        order_index: Optional[np.ndarray] = None
+    ) -> PointsBreakdown:
+        """
+        Computes the points earned by each line item in one pass.
+
+        Args:
+            price (np.ndarray): Unit price of each line (float64).
+            quantity (np.ndarray): Quantity of each line (int64).
+            category_id (np.ndarray): Category of each line's product
+                (int64), 0 for products without a category.
+            rule_table (RuleTable): The active rules.
+            missing_product (Optional[np.ndarray], optional): True for lines
+                whose product does not exist; their price and category are
+                ignored. Defaults to no missing products.
+            order_index (Optional[np.ndarray], optional): The order of each
+                line (int64, from 0), to compute the lines of many orders at
+                once. Spend tiers and caps apply to each order separately.
+                Defaults to all lines belonging to one order.
+
+        Returns:
+            PointsBreakdown: The points and masks of every line.
+        """
+        price = np.asarray(price, dtype=np.float64)
+        quantity = np.asarray(quantity, dtype=np.int64)
+        category_id = np.asarray(category_id, dtype=np.int64)
+        if missing_product is None:
+            missing_product = np.zeros(len(price), dtype=bool)
+        else:
+            missing_product = np.asarray(missing_product, dtype=bool)
+        if order_index is None:
+            order_index = np.zeros(len(price), dtype=np.int64)
+        else:
+            order_index = np.asarray(order_index, dtype=np.int64)
+
+        points_per_dollar = rule_table.lookup(category_id)
+        missing_category = ~missing_product & (category_id == 0)
+        missing_rule = (~missing_product & ~missing_category &
+                        (points_per_dollar < 0))
+        earned = ~(missing_product | missing_category | missing_rule)
+
+        with np.errstate(invalid='ignore', over='ignore'):
+            if len(rule_table.tier_min_spend):
+                spend = np.bincount(
+                    order_index,
+                    weights=np.where(earned, price * quantity, 0.0))
+                points_per_dollar = points_per_dollar + \
+                    rule_table.tier_bonus(spend)[order_index]
+            raw = (price * points_per_dollar) * quantity
+            raw = raw * rule_table.lookup_multipliers(category_id)
+        points = np.trunc(np.where(earned, raw, 0.0)).astype(np.int64)
+
+        if rule_table.has_caps:
+            points = PointsEngine._cap_groups(
+                points, (order_index, category_id),
+                np.where(earned, rule_table.lookup_max_points(category_id),
+                         -1))
+            if rule_table.order_max_points is not None:
+                points = PointsEngine._cap_groups(
+                    points, (order_index,),
+                    np.full(len(points), rule_table.order_max_points,
+                            dtype=np.int64))
+        return PointsBreakdown(
+            points=points,
+            earned=earned,
+            missing_product=missing_product,
+            missing_category=missing_category,
+            missing_rule=missing_rule
+        )
+
+    @staticmethod
+    def _cap_groups(
+        points: np.ndarray,
+        keys: Sequence[np.ndarray],
+        max_points: np.ndarray
+    ) -> np.ndarray:
+        """
+        Limits the points of each group of lines with equal `keys` to the
+        group's cap, taking the points of its lines in order until the cap
+        is reached. Lines whose cap is -1 are left alone.
+        """
+        capped = np.flatnonzero(max_points >= 0)
+        if not len(capped):
+            return points
+        # Group the capped lines, keeping their order (lexsort is stable
+        # and sorts by its last key first), and compute the running total
+        # of each group.
+        order = capped[np.lexsort(
+            tuple(key[capped] for key in reversed(keys)))]
+        values = points[order]
+        running = np.cumsum(values)
+        group_start = np.zeros(len(order), dtype=bool)
+        group_start[0] = True
+        for key in keys:
+            sorted_key = key[order]
+            group_start[1:] |= sorted_key[1:] != sorted_key[:-1]
+        offsets = (running - values)[group_start]
+        running -= offsets[np.cumsum(group_start) - 1]
+
+        limit = max_points[order]
+        points = points.copy()
+        points[order] = (np.minimum(running, limit) -
+                         np.minimum(running - values, limit))
+        return points
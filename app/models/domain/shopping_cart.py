@@ -1,5 +1,6 @@
 # app/models/domain/shopping_cart.py
-from typing import List, Optional
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
 from app.models.domain.product import Product
 
 
@@ -11,18 +12,31 @@ class ShoppingCart:
     of a shopping cart, including its identification, associated customer,
     and items.
 
+    The items are held in a mapping keyed by product ID, in the order they
+    were added, so adding, updating, removing and looking up an item take
+    constant time whatever the size of the cart. The subtotal and the total
+    quantity are kept up to date as items change instead of being summed
+    on every read.
+
     Attributes:
         id (int): The unique identifier for the shopping cart.
         customer_id (int): The identifier of the customer associated
             with this cart.
-        items (List['ShoppingCartItem']): A list of items in the shopping cart.
+        items (List['ShoppingCartItem']): The items in the shopping cart, in
+            the order they were added.
+        version (int): The version of the cart when it was read.
+        subtotal (float): The price of the items times their quantity.
+        item_count (int): The total quantity of the items.
     """
+    __slots__ = ('id', 'customer_id', 'version', '_items', '_subtotal',
+                 '_item_count')
 
     def __init__(
         self,
         id: int,
         customer_id: int,
-        items: Optional[List['ShoppingCartItem']] = None
+        items: Optional[List['ShoppingCartItem']] = None,
+        version: int = 0
     ) -> None:
         """
         Initializes a new ShoppingCart instance.
@@ -32,11 +46,63 @@ class ShoppingCart:
             customer_id (int): The identifier of the customer associated
               with this cart.
             items (Optional[List['ShoppingCartItem']], optional): A list of
-                items in the shopping cart. Defaults to None.
+                items in the shopping cart. Items of the same product are
+                merged. Defaults to None.
+            version (int, optional): The version of the cart when it was
+                read. Defaults to 0 for new carts.
         """
         self.id: int = id
         self.customer_id: int = customer_id
-        self.items: List['ShoppingCartItem'] = items or []
+        self.version: int = version
+        self._items: Dict[int, ShoppingCartItem] = {}
+        self._subtotal: Decimal = Decimal(0)
+        self._item_count: int = 0
+        self.items = items or []
+
+    @property
+    def items(self) -> List['ShoppingCartItem']:
+        """
+        The items in the shopping cart, in the order they were added. The
+        list is a copy; change the cart through its methods.
+        """
+        return list(self._items.values())
+
+    @items.setter
+    def items(self, items: Iterable['ShoppingCartItem']) -> None:
+        self.clear()
+        for item in items:
+            existing = self._items.get(item.product.id)
+            if existing is not None:
+                existing.quantity += item.quantity
+            else:
+                self._attach(item)
+
+    @property
+    def subtotal(self) -> float:
+        """The price of the items times their quantity."""
+        return float(self._subtotal)
+
+    @property
+    def item_count(self) -> int:
+        """The total quantity of the items."""
+        return self._item_count
+
+    def __contains__(self, product_id: object) -> bool:
+        """Returns whether the product with the given ID is in the cart."""
+        return product_id in self._items
+
+    def get_item(self, product_id: int) -> Optional['ShoppingCartItem']:
+        """
+        Retrieves the item of a product.
+
+        Args:
+            product_id (int): The ID of the product.
+
+        Returns:
+            Optional[ShoppingCartItem]: The item, or None if the product is
+            not in the cart.
+        """
+        return self._items.get(product_id)
 
     def add_item(self, product: 'Product', quantity: int) -> None:
         """
@@ -47,11 +113,11 @@ class ShoppingCart:
             product (Product): The product to add to the cart.
             quantity (int): The quantity of the product to add.
         """
-        for item in self.items:
-            if item.product.id == product.id:
-                item.quantity += quantity
-                return
-        self.items.append(ShoppingCartItem(product=product, quantity=quantity))
+        item = self._items.get(product.id)
+        if item is not None:
+            item.quantity += quantity
+        else:
+            self._attach(ShoppingCartItem(product=product, quantity=quantity))
 
     def remove_item(self, product_id: int) -> None:
         """
@@ -60,8 +126,10 @@ class ShoppingCart:
         Args:
             product_id (int): The ID of the product to remove from the cart.
         """
-        self.items = [
-            item for item in self.items if item.product.id != product_id]
+        item = self._items.pop(product_id, None)
+        if item is not None:
+            self._change_totals(item, -item.quantity)
+            item._cart = None
 
     def update_item_quantity(self, product_id: int, quantity: int) -> None:
         """
@@ -71,16 +139,35 @@ class ShoppingCart:
             product_id (int): The ID of the product to update.
             quantity (int): The new quantity for the product.
         """
-        for item in self.items:
-            if item.product.id == product_id:
-                item.quantity = quantity
-                return
+        item = self._items.get(product_id)
+        if item is not None:
+            item.quantity = quantity
 
     def clear(self) -> None:
         """
         Removes all items from the shopping cart.
         """
-        self.items.clear()
+        for item in self._items.values():
+            item._cart = None
+        self._items.clear()
+        self._subtotal = Decimal(0)
+        self._item_count = 0
+
+    def _attach(self, item: 'ShoppingCartItem') -> None:
+        """Adds an item of a product not yet in the cart."""
+        if item._cart is not None:
+            item = ShoppingCartItem(item.product, item.quantity)
+        self._items[item.product.id] = item
+        item._cart = self
+        self._change_totals(item, item.quantity)
+
+    def _change_totals(self, item: 'ShoppingCartItem', quantity: int) -> None:
+        """
+        Adds a change of an item's quantity to the running totals. Prices
+        are summed as decimals so that the subtotal does not drift.
+        """
+        self._item_count += quantity
+        self._subtotal += Decimal(str(item.product.price)) * quantity
 
 
 class ShoppingCartItem:
@@ -88,12 +175,14 @@ class ShoppingCartItem:
     Represents an item in a shopping cart.
 
     This class encapsulates a product and its quantity in the context
-    of a shopping cart.
+    of a shopping cart. Setting the quantity of an item in a cart updates
+    the cart's totals.
 
     Attributes:
         product (Product): The product associated with this cart item.
         quantity (int): The quantity of the product in the cart.
     """
+    __slots__ = ('product', '_quantity', '_cart')
 
     def __init__(self, product: 'Product', quantity: int) -> None:
         """
@@ -104,4 +193,16 @@ class ShoppingCartItem:
             quantity (int): The quantity of the product.
         """
         self.product: 'Product' = product
-        self.quantity: int = quantity
+        self._quantity: int = quantity
+        self._cart: Optional[ShoppingCart] = None
+
+    @property
+    def quantity(self) -> int:
+        """The quantity of the product in the cart."""
+        return self._quantity
+
+    @quantity.setter
+    def quantity(self, quantity: int) -> None:
+        if self._cart is not None:
+            self._cart._change_totals(self, quantity - self._quantity)
+        self._quantity = quantity
@@ -1,11 +1,20 @@
 # app/repositories/base_repository.py
-from typing import TypeVar, Generic, List, Optional
+from typing import Any, Dict, TypeVar, Generic, List, Optional
 import logging
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm.exc import StaleDataError
+from app.utils.exceptions import ConcurrencyConflictError
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Dialects whose INSERT supports ON CONFLICT ... DO UPDATE.
+UPSERT_INSERTS: Dict[str, Any] = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
 
 class BaseRepository(Generic[T]):
     """
@@ -66,15 +75,30 @@ class BaseRepository(Generic[T]):
         """
         Updates an existing entity in the database.
 
+        For models with a ``version_id_col``, the update only succeeds if
+        the entity's version is still the current version of its row.
+
         Args:
             entity (T): The entity to update.
 
         Returns:
             T: The updated entity.
+
+        Raises:
+            ConcurrencyConflictError: If the row was changed since the
+                entity's version was read.
         """
         from app import db
-        db.session.merge(entity)
-        db.session.commit()
+        try:
+            db.session.merge(entity)
+            db.session.commit()
+        except StaleDataError as e:
+            db.session.rollback()
+            logger.info(f"Conflicting update of {self.model.__tablename__} "
+                        f"row {entity.id}: {e}")
+            raise ConcurrencyConflictError(
+                f"Row {entity.id} of {self.model.__tablename__} was changed "
+                f"concurrently")
         return entity
 
     def delete(self, id: int) -> None:
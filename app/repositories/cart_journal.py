@@ -0,0 +1,139 @@
+# app/repositories/cart_journal.py
+import json
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_SEGMENT_NAME = re.compile(r'^cart-journal-(\d+)\.jsonl$')
+
+
+class CartJournal:
+    """
+    An append-only journal of cart edits, one JSON record per line, split
+    into numbered segment files.
+
+    Records are only ever appended. Once the edits of a segment are in the
+    database, the whole segment is deleted with discard(), so the journal
+    only holds the edits that may not have been written yet. A directory is
+    used by one journal at a time; the journal holds a lock on it until
+    closed.
+    """
+
+    def __init__(self, directory: str, fsync: bool = False) -> None:
+        """
+        Initializes the journal and locks its directory. Segments left by
+        an earlier run are kept for replay(); new records go to a new
+        segment.
+
+        Args:
+            directory (str): The directory holding the segment files. It is
+                created if missing.
+            fsync (bool, optional): Whether every record is synced to disk,
+                so that it survives a crash of the machine and not only of
+                the process. Defaults to False.
+
+        Raises:
+            RuntimeError: If another journal uses the directory.
+        """
+        self.directory: str = os.path.abspath(directory)
+        self.fsync: bool = fsync
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock_file: TextIO = open(
+            os.path.join(self.directory, 'lock'), 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._lock_file.close()
+                raise RuntimeError(
+                    f"Cart journal {self.directory} is used by another "
+                    f"process")
+        segments = self._segments()
+        self._segment: int = segments[-1] if segments else 0
+        self._file: Optional[TextIO] = None
+        self.rotate()
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """
+        Appends a record to the current segment.
+
+        Args:
+            record (Dict[str, Any]): The record, serializable as JSON.
+        """
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def rotate(self) -> int:
+        """
+        Closes the current segment and starts a new one.
+
+        Returns:
+            int: The number of the closed segment; every record appended
+            before the call is in it or in an older segment.
+        """
+        closed = self._segment
+        if self._file is not None:
+            self._file.close()
+        self._segment += 1
+        self._file = open(self._path(self._segment), 'a', encoding='utf-8')
+        return closed
+
+    def discard(self, up_to: int) -> None:
+        """
+        Deletes the closed segments up to and including `up_to`.
+
+        Args:
+            up_to (int): The number of a segment returned by rotate().
+        """
+        for segment in self._segments():
+            if segment <= up_to:
+                os.remove(self._path(segment))
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """
+        Reads the records of the closed segments, oldest first.
+
+        A last line left incomplete by a crash is skipped.
+
+        Yields:
+            Dict[str, Any]: The records, in the order they were appended.
+        """
+        for segment in self._segments():
+            if segment >= self._segment:
+                break
+            with open(self._path(segment), encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Skipped an incomplete record in "
+                                       f"cart journal segment {segment}")
+
+    def close(self) -> None:
+        """Closes the current segment and unlocks the directory."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._lock_file.close()
+
+    def _segments(self) -> List[int]:
+        """Returns the numbers of the segment files, in ascending order."""
+        return sorted(
+            int(match.group(1))
+            for match in map(_SEGMENT_NAME.match, os.listdir(self.directory))
+            if match
+        )
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(
+            self.directory, f'cart-journal-{segment:06d}.jsonl')
@@ -0,0 +1,523 @@
+# app/repositories/cart_store.py
+import threading
+from typing import Dict, Iterable, Optional, Sequence, Set
+from flask import Flask
+from app.repositories.cart_journal import CartJournal
+from app.repositories.shopping_cart_repository import (
+    CartChanges,
+    CartOperation,
+    ShoppingCartRepository,
+    check_operations
+)
+from app.utils.metrics import metrics
+from app.utils.scheduler import PeriodicTask
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CartStore:
+    """
+    Applies cart edits to the database as they are made.
+
+    This is the default store, and the interface of the buffered stores:
+    edits are made through add_item(), update_item_quantity(),
+    remove_item(), apply_operations() and clear(); flush() makes buffered
+    edits visible to database reads; release() additionally drops carts
+    from the buffer before an operation changes them in the database
+    directly.
+    """
+
+    def __init__(self, repository: ShoppingCartRepository) -> None:
+        """
+        Initializes the store.
+
+        Args:
+            repository (ShoppingCartRepository): Repository the edits are
+                written with.
+        """
+        self.repository: ShoppingCartRepository = repository
+
+    def start(self) -> None:
+        """Starts the store's background work, if any."""
+
+    def stop(self) -> None:
+        """Stops the store's background work and writes pending edits."""
+
+    def add_item(
+        self, customer_id: int, product_id: int, quantity: int
+    ) -> None:
+        """
+        Adds a quantity of a product to a customer's cart, creating the
+        cart if the customer has none.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            product_id (int): The ID of the product to add.
+            quantity (int): The quantity of the product to add.
+        """
+        self.repository.add_item(
+            self.repository.find_or_create_id(customer_id),
+            product_id, quantity)
+
+    def update_item_quantity(
+        self, customer_id: int, product_id: int, quantity: int
+    ) -> None:
+        """
+        Sets the quantity of a product already in a customer's cart.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            product_id (int): The ID of the product to update.
+            quantity (int): The new quantity of the product.
+        """
+        cart_id = self.repository.find_id_by_customer_id(customer_id)
+        if cart_id is not None:
+            self.repository.update_item_quantity(
+                cart_id, product_id, quantity)
+
+    def remove_item(self, customer_id: int, product_id: int) -> None:
+        """
+        Removes a product from a customer's cart.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            product_id (int): The ID of the product to remove.
+        """
+        cart_id = self.repository.find_id_by_customer_id(customer_id)
+        if cart_id is not None:
+            self.repository.remove_item(cart_id, product_id)
+
+    def apply_operations(
+        self, customer_id: int, operations: Sequence[CartOperation]
+    ) -> None:
+        """
+        Applies item operations to a customer's cart, in order and in one
+        transaction. The cart is created if an operation adds a product and
+        the customer has none.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            operations (Sequence[CartOperation]): The operations.
+
+        Raises:
+            ValueError: If an operation fails check_operations(). Nothing
+                is written, and no cart is created.
+        """
+        if not operations:
+            return
+        check_operations(operations)
+        if any(operation.kind == CartOperation.ADD
+               for operation in operations):
+            cart_id = self.repository.find_or_create_id(customer_id)
+        else:
+            cart_id = self.repository.find_id_by_customer_id(customer_id)
+        if cart_id is not None:
+            self.repository.apply_operations(cart_id, operations)
+
+    def clear(self, customer_id: int) -> None:
+        """
+        Removes every item from a customer's cart.
+
+        Args:
+            customer_id (int): The ID of the customer.
+        """
+        cart_id = self.repository.find_id_by_customer_id(customer_id)
+        if cart_id is not None:
+            self.repository.clear_cart(cart_id)
+
+    def flush(self, customer_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Writes the buffered edits of some or all customers.
+
+        Args:
+            customer_ids (Optional[Iterable[int]], optional): The customers
+                whose edits to write. Defaults to every customer.
+
+        Returns:
+            int: The number of carts written.
+        """
+        return 0
+
+    def release(self, customer_ids: Iterable[int]) -> int:
+        """
+        Writes the buffered edits of some customers and drops their carts
+        from the buffer, so that changes made to them in the database are
+        seen by later edits.
+
+        Args:
+            customer_ids (Iterable[int]): The customers.
+
+        Returns:
+            int: The number of carts written.
+        """
+        return 0
+
+
+class MemoryCartStore(CartStore):
+    """
+    Holds the carts being edited in memory and writes them to the database
+    behind the edits, in batches.
+
+    Every edit changes the in-memory cart of its customer, loaded from the
+    database on the first edit, and is appended to a CartJournal as the new
+    quantity of the product. Quantities rather than deltas are journaled, so
+    replaying an edit that already reached the database does no harm. A
+    background flush writes the changed carts every `flush_interval`
+    seconds, `batch_size` carts per transaction, then deletes the journal
+    segments it covered and drops the carts that were not edited since the
+    previous flush. After a restart, start() replays the remaining journal
+    into the database.
+
+    The store only buffers once started, and only in the process holding
+    the lock on the journal; otherwise edits are written at once, as by
+    CartStore. It is only correct while all cart edits go through it, so it
+    is meant for a single process; share a store between processes with
+    CartStoreServer instead.
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        repository: ShoppingCartRepository,
+        journal_dir: str,
+        journal_fsync: bool = False,
+        flush_interval: float = 1.0,
+        batch_size: int = 500
+    ) -> None:
+        """
+        Initializes the store without starting it.
+
+        Args:
+            app (Flask): The application whose context database work runs
+                in.
+            repository (ShoppingCartRepository): Repository the carts are
+                read and written with.
+            journal_dir (str): The directory of the journal of the edits.
+            journal_fsync (bool, optional): Whether every journaled edit is
+                synced to disk. Defaults to False.
+            flush_interval (float, optional): Seconds between two
+                background flushes. 0 disables them. Defaults to 1.0.
+            batch_size (int, optional): Carts written per transaction.
+                Defaults to 500.
+        """
+        super().__init__(repository)
+        self.app: Flask = app
+        self.journal_dir: str = journal_dir
+        self.journal_fsync: bool = journal_fsync
+        self.journal: Optional[CartJournal] = None
+        self.flush_interval: float = flush_interval
+        self.batch_size: int = batch_size
+        # The quantities of the cached carts, by customer and product ID.
+        self._carts: Dict[int, Dict[int, int]] = {}
+        # The products changed since the last flush, by customer ID.
+        self._dirty: Dict[int, Set[int]] = {}
+        # The customers whose cart was cleared since the last flush.
+        self._cleared: Set[int] = set()
+        # Guards the carts and the journal; held briefly by every edit.
+        self._lock = threading.Lock()
+        # Serializes flushes, so that an older state of a cart is never
+        # written after a newer one.
+        self._flush_lock = threading.RLock()
+        self._flusher: Optional[PeriodicTask] = None
+
+    def start(self) -> None:
+        """
+        Opens the journal, writes the edits left in it by an earlier run and
+        starts the background flush. If another process uses the journal,
+        the store keeps writing edits at once.
+        """
+        try:
+            self.journal = CartJournal(
+                self.journal_dir, fsync=self.journal_fsync)
+        except RuntimeError as e:
+            logger.warning(f"Not buffering cart edits: {e}")
+            return
+        replayed = self._replay()
+        if replayed:
+            logger.info(f"Replayed the journaled edits of {replayed} carts")
+        self.flush()
+        if self.flush_interval:
+            self._flusher = PeriodicTask(
+                self.app, 'cart-flush', self.flush_interval, self.flush)
+            self._flusher.start()
+
+    def stop(self) -> None:
+        """
+        Stops the background flush, writes every edit and closes the
+        journal.
+        """
+        if self._flusher is not None:
+            self._flusher.stop()
+            self._flusher = None
+        if self.journal is not None:
+            self.flush()
+            self.journal.close()
+            self.journal = None
+
+    def add_item(
+        self, customer_id: int, product_id: int, quantity: int
+    ) -> None:
+        """
+        Adds a quantity of a product to a customer's cart.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            product_id (int): The ID of the product to add.
+            quantity (int): The quantity of the product to add.
+        """
+        self.apply_operations(customer_id, [
+            CartOperation(CartOperation.ADD, product_id, quantity)])
+
+    def update_item_quantity(
+        self, customer_id: int, product_id: int, quantity: int
+    ) -> None:
+        """
+        Sets the quantity of a product already in a customer's cart.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            product_id (int): The ID of the product to update.
+            quantity (int): The new quantity of the product.
+        """
+        self.apply_operations(customer_id, [
+            CartOperation(CartOperation.UPDATE, product_id, quantity)])
+
+    def remove_item(self, customer_id: int, product_id: int) -> None:
+        """
+        Removes a product from a customer's cart.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            product_id (int): The ID of the product to remove.
+        """
+        self.apply_operations(customer_id, [
+            CartOperation(CartOperation.REMOVE, product_id)])
+
+    def apply_operations(
+        self, customer_id: int, operations: Sequence[CartOperation]
+    ) -> None:
+        """
+        Applies item operations to a customer's in-memory cart, in order,
+        with the cart loaded once and locked for all of them.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            operations (Sequence[CartOperation]): The operations.
+
+        Raises:
+            ValueError: If an operation fails check_operations().
+        """
+        if self.journal is None:
+            return super().apply_operations(customer_id, operations)
+        if not operations:
+            return
+        check_operations(operations)
+        loaded = self._load(customer_id)
+        with self._lock:
+            cart = self._carts.setdefault(customer_id, loaded)
+            for operation in operations:
+                product_id = operation.product_id
+                if operation.kind == CartOperation.ADD:
+                    self._set(customer_id, cart, product_id,
+                              cart.get(product_id, 0) + operation.quantity)
+                elif product_id not in cart:
+                    continue
+                elif operation.kind == CartOperation.UPDATE:
+                    self._set(customer_id, cart, product_id,
+                              operation.quantity)
+                else:
+                    self._set(customer_id, cart, product_id, 0)
+
+    def clear(self, customer_id: int) -> None:
+        """
+        Removes every item from a customer's cart.
+
+        Args:
+            customer_id (int): The ID of the customer.
+        """
+        if self.journal is None:
+            return super().clear(customer_id)
+        loaded = self._load(customer_id)
+        with self._lock:
+            self._carts.setdefault(customer_id, loaded).clear()
+            self._dirty[customer_id] = set()
+            self._cleared.add(customer_id)
+            self.journal.append({'customer_id': customer_id, 'cleared': True})
+        metrics.increment('cart_store.edits')
+
+    def flush(self, customer_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Writes the edits of some or all customers to the database.
+
+        A flush of every customer also deletes the journal segments it
+        covered and drops the carts that were not edited since the previous
+        flush.
+
+        Args:
+            customer_ids (Optional[Iterable[int]], optional): The customers
+                whose edits to write. Defaults to every customer.
+
+        Returns:
+            int: The number of carts written.
+
+        Raises:
+            Exception: Any error of the database. The edits stay buffered
+                and are written by the next flush.
+        """
+        if self.journal is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                if customer_ids is None:
+                    changed = list(self._dirty)
+                    for customer_id in set(self._carts) - set(changed):
+                        del self._carts[customer_id]
+                    closed_segment = self.journal.rotate()
+                else:
+                    changed = [customer_id for customer_id in customer_ids
+                               if customer_id in self._dirty]
+                    closed_segment = None
+                changes = [self._take_changes(customer_id)
+                           for customer_id in changed]
+
+            try:
+                with self.app.app_context():
+                    for start in range(0, len(changes), self.batch_size):
+                        self.repository.write_changes(
+                            changes[start:start + self.batch_size])
+            except Exception:
+                with self._lock:
+                    for change in changes:
+                        self._dirty.setdefault(change.customer_id, set()) \
+                            .update(change.quantities)
+                        if change.cleared:
+                            self._cleared.add(change.customer_id)
+                metrics.increment('cart_store.flush_errors')
+                raise
+
+            if closed_segment is not None:
+                self.journal.discard(closed_segment)
+        if changes:
+            metrics.increment('cart_store.flushed_carts', len(changes))
+            metrics.observe('cart_store.flush_carts', len(changes))
+        return len(changes)
+
+    def release(self, customer_ids: Iterable[int]) -> int:
+        """
+        Writes the edits of some customers and drops their carts from
+        memory. A record in the journal marks their earlier records as
+        written, so a restart does not replay them over later changes.
+
+        Args:
+            customer_ids (Iterable[int]): The customers.
+
+        Returns:
+            int: The number of carts written.
+        """
+        customer_ids = list(customer_ids)
+        written = 0
+        with self._flush_lock:
+            while True:
+                written += self.flush(customer_ids)
+                with self._lock:
+                    # Edits made during the flush are written by another
+                    # round before the carts are dropped.
+                    if any(customer_id in self._dirty
+                           for customer_id in customer_ids):
+                        continue
+                    for customer_id in customer_ids:
+                        if self._carts.pop(customer_id, None) is not None:
+                            self.journal.append({
+                                'customer_id': customer_id,
+                                'released': True
+                            })
+                    return written
+
+    def _load(self, customer_id: int) -> Dict[int, int]:
+        """
+        Returns the in-memory cart of a customer, reading it from the
+        database if it is not cached. A flush may drop a cart that was not
+        edited, so edits take the cart from `_carts` again under the lock,
+        falling back to the returned one.
+        """
+        with self._lock:
+            cart = self._carts.get(customer_id)
+        if cart is not None:
+            metrics.increment('cart_store.hits')
+            return cart
+        metrics.increment('cart_store.misses')
+        with self.app.app_context():
+            quantities = self.repository.find_item_quantities(customer_id)
+        with self._lock:
+            return self._carts.setdefault(customer_id, quantities)
+
+    def _set(
+        self,
+        customer_id: int,
+        cart: Dict[int, int],
+        product_id: int,
+        quantity: int
+    ) -> None:
+        """Sets the quantity of a product, 0 removing it. Hold the lock."""
+        if quantity > 0:
+            cart[product_id] = quantity
+        else:
+            cart.pop(product_id, None)
+        self._dirty.setdefault(customer_id, set()).add(product_id)
+        self.journal.append({
+            'customer_id': customer_id,
+            'product_id': product_id,
+            'quantity': max(quantity, 0)
+        })
+        metrics.increment('cart_store.edits')
+
+    def _take_changes(self, customer_id: int) -> CartChanges:
+        """Takes the buffered changes of a customer. Hold the lock."""
+        cart = self._carts.get(customer_id, {})
+        products = self._dirty.pop(customer_id)
+        cleared = customer_id in self._cleared
+        self._cleared.discard(customer_id)
+        return CartChanges(
+            customer_id=customer_id,
+            cleared=cleared,
+            quantities={
+                product_id: cart.get(product_id, 0)
+                for product_id in products
+            }
+        )
+
+    def _replay(self) -> int:
+        """
+        Applies the journal left by an earlier run to the in-memory carts.
+
+        Returns:
+            int: The number of carts with replayed edits.
+        """
+        pending: Dict[int, CartChanges] = {}
+        for record in self.journal.replay():
+            customer_id = record['customer_id']
+            if record.get('released'):
+                pending.pop(customer_id, None)
+            elif record.get('cleared'):
+                pending[customer_id] = CartChanges(customer_id, True, {})
+            else:
+                pending.setdefault(
+                    customer_id, CartChanges(customer_id, False, {})
+                ).quantities[record['product_id']] = record['quantity']
+
+        for change in pending.values():
+            loaded = self._load(change.customer_id)
+            with self._lock:
+                cart = self._carts.setdefault(change.customer_id, loaded)
+                if change.cleared:
+                    cart.clear()
+                    self._cleared.add(change.customer_id)
+                for product_id, quantity in change.quantities.items():
+                    if quantity > 0:
+                        cart[product_id] = quantity
+                    else:
+                        cart.pop(product_id, None)
+                self._dirty.setdefault(change.customer_id, set()).update(
+                    change.quantities)
+        return len(pending)
@@ -0,0 +1,186 @@
+# app/repositories/cart_store_server.py
+import threading
+from multiprocessing.managers import BaseManager
+from typing import Any, Iterable, Optional, Sequence, Tuple
+from app.repositories.cart_store import CartStore, MemoryCartStore
+from app.repositories.shopping_cart_repository import CartOperation
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The methods of the served store that clients may call.
+EXPOSED_METHODS: Tuple[str, ...] = (
+    'add_item', 'update_item_quantity', 'remove_item', 'apply_operations',
+    'clear', 'flush', 'release'
+)
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """
+    Parses a ``host:port`` address.
+
+    Args:
+        address (str): The address.
+
+    Returns:
+        Tuple[str, int]: The host and port.
+
+    Raises:
+        ValueError: If the address has no port.
+    """
+    host, separator, port = address.rpartition(':')
+    if not separator:
+        raise ValueError(f"Cart store address {address} has no port")
+    return host or '127.0.0.1', int(port)
+
+
+def parse_authkey(authkey: Optional[str]) -> bytes:
+    """
+    Parses the key of the cart store server.
+
+    Args:
+        authkey (Optional[str]): The configured key.
+
+    Returns:
+        bytes: The key to authenticate with.
+
+    Raises:
+        ValueError: If no key is configured.
+    """
+    if not authkey:
+        raise ValueError("CART_STORE_AUTHKEY must be set to use the cart "
+                         "store server")
+    return authkey.encode()
+
+
+class CartStoreServer:
+    """
+    Serves a MemoryCartStore to the application processes over a local
+    socket, standing in for a shared cache server.
+
+    Every process then edits the same in-memory carts, and the server is
+    the only one writing them to the database.
+    """
+
+    def __init__(
+        self,
+        store: MemoryCartStore,
+        address: Tuple[str, int],
+        authkey: bytes
+    ) -> None:
+        """
+        Initializes the server and binds its socket.
+
+        Args:
+            store (MemoryCartStore): The store to serve. It is started and
+                stopped with the server.
+            address (Tuple[str, int]): The host and port to listen on; port
+                0 picks a free port.
+            authkey (bytes): The key clients authenticate with.
+        """
+        self.store: MemoryCartStore = store
+
+        class Manager(BaseManager):
+            pass
+
+        Manager.register('cart_store', callable=lambda: store,
+                         exposed=EXPOSED_METHODS)
+        self._server = Manager(address=address, authkey=authkey).get_server()
+        self._stopped = threading.Event()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """The host and port the server listens on."""
+        return self._server.address
+
+    def serve_forever(self) -> None:
+        """Starts the store and serves it until stop() is called."""
+        self.store.start()
+        logger.info(f"Serving the cart store on {self.address}")
+        serving = threading.Thread(
+            target=self._serve, name='cart-store-server', daemon=True)
+        serving.start()
+        try:
+            self._stopped.wait()
+        finally:
+            self._server.stop_event.set()
+            self.store.stop()
+
+    def stop(self) -> None:
+        """Stops serving after writing every edit of the store."""
+        self._stopped.set()
+
+    def _serve(self) -> None:
+        # The manager server exits its thread with sys.exit() once stopped.
+        try:
+            self._server.serve_forever()
+        except SystemExit:
+            pass
+
+
+class RemoteCartStore(CartStore):
+    """
+    A CartStore whose edits are made in the store of a CartStoreServer.
+    The connection is opened on first use.
+    """
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes) -> None:
+        """
+        Initializes the store without connecting.
+
+        Args:
+            address (Tuple[str, int]): The host and port of the server.
+            authkey (bytes): The key to authenticate with.
+        """
+        self.address: Tuple[str, int] = address
+        self.authkey: bytes = authkey
+        self._remote: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def add_item(
+        self, customer_id: int, product_id: int, quantity: int
+    ) -> None:
+        """See CartStore.add_item()."""
+        self._store().add_item(customer_id, product_id, quantity)
+
+    def update_item_quantity(
+        self, customer_id: int, product_id: int, quantity: int
+    ) -> None:
+        """See CartStore.update_item_quantity()."""
+        self._store().update_item_quantity(customer_id, product_id, quantity)
+
+    def remove_item(self, customer_id: int, product_id: int) -> None:
+        """See CartStore.remove_item()."""
+        self._store().remove_item(customer_id, product_id)
+
+    def apply_operations(
+        self, customer_id: int, operations: Sequence[CartOperation]
+    ) -> None:
+        """See CartStore.apply_operations()."""
+        self._store().apply_operations(customer_id, list(operations))
+
+    def clear(self, customer_id: int) -> None:
+        """See CartStore.clear()."""
+        self._store().clear(customer_id)
+
+    def flush(self, customer_ids: Optional[Iterable[int]] = None) -> int:
+        """See CartStore.flush()."""
+        return self._store().flush(
+            None if customer_ids is None else list(customer_ids))
+
+    def release(self, customer_ids: Iterable[int]) -> int:
+        """See CartStore.release()."""
+        return self._store().release(list(customer_ids))
+
+    def _store(self) -> Any:
+        """Returns the proxy of the served store, connecting if needed."""
+        with self._lock:
+            if self._remote is None:
+                class Manager(BaseManager):
+                    pass
+
+                Manager.register('cart_store', exposed=EXPOSED_METHODS)
+                manager = Manager(address=self.address, authkey=self.authkey)
+                manager.connect()
+                self._remote = manager.cart_store()
+            return self._remote
@@ -0,0 +1,146 @@
+# app/repositories/checkout_job_repository.py
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import func, update
+from app.repositories.base_repository import BaseRepository
+from app.models.database.checkout_job import CheckoutJobTable
+from app.models.domain.checkout_job import CheckoutJob
+from app.mappers.checkout_job_mapper import CheckoutJobMapper
+from app import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CheckoutJobRepository(BaseRepository[CheckoutJobTable]):
+    def __init__(self):
+        """
+        Initializes the CheckoutJobRepository with the CheckoutJobTable
+        model.
+        """
+        super().__init__(CheckoutJobTable)
+
+    def enqueue(self, customer_id: int) -> CheckoutJob:
+        """
+        Adds a checkout of a customer to the queue.
+
+        Args:
+            customer_id (int): The ID of the customer checking out.
+
+        Returns:
+            CheckoutJob: The queued job.
+        """
+        job_table = CheckoutJobMapper.to_persistence_model(CheckoutJob(
+            id=None, customer_id=customer_id, status=CheckoutJob.QUEUED))
+        db.session.add(job_table)
+        db.session.commit()
+        return CheckoutJobMapper.from_persistence(job_table)
+
+    def find_by_id(self, id: int) -> Optional[CheckoutJob]:
+        """
+        Finds a checkout job by its ID.
+
+        Args:
+            id (int): The ID of the job.
+
+        Returns:
+            Optional[CheckoutJob]: The found job or None if not found.
+        """
+        job_table = db.session.get(CheckoutJobTable, id)
+        return (
+            CheckoutJobMapper.from_persistence(job_table)
+            if job_table
+            else None
+        )
+
+    def claim_next(self) -> Optional[CheckoutJob]:
+        """
+        Marks the oldest queued job as running and returns it.
+
+        The claim is a conditional UPDATE on the job's status, so a job is
+        never claimed twice, even by workers in different processes.
+
+        Returns:
+            Optional[CheckoutJob]: The claimed job, or None if the queue is
+            empty.
+        """
+        while True:
+            job_id = db.session.query(CheckoutJobTable.id).filter(
+                CheckoutJobTable.status == CheckoutJob.QUEUED
+            ).order_by(CheckoutJobTable.id).limit(1).scalar()
+            if job_id is None:
+                db.session.commit()
+                return None
+            claimed = db.session.execute(
+                update(CheckoutJobTable).where(
+                    CheckoutJobTable.id == job_id,
+                    CheckoutJobTable.status == CheckoutJob.QUEUED
+                ).values(
+                    status=CheckoutJob.RUNNING,
+                    started_at=datetime.utcnow()
+                )
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                return self.find_by_id(job_id)
+
+    def finish(
+        self,
+        id: int,
+        status: str,
+        result: Optional[str] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """
+        Records the outcome of a job.
+
+        Args:
+            id (int): The ID of the job.
+            status (str): SUCCEEDED or FAILED.
+            result (Optional[str], optional): The serialized checkout
+                response. Defaults to None.
+            error (Optional[str], optional): The error message. Defaults to
+                None.
+        """
+        db.session.execute(
+            update(CheckoutJobTable).where(CheckoutJobTable.id == id).values(
+                status=status,
+                result=result,
+                error=error,
+                finished_at=datetime.utcnow()
+            )
+        )
+        db.session.commit()
+
+    def count_queued(self) -> int:
+        """
+        Counts the jobs waiting for a worker.
+
+        Returns:
+            int: The number of queued jobs.
+        """
+        return db.session.query(func.count(CheckoutJobTable.id)).filter(
+            CheckoutJobTable.status == CheckoutJob.QUEUED
+        ).scalar()
+
+    def requeue_stale(self, started_before: datetime) -> int:
+        """
+        Puts jobs back in the queue whose worker died before finishing them.
+
+        Args:
+            started_before (datetime): Running jobs claimed before this time
+                are requeued.
+
+        Returns:
+            int: The number of requeued jobs.
+        """
+        requeued = db.session.execute(
+            update(CheckoutJobTable).where(
+                CheckoutJobTable.status == CheckoutJob.RUNNING,
+                CheckoutJobTable.started_at < started_before
+            ).values(status=CheckoutJob.QUEUED, started_at=None)
+        ).rowcount
+        db.session.commit()
+        if requeued:
+            logger.warning(f"Requeued {requeued} stale checkout jobs")
+        return requeued
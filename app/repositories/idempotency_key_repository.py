@@ -0,0 +1,174 @@
+# app/repositories/idempotency_key_repository.py
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from app.repositories.base_repository import BaseRepository
+from app.models.database.idempotency_key import IdempotencyKeyTable
+from app.models.domain.idempotency_key import IdempotencyKey
+from app.mappers.idempotency_key_mapper import IdempotencyKeyMapper
+from app import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyKeyRepository(BaseRepository[IdempotencyKeyTable]):
+    def __init__(self):
+        """
+        Initializes the IdempotencyKeyRepository with the
+        IdempotencyKeyTable model.
+        """
+        super().__init__(IdempotencyKeyTable)
+
+    def find_by_key(
+        self, customer_id: int, key: str
+    ) -> Optional[IdempotencyKey]:
+        """
+        Finds the record of an Idempotency-Key sent by a customer.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            key (str): The value of the Idempotency-Key header.
+
+        Returns:
+            Optional[IdempotencyKey]: The found record or None if not found.
+        """
+        key_table = db.session.query(IdempotencyKeyTable).filter(
+            IdempotencyKeyTable.customer_id == customer_id,
+            IdempotencyKeyTable.key == key
+        ).first()
+        return (
+            IdempotencyKeyMapper.from_persistence(key_table)
+            if key_table
+            else None
+        )
+
+    def reserve(
+        self,
+        customer_id: int,
+        key: str,
+        expires_at: datetime,
+        stale_before: datetime
+    ) -> Optional[IdempotencyKey]:
+        """
+        Claims a key for the request about to be processed.
+
+        The claim is an INSERT of a 'processing' record, so of two concurrent
+        requests with the same key only one succeeds. A 'processing' record
+        created before `stale_before` belongs to a request that never
+        finished and is taken over.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            key (str): The value of the Idempotency-Key header.
+            expires_at (datetime): When the new record expires.
+            stale_before (datetime): Processing records created before this
+                time may be taken over.
+
+        Returns:
+            Optional[IdempotencyKey]: None if the key was claimed, otherwise
+            the record that already holds it.
+        """
+        try:
+            db.session.add(IdempotencyKeyMapper.to_persistence_model(
+                IdempotencyKey(
+                    id=None,
+                    customer_id=customer_id,
+                    key=key,
+                    status=IdempotencyKey.PROCESSING,
+                    expires_at=expires_at
+                )))
+            db.session.commit()
+            return None
+        except IntegrityError:
+            db.session.rollback()
+
+        taken_over = db.session.execute(
+            update(IdempotencyKeyTable).where(
+                IdempotencyKeyTable.customer_id == customer_id,
+                IdempotencyKeyTable.key == key,
+                IdempotencyKeyTable.status == IdempotencyKey.PROCESSING,
+                IdempotencyKeyTable.created_at < stale_before
+            ).values(created_at=datetime.utcnow(), expires_at=expires_at)
+        ).rowcount
+        db.session.commit()
+        if taken_over:
+            logger.warning(f"Took over stale idempotency key {key!r} "
+                           f"of customer {customer_id}")
+            return None
+        return self.find_by_key(customer_id, key)
+
+    def complete(
+        self,
+        customer_id: int,
+        key: str,
+        status_code: int,
+        response_body: str
+    ) -> None:
+        """
+        Stores the response of the request that claimed a key.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            key (str): The value of the Idempotency-Key header.
+            status_code (int): The HTTP status code of the response.
+            response_body (str): The serialized response body.
+        """
+        db.session.execute(
+            update(IdempotencyKeyTable).where(
+                IdempotencyKeyTable.customer_id == customer_id,
+                IdempotencyKeyTable.key == key
+            ).values(
+                status=IdempotencyKey.COMPLETED,
+                status_code=status_code,
+                response_body=response_body
+            )
+        )
+        db.session.commit()
+
+    def release(self, customer_id: int, key: str) -> None:
+        """
+        Deletes a key so that the request can be retried, for example
+        after it failed or after the key expired.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            key (str): The value of the Idempotency-Key header.
+        """
+        db.session.execute(
+            delete(IdempotencyKeyTable).where(
+                IdempotencyKeyTable.customer_id == customer_id,
+                IdempotencyKeyTable.key == key
+            )
+        )
+        db.session.commit()
+
+    def purge_expired(
+        self, current_time: datetime, batch_size: int = 1000
+    ) -> int:
+        """
+        Deletes expired keys in batches, committing after each batch.
+
+        Args:
+            current_time (datetime): Keys expiring at or before this time
+                are deleted.
+            batch_size (int, optional): The maximum number of keys deleted
+                per transaction. Defaults to 1000.
+
+        Returns:
+            int: The number of keys deleted.
+        """
+        purged = 0
+        while True:
+            expired_ids = db.session.query(IdempotencyKeyTable.id).filter(
+                IdempotencyKeyTable.expires_at <= current_time
+            ).limit(batch_size).scalar_subquery()
+            deleted = db.session.execute(
+                delete(IdempotencyKeyTable).where(
+                    IdempotencyKeyTable.id.in_(expired_ids))
+            ).rowcount
+            db.session.commit()
+            purged += deleted
+            if deleted < batch_size:
+                return purged
@@ -1,29 +1,84 @@
 # app/repositories/loyalty_account_repository.py
-from typing import Optional, Dict, Any
+from typing import (
+    Optional, Dict, Any, List, NamedTuple, Sequence, Set, Tuple, Union
+)
 from datetime import datetime, timezone
 from app.repositories.base_repository import BaseRepository
+from app.repositories.point_daily_rollup_repository import (
+    PointDailyRollupRepository
+)
+from app.repositories.point_earning_rule_index import PointEarningRuleIndex
+from app.repositories.point_transaction_repository import (
+    PointTransactionRepository
+)
 from app.models.database.loyalty_account import LoyaltyAccountTable
-from app.models.database.point_transaction import PointTransactionTable
 from app.models.database.product import ProductTable
-from app.models.database.point_earning_rule import PointEarningRuleTable
-from app.models.database.shopping_cart import ShoppingCartTable
+from app.models.database.shopping_cart import (
+    ShoppingCartTable,
+    ShoppingCartItemTable,
+)
 from app.models.domain.loyalty_account import LoyaltyAccount
+from app.models.domain.shopping_cart import ShoppingCart
 from app.mappers.loyalty_account_mapper import LoyaltyAccountMapper
-from app.mappers.product_mapper import ProductMapper
+from app.models.domain.points_engine import PointsEngine
+from app.utils.exceptions import ConcurrencyConflictError
+from app.utils.tracing import span, trace
 from app import db
 import logging
+import numpy as np
+from sqlalchemy import bindparam, delete, func, tuple_, update
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import SQLAlchemyError
 
 logger = logging.getLogger(__name__)
 
+# The settlement outcome of a customer whose account or cart was changed
+# while the settlement priced the cart.
+SETTLEMENT_CONFLICT: str = \
+    "Loyalty account or shopping cart was changed concurrently"
+
+
+class CartLine(NamedTuple):
+    """A cart item with the price and category of its product."""
+    item_product_id: int
+    quantity: int
+    product_id: Optional[int]
+    price: Optional[float]
+    category_id: Optional[int]
+
 
 class LoyaltyAccountRepository(BaseRepository[LoyaltyAccountTable]):
-    def __init__(self):
+    def __init__(
+        self,
+        rule_index: Optional[PointEarningRuleIndex] = None,
+        point_transaction_repository: Optional[
+            PointTransactionRepository] = None,
+        point_daily_rollup_repository: Optional[
+            PointDailyRollupRepository] = None
+    ):
         """
         Initializes the LoyaltyAccountRepository with the
         LoyaltyAccountTable model.
+
+        Args:
+            rule_index (Optional[PointEarningRuleIndex], optional): The
+                index used to look up the active point earning rules during
+                checkout. Defaults to a new, private index.
+            point_transaction_repository (Optional[
+                PointTransactionRepository], optional): Repository used to
+                write the checkout ledger. Defaults to a new repository.
+            point_daily_rollup_repository (Optional[
+                PointDailyRollupRepository], optional): Repository used to
+                keep the daily points rollups in step with the ledger.
+                Defaults to a new repository.
         """
         super().__init__(LoyaltyAccountTable)
+        self.rule_index: PointEarningRuleIndex = \
+            rule_index or PointEarningRuleIndex()
+        self.point_transaction_repository: PointTransactionRepository = \
+            point_transaction_repository or PointTransactionRepository()
+        self.point_daily_rollup_repository: PointDailyRollupRepository = \
+            point_daily_rollup_repository or PointDailyRollupRepository()
 
     def find_by_id(self, id: int) -> Optional[LoyaltyAccount]:
         """
@@ -64,6 +119,26 @@ class LoyaltyAccountRepository(BaseRepository[LoyaltyAccountTable]):
             else None
         )
 
+    def find_id_and_version_by_customer_id(
+        self, customer_id: int
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Retrieves the ID and version of a customer's loyalty account without
+        loading the account. The version is bumped by every change of the
+        balance.
+
+        Args:
+            customer_id (int): The ID of the customer.
+
+        Returns:
+            Optional[Tuple[int, int]]: The ID and version of the account, or
+            None if the customer has no account.
+        """
+        row = db.session.query(
+            LoyaltyAccountTable.id, LoyaltyAccountTable.version
+        ).filter(LoyaltyAccountTable.customer_id == customer_id).first()
+        return (row.id, row.version) if row else None
+
     def create(self, loyalty_account: LoyaltyAccount) -> LoyaltyAccount:
         """
         Creates a new loyalty account.
@@ -100,7 +175,7 @@ class LoyaltyAccountRepository(BaseRepository[LoyaltyAccountTable]):
 
     def add_points(
         self, loyalty_account_id: int, points: int
-    ) -> LoyaltyAccount:
+    ) -> Optional[LoyaltyAccount]:
         """
         Adds points to a loyalty account.
 
@@ -109,13 +184,82 @@ class LoyaltyAccountRepository(BaseRepository[LoyaltyAccountTable]):
             points (int): Number of points to add.
 
         Returns:
-            LoyaltyAccount: Updated loyalty account.
+            Optional[LoyaltyAccount]: Updated loyalty account, or None if
+            the account does not exist.
         """
-        loyalty_account = self.find_by_id(loyalty_account_id)
-        if loyalty_account:
-            loyalty_account.points += points
-            return self.update(loyalty_account)
-        return None
+        row = self._increment_points(loyalty_account_id, points)
+        db.session.commit()
+        if row is None:
+            return None
+        return LoyaltyAccount(
+            id=loyalty_account_id,
+            customer_id=row.customer_id,
+            points=row.points
+        )
+
+    def increment_points(
+        self, loyalty_account_id: int, delta: int, commit: bool = True
+    ) -> Optional[int]:
+        """
+        Atomically changes the points balance of a loyalty account.
+
+        The balance is changed with a single
+        ``UPDATE loyalty_accounts SET points = points + :delta`` statement,
+        so concurrent increments never overwrite each other and no SELECT
+        is needed beforehand.
+
+        Args:
+            loyalty_account_id (int): The ID of the loyalty account.
+            delta (int): The number of points to add. Negative values
+                deduct points.
+            commit (bool, optional): Whether to commit the change. Pass
+                False when running inside a larger transaction.
+                Defaults to True.
+
+        Returns:
+            Optional[int]: The new balance, or None if the account does not
+            exist.
+        """
+        row = self._increment_points(loyalty_account_id, delta)
+        if commit:
+            db.session.commit()
+        return row.points if row is not None else None
+
+    def _increment_points(
+        self,
+        loyalty_account_id: int,
+        delta: int,
+        expected_version: Optional[int] = None
+    ) -> Optional[Row]:
+        """
+        Issues the balance UPDATE, which also bumps the account's version,
+        and returns the account's customer ID and new balance. Falls back to
+        a SELECT in the same transaction on databases without
+        UPDATE ... RETURNING.
+
+        If `expected_version` is given, the account is only updated if that
+        is still its version; otherwise None is returned.
+        """
+        statement = update(LoyaltyAccountTable).where(
+            LoyaltyAccountTable.id == loyalty_account_id
+        ).values(
+            points=func.coalesce(LoyaltyAccountTable.points, 0) + delta,
+            version=LoyaltyAccountTable.version + 1
+        ).execution_options(synchronize_session='fetch')
+        if expected_version is not None:
+            statement = statement.where(
+                LoyaltyAccountTable.version == expected_version)
+
+        if db.engine.dialect.update_returning:
+            return db.session.execute(statement.returning(
+                LoyaltyAccountTable.customer_id, LoyaltyAccountTable.points
+            )).first()
+
+        if db.session.execute(statement).rowcount == 0:
+            return None
+        return db.session.query(
+            LoyaltyAccountTable.customer_id, LoyaltyAccountTable.points
+        ).filter(LoyaltyAccountTable.id == loyalty_account_id).first()
 
     def checkout_transaction(self, customer_id: int) -> Dict[str, Any]:
         """
@@ -123,83 +267,493 @@ class LoyaltyAccountRepository(BaseRepository[LoyaltyAccountTable]):
         This method is executed within an atomic database transaction
         to ensure data consistency across multiple operations.
 
+        The cart and its products are loaded in a single query and the
+        applicable point earning rules come from the rule index, so the
+        number of queries issued does not depend on the number of items in
+        the cart. The customer's daily points rollup is updated in the same
+        transaction as the ledger.
+
+        If every line of the cart could be priced, the cart's items are
+        deleted with one statement in the same transaction, so points are
+        never granted for a cart that is left in place.
+
+        The account and the cart are only written if their versions are
+        still the versions they were read at, so a concurrent checkout or
+        cart change makes the checkout fail instead of being priced against
+        a cart that no longer exists.
+
+        The stages of the checkout are traced as children of a
+        ``checkout_transaction`` span, see app.utils.tracing: ``load_account``,
+        ``load_cart``, ``rules``, ``points``, ``ledger``, ``balance`` and
+        ``commit``, with the number of rows of the cart, priced lines and
+        ledger rows.
+
         Args:
             customer_id (int): The ID of the customer.
 
         Returns:
             Dict[str, Any]: A dictionary with transaction details.
-        """
-        result = {
-            'totalPointsEarned': 0,
-            'invalidProducts': [],
-            'productsMissingCategory': [],
-            'pointEarningRulesMissing': []
-        }
 
+        Raises:
+            ConcurrencyConflictError: If the account or the cart was changed
+                concurrently. Nothing is written.
+        """
         try:
-            with db.session.begin():
-                loyalty_account_table = self.find_by_customer_id(customer_id)
-                loyalty_account = LoyaltyAccountMapper.from_persistence(
-                    loyalty_account_table)
+            with trace('checkout_transaction') as checkout_span, \
+                    db.session.begin() as transaction:
+                with span('load_account'):
+                    loyalty_account = self.find_by_customer_id(customer_id)
                 if not loyalty_account:
                     raise ValueError("Loyalty account not found")
 
-                cart = db.session.query(ShoppingCartTable).filter(
-                    ShoppingCartTable.customer_id == customer_id).first()
-                if not cart or not cart.items:
+                # Products are resolved by the same query.
+                with span('load_cart') as stage:
+                    cart_lines = self._load_cart_lines(customer_id)
+                    stage.set(rows=len(cart_lines))
+                if not cart_lines:
                     raise ValueError("Shopping cart is empty or not found")
 
-                current_date = datetime.now(timezone.utc).date()
+                transaction_date = datetime.now(timezone.utc)
+                result, ledger_rows = self._price_cart_lines(
+                    loyalty_account.id, cart_lines, transaction_date)
+
+                with span('ledger', rows=len(ledger_rows)):
+                    self.point_transaction_repository.bulk_insert_rows(
+                        ledger_rows, commit=False)
+                    self.point_daily_rollup_repository.add_ledger_rows(
+                        ledger_rows)
+                with span('balance'):
+                    self._write_balance_and_cart(
+                        loyalty_account, cart_lines, result)
+                with span('commit'):
+                    transaction.commit()
+                checkout_span.set(
+                    points=result['totalPointsEarned'])
+            return result
+        except SQLAlchemyError as e:
+            # Log the error
+            logger.error(f"Error during checkout transaction: {str(e)}")
+            # The transaction is automatically rolled back
+            raise
 
-                for item in cart.items:
-                    product_table = db.session.query(
-                        ProductTable).get(item.product_id)
-                    if not product_table:
-                        result['invalidProducts'].append(item.product_id)
-                        continue
+    def _write_balance_and_cart(
+        self,
+        loyalty_account: LoyaltyAccount,
+        cart_lines: List[Row],
+        result: Dict[str, Any]
+    ) -> None:
+        """
+        Adds the points of a checkout to the account, bumps the cart's
+        version and clears the cart if every line was priced, checking that
+        neither was changed since it was read.
 
-                    product = ProductMapper.from_persistence(product_table)
+        Raises:
+            ConcurrencyConflictError: If the account or the cart was changed
+                concurrently.
+        """
+        if self._increment_points(
+                loyalty_account.id, result['totalPointsEarned'],
+                expected_version=loyalty_account.version) is None:
+            raise ConcurrencyConflictError(
+                "Loyalty account was changed concurrently")
+        if db.session.execute(
+            update(ShoppingCartTable).where(
+                ShoppingCartTable.id == cart_lines[0].cart_id,
+                ShoppingCartTable.version == cart_lines[0].cart_version
+            ).values(
+                version=ShoppingCartTable.version + 1
+            ).execution_options(synchronize_session=False)
+        ).rowcount == 0:
+            raise ConcurrencyConflictError(
+                "Shopping cart was changed concurrently")
+        if self._is_settled(result):
+            db.session.execute(
+                delete(ShoppingCartItemTable).where(
+                    ShoppingCartItemTable.cart_id == cart_lines[0].cart_id)
+            )
+
+    def quote_transaction(self, customer_id: int) -> Dict[str, Any]:
+        """
+        Calculates the points a checkout of the customer's cart would earn
+        right now, without writing anything.
 
-                    if not product.category_id:
-                        result['productsMissingCategory'].append(product.id)
-                        continue
+        Args:
+            customer_id (int): The ID of the customer.
+
+        Returns:
+            Dict[str, Any]: A dictionary with the same transaction details
+            as checkout_transaction().
+
+        Raises:
+            ValueError: If the cart is empty or does not exist.
+        """
+        cart_lines = self._load_cart_lines(customer_id)
+        if not cart_lines:
+            raise ValueError("Shopping cart is empty or not found")
+        result, _ = self._price_cart_lines(
+            None, cart_lines, datetime.now(timezone.utc))
+        return result
+
+    def quote_cart(self, cart: ShoppingCart) -> Dict[str, Any]:
+        """
+        Calculates the points a checkout of an already loaded cart would
+        earn right now, from the products of its items, without querying.
+
+        Args:
+            cart (ShoppingCart): The cart, with its items and products.
+
+        Returns:
+            Dict[str, Any]: A dictionary with the same transaction details
+            as checkout_transaction().
 
-                    rule = db.session.query(PointEarningRuleTable).filter(
-                        PointEarningRuleTable.category_id == product.category_id,  # noqa: E501
-                        PointEarningRuleTable.start_date <= current_date,
-                        db.or_(
-                            PointEarningRuleTable.end_date.is_(None),
-                            PointEarningRuleTable.end_date >= current_date
-                        )
-                    ).first()
-
-                    if not rule:
-                        result['pointEarningRulesMissing'].append(product.id)
+        Raises:
+            ValueError: If the cart is empty.
+        """
+        if not cart.items:
+            raise ValueError("Shopping cart is empty or not found")
+        cart_lines = [
+            CartLine(item.product.id, item.quantity, item.product.id,
+                     item.product.price, item.product.category_id)
+            for item in cart.items
+        ]
+        result, _ = self._price_cart_lines(
+            None, cart_lines, datetime.now(timezone.utc))
+        return result
+
+    def load_product_map(self) -> Dict[int, Row]:
+        """
+        Loads the price and category of every product.
+
+        The map is meant to be loaded once and shared by all chunks of a
+        settle_carts() run.
+
+        Returns:
+            Dict[int, Row]: Rows with the columns ``price`` and
+            ``category_id`` by product ID.
+        """
+        with db.session.begin():
+            return {
+                row.id: row
+                for row in db.session.query(
+                    ProductTable.id, ProductTable.price,
+                    ProductTable.category_id)
+            }
+
+    def settle_carts(
+        self,
+        customer_ids: List[int],
+        product_map: Dict[int, Row]
+    ) -> Dict[int, Union[Dict[str, Any], str]]:
+        """
+        Checks out the carts of several customers in a single transaction.
+
+        This is the batch counterpart of checkout_transaction(): the accounts
+        and cart items of all customers are loaded with one query each,
+        products come from `product_map` and rules from the rule index, and
+        the ledger rows, daily rollups, balance updates and cart deletions are
+        each written with one statement. Carts of successful checkouts are
+        cleared. Customers without an account or a non-empty cart get an
+        error message instead of a result and do not affect the others.
+
+        Like checkout_transaction(), a customer's account and cart are only
+        written if their versions are still the versions they were read at.
+        Customers whose account or cart was changed concurrently get
+        SETTLEMENT_CONFLICT and nothing is written for them.
+
+        Args:
+            customer_ids (List[int]): The IDs of the customers to check out.
+            product_map (Dict[int, Row]): Products as returned by
+                load_product_map().
+
+        Returns:
+            Dict[int, Union[Dict[str, Any], str]]: The transaction details,
+            as returned by checkout_transaction(), or an error message by
+            customer ID, in the order of `customer_ids`.
+        """
+        outcomes: Dict[int, Union[Dict[str, Any], str]] = {}
+        try:
+            with db.session.begin():
+                # Like find_by_customer_id(), use the customer's first
+                # account.
+                accounts: Dict[int, Row] = {}
+                for row in db.session.query(
+                    LoyaltyAccountTable.id, LoyaltyAccountTable.customer_id,
+                    LoyaltyAccountTable.version
+                ).filter(
+                    LoyaltyAccountTable.customer_id.in_(customer_ids)
+                ).order_by(LoyaltyAccountTable.id.desc()):
+                    accounts[row.customer_id] = row
+
+                carts: Dict[int, Row] = {}
+                lines_by_customer: Dict[int, List[CartLine]] = {}
+                for item in self._load_cart_items(customer_ids):
+                    carts[item.customer_id] = item
+                    product = product_map.get(item.product_id)
+                    if product is None:
+                        line = CartLine(
+                            item.product_id, item.quantity, None, None, None)
+                    else:
+                        line = CartLine(
+                            item.product_id, item.quantity, item.product_id,
+                            product.price, product.category_id)
+                    lines_by_customer.setdefault(
+                        item.customer_id, []).append(line)
+
+                transaction_date = datetime.now(timezone.utc)
+                priced: Dict[int, Tuple[Dict[str, Any],
+                                        List[Dict[str, Any]]]] = {}
+                for customer_id in customer_ids:
+                    if customer_id in outcomes or customer_id in priced:
+                        continue
+                    if customer_id not in accounts:
+                        outcomes[customer_id] = "Loyalty account not found"
+                        continue
+                    if customer_id not in lines_by_customer:
+                        outcomes[customer_id] = \
+                            "Shopping cart is empty or not found"
                         continue
 
-                    points_earned = int(
-                        product.price * rule.points_per_dollar * item.quantity
+                    priced[customer_id] = self._price_cart_lines(
+                        accounts[customer_id].id,
+                        lines_by_customer[customer_id],
+                        transaction_date)
+                    # Keep the outcomes in the order of `customer_ids`.
+                    outcomes[customer_id] = priced[customer_id][0]
+
+                # Claim the carts first, so that a customer whose cart
+                # changed never gets points.
+                claimed_carts = self._bump_versions(ShoppingCartTable, {
+                    carts[customer_id].cart_id: carts[customer_id].cart_version
+                    for customer_id in priced})
+                claimed_accounts = self._bump_versions(LoyaltyAccountTable, {
+                    accounts[customer_id].id: accounts[customer_id].version
+                    for customer_id in priced
+                    if carts[customer_id].cart_id in claimed_carts})
+
+                ledger_rows: List[Dict[str, Any]] = []
+                balance_updates: List[Dict[str, Any]] = []
+                settled_cart_ids: List[int] = []
+                for customer_id, (result, rows) in priced.items():
+                    if accounts[customer_id].id not in claimed_accounts:
+                        outcomes[customer_id] = SETTLEMENT_CONFLICT
+                        continue
+                    ledger_rows.extend(rows)
+                    if result['totalPointsEarned']:
+                        balance_updates.append({
+                            'account_id': accounts[customer_id].id,
+                            'delta': result['totalPointsEarned']
+                        })
+                    if self._is_settled(result):
+                        settled_cart_ids.append(carts[customer_id].cart_id)
+
+                self.point_transaction_repository.bulk_insert_rows(
+                    ledger_rows, commit=False)
+                self.point_daily_rollup_repository.add_ledger_rows(
+                    ledger_rows)
+                if balance_updates:
+                    # The versions were bumped when the accounts were
+                    # claimed.
+                    account_table = LoyaltyAccountTable.__table__
+                    db.session.execute(
+                        update(account_table).where(
+                            account_table.c.id == bindparam('account_id')
+                        ).values(
+                            points=func.coalesce(account_table.c.points, 0) +
+                            bindparam('delta')
+                        ),
+                        balance_updates
                     )
-                    logger.debug(f"Points earned: {points_earned}")
-                    result['totalPointsEarned'] += points_earned
-
-                    transaction: PointTransactionTable = PointTransactionTable(
-                        loyalty_account_id=loyalty_account.id,
-                        product_id=product.id,
-                        points_earned=points_earned,
-                        transaction_date=datetime.now(timezone.utc)
+                if settled_cart_ids:
+                    db.session.execute(
+                        delete(ShoppingCartItemTable).where(
+                            ShoppingCartItemTable.cart_id.in_(
+                                settled_cart_ids))
                     )
-                    db.session.add(transaction)
-
-                loyalty_account.points += result['totalPointsEarned']
-                loyalty_account_table: LoyaltyAccountTable = (
-                    LoyaltyAccountMapper.to_persistence_model(loyalty_account))
-                self.update(loyalty_account_table)
-
-            # The commit is automatically done if no exception is raised
-            return result
+            return outcomes
         except SQLAlchemyError as e:
-            # Log the error
-            logger.error(f"Error during checkout transaction: {str(e)}")
-            # The transaction is automatically rolled back
+            logger.error(f"Error during cart settlement: {str(e)}")
             raise
+
+    @staticmethod
+    def _bump_versions(table: Any, expected: Dict[int, int]) -> Set[int]:
+        """
+        Bumps the version of the rows of `table` whose version is still the
+        expected one, and returns their IDs. Rows changed since they were
+        read are left alone. Uses one UPDATE ... RETURNING where the
+        database supports it, and one UPDATE per row otherwise.
+
+        Args:
+            table (Any): The mapped table, with `id` and `version` columns.
+            expected (Dict[int, int]): The version read, by row ID.
+
+        Returns:
+            Set[int]: The IDs of the rows whose version was bumped.
+        """
+        if not expected:
+            return set()
+        if db.engine.dialect.update_returning:
+            return set(db.session.scalars(
+                update(table).where(
+                    tuple_(table.id, table.version).in_(
+                        list(expected.items()))
+                ).values(
+                    version=table.version + 1
+                ).returning(table.id).execution_options(
+                    synchronize_session=False)
+            ))
+        return {
+            id for id, version in expected.items()
+            if db.session.execute(
+                update(table).where(
+                    table.id == id, table.version == version
+                ).values(
+                    version=table.version + 1
+                ).execution_options(synchronize_session=False)
+            ).rowcount
+        }
+
+    @staticmethod
+    def _is_settled(result: Dict[str, Any]) -> bool:
+        """
+        Returns whether a checkout priced every line of the cart, in which
+        case the cart is cleared.
+        """
+        return not (result['invalidProducts'] or
+                    result['productsMissingCategory'] or
+                    result['pointEarningRulesMissing'])
+
+    def _price_cart_lines(
+        self,
+        loyalty_account_id: int,
+        cart_lines: Sequence[Any],
+        transaction_date: datetime
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Calculates the points earned for the lines of a cart with the
+        vectorized PointsEngine.
+
+        Args:
+            loyalty_account_id (int): The ID of the account earning points.
+            cart_lines (Sequence[Any]): Rows or CartLines with the columns
+                ``item_product_id``, ``quantity``, ``product_id``, ``price``
+                and ``category_id``.
+            transaction_date (datetime): The date of the checkout.
+
+        Returns:
+            Tuple[Dict[str, Any], List[Dict[str, Any]]]: The transaction
+            details and the ledger rows to insert.
+        """
+        item_product_ids = np.array(
+            [line.item_product_id for line in cart_lines], dtype=np.int64)
+        missing_product = np.array(
+            [line.product_id is None for line in cart_lines], dtype=bool)
+        quantity = np.array(
+            [line.quantity for line in cart_lines], dtype=np.int64)
+        with span('rules'):
+            rule_table = self.rule_index.rule_table(transaction_date.date())
+        with span('points', rows=len(cart_lines)):
+            breakdown = PointsEngine.compute(
+                price=np.array([line.price or 0.0 for line in cart_lines],
+                               dtype=np.float64),
+                quantity=quantity,
+                category_id=np.array([line.category_id or 0
+                                      for line in cart_lines],
+                                     dtype=np.int64),
+                rule_table=rule_table,
+                missing_product=missing_product
+            )
+
+        result: Dict[str, Any] = {
+            'totalPointsEarned': breakdown.total,
+            'invalidProducts':
+                item_product_ids[breakdown.missing_product].tolist(),
+            'productsMissingCategory':
+                item_product_ids[breakdown.missing_category].tolist(),
+            'pointEarningRulesMissing':
+                item_product_ids[breakdown.missing_rule].tolist()
+        }
+        ledger_rows: List[Dict[str, Any]] = [
+            {
+                'loyalty_account_id': loyalty_account_id,
+                'product_id': product_id,
+                'points_earned': points_earned,
+                'transaction_date': transaction_date,
+                'quantity': quantity
+            }
+            for product_id, points_earned, quantity in zip(
+                item_product_ids[breakdown.earned].tolist(),
+                breakdown.points[breakdown.earned].tolist(),
+                quantity[breakdown.earned].tolist())
+        ]
+        logger.debug(f"Points earned: {result['totalPointsEarned']}")
+
+        return result, ledger_rows
+
+    def _load_cart_items(self, customer_ids: List[int]) -> List[Row]:
+        """
+        Loads the items of the shopping carts of several customers in a
+        single query, using each customer's first cart.
+
+        Args:
+            customer_ids (List[int]): The IDs of the customers.
+
+        Returns:
+            List[Row]: One row per cart item with the columns
+            ``customer_id``, ``cart_id``, ``cart_version``, ``product_id``
+            and ``quantity``.
+        """
+        first_cart_ids = db.session.query(
+            func.min(ShoppingCartTable.id)
+        ).filter(
+            ShoppingCartTable.customer_id.in_(customer_ids)
+        ).group_by(ShoppingCartTable.customer_id)
+
+        return db.session.query(
+            ShoppingCartTable.customer_id,
+            ShoppingCartItemTable.cart_id,
+            ShoppingCartTable.version.label('cart_version'),
+            ShoppingCartItemTable.product_id,
+            ShoppingCartItemTable.quantity
+        ).join(
+            ShoppingCartTable,
+            ShoppingCartTable.id == ShoppingCartItemTable.cart_id
+        ).filter(
+            ShoppingCartItemTable.cart_id.in_(first_cart_ids)
+        ).order_by(ShoppingCartItemTable.id).all()
+
+    def _load_cart_lines(self, customer_id: int) -> List[Row]:
+        """
+        Loads the items of a customer's shopping cart together with their
+        products in a single query.
+
+        Products are outer-joined so that items pointing at a product that no
+        longer exists are still returned, with ``product_id`` set to None.
+
+        Args:
+            customer_id (int): The ID of the customer.
+
+        Returns:
+            List[Row]: One row per cart item with the columns
+            ``item_product_id``, ``quantity``, ``product_id``, ``price``,
+            ``category_id``, ``cart_id`` and ``cart_version``.
+        """
+        cart_id = db.session.query(ShoppingCartTable.id).filter(
+            ShoppingCartTable.customer_id == customer_id
+        ).order_by(ShoppingCartTable.id).limit(1).scalar_subquery()
+
+        return db.session.query(
+            ShoppingCartItemTable.product_id.label('item_product_id'),
+            ShoppingCartItemTable.quantity,
+            ProductTable.id.label('product_id'),
+            ProductTable.price,
+            ProductTable.category_id,
+            ShoppingCartTable.id.label('cart_id'),
+            ShoppingCartTable.version.label('cart_version')
+        ).join(
+            ShoppingCartTable,
+            ShoppingCartTable.id == ShoppingCartItemTable.cart_id
+        ).outerjoin(
+            ProductTable, ProductTable.id == ShoppingCartItemTable.product_id
+        ).filter(
+            ShoppingCartItemTable.cart_id == cart_id
+        ).order_by(ShoppingCartItemTable.id).all()
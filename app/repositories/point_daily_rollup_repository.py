@@ -0,0 +1,251 @@
+# app/repositories/point_daily_rollup_repository.py
+from typing import Any, Dict, Iterable, List, Tuple
+from datetime import date
+from sqlalchemy import (
+    and_, cast, delete, func, insert, not_, or_, type_coerce, update
+)
+from sqlalchemy.sql.elements import ColumnElement
+from app.repositories.base_repository import BaseRepository, UPSERT_INSERTS
+from app.models.database.loyalty_account import LoyaltyAccountTable
+from app.models.database.point_daily_rollup import PointDailyRollupTable
+from app.models.database.point_transaction import PointTransactionTable
+from app.models.database.point_transaction_archive import (
+    PointTransactionArchiveTable
+)
+from app.models.domain.point_daily_rollup import PointDailyRollup
+from app.mappers.point_daily_rollup_mapper import PointDailyRollupMapper
+from app.utils.dates import next_month
+from app import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PointDailyRollupRepository(BaseRepository[PointDailyRollupTable]):
+    def __init__(self):
+        """
+        Initializes the PointDailyRollupRepository with the
+        PointDailyRollupTable model.
+        """
+        super().__init__(PointDailyRollupTable)
+
+    def add_ledger_rows(self, ledger_rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Adds point_transactions rows to the rollups of their account and
+        day, without committing.
+
+        Call it in the transaction that inserts the rows, so that the
+        rollup never disagrees with the ledger. The rows are summed per
+        account and day first, so the number of rollup rows written does not
+        depend on the number of transactions.
+
+        Args:
+            ledger_rows (Iterable[Dict[str, Any]]): Rows with the columns
+                ``loyalty_account_id``, ``points_earned`` and
+                ``transaction_date``.
+
+        Returns:
+            int: The number of rollup rows written.
+        """
+        totals: Dict[Tuple[int, date], List[int]] = {}
+        for row in ledger_rows:
+            key = (row['loyalty_account_id'], row['transaction_date'].date())
+            total = totals.setdefault(key, [0, 0])
+            total[0] += row['points_earned']
+            total[1] += 1
+        if not totals:
+            return 0
+
+        self._upsert([
+            {
+                'loyalty_account_id': loyalty_account_id,
+                'day': day,
+                'points_earned': points_earned,
+                'transaction_count': transaction_count
+            }
+            for (loyalty_account_id, day), (points_earned, transaction_count)
+            in totals.items()
+        ])
+        return len(totals)
+
+    def replace_days(
+        self,
+        start_day: date,
+        end_day: date,
+        ledger_rows: Iterable[Dict[str, Any]]
+    ) -> int:
+        """
+        Replaces the rollups of every account between two days, inclusive,
+        with the sums of `ledger_rows`, without committing.
+
+        Args:
+            start_day (date): The first day.
+            end_day (date): The last day.
+            ledger_rows (Iterable[Dict[str, Any]]): All transactions of
+                those days, as taken by add_ledger_rows().
+
+        Returns:
+            int: The number of rollup rows written.
+        """
+        db.session.execute(
+            delete(PointDailyRollupTable).where(
+                PointDailyRollupTable.day.between(start_day, end_day))
+        )
+        return self.add_ledger_rows(ledger_rows)
+
+    def find_by_loyalty_account_id(
+        self, loyalty_account_id: int, start_day: date, end_day: date
+    ) -> List[PointDailyRollup]:
+        """
+        Finds the rollups of a loyalty account between two days, inclusive.
+
+        Args:
+            loyalty_account_id (int): The ID of the loyalty account.
+            start_day (date): The first day.
+            end_day (date): The last day.
+
+        Returns:
+            List[PointDailyRollup]: The rollups of the days with
+            transactions, in chronological order.
+        """
+        rollup_tables = db.session.query(PointDailyRollupTable).filter(
+            PointDailyRollupTable.loyalty_account_id == loyalty_account_id,
+            PointDailyRollupTable.day.between(start_day, end_day)
+        ).order_by(PointDailyRollupTable.day).all()
+        return [
+            PointDailyRollupMapper.from_persistence(rollup_table)
+            for rollup_table in rollup_tables
+        ]
+
+    def rebuild(self, batch_size: int = 500) -> int:
+        """
+        Recomputes every rollup from the point_transactions ledger.
+
+        Accounts are processed in batches of `batch_size`, in ID order. The
+        rollups of a batch are deleted and recomputed in one transaction,
+        so a failed run can simply be started again. Months moved to the
+        archive are skipped; archiving a month recomputes its rollups.
+
+        Args:
+            batch_size (int, optional): The number of accounts per
+                transaction. Defaults to 500.
+
+        Returns:
+            int: The number of rollup rows written.
+        """
+        transactions = PointTransactionTable
+        if db.engine.dialect.name == 'sqlite':
+            day = type_coerce(func.date(transactions.transaction_date),
+                              db.Date)
+        else:
+            day = cast(transactions.transaction_date, db.Date)
+
+        archived_months = [
+            row.month for row in db.session.query(
+                PointTransactionArchiveTable.month)
+        ]
+        live_days = self._outside_months(
+            PointDailyRollupTable.day, archived_months)
+        live_transactions = self._outside_months(day, archived_months)
+
+        written = 0
+        last_account_id = 0
+        while True:
+            account_ids = [
+                row.id for row in db.session.query(
+                    LoyaltyAccountTable.id
+                ).filter(
+                    LoyaltyAccountTable.id > last_account_id
+                ).order_by(LoyaltyAccountTable.id).limit(batch_size)
+            ]
+            if not account_ids:
+                db.session.commit()
+                return written
+
+            db.session.execute(
+                delete(PointDailyRollupTable).where(
+                    PointDailyRollupTable.loyalty_account_id.in_(account_ids),
+                    live_days)
+            )
+            rows = [
+                {
+                    'loyalty_account_id': row.loyalty_account_id,
+                    'day': row.day,
+                    'points_earned': row.points_earned,
+                    'transaction_count': row.transaction_count
+                }
+                for row in db.session.query(
+                    transactions.loyalty_account_id,
+                    day.label('day'),
+                    func.sum(transactions.points_earned).label(
+                        'points_earned'),
+                    func.count(transactions.id).label('transaction_count')
+                ).filter(
+                    transactions.loyalty_account_id.in_(account_ids),
+                    live_transactions
+                ).group_by(transactions.loyalty_account_id, day)
+            ]
+            if rows:
+                db.session.execute(insert(PointDailyRollupTable), rows)
+            db.session.commit()
+
+            written += len(rows)
+            last_account_id = account_ids[-1]
+            logger.info(f"Rebuilt {len(rows)} daily rollups of accounts "
+                        f"{account_ids[0]} to {last_account_id}")
+
+    @staticmethod
+    def _outside_months(
+        day: ColumnElement, months: List[date]
+    ) -> ColumnElement:
+        """
+        Builds a condition matching the days outside the given months.
+
+        Args:
+            day (ColumnElement): An expression evaluating to a date.
+            months (List[date]): The first days of the excluded months.
+
+        Returns:
+            ColumnElement: The condition.
+        """
+        return not_(or_(False, *(
+            and_(day >= month, day < next_month(month))
+            for month in months
+        )))
+
+    @staticmethod
+    def _upsert(rows: List[Dict[str, Any]]) -> None:
+        """
+        Adds the points and transaction counts of `rows` to the existing
+        rollups, creating the missing ones, with one executemany statement
+        where the database supports ON CONFLICT.
+        """
+        rollups = PointDailyRollupTable.__table__
+        upsert_insert = UPSERT_INSERTS.get(db.engine.dialect.name)
+        if upsert_insert is not None:
+            statement = upsert_insert(rollups)
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=[rollups.c.loyalty_account_id, rollups.c.day],
+                set_={
+                    'points_earned': rollups.c.points_earned +
+                    statement.excluded.points_earned,
+                    'transaction_count': rollups.c.transaction_count +
+                    statement.excluded.transaction_count
+                }
+            ), rows)
+            return
+
+        for row in rows:
+            updated = db.session.execute(
+                update(rollups).where(
+                    rollups.c.loyalty_account_id == row['loyalty_account_id'],
+                    rollups.c.day == row['day']
+                ).values(
+                    points_earned=rollups.c.points_earned +
+                    row['points_earned'],
+                    transaction_count=rollups.c.transaction_count +
+                    row['transaction_count']
+                )
+            ).rowcount
+            if not updated:
+                db.session.execute(insert(rollups), [row])
@@ -0,0 +1,281 @@
+# app/repositories/point_earning_rule_index.py
+import threading
+import time
+from datetime import date
+from typing import Dict, List, Optional, Iterable, Any, Tuple
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
+from app.models.database.point_earning_rule import PointEarningRuleTable
+from app.models.domain.point_earning_rule import (
+    RATE,
+    PointEarningRule,
+    PointEarningRuleTimeline
+)
+from app.mappers.point_earning_rule_mapper import PointEarningRuleMapper
+from app.models.domain.points_engine import RuleSet, RuleTable
+from app import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PointEarningRuleIndex:
+    """
+    Process-local index of point earning rules keyed by category.
+
+    Each category maps to a PointEarningRuleTimeline of its rate rules, so
+    finding the rate active on a date is a binary search instead of a
+    database query; the timeline under the key None holds the base rate.
+    The bonus, tier, multiplier and cap rules are kept as a list. The index
+    is built lazily on first use and rebuilt per category when rules are
+    created, updated or deleted through PointEarningRuleRepository.
+    Changes made behind the repository's back are picked up once the index
+    is older than `max_age` seconds, or after an explicit invalidate().
+    Threads that find the index stale at the same time rebuild it once.
+
+    For the points engine, all rules are compiled into one RuleTable per
+    date bucket, the span of days between two rule start or end dates in
+    which the same rules are active. Compiled tables are kept until the
+    rules change; every rebuild drops them, so the next lookup recompiles.
+
+    Attributes:
+        hits (int): Lookups answered from an already built index.
+        misses (int): Lookups that had to (re)build the index first.
+        rebuilds (int): Full rebuilds of the index.
+        category_rebuilds (int): Incremental rebuilds of a single category.
+        compiles (int): RuleTables compiled for a date bucket.
+        version (int): Incremented on every change of the indexed rules.
+    """
+
+    def __init__(self, max_age: Optional[float] = None) -> None:
+        """
+        Initializes an empty index.
+
+        Args:
+            max_age (Optional[float], optional): Seconds after which the
+                index is rebuilt from the database. Defaults to None, which
+                keeps the index until it is invalidated.
+        """
+        self.max_age: Optional[float] = max_age
+        self.hits: int = 0
+        self.misses: int = 0
+        self.rebuilds: int = 0
+        self.category_rebuilds: int = 0
+        self.compiles: int = 0
+        self.version: int = 0
+        self._timelines: Optional[
+            Dict[Optional[int], PointEarningRuleTimeline]] = None
+        self._modifiers: List[PointEarningRule] = []
+        self._built_at: float = 0.0
+        # The rules compiled for the points engine, and their version.
+        self._compiled: Optional[Tuple[int, RuleSet]] = None
+        self._lock = threading.Lock()
+        # Guards the hit and compile counters, which are updated on every
+        # lookup, so that lookups do not wait for a rebuild to count.
+        self._counter_lock = threading.Lock()
+
+    def find_active_rule(
+        self, category_id: int, current_date: date
+    ) -> Optional[PointEarningRule]:
+        """
+        Finds the rate rule active for a category on a given date, falling
+        back to the base rate.
+
+        Args:
+            category_id (int): The ID of the category.
+            current_date (date): The date the rule must be active on.
+
+        Returns:
+            Optional[PointEarningRule]: The active rule, or None if neither
+            the category nor the base rate has a rule active on that date.
+        """
+        timelines = self.timelines()
+        for key in (category_id, None):
+            timeline = timelines.get(key)
+            rule = timeline.find(current_date) if timeline else None
+            if rule is not None:
+                return rule
+        return None
+
+    def rule_table(self, current_date: date) -> RuleTable:
+        """
+        Returns the rules active on a date compiled into a RuleTable for the
+        points engine. Tables are compiled once per date bucket and cached
+        until the index changes.
+
+        Args:
+            current_date (date): The date the rules must be active on.
+
+        Returns:
+            RuleTable: The rules active on `current_date`.
+        """
+        timelines = self.timelines()
+        version = self.version
+        modifiers = self._modifiers
+        if self._timelines is not timelines:
+            # The rules changed meanwhile; compile without caching.
+            return RuleTable.from_timelines(
+                timelines, current_date, modifiers)
+        compiled = self._compiled
+        if compiled is None or compiled[0] != version:
+            compiled = (version, RuleSet(timelines, modifiers))
+            self._compiled = compiled
+        rule_set = compiled[1]
+        compiles = rule_set.compiles
+        rule_table = rule_set.rule_table(current_date)
+        with self._counter_lock:
+            self.compiles += rule_set.compiles - compiles
+        return rule_table
+
+    def timelines(self) -> Dict[Optional[int], PointEarningRuleTimeline]:
+        """
+        Returns the rate timelines of all categories, building the index
+        first if it is empty or stale.
+
+        Returns:
+            Dict[Optional[int], PointEarningRuleTimeline]: Timelines by
+            category ID, None for the base rate.
+        """
+        timelines = self._timelines
+        if timelines is None or self._is_stale():
+            with self._lock:
+                # Another thread may have rebuilt the index while this one
+                # waited for the lock.
+                timelines = self._timelines
+                if timelines is None or self._is_stale():
+                    self.misses += 1
+                    return self._rebuild()
+        with self._counter_lock:
+            self.hits += 1
+        return timelines
+
+    def rebuild(self) -> Dict[Optional[int], PointEarningRuleTimeline]:
+        """
+        Rebuilds the whole index from the database.
+
+        Returns:
+            Dict[Optional[int], PointEarningRuleTimeline]: Timelines by
+            category ID, None for the base rate.
+        """
+        with self._lock:
+            return self._rebuild()
+
+    def _rebuild(self) -> Dict[Optional[int], PointEarningRuleTimeline]:
+        """Rebuilds the whole index. The caller holds the lock."""
+        rules_by_category: Dict[Optional[int], List[PointEarningRule]] = {}
+        for rule in self._load_rules():
+            rules_by_category.setdefault(rule.category_id, []).append(rule)
+        timelines = {
+            category_id: PointEarningRuleTimeline(rules)
+            for category_id, rules in rules_by_category.items()
+        }
+        self._modifiers = self._load_modifiers()
+        self._timelines = timelines
+        self._built_at = time.monotonic()
+        self.rebuilds += 1
+        self.version += 1
+        logger.debug(f"Rebuilt point earning rule index: "
+                     f"{len(timelines)} categories")
+        return timelines
+
+    def rebuild_categories(
+        self, category_ids: Iterable[Optional[int]]
+    ) -> None:
+        """
+        Rebuilds the timelines of the given categories only, and reloads
+        the bonus, tier, multiplier and cap rules. Does nothing if the index
+        has not been built yet.
+
+        Args:
+            category_ids (Iterable[Optional[int]]): The categories whose
+                rules changed, None for the rules of all categories.
+        """
+        category_ids = set(category_ids)
+        if not category_ids:
+            return
+
+        with self._lock:
+            if self._timelines is None:
+                return
+            rules_by_category: Dict[
+                Optional[int], List[PointEarningRule]] = {
+                category_id: [] for category_id in category_ids
+            }
+            for rule in self._load_rules(category_ids):
+                rules_by_category[rule.category_id].append(rule)
+
+            timelines = dict(self._timelines)
+            for category_id, rules in rules_by_category.items():
+                if rules:
+                    timelines[category_id] = PointEarningRuleTimeline(rules)
+                else:
+                    timelines.pop(category_id, None)
+            self._modifiers = self._load_modifiers()
+            self._timelines = timelines
+            self.category_rebuilds += len(category_ids)
+            self.version += 1
+
+    def invalidate(self) -> None:
+        """
+        Drops the index so that the next lookup rebuilds it.
+        """
+        with self._lock:
+            self._timelines = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the index counters.
+
+        Returns:
+            Dict[str, Any]: The hit, miss, rebuild and compile counters, the
+            index version and the number of indexed categories.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'rebuilds': self.rebuilds,
+            'category_rebuilds': self.category_rebuilds,
+            'compiles': self.compiles,
+            'version': self.version,
+            'categories': len(self._timelines or {})
+        }
+
+    def _is_stale(self) -> bool:
+        """Checks whether the index is older than `max_age`."""
+        return (self.max_age is not None and
+                time.monotonic() - self._built_at > self.max_age)
+
+    def _load_rules(
+        self, category_ids: Optional[Iterable[Optional[int]]] = None
+    ) -> List[PointEarningRule]:
+        """
+        Loads rate rules ordered by ID, optionally limited to some
+        categories.
+        """
+        query = db.session.query(PointEarningRuleTable).options(
+            joinedload(PointEarningRuleTable.category)).filter(
+            PointEarningRuleTable.rule_type == RATE)
+        if category_ids is not None:
+            category_ids = set(category_ids)
+            condition = PointEarningRuleTable.category_id.in_(
+                category_ids - {None})
+            if None in category_ids:
+                condition = or_(
+                    condition, PointEarningRuleTable.category_id.is_(None))
+            query = query.filter(condition)
+        return [
+            PointEarningRuleMapper.from_persistence(rule_table)
+            for rule_table in query.order_by(PointEarningRuleTable.id).all()
+        ]
+
+    def _load_modifiers(self) -> List[PointEarningRule]:
+        """
+        Loads the bonus, tier, multiplier and cap rules ordered by ID.
+        """
+        query = db.session.query(PointEarningRuleTable).options(
+            joinedload(PointEarningRuleTable.category)).filter(
+            PointEarningRuleTable.rule_type != RATE)
+        return [
+            PointEarningRuleMapper.from_persistence(rule_table)
+            for rule_table in query.order_by(PointEarningRuleTable.id).all()
+        ]
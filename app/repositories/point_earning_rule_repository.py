@@ -2,8 +2,8 @@
 
 from typing import List, Optional
 from datetime import date
-from sqlalchemy import and_, or_
 from app.repositories.base_repository import BaseRepository
+from app.repositories.point_earning_rule_index import PointEarningRuleIndex
 from app.models.database.point_earning_rule import PointEarningRuleTable
 from app.models.domain.point_earning_rule import PointEarningRule
 from app.mappers.point_earning_rule_mapper import PointEarningRuleMapper
@@ -11,12 +11,19 @@ from app import db
 
 
 class PointEarningRuleRepository(BaseRepository[PointEarningRuleTable]):
-    def __init__(self):
+    def __init__(self, rule_index: Optional[PointEarningRuleIndex] = None):
         """
         Initializes the PointEarningRuleRepository with the
         PointEarningRuleTable model.
+
+        Args:
+            rule_index (Optional[PointEarningRuleIndex], optional): The
+                index used to look up active rules and kept up to date on
+                writes. Defaults to a new, private index.
         """
         super().__init__(PointEarningRuleTable)
+        self.rule_index: PointEarningRuleIndex = \
+            rule_index or PointEarningRuleIndex()
 
     def find_by_id(self, id: int) -> Optional[PointEarningRule]:
         """
@@ -31,11 +38,23 @@ class PointEarningRuleRepository(BaseRepository[PointEarningRuleTable]):
         """
         rule_table = super().find_by_id(id)
         return (
-            PointEarningRuleMapper.to_domain(rule_table)
+            PointEarningRuleMapper.from_persistence(rule_table)
             if rule_table
             else None
         )
 
+    def find_all(self) -> List[PointEarningRule]:
+        """
+        Finds all point earning rules.
+
+        Returns:
+            List[PointEarningRule]: The rules, ordered by ID.
+        """
+        rule_tables = db.session.query(PointEarningRuleTable).order_by(
+            PointEarningRuleTable.id).all()
+        return [PointEarningRuleMapper.from_persistence(rule)
+                for rule in rule_tables]
+
     def find_active_rule_for_category(
         self, category_id: int, date: date
     ) -> Optional[PointEarningRule]:
@@ -48,24 +67,11 @@ class PointEarningRuleRepository(BaseRepository[PointEarningRuleTable]):
             date (date): The date to check for an active rule.
 
         Returns:
-            Optional[PointEarningRule]: The active point earning rule
-            or None if no active rule is found.
-        """
-        rule_table = db.session.query(PointEarningRuleTable).filter(
-            and_(
-                PointEarningRuleTable.category_id == category_id,
-                PointEarningRuleTable.start_date <= date,
-                or_(
-                    PointEarningRuleTable.end_date.is_(None),
-                    PointEarningRuleTable.end_date >= date
-                )
-            )
-        ).first()
-        return (
-            PointEarningRuleMapper.to_domain(rule_table)
-            if rule_table
-            else None
-        )
+            Optional[PointEarningRule]: The active rate rule of the category,
+            else the active base rate rule, or None if no active rule is
+            found.
+        """
+        return self.rule_index.find_active_rule(category_id, date)
 
     def create(self, rule: PointEarningRule) -> PointEarningRule:
         """
@@ -76,10 +82,15 @@ class PointEarningRuleRepository(BaseRepository[PointEarningRuleTable]):
 
         Returns:
             PointEarningRule: The created PointEarningRule object.
+
+        Raises:
+            ValueError: If the rule lacks a field its rule type needs.
         """
-        rule_table = PointEarningRuleMapper.to_persistence(rule)
+        rule.validate()
+        rule_table = PointEarningRuleMapper.to_persistence_model(rule)
         created_rule = super().create(rule_table)
-        return PointEarningRuleMapper.to_domain(created_rule)
+        self.rule_index.rebuild_categories([created_rule.category_id])
+        return PointEarningRuleMapper.from_persistence(created_rule)
 
     def update(self, rule: PointEarningRule) -> PointEarningRule:
         """
@@ -90,10 +101,19 @@ class PointEarningRuleRepository(BaseRepository[PointEarningRuleTable]):
 
         Returns:
             PointEarningRule: The updated PointEarningRule object.
+
+        Raises:
+            ValueError: If the rule lacks a field its rule type needs.
         """
-        rule_table = PointEarningRuleMapper.to_persistence(rule)
-        updated_rule = super().update(rule_table)
-        return PointEarningRuleMapper.to_domain(updated_rule)
+        rule.validate()
+        previous_category_id = db.session.query(
+            PointEarningRuleTable.category_id).filter(
+            PointEarningRuleTable.id == rule.id).scalar()
+        rule_table = PointEarningRuleMapper.to_persistence_model(rule)
+        super().update(rule_table)
+        self.rule_index.rebuild_categories(
+            [previous_category_id, rule.category_id])
+        return self.find_by_id(rule.id)
 
     def delete(self, id: int) -> None:
         """
@@ -103,7 +123,11 @@ class PointEarningRuleRepository(BaseRepository[PointEarningRuleTable]):
             id (int): The unique identifier of the point earning rule
                 to delete.
         """
+        category_id = db.session.query(
+            PointEarningRuleTable.category_id).filter(
+            PointEarningRuleTable.id == id).scalar()
         super().delete(id)
+        self.rule_index.rebuild_categories([category_id])
 
     def find_by_category(self, category_id: int) -> List[PointEarningRule]:
         """
@@ -118,4 +142,5 @@ class PointEarningRuleRepository(BaseRepository[PointEarningRuleTable]):
         rule_tables = db.session.query(PointEarningRuleTable).filter(
             PointEarningRuleTable.category_id == category_id
         ).all()
-        return [PointEarningRuleMapper.to_domain(rule) for rule in rule_tables]
+        return [PointEarningRuleMapper.from_persistence(rule)
+                for rule in rule_tables]
@@ -0,0 +1,154 @@
+# app/repositories/point_transaction_archive_store.py
+import csv
+import gzip
+import hashlib
+import io
+import os
+import tempfile
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The columns of an archive file, in order.
+ARCHIVE_COLUMNS: Tuple[str, ...] = (
+    'id', 'loyalty_account_id', 'product_id', 'points_earned',
+    'transaction_date', 'quantity'
+)
+
+
+class PointTransactionArchiveStore:
+    """
+    Stores archived months of the point transaction ledger as read-only,
+    gzip-compressed CSV files, one file per month.
+
+    Rows are written in transaction date order, so reads of a date range
+    stop at the first row past its end.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Initializes the store.
+
+        Args:
+            directory (str): The directory holding the archive files. It is
+                created on the first write.
+        """
+        self.directory: str = os.path.abspath(directory)
+
+    def write(
+        self, month: date, rows: Iterable[Dict[str, Any]]
+    ) -> Tuple[str, str]:
+        """
+        Writes the transactions of a month to a new archive file.
+
+        The file is written under a temporary name and renamed once
+        complete, so readers never see a partial file. Every call creates a
+        new file; an earlier archive of the same month is left in place.
+
+        Args:
+            month (date): The first day of the month.
+            rows (Iterable[Dict[str, Any]]): The transactions, in
+                transaction date order, with the columns in ARCHIVE_COLUMNS.
+
+        Returns:
+            Tuple[str, str]: The path and SHA-256 digest of the file.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+        path = os.path.join(
+            self.directory, f"point_transactions_{month:%Y_%m}_{stamp}.csv.gz")
+        fd, temporary_path = tempfile.mkstemp(
+            dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, \
+                    gzip.GzipFile(fileobj=raw, mode='wb') as compressed, \
+                    io.TextIOWrapper(compressed, encoding='utf-8',
+                                     newline='') as text:
+                writer = csv.writer(text)
+                writer.writerow(ARCHIVE_COLUMNS)
+                for row in rows:
+                    writer.writerow([
+                        row['id'], row['loyalty_account_id'],
+                        row['product_id'], row['points_earned'],
+                        row['transaction_date'].isoformat(),
+                        '' if row.get('quantity') is None
+                        else row['quantity']
+                    ])
+            checksum = self._checksum(temporary_path)
+            os.chmod(temporary_path, 0o444)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        logger.info(f"Wrote archive {path}")
+        return path, checksum
+
+    @staticmethod
+    def read(
+        path: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        loyalty_account_id: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Reads the transactions of an archive file, optionally filtered.
+
+        Args:
+            path (str): The path of the archive file.
+            start_date (Optional[datetime], optional): Skip transactions
+                before this time. Defaults to None.
+            end_date (Optional[datetime], optional): Skip transactions
+                after this time. Defaults to None.
+            loyalty_account_id (Optional[int], optional): Only return the
+                transactions of this account. Defaults to None.
+
+        Yields:
+            Dict[str, Any]: The transactions, in transaction date order,
+            with the columns in ARCHIVE_COLUMNS.
+        """
+        with gzip.open(path, 'rt', encoding='utf-8', newline='') as text:
+            for record in csv.DictReader(text):
+                transaction_date = datetime.fromisoformat(
+                    record['transaction_date'])
+                if end_date is not None and transaction_date > end_date:
+                    return
+                if start_date is not None and transaction_date < start_date:
+                    continue
+                account_id = int(record['loyalty_account_id'])
+                # Files written before quantities were kept lack the column.
+                quantity = record.get('quantity')
+                if loyalty_account_id is not None and \
+                        account_id != loyalty_account_id:
+                    continue
+                yield {
+                    'id': int(record['id']),
+                    'loyalty_account_id': account_id,
+                    'product_id': int(record['product_id']),
+                    'points_earned': int(record['points_earned']),
+                    'transaction_date': transaction_date,
+                    'quantity': int(quantity) if quantity else None
+                }
+
+    @staticmethod
+    def remove(path: str) -> None:
+        """
+        Deletes an archive file, if it exists.
+
+        Args:
+            path (str): The path of the archive file.
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _checksum(path: str) -> str:
+        """Returns the SHA-256 digest of a file."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 16), b''):
+                digest.update(block)
+        return digest.hexdigest()
@@ -1,22 +1,86 @@
 # app/repositories/point_transaction_repository.py
 
-from typing import List
-from datetime import datetime
-from sqlalchemy import between
+import heapq
+import time
+from typing import List, Iterable, Iterator, Dict, Any, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import and_, between, delete, func, insert, or_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query
 from app.repositories.base_repository import BaseRepository
+from app.repositories.point_daily_rollup_repository import (
+    PointDailyRollupRepository
+)
+from app.repositories.point_transaction_archive_store import (
+    PointTransactionArchiveStore
+)
+from app.models.database.loyalty_account import LoyaltyAccountTable
 from app.models.database.point_transaction import PointTransactionTable
+from app.models.database.point_transaction_archive import (
+    PointTransactionArchiveTable
+)
+from app.models.database.product import ProductTable
 from app.models.domain.point_transaction import PointTransaction
+from app.models.domain.point_transaction_archive import (
+    PointTransactionArchive
+)
+from app.mappers.loyalty_account_mapper import LoyaltyAccountMapper
+from app.mappers.point_transaction_archive_mapper import (
+    PointTransactionArchiveMapper
+)
 from app.mappers.point_transaction_mapper import PointTransactionMapper
+from app.mappers.product_mapper import ProductMapper
+from app.utils.dates import month_start, next_month
+from app.utils.metrics import metrics
 from app import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# The maximum number of IDs bound in one IN clause.
+DELETE_BATCH_SIZE: int = 500
+
+# The number of rows fetched from the database cursor at a time.
+STREAM_YIELD_PER: int = 500
 
 
 class PointTransactionRepository(BaseRepository[PointTransactionTable]):
-    def __init__(self):
+    """
+    Repository of the point transaction ledger.
+
+    Recent transactions live in the 'point_transactions' table. Older months
+    can be moved to an archive of compressed, read-only files, one per
+    month, catalogued in 'point_transaction_archives'. The find methods
+    route each query to the table and to the archived months that can hold
+    matching transactions, and merge the results.
+    """
+
+    def __init__(
+        self,
+        archive_store: Optional[PointTransactionArchiveStore] = None,
+        point_daily_rollup_repository: Optional[
+            PointDailyRollupRepository] = None
+    ):
         """
         Initializes the PointTransactionRepository with
         the PointTransactionTable model.
+
+        Args:
+            archive_store (Optional[PointTransactionArchiveStore],
+                optional): Where archived months are written. Archived
+                months remain readable without it, but archive_month()
+                requires it. Defaults to None.
+            point_daily_rollup_repository (Optional[
+                PointDailyRollupRepository], optional): Repository whose
+                rollups are recomputed when a month is archived. Defaults
+                to a new repository.
         """
         super().__init__(PointTransactionTable)
+        self.archive_store: Optional[PointTransactionArchiveStore] = \
+            archive_store
+        self.point_daily_rollup_repository: PointDailyRollupRepository = \
+            point_daily_rollup_repository or PointDailyRollupRepository()
 
     def create(self, transaction: PointTransaction) -> PointTransaction:
         """
@@ -29,54 +93,352 @@ class PointTransactionRepository(BaseRepository[PointTransactionTable]):
         Returns:
             PointTransaction: The created PointTransaction.
         """
-        transaction_table = PointTransactionMapper.to_persistence(transaction)
+        transaction_table = PointTransactionMapper.to_persistence_model(
+            transaction)
         created_transaction = super().create(transaction_table)
-        return PointTransactionMapper.to_domain(created_transaction)
+        return PointTransactionMapper.from_persistence(created_transaction)
+
+    def bulk_create(
+        self, transactions: Iterable[PointTransaction], commit: bool = True
+    ) -> int:
+        """
+        Creates many point transactions with a single executemany INSERT.
+
+        Unlike create(), no ORM objects are built or tracked by the session,
+        so the created transactions are not returned.
+
+        Args:
+            transactions (Iterable[PointTransaction]): The PointTransaction
+                objects to create.
+            commit (bool, optional): Whether to commit after inserting.
+                Defaults to True.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        rows = [
+            PointTransactionMapper.to_persistence(transaction)
+            for transaction in transactions
+        ]
+        return self.bulk_insert_rows(rows, commit=commit)
+
+    def bulk_insert_rows(
+        self, rows: List[Dict[str, Any]], commit: bool = True
+    ) -> int:
+        """
+        Inserts raw point_transactions rows with a single executemany
+        statement, bypassing the ORM unit of work.
+
+        The throughput of every batch is logged and recorded in the
+        ``point_transactions.bulk_insert.rows_per_second`` histogram.
+
+        Args:
+            rows (List[Dict[str, Any]]): Column values keyed by column name.
+            commit (bool, optional): Whether to commit after inserting.
+                Pass False when running inside a larger transaction.
+                Defaults to True.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        if not rows:
+            return 0
+
+        started = time.perf_counter()
+        db.session.execute(insert(PointTransactionTable.__table__), rows)
+        if commit:
+            db.session.commit()
+        elapsed = time.perf_counter() - started
+
+        rows_per_second = len(rows) / elapsed if elapsed > 0 else 0.0
+        metrics.increment('point_transactions.bulk_insert.rows', len(rows))
+        metrics.observe('point_transactions.bulk_insert.seconds', elapsed)
+        metrics.observe('point_transactions.bulk_insert.rows_per_second',
+                        rows_per_second)
+        logger.debug(f"Inserted {len(rows)} point transactions in "
+                     f"{elapsed * 1000:.1f} ms ({rows_per_second:.0f} rows/s)")
+        return len(rows)
 
     def find_by_loyalty_account_id(
         self, loyalty_account_id: int
     ) -> List[PointTransaction]:
         """
         Finds all point transactions associated with a specific
-        loyalty account ID.
+        loyalty account ID, including archived ones.
+
+        Only the archived months whose account ID range includes the
+        account are read.
 
         Args:
             loyalty_account_id (int): The unique identifier of the
             loyalty account.
 
         Returns:
-            List[PointTransaction]: A list of PointTransaction objects.
+            List[PointTransaction]: A list of PointTransaction objects, in
+            transaction date order.
         """
-        transaction_tables = db.session.query(PointTransactionTable).filter(
-            PointTransactionTable.loyalty_account_id == loyalty_account_id
-        ).all()
-        return [
-            PointTransactionMapper.to_domain(transaction)
-            for transaction in transaction_tables
-        ]
+        rows = self._query_rows(
+            PointTransactionTable.loyalty_account_id == loyalty_account_id)
+        for archive in self.find_archives():
+            if archive.may_contain_account(loyalty_account_id):
+                rows.extend(PointTransactionArchiveStore.read(
+                    archive.path, loyalty_account_id=loyalty_account_id))
+        return self._to_domain(rows)
 
     def find_by_date_range(
         self, start_date: datetime, end_date: datetime
     ) -> List[PointTransaction]:
         """
-        Finds all point transactions within a specified date range.
+        Finds all point transactions within a specified date range,
+        including archived ones.
+
+        Only the archived months overlapping the range are read.
 
         Args:
             start_date (datetime): The start date of the range.
             end_date (datetime): The end date of the range.
 
         Returns:
-            List[PointTransaction]: A list of PointTransaction objects.
+            List[PointTransaction]: A list of PointTransaction objects, in
+            transaction date order.
+        """
+        start_date = self._to_naive_utc(start_date)
+        end_date = self._to_naive_utc(end_date)
+        rows = self._query_rows(between(
+            PointTransactionTable.transaction_date, start_date, end_date))
+        for archive in self.find_archives(
+                month_start(start_date), end_date.date()):
+            rows.extend(PointTransactionArchiveStore.read(
+                archive.path, start_date=start_date, end_date=end_date))
+        return self._to_domain(rows)
+
+    def iter_by_date_range(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        after: Optional[Tuple[datetime, int]] = None,
+        page_size: int = 5000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the point transactions within a date range, including
+        archived ones, in (transaction_date, id) order.
+
+        The table is read in pages of `page_size` rows with keyset
+        pagination on (transaction_date, id), each page in its own short
+        transaction and fetched `STREAM_YIELD_PER` rows at a time. Archived
+        months are read row by row and merged in. Memory use therefore
+        does not depend on the size of the range.
+
+        Args:
+            start_date (datetime): The start date of the range.
+            end_date (datetime): The end date of the range.
+            after (Optional[Tuple[datetime, int]], optional): The
+                (transaction_date, id) of the last transaction already
+                read. Only later transactions are returned. Defaults to
+                None.
+            page_size (int, optional): The number of rows per page.
+                Defaults to 5000.
+
+        Yields:
+            Dict[str, Any]: The transactions, with the columns ``id``,
+            ``loyalty_account_id``, ``product_id``, ``points_earned``,
+            ``transaction_date`` and ``quantity``.
+        """
+        start_date = self._to_naive_utc(start_date)
+        end_date = self._to_naive_utc(end_date)
+        if after is not None:
+            after = (self._to_naive_utc(after[0]), after[1])
+        first_date = max(start_date, after[0]) if after else start_date
+        archives = self.find_archives(month_start(first_date), end_date.date())
+        db.session.commit()
+
+        streams: List[Iterator[Dict[str, Any]]] = [
+            self._iter_table_rows(start_date, end_date, after, page_size)
+        ]
+        for archive in archives:
+            rows = PointTransactionArchiveStore.read(
+                archive.path, start_date=first_date, end_date=end_date)
+            if after is not None:
+                rows = (
+                    row for row in rows
+                    if (row['transaction_date'], row['id']) > after
+                )
+            streams.append(rows)
+        yield from heapq.merge(
+            *streams, key=lambda row: (row['transaction_date'], row['id']))
+
+    def find_replay_rows(
+        self, start_date: datetime, end_date: datetime
+    ) -> List[Row]:
         """
-        transaction_tables = db.session.query(PointTransactionTable).filter(
-            between(PointTransactionTable.transaction_date,
-                    start_date, end_date)
+        Loads the point_transactions rows of a date range with the columns
+        needed to recompute their points, without building domain objects.
+        Archived months are not included.
+
+        Args:
+            start_date (datetime): The start of the range, inclusive.
+            end_date (datetime): The end of the range, exclusive.
+
+        Returns:
+            List[Row]: Rows with the columns ``loyalty_account_id``,
+            ``product_id``, ``quantity``, ``points_earned`` and
+            ``transaction_date``, in no particular order.
+        """
+        rows = db.session.query(
+            PointTransactionTable.loyalty_account_id,
+            PointTransactionTable.product_id,
+            PointTransactionTable.quantity,
+            PointTransactionTable.points_earned,
+            PointTransactionTable.transaction_date
+        ).filter(
+            PointTransactionTable.transaction_date >=
+            self._to_naive_utc(start_date),
+            PointTransactionTable.transaction_date <
+            self._to_naive_utc(end_date)
         ).all()
+        db.session.commit()
+        return rows
+
+    def find_archives(
+        self,
+        first_month: Optional[date] = None,
+        last_month: Optional[date] = None
+    ) -> List[PointTransactionArchive]:
+        """
+        Finds the archived months, optionally between two months.
+
+        Args:
+            first_month (Optional[date], optional): The first day of the
+                first month. Defaults to None.
+            last_month (Optional[date], optional): Any day of the last
+                month. Defaults to None.
+
+        Returns:
+            List[PointTransactionArchive]: The archived months, oldest
+            first.
+        """
+        query = db.session.query(PointTransactionArchiveTable)
+        if first_month is not None:
+            query = query.filter(
+                PointTransactionArchiveTable.month >= first_month)
+        if last_month is not None:
+            query = query.filter(
+                PointTransactionArchiveTable.month <= last_month)
         return [
-            PointTransactionMapper.to_domain(transaction)
-            for transaction in transaction_tables
+            PointTransactionArchiveMapper.from_persistence(archive)
+            for archive in query.order_by(PointTransactionArchiveTable.month)
         ]
 
+    def archive_before(self, cutoff: date) -> List[PointTransactionArchive]:
+        """
+        Archives every month that ends before the month of `cutoff`.
+
+        Args:
+            cutoff (date): Any day of the first month kept in the table.
+
+        Returns:
+            List[PointTransactionArchive]: The months that were archived.
+        """
+        cutoff = month_start(cutoff)
+        oldest = db.session.query(
+            func.min(PointTransactionTable.transaction_date)
+        ).filter(
+            PointTransactionTable.transaction_date <
+            datetime.combine(cutoff, datetime.min.time())
+        ).scalar()
+        db.session.commit()
+
+        archives: List[PointTransactionArchive] = []
+        month = month_start(oldest) if oldest is not None else cutoff
+        while month < cutoff:
+            archive = self.archive_month(month)
+            if archive is not None:
+                archives.append(archive)
+            month = next_month(month)
+        return archives
+
+    def archive_month(self, month: date) -> Optional[PointTransactionArchive]:
+        """
+        Moves the transactions of a month from the table to the archive.
+
+        The transactions are written to a new archive file together with
+        those of an earlier archive of the month, if any. The catalog entry,
+        the deletion from the table and the month's daily rollups are then
+        updated in one transaction; if it fails, the new file is removed and
+        the earlier archive stays in use.
+
+        Args:
+            month (date): Any day of the month.
+
+        Returns:
+            Optional[PointTransactionArchive]: The archived month, or None
+            if the table held no transactions of that month.
+
+        Raises:
+            ValueError: If the repository has no archive store.
+        """
+        if self.archive_store is None:
+            raise ValueError("No archive store is configured")
+        month = month_start(month)
+        start = datetime.combine(month, datetime.min.time())
+        end = datetime.combine(next_month(month), datetime.min.time())
+
+        try:
+            rows = self._query_rows(
+                PointTransactionTable.transaction_date >= start,
+                PointTransactionTable.transaction_date < end)
+            if not rows:
+                db.session.commit()
+                return None
+            archive_table = db.session.query(
+                PointTransactionArchiveTable).filter(
+                PointTransactionArchiveTable.month == month).first()
+            archived_ids = [row['id'] for row in rows]
+            previous_path = None
+            if archive_table is not None:
+                previous_path = archive_table.path
+                rows.extend(PointTransactionArchiveStore.read(previous_path))
+                rows.sort(key=lambda row: (row['transaction_date'],
+                                           row['id']))
+            path, checksum = self.archive_store.write(month, rows)
+        except Exception:
+            db.session.rollback()
+            raise
+
+        try:
+            for i in range(0, len(archived_ids), DELETE_BATCH_SIZE):
+                db.session.execute(
+                    delete(PointTransactionTable).where(
+                        PointTransactionTable.id.in_(
+                            archived_ids[i:i + DELETE_BATCH_SIZE]))
+                )
+            if archive_table is None:
+                archive_table = PointTransactionArchiveTable(month=month)
+                db.session.add(archive_table)
+            archive_table.path = path
+            archive_table.checksum = checksum
+            archive_table.row_count = len(rows)
+            archive_table.points_earned = sum(
+                row['points_earned'] for row in rows)
+            archive_table.min_loyalty_account_id = min(
+                row['loyalty_account_id'] for row in rows)
+            archive_table.max_loyalty_account_id = max(
+                row['loyalty_account_id'] for row in rows)
+            archive_table.archived_at = datetime.utcnow()
+            self.point_daily_rollup_repository.replace_days(
+                month, next_month(month) - timedelta(days=1), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            PointTransactionArchiveStore.remove(path)
+            raise
+
+        if previous_path is not None:
+            PointTransactionArchiveStore.remove(previous_path)
+        logger.info(f"Archived {len(archived_ids)} point transactions of "
+                    f"{month:%Y-%m} to {path}")
+        return PointTransactionArchiveMapper.from_persistence(archive_table)
+
     def find_by_id(self, id: int) -> PointTransaction:
         """
         Finds a point transaction by its ID.
@@ -117,3 +479,102 @@ class PointTransactionRepository(BaseRepository[PointTransactionTable]):
             id (int): The unique identifier of the point transaction to delete.
         """
         super().delete(id)
+
+    @staticmethod
+    def _row_query() -> Query:
+        """
+        Returns a query of the point_transactions columns stored in an
+        archive file.
+        """
+        return db.session.query(
+            PointTransactionTable.id,
+            PointTransactionTable.loyalty_account_id,
+            PointTransactionTable.product_id,
+            PointTransactionTable.points_earned,
+            PointTransactionTable.transaction_date,
+            PointTransactionTable.quantity
+        )
+
+    @classmethod
+    def _query_rows(cls, *criteria: Any) -> List[Dict[str, Any]]:
+        """
+        Loads the point_transactions rows matching `criteria` as
+        dictionaries with the columns of an archive file.
+        """
+        return [
+            row._asdict() for row in cls._row_query().filter(
+                *criteria).order_by(
+                PointTransactionTable.transaction_date,
+                PointTransactionTable.id)
+        ]
+
+    @classmethod
+    def _iter_table_rows(
+        cls,
+        start_date: datetime,
+        end_date: datetime,
+        after: Optional[Tuple[datetime, int]],
+        page_size: int
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the point_transactions rows of a date range after a
+        (transaction_date, id) position, one keyset page at a time.
+        """
+        while True:
+            query = cls._row_query().filter(between(
+                PointTransactionTable.transaction_date, start_date, end_date))
+            if after is not None:
+                query = query.filter(or_(
+                    PointTransactionTable.transaction_date > after[0],
+                    and_(PointTransactionTable.transaction_date == after[0],
+                         PointTransactionTable.id > after[1])
+                ))
+            fetched = 0
+            for row in query.order_by(
+                PointTransactionTable.transaction_date,
+                PointTransactionTable.id
+            ).limit(page_size).execution_options(yield_per=STREAM_YIELD_PER):
+                fetched += 1
+                after = (row.transaction_date, row.id)
+                yield row._asdict()
+            db.session.commit()
+            if fetched < page_size:
+                return
+
+    @staticmethod
+    def _to_domain(rows: List[Dict[str, Any]]) -> List[PointTransaction]:
+        """
+        Builds domain objects from table and archive rows, in transaction
+        date order, loading their accounts and products with one query each.
+        """
+        rows.sort(key=lambda row: (row['transaction_date'], row['id']))
+        account_ids = {row['loyalty_account_id'] for row in rows}
+        product_ids = {row['product_id'] for row in rows}
+        accounts = {
+            account.id: LoyaltyAccountMapper.from_persistence(account)
+            for account in db.session.query(LoyaltyAccountTable).filter(
+                LoyaltyAccountTable.id.in_(account_ids))
+        } if rows else {}
+        products = {
+            product.id: ProductMapper.from_persistence(product)
+            for product in db.session.query(ProductTable).filter(
+                ProductTable.id.in_(product_ids))
+        } if rows else {}
+        return [
+            PointTransaction(
+                id=row['id'],
+                loyalty_account=accounts.get(row['loyalty_account_id']),
+                product=products.get(row['product_id']),
+                points_earned=row['points_earned'],
+                transaction_date=row['transaction_date'],
+                quantity=row.get('quantity')
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def _to_naive_utc(value: datetime) -> datetime:
+        """Converts an aware datetime to the naive UTC time stored."""
+        if value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -1,5 +1,6 @@
 # app/repositories/product_repository.py
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
+from sqlalchemy.engine import Row
 from app.repositories.base_repository import BaseRepository
 from app.models.database.product import ProductTable
 from app.models.domain.product import Product
@@ -31,6 +32,25 @@ class ProductRepository(BaseRepository[ProductTable]):
             else None
         )
 
+    def find_existing_ids(self, ids: Iterable[int]) -> Set[int]:
+        """
+        Retrieves which of the given product IDs exist, with one query and
+        without loading the products.
+
+        Args:
+            ids (Iterable[int]): The product IDs to check.
+
+        Returns:
+            Set[int]: The IDs of the existing products.
+        """
+        ids = set(ids)
+        if not ids:
+            return set()
+        return {
+            product_id for product_id, in db.session.query(
+                ProductTable.id).filter(ProductTable.id.in_(ids))
+        }
+
     def find_all(self) -> List[Product]:
         """
         Retrieves all products.
@@ -42,6 +62,19 @@ class ProductRepository(BaseRepository[ProductTable]):
         return [ProductMapper.from_persistence(product)
                 for product in product_tables]
 
+    def find_price_rows(self) -> List[Row]:
+        """
+        Retrieves the price and category of every product, without
+        building domain objects.
+
+        Returns:
+            List[Row]: Rows with the columns ``id``, ``price`` and
+            ``category_id``, ordered by ID.
+        """
+        return db.session.query(
+            ProductTable.id, ProductTable.price, ProductTable.category_id
+        ).order_by(ProductTable.id).all()
+
     def find_by_category(self, category_id: int) -> List[Product]:
         """
         Retrieves products by their category ID.
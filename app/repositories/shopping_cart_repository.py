@@ -1,13 +1,81 @@
 # app/repositories/shopping_cart_repository.py
-from typing import Optional
-from app.repositories.base_repository import BaseRepository
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from app.repositories.base_repository import BaseRepository, UPSERT_INSERTS
 from app.models.database.shopping_cart import (
     ShoppingCartTable,
     ShoppingCartItemTable,
 )
 from app.models.domain.shopping_cart import ShoppingCart
+from sqlalchemy import bindparam, delete, func, insert, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Load, selectinload
+from sqlalchemy.orm.exc import StaleDataError
 from app.mappers.shopping_cart_mapper import ShoppingCartMapper
+from app.utils.exceptions import ConcurrencyConflictError
 from app import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CartChanges(NamedTuple):
+    """
+    The buffered changes of a customer's cart: whether it was cleared, and
+    the new quantity of every changed product, 0 for removed items.
+    """
+    customer_id: int
+    cleared: bool
+    quantities: Dict[int, int]
+
+
+class CartOperation(NamedTuple):
+    """
+    An operation on one item of a cart: adding a quantity of a product,
+    setting its quantity, or removing it. The quantity is unused by
+    removals.
+    """
+    ADD = 'add'
+    UPDATE = 'update'
+    REMOVE = 'remove'
+
+    kind: str
+    product_id: int
+    quantity: int = 0
+
+
+def check_operations(operations: Sequence[CartOperation]) -> None:
+    """
+    Checks cart operations before a cart store applies them, so that every
+    store accepts the same ones: adds and updates need a quantity of at
+    least 1, since an item is removed with a removal, not with a quantity
+    of 0.
+
+    Args:
+        operations (Sequence[CartOperation]): The operations.
+
+    Raises:
+        ValueError: If an operation is unknown or has no positive quantity.
+    """
+    for operation in operations:
+        if operation.kind == CartOperation.REMOVE:
+            continue
+        if operation.kind not in (CartOperation.ADD, CartOperation.UPDATE):
+            raise ValueError(f"Unknown cart operation '{operation.kind}'")
+        if operation.quantity < 1:
+            raise ValueError(
+                f"quantity of '{operation.kind}' must be at least 1")
+
+
+def _with_items_and_products() -> Load:
+    """
+    Returns the loader option that reads the items of the queried carts
+    with one extra query, products included, instead of lazy-loading each
+    item's product. A SELECT ... IN for the items keeps the cart row from
+    being repeated once per item, and the products are joined into it.
+    """
+    return selectinload(ShoppingCartTable.items).joinedload(
+        ShoppingCartItemTable.product)
 
 
 class ShoppingCartRepository(BaseRepository[ShoppingCartTable]):
@@ -20,23 +88,83 @@ class ShoppingCartRepository(BaseRepository[ShoppingCartTable]):
 
     def find_by_customer_id(self, customer_id: int) -> Optional[ShoppingCart]:
         """
-        Retrieves a shopping cart by the customer ID.
+        Retrieves a shopping cart by the customer ID, with its items and
+        their products.
+
+        The cart is read with two queries whatever its number of items: one
+        for the cart and one for its items joined with their products.
 
         Args:
             customer_id (int): The ID of the customer.
 
         Returns:
-            Optional[ShoppingCart]: The found shopping cart
+            Optional[ShoppingCart]: The customer's first shopping cart
             or None if not found.
         """
         cart_table = db.session.query(ShoppingCartTable).filter(
-            ShoppingCartTable.customer_id == customer_id).first()
+            ShoppingCartTable.customer_id == customer_id
+        ).order_by(ShoppingCartTable.id).options(
+            _with_items_and_products()
+        ).first()
         return (
             ShoppingCartMapper.from_persistence(cart_table)
             if cart_table
             else None
         )
 
+    def find_id_and_version_by_customer_id(
+        self, customer_id: int
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Retrieves the ID and version of a customer's shopping cart without
+        loading the cart or its items. Together they change whenever the
+        cart's items do, even if the cart is deleted and created again.
+
+        Args:
+            customer_id (int): The ID of the customer.
+
+        Returns:
+            Optional[Tuple[int, int]]: The ID and version of the customer's
+            first cart, or None if the customer has no cart.
+        """
+        row = db.session.query(
+            ShoppingCartTable.id, ShoppingCartTable.version
+        ).filter(
+            ShoppingCartTable.customer_id == customer_id
+        ).order_by(ShoppingCartTable.id).first()
+        return (row.id, row.version) if row else None
+
+    def update(self, entity: ShoppingCartTable) -> ShoppingCartTable:
+        """
+        Updates an existing shopping cart and its items, and bumps the
+        cart's version.
+
+        The cart row is always updated, even if only its items changed, so
+        that the update only succeeds if `entity.version` is still the
+        current version of the cart.
+
+        Args:
+            entity (ShoppingCartTable): The cart to update, with the version
+                it was read at.
+
+        Returns:
+            ShoppingCartTable: The updated cart.
+
+        Raises:
+            ConcurrencyConflictError: If the cart was changed since its
+                version was read.
+        """
+        try:
+            cart_table = db.session.merge(entity)
+            cart_table.updated_at = datetime.utcnow()
+            db.session.commit()
+        except StaleDataError as e:
+            db.session.rollback()
+            logger.info(f"Conflicting update of cart {entity.id}: {e}")
+            raise ConcurrencyConflictError(
+                f"Shopping cart {entity.id} was changed concurrently")
+        return entity
+
     def save(self, cart: ShoppingCart) -> ShoppingCart:
         """
         Saves a shopping cart to the database.
@@ -54,29 +182,141 @@ class ShoppingCartRepository(BaseRepository[ShoppingCartTable]):
             saved_cart = super().create(cart_table)
         return ShoppingCartMapper.to_domain(saved_cart)
 
+    def find_id_by_customer_id(self, customer_id: int) -> Optional[int]:
+        """
+        Retrieves the ID of a customer's shopping cart without loading the
+        cart or its items.
+
+        Args:
+            customer_id (int): The ID of the customer.
+
+        Returns:
+            Optional[int]: The ID of the customer's first cart, or None if
+            the customer has no cart.
+        """
+        return db.session.query(ShoppingCartTable.id).filter(
+            ShoppingCartTable.customer_id == customer_id
+        ).order_by(ShoppingCartTable.id).limit(1).scalar()
+
+    def find_or_create_id(self, customer_id: int) -> int:
+        """
+        Retrieves the ID of a customer's shopping cart, creating an empty
+        cart if the customer has none.
+
+        Args:
+            customer_id (int): The ID of the customer.
+
+        Returns:
+            int: The ID of the customer's first cart.
+        """
+        cart_id = self.find_id_by_customer_id(customer_id)
+        if cart_id is None:
+            cart_id = self.create(ShoppingCartTable(
+                customer_id=customer_id)).id
+        return cart_id
+
+    def find_item_quantities(self, customer_id: int) -> Dict[int, int]:
+        """
+        Retrieves the quantity of every product in a customer's shopping
+        cart, without loading the products.
+
+        Args:
+            customer_id (int): The ID of the customer.
+
+        Returns:
+            Dict[int, int]: The quantities by product ID, empty if the
+            customer has no cart.
+        """
+        cart_id = self.find_id_by_customer_id(customer_id)
+        if cart_id is None:
+            return {}
+        return dict(db.session.query(
+            ShoppingCartItemTable.product_id, ShoppingCartItemTable.quantity
+        ).filter(ShoppingCartItemTable.cart_id == cart_id).all())
+
+    def write_changes(self, changes: Sequence[CartChanges]) -> None:
+        """
+        Writes the buffered changes of many carts in one transaction.
+
+        The number of statements does not depend on the number of carts:
+        missing carts are created together, cleared carts are emptied with
+        one DELETE, removed items with one executemany DELETE and the new
+        quantities with one executemany upsert where the database supports
+        ON CONFLICT. The version of every changed cart is bumped once.
+
+        Args:
+            changes (Sequence[CartChanges]): The changes, at most one per
+                customer.
+        """
+        if not changes:
+            return
+        customer_ids = [change.customer_id for change in changes]
+        cart_ids: Dict[int, int] = dict(db.session.query(
+            ShoppingCartTable.customer_id, func.min(ShoppingCartTable.id)
+        ).filter(
+            ShoppingCartTable.customer_id.in_(customer_ids)
+        ).group_by(ShoppingCartTable.customer_id).all())
+        missing = [
+            ShoppingCartTable(customer_id=customer_id)
+            for customer_id in customer_ids if customer_id not in cart_ids
+        ]
+        if missing:
+            db.session.add_all(missing)
+            db.session.flush()
+            cart_ids.update((cart.customer_id, cart.id) for cart in missing)
+
+        table = ShoppingCartItemTable.__table__
+        cleared = [cart_ids[change.customer_id]
+                   for change in changes if change.cleared]
+        if cleared:
+            db.session.execute(
+                delete(table).where(table.c.cart_id.in_(cleared)))
+        removed = [
+            {'item_cart_id': cart_ids[change.customer_id],
+             'item_product_id': product_id}
+            for change in changes if not change.cleared
+            for product_id, quantity in change.quantities.items()
+            if quantity <= 0
+        ]
+        if removed:
+            db.session.execute(delete(table).where(
+                table.c.cart_id == bindparam('item_cart_id'),
+                table.c.product_id == bindparam('item_product_id')
+            ), removed)
+        self._upsert_items([
+            {'cart_id': cart_ids[change.customer_id],
+             'product_id': product_id, 'quantity': quantity}
+            for change in changes
+            for product_id, quantity in change.quantities.items()
+            if quantity > 0
+        ], increment=False)
+
+        db.session.execute(
+            update(ShoppingCartTable).where(
+                ShoppingCartTable.id.in_(list(cart_ids.values()))
+            ).values(
+                version=ShoppingCartTable.version + 1,
+                updated_at=datetime.utcnow()
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
     def add_item(self, cart_id: int, product_id: int, quantity: int) -> None:
         """
-        Adds an item to the shopping cart or updates its quantity
-        if it already exists.
+        Adds an item to the shopping cart or increases its quantity if it
+        already exists, as a single upsert of the item row.
+
+        On databases whose INSERT supports ON CONFLICT the quantity is added
+        by the database; elsewhere the item is updated, and inserted if
+        there was nothing to update.
 
         Args:
             cart_id (int): The ID of the cart.
             product_id (int): The ID of the product to add.
             quantity (int): The quantity of the product to add.
         """
-        cart_item = db.session.query(ShoppingCartItemTable).filter(
-            ShoppingCartItemTable.cart_id == cart_id,
-            ShoppingCartItemTable.product_id == product_id
-        ).first()
-
-        if cart_item:
-            cart_item.quantity += quantity
-        else:
-            cart_item = ShoppingCartItemTable(
-                cart_id=cart_id, product_id=product_id, quantity=quantity)
-            db.session.add(cart_item)
-
-        db.session.commit()
+        self.apply_operations(cart_id, [
+            CartOperation(CartOperation.ADD, product_id, quantity)])
 
     def remove_item(self, cart_id: int, product_id: int) -> None:
         """
@@ -86,31 +326,69 @@ class ShoppingCartRepository(BaseRepository[ShoppingCartTable]):
             cart_id (int): The ID of the cart.
             product_id (int): The ID of the product to remove.
         """
-        db.session.query(ShoppingCartItemTable).filter(
-            ShoppingCartItemTable.cart_id == cart_id,
-            ShoppingCartItemTable.product_id == product_id
-        ).delete()
-        db.session.commit()
+        self.apply_operations(cart_id, [
+            CartOperation(CartOperation.REMOVE, product_id)])
 
     def update_item_quantity(
         self, cart_id: int, product_id: int, quantity: int
     ) -> None:
         """
-        Updates the quantity of an item in the shopping cart.
+        Updates the quantity of an item in the shopping cart. Does nothing
+        if the product is not in the cart.
 
         Args:
             cart_id (int): The ID of the cart.
             product_id (int): The ID of the product to update.
             quantity (int): The new quantity of the product.
         """
-        cart_item = db.session.query(ShoppingCartItemTable).filter(
-            ShoppingCartItemTable.cart_id == cart_id,
-            ShoppingCartItemTable.product_id == product_id
-        ).first()
+        self.apply_operations(cart_id, [
+            CartOperation(CartOperation.UPDATE, product_id, quantity)])
 
-        if cart_item:
-            cart_item.quantity = quantity
-            db.session.commit()
+    def apply_operations(
+        self, cart_id: int, operations: Sequence[CartOperation]
+    ) -> int:
+        """
+        Applies item operations to the shopping cart in one transaction,
+        in order, without loading the cart.
+
+        Every operation is a single statement on one item row, as in
+        add_item(), update_item_quantity() and remove_item(). The cart's
+        version is bumped once if any row changed.
+
+        Args:
+            cart_id (int): The ID of the cart.
+            operations (Sequence[CartOperation]): The operations.
+
+        Returns:
+            int: The number of operations that changed a row.
+
+        Raises:
+            ValueError: If an operation fails check_operations().
+        """
+        check_operations(operations)
+        changed = 0
+        for operation in operations:
+            if operation.kind == CartOperation.ADD:
+                self._upsert_items([{
+                    'cart_id': cart_id,
+                    'product_id': operation.product_id,
+                    'quantity': operation.quantity
+                }], increment=True)
+                changed += 1
+                continue
+            items = db.session.query(ShoppingCartItemTable).filter(
+                ShoppingCartItemTable.cart_id == cart_id,
+                ShoppingCartItemTable.product_id == operation.product_id
+            )
+            if operation.kind == CartOperation.UPDATE:
+                changed += items.update({'quantity': operation.quantity},
+                                        synchronize_session=False)
+            else:
+                changed += items.delete(synchronize_session=False)
+        if changed:
+            self._bump_version(cart_id)
+        db.session.commit()
+        return changed
 
     def clear_cart(self, cart_id: int) -> None:
         """
@@ -120,12 +398,15 @@ class ShoppingCartRepository(BaseRepository[ShoppingCartTable]):
             cart_id (int): The ID of the cart to clear.
         """
         db.session.query(ShoppingCartItemTable).filter(
-            ShoppingCartItemTable.cart_id == cart_id).delete()
+            ShoppingCartItemTable.cart_id == cart_id
+        ).delete(synchronize_session=False)
+        self._bump_version(cart_id)
         db.session.commit()
 
     def get_cart_with_items(self, cart_id: int) -> Optional[ShoppingCart]:
         """
-        Retrieves a shopping cart along with its items.
+        Retrieves a shopping cart along with its items and their products,
+        with two queries whatever its number of items.
 
         Args:
             cart_id (int): The ID of the cart.
@@ -135,8 +416,115 @@ class ShoppingCartRepository(BaseRepository[ShoppingCartTable]):
             or None if not found.
         """
         cart_table = db.session.query(ShoppingCartTable).filter(
-            ShoppingCartTable.id == cart_id).options(
-            db.joinedload(ShoppingCartTable.items).joinedload(
-                ShoppingCartItemTable.product)
-        ).first()
-        return ShoppingCartMapper.to_domain(cart_table) if cart_table else None
+            ShoppingCartTable.id == cart_id
+        ).options(_with_items_and_products()).first()
+        return (
+            ShoppingCartMapper.from_persistence(cart_table)
+            if cart_table
+            else None
+        )
+
+    def find_abandoned(self, cutoff: datetime, limit: int) -> List[Row]:
+        """
+        Retrieves the carts last changed before a time, oldest first, using
+        the index on ``updated_at``.
+
+        Args:
+            cutoff (datetime): Carts changed at or after this time are kept.
+            limit (int): The maximum number of carts returned.
+
+        Returns:
+            List[Row]: Rows with the columns ``id`` and ``customer_id``.
+        """
+        return db.session.query(
+            ShoppingCartTable.id, ShoppingCartTable.customer_id
+        ).filter(
+            ShoppingCartTable.updated_at < cutoff
+        ).order_by(ShoppingCartTable.updated_at).limit(limit).all()
+
+    def delete_abandoned(
+        self, cart_ids: Sequence[int], cutoff: datetime
+    ) -> Tuple[int, int]:
+        """
+        Deletes carts and their items in one short transaction, skipping
+        the carts changed since they were found.
+
+        The carts still unchanged are locked first where the database
+        supports it, so that an item added concurrently waits for the
+        deletion instead of being deleted with the cart unseen.
+
+        Args:
+            cart_ids (Sequence[int]): The IDs of the carts, as returned by
+                find_abandoned().
+            cutoff (datetime): The cutoff the carts were found with.
+
+        Returns:
+            Tuple[int, int]: The numbers of carts and items deleted.
+        """
+        abandoned = [cart_id for cart_id, in db.session.query(
+            ShoppingCartTable.id
+        ).filter(
+            ShoppingCartTable.id.in_(cart_ids),
+            ShoppingCartTable.updated_at < cutoff
+        ).with_for_update()]
+        if not abandoned:
+            db.session.commit()
+            return 0, 0
+        items = ShoppingCartItemTable.__table__
+        carts = ShoppingCartTable.__table__
+        deleted_items = db.session.execute(
+            delete(items).where(items.c.cart_id.in_(abandoned))).rowcount
+        deleted_carts = db.session.execute(
+            delete(carts).where(carts.c.id.in_(abandoned))).rowcount
+        db.session.commit()
+        return deleted_carts, deleted_items
+
+    @staticmethod
+    def _upsert_items(rows: List[Dict[str, int]], increment: bool) -> None:
+        """
+        Writes item rows, creating the missing ones, with one executemany
+        statement where the database supports ON CONFLICT. Existing rows
+        get the quantity of their row added if `increment`, or replaced
+        otherwise.
+        """
+        if not rows:
+            return
+        table = ShoppingCartItemTable.__table__
+        upsert_insert = UPSERT_INSERTS.get(db.engine.dialect.name)
+        if upsert_insert is not None:
+            statement = upsert_insert(table)
+            quantity = statement.excluded.quantity
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.cart_id, table.c.product_id],
+                set_={'quantity': table.c.quantity + quantity
+                      if increment else quantity}
+            ), rows)
+            return
+
+        for row in rows:
+            updated = db.session.execute(
+                update(table).where(
+                    table.c.cart_id == row['cart_id'],
+                    table.c.product_id == row['product_id']
+                ).values(
+                    quantity=table.c.quantity + row['quantity']
+                    if increment else row['quantity']
+                )
+            ).rowcount
+            if not updated:
+                db.session.execute(insert(table), [row])
+
+    @staticmethod
+    def _bump_version(cart_id: int) -> None:
+        """
+        Increments a cart's version in the current transaction, without
+        checking it. Used by the item-level methods, which change single
+        item rows instead of the whole cart.
+        """
+        db.session.execute(
+            update(ShoppingCartTable).where(
+                ShoppingCartTable.id == cart_id
+            ).values(
+                version=ShoppingCartTable.version + 1
+            ).execution_options(synchronize_session=False)
+        )
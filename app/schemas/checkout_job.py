@@ -0,0 +1,26 @@
+# app/schemas/checkout_job.py
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from app.schemas.checkout import CheckoutResponseDto
+
+
+class CheckoutJobDto(BaseModel):
+    """
+    Data Transfer Object for an asynchronous checkout.
+
+    Attributes:
+        job_id (int): The ID of the checkout job.
+        status (str): 'queued', 'running', 'succeeded' or 'failed'.
+        result (Optional[CheckoutResponseDto]): The checkout response once
+            the job succeeded.
+        error (Optional[str]): The error message if the job failed.
+        created_at (datetime): When the job was queued.
+        finished_at (Optional[datetime]): When the job finished.
+    """
+    job_id: int
+    status: str
+    result: Optional[CheckoutResponseDto] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
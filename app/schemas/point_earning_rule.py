@@ -9,16 +9,27 @@ class PointEarningRuleCreateDto(BaseModel):
     Data Transfer Object for creating a point earning rule.
 
     Attributes:
-        category_id (int): The identifier of the category this rule applies to.
+        category_id (Optional[int]): The identifier of the category this
+            rule applies to, or None for all categories.
         points_per_dollar (int): The number of points earned per dollar spent.
         start_date (date): The start date from which the rule is applicable.
         end_date (Optional[date]): The optional end date until which the rule
             is applicable.
+        rule_type (str): 'rate', 'bonus', 'tier', 'multiplier' or 'cap'.
+        multiplier (Optional[float]): The factor of a multiplier rule.
+        min_spend (Optional[float]): The order amount from which a tier rule
+            applies.
+        max_points (Optional[int]): The most points per order allowed by a
+            cap rule.
     """
-    category_id: int
-    points_per_dollar: int
+    category_id: Optional[int] = None
+    points_per_dollar: int = 0
     start_date: date
     end_date: Optional[date] = None
+    rule_type: str = 'rate'
+    multiplier: Optional[float] = None
+    min_spend: Optional[float] = None
+    max_points: Optional[int] = None
 
 
 class PointEarningRuleResponseDto(BaseModel):
@@ -27,14 +38,25 @@ class PointEarningRuleResponseDto(BaseModel):
 
     Attributes:
         id (int): The unique identifier of the point earning rule.
-        category_id (int): The identifier of the category this rule applies to.
+        category_id (Optional[int]): The identifier of the category this
+            rule applies to, or None for all categories.
         points_per_dollar (int): The number of points earned per dollar spent.
         start_date (date): The start date from which the rule is applicable.
         end_date (Optional[date]): The optional end date until which the rule
             is applicable.
+        rule_type (str): 'rate', 'bonus', 'tier', 'multiplier' or 'cap'.
+        multiplier (Optional[float]): The factor of a multiplier rule.
+        min_spend (Optional[float]): The order amount from which a tier rule
+            applies.
+        max_points (Optional[int]): The most points per order allowed by a
+            cap rule.
     """
     id: int
-    category_id: int
-    points_per_dollar: int
+    category_id: Optional[int] = None
+    points_per_dollar: int = 0
     start_date: date
     end_date: Optional[date] = None
+    rule_type: str = 'rate'
+    multiplier: Optional[float] = None
+    min_spend: Optional[float] = None
+    max_points: Optional[int] = None
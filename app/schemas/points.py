@@ -1,4 +1,6 @@
 # app/schemas/points.py
+from datetime import date
+from typing import List
 from pydantic import BaseModel
 
 
@@ -10,3 +12,36 @@ class PointsDto(BaseModel):
         points (int): The total number of loyalty points.
     """
     points: int
+
+
+class DailyPointsDto(BaseModel):
+    """
+    Data Transfer Object for the points a loyalty account earned on one day.
+
+    Attributes:
+        day (date): The UTC date.
+        points_earned (int): The points earned on that day.
+        transaction_count (int): The number of point transactions on that
+            day.
+    """
+    day: date
+    points_earned: int
+    transaction_count: int
+
+
+class DailyPointsReportDto(BaseModel):
+    """
+    Data Transfer Object for the points a loyalty account earned per day
+    over a date range.
+
+    Attributes:
+        start_date (date): The first day of the range.
+        end_date (date): The last day of the range.
+        total_points_earned (int): The points earned over the whole range.
+        days (List[DailyPointsDto]): The days on which points were earned,
+            in chronological order.
+    """
+    start_date: date
+    end_date: date
+    total_points_earned: int
+    days: List[DailyPointsDto]
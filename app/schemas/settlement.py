@@ -0,0 +1,30 @@
+# app/schemas/settlement.py
+from pydantic import BaseModel
+from typing import List, Optional
+from app.schemas.checkout import CheckoutResponseDto
+
+
+class SettlementRequestDto(BaseModel):
+    """
+    Data Transfer Object for a bulk settlement request.
+
+    Attributes:
+        customer_ids (List[int]): The IDs of the customers whose carts are
+            checked out.
+    """
+    customer_ids: List[int]
+
+
+class SettlementResultDto(BaseModel):
+    """
+    Data Transfer Object for the settlement of one customer's cart.
+
+    Attributes:
+        customer_id (int): The ID of the customer.
+        result (Optional[CheckoutResponseDto]): The checkout response, if
+            the cart could be checked out.
+        error (Optional[str]): Why the cart could not be checked out.
+    """
+    customer_id: int
+    result: Optional[CheckoutResponseDto] = None
+    error: Optional[str] = None
@@ -1,8 +1,12 @@
 # app/schemas/shopping_cart.py
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import List, Literal, Optional
+from .checkout import CheckoutResponseDto
 from .product import ProductResponseDto
 
+# The most operations a batched cart update may carry.
+MAX_CART_OPERATIONS: int = 100
+
 
 class ShoppingCartItemDto(BaseModel):
     """
@@ -30,16 +34,36 @@ class ShoppingCartResponseDto(BaseModel):
     items: List[ShoppingCartItemDto]
 
 
+class CartMutationResponseDto(BaseModel):
+    """
+    Data Transfer Object for the response of a cart change that asked for
+    the resulting cart.
+
+    Attributes:
+        success (bool): Flag indicating that the change was applied.
+        cart (Optional[ShoppingCartResponseDto]): The cart after the change,
+            or None if the customer has no cart.
+        quote (Optional[CheckoutResponseDto]): The points a checkout of the
+            cart would earn, or None if the cart is empty.
+    """
+    success: bool = True
+    cart: Optional[ShoppingCartResponseDto]
+    quote: Optional[CheckoutResponseDto]
+
+
 class AddToCartDto(BaseModel):
     """
     Data Transfer Object for adding a product to a shopping cart.
 
     Attributes:
-        product_id (int): The identifier of the product to add.
-        quantity (int): The quantity of the product to add.
+        product_id (int): The identifier of the product to add, sent as
+            `productId`.
+        quantity (int): The quantity of the product to add, at least 1.
     """
-    product_id: int
-    quantity: int
+    model_config = ConfigDict(populate_by_name=True)
+
+    product_id: int = Field(alias='productId')
+    quantity: int = Field(ge=1)
 
 
 class UpdateCartItemDto(BaseModel):
@@ -48,6 +72,40 @@ class UpdateCartItemDto(BaseModel):
     in the shopping cart.
 
     Attributes:
-        quantity (int): The updated quantity of the item.
+        quantity (int): The updated quantity of the item, at least 1.
     """
-    quantity: int
+    quantity: int = Field(ge=1)
+
+
+class CartOperationDto(BaseModel):
+    """
+    Data Transfer Object for one operation of a batched cart update.
+
+    Attributes:
+        op (str): 'add' to add a quantity of the product, 'update' to set
+            the quantity of an item already in the cart, or 'remove' to
+            remove it.
+        product_id (int): The identifier of the product.
+        quantity (Optional[int]): The quantity to add or set, at least 1.
+            Required by 'add' and 'update'; use 'remove' to drop an item.
+    """
+    op: Literal['add', 'update', 'remove']
+    product_id: int
+    quantity: Optional[int] = Field(default=None, ge=1)
+
+    @model_validator(mode='after')
+    def check_quantity(self) -> 'CartOperationDto':
+        if self.op != 'remove' and self.quantity is None:
+            raise ValueError(f"quantity is required by '{self.op}'")
+        return self
+
+
+class CartPatchDto(BaseModel):
+    """
+    Data Transfer Object for a batched cart update.
+
+    Attributes:
+        operations (List[CartOperationDto]): The operations, applied in
+            order; at most MAX_CART_OPERATIONS.
+    """
+    operations: List[CartOperationDto] = Field(max_length=MAX_CART_OPERATIONS)
@@ -0,0 +1,74 @@
+# app/schemas/simulation.py
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+
+
+class CategoryPointsDeltaDto(BaseModel):
+    """
+    Data Transfer Object for the simulated points of one category.
+
+    Attributes:
+        category_id (Optional[int]): The ID of the category, or None for
+            products without a category.
+        transaction_count (int): The number of replayed transactions.
+        actual_points (int): The points recorded in the ledger.
+        simulated_points (int): The points the candidate rules would have
+            given.
+        delta (int): simulated_points minus actual_points.
+    """
+    category_id: Optional[int] = None
+    transaction_count: int
+    actual_points: int
+    simulated_points: int
+    delta: int
+
+
+class DailyPointsDeltaDto(BaseModel):
+    """
+    Data Transfer Object for the simulated points of one day.
+
+    Attributes:
+        day (date): The UTC date.
+        transaction_count (int): The number of replayed transactions.
+        actual_points (int): The points recorded in the ledger.
+        simulated_points (int): The points the candidate rules would have
+            given.
+        delta (int): simulated_points minus actual_points.
+    """
+    day: date
+    transaction_count: int
+    actual_points: int
+    simulated_points: int
+    delta: int
+
+
+class RuleSimulationReportDto(BaseModel):
+    """
+    Data Transfer Object for the replay of the ledger against candidate
+    point earning rules.
+
+    Attributes:
+        start_date (date): The first day of the replayed range.
+        end_date (date): The last day of the replayed range.
+        transaction_count (int): The number of replayed transactions.
+        skipped_transaction_count (int): The number of transactions that
+            could not be replayed because their quantity was not recorded.
+        actual_points (int): The points recorded in the ledger.
+        simulated_points (int): The points the candidate rules would have
+            given.
+        delta (int): simulated_points minus actual_points.
+        categories (List[CategoryPointsDeltaDto]): The points per category,
+            by category ID.
+        days (List[DailyPointsDeltaDto]): The points per day, in
+            chronological order.
+    """
+    start_date: date
+    end_date: date
+    transaction_count: int
+    skipped_transaction_count: int
+    actual_points: int
+    simulated_points: int
+    delta: int
+    categories: List[CategoryPointsDeltaDto]
+    days: List[DailyPointsDeltaDto]
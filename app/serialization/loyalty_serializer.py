@@ -1,8 +1,11 @@
 # app/serialization/loyalty_serializer.py
 from app.serialization.base_serializer import BaseSerializer
 from app.schemas.checkout import CheckoutResponseDto
-from app.schemas.points import PointsDto
-from app.schemas.shopping_cart import ShoppingCartResponseDto
+from app.schemas.checkout_job import CheckoutJobDto
+from app.schemas.points import DailyPointsReportDto, PointsDto
+from app.schemas.settlement import SettlementResultDto
+from app.schemas.shopping_cart import (CartMutationResponseDto,
+                                       ShoppingCartResponseDto)
 
 
 class LoyaltySerializer(BaseSerializer):
@@ -21,6 +24,33 @@ class LoyaltySerializer(BaseSerializer):
         """
         return BaseSerializer.serialize(checkout)
 
+    @staticmethod
+    def serialize_checkout_job(job: CheckoutJobDto) -> dict:
+        """
+        Serializes a CheckoutJobDto into a dictionary.
+
+        Args:
+            job (CheckoutJobDto): The checkout job data.
+
+        Returns:
+            dict: The serialized checkout job.
+        """
+        return BaseSerializer.serialize(job)
+
+    @staticmethod
+    def serialize_settlement_result(result: SettlementResultDto) -> dict:
+        """
+        Serializes a SettlementResultDto into a dictionary.
+
+        Args:
+            result (SettlementResultDto): The settlement result of one
+                customer.
+
+        Returns:
+            dict: The serialized settlement result.
+        """
+        return BaseSerializer.serialize(result)
+
     @staticmethod
     def serialize_points(points: PointsDto) -> dict:
         """
@@ -34,6 +64,20 @@ class LoyaltySerializer(BaseSerializer):
         """
         return BaseSerializer.serialize(points)
 
+    @staticmethod
+    def serialize_daily_points(report: DailyPointsReportDto) -> dict:
+        """
+        Serializes a DailyPointsReportDto into a dictionary. Dates are
+        serialized in ISO 8601 format.
+
+        Args:
+            report (DailyPointsReportDto): The daily points report.
+
+        Returns:
+            dict: The serialized daily points report.
+        """
+        return report.model_dump(mode='json')
+
     @staticmethod
     def serialize_shopping_cart(cart_dto: ShoppingCartResponseDto) -> dict:
         """
@@ -47,3 +91,17 @@ class LoyaltySerializer(BaseSerializer):
             dict: The serialized shopping cart data.
         """
         return BaseSerializer.serialize(cart_dto)
+
+    @staticmethod
+    def serialize_cart_mutation(mutation: CartMutationResponseDto) -> dict:
+        """
+        Serializes a CartMutationResponseDto into a dictionary.
+
+        Args:
+            mutation (CartMutationResponseDto): The cart and quote after a
+                cart change.
+
+        Returns:
+            dict: The serialized cart and quote.
+        """
+        return BaseSerializer.serialize(mutation)
@@ -0,0 +1,108 @@
+# app/services/cart_sweeper_service.py
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from app.repositories.cart_store import CartStore
+from app.repositories.shopping_cart_repository import ShoppingCartRepository
+from app.utils.metrics import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CartSweepResult(NamedTuple):
+    """The rows reclaimed by a sweep of abandoned carts, and its duration."""
+    carts: int
+    items: int
+    batches: int
+    seconds: float
+
+
+class CartSweeperService:
+    """
+    Deletes the shopping carts nobody changed for a while, with their items.
+
+    Every visitor who opens a cart leaves a row behind, so without sweeping
+    the cart tables only ever grow. Carts are deleted in batches of
+    `batch_size`, one short transaction per batch, so that cart changes of
+    live customers only ever wait for one batch.
+    """
+
+    def __init__(
+        self,
+        shopping_cart_repository: ShoppingCartRepository,
+        cart_store: CartStore,
+        ttl_seconds: float,
+        batch_size: int = 500
+    ) -> None:
+        """
+        Initializes the CartSweeperService.
+
+        Args:
+            shopping_cart_repository (ShoppingCartRepository): Repository
+                the carts are found and deleted with.
+            cart_store (CartStore): Store the carts are released from before
+                they are deleted, so that buffered edits are not lost and
+                deleted carts are not written back.
+            ttl_seconds (float): Seconds after its last change from which a
+                cart is abandoned.
+            batch_size (int, optional): Carts deleted per transaction.
+                Defaults to 500.
+        """
+        self.shopping_cart_repository: ShoppingCartRepository = \
+            shopping_cart_repository
+        self.cart_store: CartStore = cart_store
+        self.ttl: timedelta = timedelta(seconds=ttl_seconds)
+        self.batch_size: int = batch_size
+
+    def sweep(
+        self,
+        ttl_seconds: Optional[float] = None,
+        batch_size: Optional[int] = None
+    ) -> CartSweepResult:
+        """
+        Deletes the abandoned carts and their items, oldest first.
+
+        Each batch is released from the cart store before it is deleted.
+        A cart whose buffered edits are written by the release is changed
+        again, and so is kept.
+
+        Args:
+            ttl_seconds (Optional[float], optional): Overrides the
+                configured time to live.
+            batch_size (Optional[int], optional): Overrides the configured
+                batch size.
+
+        Returns:
+            CartSweepResult: The numbers of carts, items and batches
+            deleted, and the seconds taken.
+        """
+        ttl = self.ttl if ttl_seconds is None else timedelta(
+            seconds=ttl_seconds)
+        batch_size = batch_size or self.batch_size
+        cutoff = datetime.utcnow() - ttl
+        started = time.perf_counter()
+        carts = items = batches = 0
+        while True:
+            abandoned = self.shopping_cart_repository.find_abandoned(
+                cutoff, batch_size)
+            if not abandoned:
+                break
+            self.cart_store.release(row.customer_id for row in abandoned)
+            deleted_carts, deleted_items = \
+                self.shopping_cart_repository.delete_abandoned(
+                    [row.id for row in abandoned], cutoff)
+            carts += deleted_carts
+            items += deleted_items
+            batches += 1
+            if len(abandoned) < batch_size:
+                break
+
+        result = CartSweepResult(
+            carts, items, batches, time.perf_counter() - started)
+        metrics.increment('cart_sweep.carts', carts)
+        metrics.increment('cart_sweep.items', items)
+        metrics.observe('cart_sweep.seconds', result.seconds)
+        logger.info(f"Swept {carts} abandoned carts and {items} items in "
+                    f"{batches} batches, {result.seconds:.3f}s")
+        return result
@@ -0,0 +1,153 @@
+# app/services/checkout_job_service.py
+from datetime import datetime, timedelta
+from typing import Optional
+from app.repositories.cart_store import CartStore
+from app.repositories.checkout_job_repository import CheckoutJobRepository
+from app.services.loyalty_service import LoyaltyService
+from app.models.domain.checkout_job import CheckoutJob
+from app.schemas.checkout import CheckoutResponseDto
+from app.schemas.checkout_job import CheckoutJobDto
+from app.utils.metrics import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CheckoutJobService:
+    """Service layer for queued, asynchronous checkouts."""
+
+    def __init__(
+        self,
+        checkout_job_repository: CheckoutJobRepository,
+        loyalty_service: LoyaltyService,
+        cart_store: Optional[CartStore] = None
+    ):
+        """
+        Initializes the CheckoutJobService.
+
+        Args:
+            checkout_job_repository (CheckoutJobRepository): Repository for
+                the checkout queue.
+            loyalty_service (LoyaltyService): Service running the checkout,
+                which also clears the cart if it succeeded.
+            cart_store (Optional[CartStore], optional): Store the cart is
+                released from when a checkout is queued, so that worker
+                processes see its changes. Defaults to the loyalty service's
+                store.
+        """
+        self.checkout_job_repository: CheckoutJobRepository = \
+            checkout_job_repository
+        self.loyalty_service: LoyaltyService = loyalty_service
+        self.cart_store: CartStore = cart_store or loyalty_service.cart_store
+
+    def enqueue(self, customer_id: int) -> CheckoutJobDto:
+        """
+        Queues a checkout for a customer.
+
+        The customer's cart is released from the cart store first: its
+        buffered edits are written for the worker, and the cart is dropped
+        from memory, so that edits after the worker cleared the cart start
+        from the database instead of the cart that was checked out.
+
+        Args:
+            customer_id (int): The ID of the customer checking out.
+
+        Returns:
+            CheckoutJobDto: DTO describing the queued job.
+        """
+        self.cart_store.release([customer_id])
+        job = self.checkout_job_repository.enqueue(customer_id)
+        metrics.increment('checkout_jobs.enqueued')
+        self._update_queue_depth()
+        return self._to_dto(job)
+
+    def get_job(
+        self, job_id: int, customer_id: int
+    ) -> Optional[CheckoutJobDto]:
+        """
+        Retrieves a checkout job of a customer.
+
+        Args:
+            job_id (int): The ID of the job.
+            customer_id (int): The ID of the customer asking for the job.
+
+        Returns:
+            Optional[CheckoutJobDto]: DTO describing the job, or None if it
+            does not exist or belongs to another customer.
+        """
+        job = self.checkout_job_repository.find_by_id(job_id)
+        if not job or job.customer_id != customer_id:
+            return None
+        return self._to_dto(job)
+
+    def claim_next(self) -> Optional[CheckoutJob]:
+        """
+        Claims the oldest queued job for a worker.
+
+        Returns:
+            Optional[CheckoutJob]: The claimed job, or None if the queue is
+            empty.
+        """
+        job = self.checkout_job_repository.claim_next()
+        if job is not None:
+            metrics.observe(
+                'checkout_jobs.wait_seconds',
+                (job.started_at - job.created_at).total_seconds())
+            self._update_queue_depth()
+        return job
+
+    def execute(self, job_id: int, customer_id: int) -> str:
+        """
+        Runs a claimed job: checks out, which clears the cart if the
+        checkout succeeded, and records the outcome.
+
+        Args:
+            job_id (int): The ID of the claimed job.
+            customer_id (int): The ID of the customer checking out.
+
+        Returns:
+            str: The final status of the job, SUCCEEDED or FAILED.
+        """
+        try:
+            result = self.loyalty_service.checkout(customer_id)
+        except Exception as e:
+            logger.error(f"Checkout job {job_id} failed: {e}")
+            self.checkout_job_repository.finish(
+                job_id, CheckoutJob.FAILED, error=str(e))
+            return CheckoutJob.FAILED
+        self.checkout_job_repository.finish(
+            job_id, CheckoutJob.SUCCEEDED, result=result.model_dump_json())
+        return CheckoutJob.SUCCEEDED
+
+    def requeue_stale(self, timeout_seconds: float) -> int:
+        """
+        Requeues jobs that have been running for longer than a timeout,
+        i.e. whose worker died before finishing them.
+
+        Args:
+            timeout_seconds (float): Seconds after which a running job is
+                considered stale.
+
+        Returns:
+            int: The number of requeued jobs.
+        """
+        requeued = self.checkout_job_repository.requeue_stale(
+            datetime.utcnow() - timedelta(seconds=timeout_seconds))
+        self._update_queue_depth()
+        return requeued
+
+    def _update_queue_depth(self) -> None:
+        metrics.set_gauge('checkout_jobs.queue_depth',
+                          self.checkout_job_repository.count_queued())
+
+    @staticmethod
+    def _to_dto(job: CheckoutJob) -> CheckoutJobDto:
+        return CheckoutJobDto(
+            job_id=job.id,
+            status=job.status,
+            result=(CheckoutResponseDto.model_validate_json(job.result)
+                    if job.result else None),
+            error=job.error,
+            created_at=job.created_at,
+            finished_at=job.finished_at
+        )
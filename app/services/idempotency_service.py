@@ -0,0 +1,158 @@
+# app/services/idempotency_service.py
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from app.repositories.idempotency_key_repository import (
+    IdempotencyKeyRepository
+)
+from app.models.domain.idempotency_key import IdempotencyKey
+from app.utils.exceptions import ConflictError
+from app.utils.lru_cache import LRUCache
+from app.utils.metrics import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyService:
+    """
+    Service layer for Idempotency-Key handling.
+
+    The first request with a key claims it and stores its response once
+    done; retries with the same key get the stored response back. Completed
+    keys are kept in an LRU cache in front of the idempotency_keys table, so
+    a retry is answered without a database round trip.
+    """
+
+    def __init__(
+        self,
+        idempotency_key_repository: IdempotencyKeyRepository,
+        ttl_seconds: float,
+        cache_size: int,
+        processing_timeout_seconds: float
+    ):
+        """
+        Initializes the IdempotencyService.
+
+        Args:
+            idempotency_key_repository (IdempotencyKeyRepository): Repository
+                for stored idempotency keys.
+            ttl_seconds (float): Seconds a key is kept after it was claimed.
+            cache_size (int): The maximum number of completed keys cached in
+                memory.
+            processing_timeout_seconds (float): Seconds after which a key
+                still being processed is considered abandoned and may be
+                claimed again.
+        """
+        self.idempotency_key_repository: IdempotencyKeyRepository = \
+            idempotency_key_repository
+        self.ttl: timedelta = timedelta(seconds=ttl_seconds)
+        self.processing_timeout: timedelta = timedelta(
+            seconds=processing_timeout_seconds)
+        self.cache: LRUCache[IdempotencyKey] = LRUCache(cache_size)
+
+    def begin(self, customer_id: int, key: str) -> Optional[IdempotencyKey]:
+        """
+        Claims a key before the request is processed.
+
+        Args:
+            customer_id (int): The ID of the customer sending the request.
+            key (str): The value of the Idempotency-Key header.
+
+        Returns:
+            Optional[IdempotencyKey]: The completed record whose response
+            must be replayed, or None if the key was claimed and the request
+            must be processed.
+
+        Raises:
+            ConflictError: If another request with the same key is still
+                being processed.
+        """
+        now = datetime.utcnow()
+        cache_key: Tuple[int, str] = (customer_id, key)
+        cached = self.cache.get(cache_key)
+        if cached is not None and not cached.is_expired(now):
+            metrics.increment('idempotency.cache.hits')
+            return cached
+        metrics.increment('idempotency.cache.misses')
+
+        existing = self.idempotency_key_repository.reserve(
+            customer_id, key, now + self.ttl, now - self.processing_timeout)
+        if existing is not None and existing.is_expired(now):
+            # The key outlived its TTL but has not been purged yet.
+            self.cache.pop(cache_key)
+            self.idempotency_key_repository.release(customer_id, key)
+            existing = self.idempotency_key_repository.reserve(
+                customer_id, key, now + self.ttl,
+                now - self.processing_timeout)
+        if existing is None:
+            return None
+        if not existing.is_completed():
+            metrics.increment('idempotency.conflicts')
+            raise ConflictError(
+                "A request with this Idempotency-Key is already being "
+                "processed",
+                retry_after=1
+            )
+        self.cache.put(cache_key, existing)
+        return existing
+
+    def complete(
+        self,
+        customer_id: int,
+        key: str,
+        status_code: int,
+        response_body: str
+    ) -> IdempotencyKey:
+        """
+        Stores the response of a request that claimed a key.
+
+        Args:
+            customer_id (int): The ID of the customer sending the request.
+            key (str): The value of the Idempotency-Key header.
+            status_code (int): The HTTP status code of the response.
+            response_body (str): The serialized response body.
+
+        Returns:
+            IdempotencyKey: The completed record.
+        """
+        self.idempotency_key_repository.complete(
+            customer_id, key, status_code, response_body)
+        now = datetime.utcnow()
+        completed = IdempotencyKey(
+            id=None,
+            customer_id=customer_id,
+            key=key,
+            status=IdempotencyKey.COMPLETED,
+            expires_at=now + self.ttl,
+            status_code=status_code,
+            response_body=response_body,
+            created_at=now
+        )
+        self.cache.put((customer_id, key), completed)
+        return completed
+
+    def abandon(self, customer_id: int, key: str) -> None:
+        """
+        Releases a claimed key after the request failed, so that it can be
+        retried with the same key.
+
+        Args:
+            customer_id (int): The ID of the customer sending the request.
+            key (str): The value of the Idempotency-Key header.
+        """
+        self.cache.pop((customer_id, key))
+        self.idempotency_key_repository.release(customer_id, key)
+
+    def purge_expired(self) -> int:
+        """
+        Deletes expired keys from the database and the cache.
+
+        Returns:
+            int: The number of keys deleted from the database.
+        """
+        now = datetime.utcnow()
+        self.cache.remove_if(lambda record: record.is_expired(now))
+        purged = self.idempotency_key_repository.purge_expired(now)
+        metrics.increment('idempotency.purged', purged)
+        logger.info(f"Purged {purged} expired idempotency keys")
+        return purged
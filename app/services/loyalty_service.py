@@ -1,59 +1,234 @@
 # app/services/loyalty_service.py
+from datetime import date, datetime, timezone
+from typing import Callable, Optional, Tuple
+from app.mappers.point_daily_rollup_mapper import PointDailyRollupMapper
+from app.models.domain.shopping_cart import ShoppingCart
+from app.repositories.cart_store import CartStore
 from app.repositories.loyalty_account_repository import (
     LoyaltyAccountRepository
 )
+from app.repositories.point_daily_rollup_repository import (
+    PointDailyRollupRepository
+)
+from app.repositories.shopping_cart_repository import ShoppingCartRepository
 from app.schemas.checkout import CheckoutResponseDto
-from app.schemas.points import PointsDto
+from app.schemas.points import DailyPointsReportDto, PointsDto
+from app.utils.lru_cache import LRUCache
+from app.utils.metrics import metrics
+from app.utils.retry import retry_on_conflict
+from app.utils.tracing import span, trace
 import logging
 
 logger = logging.getLogger(__name__)
 
+# The longest date range a daily points report may cover.
+MAX_DAILY_POINTS_DAYS: int = 366
+
 
 class LoyaltyService:
     """Service layer for handling loyalty-related operations."""
 
-    def __init__(self, loyalty_account_repository: LoyaltyAccountRepository):
+    def __init__(
+        self,
+        loyalty_account_repository: LoyaltyAccountRepository,
+        shopping_cart_repository: Optional[ShoppingCartRepository] = None,
+        point_daily_rollup_repository: Optional[
+            PointDailyRollupRepository] = None,
+        quote_cache_size: int = 10000,
+        max_conflict_retries: int = 3,
+        slow_checkout_seconds: Optional[float] = 1.0,
+        trace_checkouts: bool = False,
+        cart_store: Optional[CartStore] = None
+    ):
         """
         Initializes the LoyaltyService with a loyalty account repository.
 
         Args:
             loyalty_account_repository (LoyaltyAccountRepository): Repository
                 for loyalty account operations.
+            shopping_cart_repository (Optional[ShoppingCartRepository],
+                optional): Repository used to read cart versions for the
+                quote cache. Defaults to a new repository.
+            point_daily_rollup_repository (Optional[
+                PointDailyRollupRepository], optional): Repository of the
+                daily points rollups. Defaults to a new repository.
+            quote_cache_size (int, optional): The maximum number of
+                customers whose last quote is cached. Defaults to 10000.
+            max_conflict_retries (int, optional): How often a checkout that
+                conflicts with a concurrent change of the account or cart is
+                run again before the conflict is raised. Defaults to 3.
+            slow_checkout_seconds (Optional[float], optional): Duration from
+                which the stage breakdown of a checkout is logged as a
+                warning. None never logs it. Defaults to 1.0.
+            trace_checkouts (bool, optional): Whether to log the stage
+                breakdown of every checkout. Defaults to False.
+            cart_store (Optional[CartStore], optional): Store whose buffered
+                cart changes are written before a cart is read. Defaults to
+                a store that buffers nothing.
         """
         self.loyalty_account_repository: LoyaltyAccountRepository = \
             loyalty_account_repository
+        self.shopping_cart_repository: ShoppingCartRepository = \
+            shopping_cart_repository or ShoppingCartRepository()
+        self.point_daily_rollup_repository: PointDailyRollupRepository = \
+            point_daily_rollup_repository or PointDailyRollupRepository()
+        # The last quote of each customer, with the cart version, rule index
+        # version and date it was calculated for.
+        self.quote_cache: LRUCache[
+            Tuple[Tuple[int, int, date], CheckoutResponseDto]
+        ] = LRUCache(quote_cache_size)
+        self.max_conflict_retries: int = max_conflict_retries
+        self.slow_checkout_seconds: Optional[float] = slow_checkout_seconds
+        self.trace_checkouts: bool = trace_checkouts
+        self.cart_store: CartStore = \
+            cart_store or CartStore(self.shopping_cart_repository)
 
     def checkout(self, customer_id: int) -> CheckoutResponseDto:
         """
-        Processes a checkout transaction for a customer.
+        Processes a checkout transaction for a customer. If every line of
+        the cart could be priced, the cart is cleared in the same
+        transaction. The buffered changes of the cart are written first.
+
+        A checkout that conflicts with a concurrent change of the account or
+        cart is run again, against the changed cart, up to
+        `max_conflict_retries` times.
+
+        The checkout is traced as a ``checkout`` span, with a
+        ``cart_store`` child, one ``checkout_transaction`` child per attempt
+        and a ``response`` child, so the duration of every stage is
+        recorded in the ``checkout.*.seconds`` histograms.
 
         Args:
             customer_id (int): The ID of the customer checking out.
 
         Returns:
             CheckoutResponseDto: DTO containing the results of the checkout.
+
+        Raises:
+            ConcurrencyConflictError: If the last attempt conflicted as well.
         """
-        result: dict = self.loyalty_account_repository.checkout_transaction(
-            customer_id)
+        with trace('checkout', slow_seconds=self.slow_checkout_seconds,
+                   log_tree=self.trace_checkouts):
+            with span('cart_store'):
+                self.cart_store.release([customer_id])
+            result: dict = retry_on_conflict(
+                lambda: self.loyalty_account_repository.checkout_transaction(
+                    customer_id),
+                'checkout', max_retries=self.max_conflict_retries)
+
+            logger.debug(f"result: {result}")
 
-        logger.debug(f"result: {result}")
-
-        try:
-            checkout_response = CheckoutResponseDto(
-                total_points_earned=result['totalPointsEarned'],
-                invalid_products=result['invalidProducts'],
-                products_missing_category=result['productsMissingCategory'],
-                point_earning_rules_missing=result['pointEarningRulesMissing'],
-                success=(len(result['invalidProducts']) == 0 and
-                         len(result['productsMissingCategory']) == 0 and
-                         len(result['pointEarningRulesMissing']) == 0)
-            )
-        except Exception as e:
-            logger.error(f"Error processing checkout: {e}")
-            raise e
+            try:
+                with span('response'):
+                    checkout_response = self.build_checkout_response(result)
+            except Exception as e:
+                logger.error(f"Error processing checkout: {e}")
+                raise e
 
         return checkout_response
 
+    def quote(self, customer_id: int) -> CheckoutResponseDto:
+        """
+        Calculates the points a checkout would earn, without checking out.
+
+        Quotes are cached per customer and recalculated only when the cart
+        ID or version, the rule index version or the date changes, so
+        polling an unchanged cart only reads the cart's ID and version. The
+        ID keeps a cart that was swept and created again at the same
+        version from getting the quote of the old cart.
+
+        Product and category changes do not invalidate a cached quote; they
+        show in the quote once the cart changes, as they do in the cart's
+        ETag.
+
+        Args:
+            customer_id (int): The ID of the customer.
+
+        Returns:
+            CheckoutResponseDto: DTO containing the expected results of the
+            checkout.
+
+        Raises:
+            ValueError: If the cart is empty or does not exist.
+        """
+        self.cart_store.flush([customer_id])
+        cart_version = self.shopping_cart_repository. \
+            find_id_and_version_by_customer_id(customer_id)
+        if cart_version is None:
+            raise ValueError("Shopping cart is empty or not found")
+        return self._cached_quote(
+            customer_id, cart_version,
+            lambda: self.loyalty_account_repository.quote_transaction(
+                customer_id))
+
+    def quote_cart(self, cart: ShoppingCart) -> CheckoutResponseDto:
+        """
+        Calculates the points a checkout of an already loaded cart would
+        earn, without reading the cart again. Shares the cache of quote(),
+        keyed by the ID and version the cart was read at.
+
+        Args:
+            cart (ShoppingCart): The customer's cart, with its items.
+
+        Returns:
+            CheckoutResponseDto: DTO containing the expected results of the
+            checkout.
+
+        Raises:
+            ValueError: If the cart is empty.
+        """
+        return self._cached_quote(
+            cart.customer_id, (cart.id, cart.version),
+            lambda: self.loyalty_account_repository.quote_cart(cart))
+
+    def _cached_quote(
+        self,
+        customer_id: int,
+        cart_version: Tuple[int, int],
+        calculate: Callable[[], dict]
+    ) -> CheckoutResponseDto:
+        """
+        Returns the cached quote of a customer if it was calculated for the
+        same cart ID and version, rule index version and date, and
+        calculates and caches it otherwise.
+        """
+        rule_index = self.loyalty_account_repository.rule_index
+        rule_index.timelines()
+        versions = (cart_version, rule_index.version,
+                    datetime.now(timezone.utc).date())
+
+        cached = self.quote_cache.get(customer_id)
+        if cached is not None and cached[0] == versions:
+            metrics.increment('quote.cache.hits')
+            return cached[1]
+        metrics.increment('quote.cache.misses')
+
+        quote = self.build_checkout_response(calculate())
+        self.quote_cache.put(customer_id, (versions, quote))
+        return quote
+
+    @staticmethod
+    def build_checkout_response(result: dict) -> CheckoutResponseDto:
+        """
+        Builds the checkout response from the transaction details returned
+        by the loyalty account repository.
+
+        Args:
+            result (dict): The transaction details of a checkout.
+
+        Returns:
+            CheckoutResponseDto: DTO containing the results of the checkout.
+        """
+        return CheckoutResponseDto(
+            total_points_earned=result['totalPointsEarned'],
+            invalid_products=result['invalidProducts'],
+            products_missing_category=result['productsMissingCategory'],
+            point_earning_rules_missing=result['pointEarningRulesMissing'],
+            success=(len(result['invalidProducts']) == 0 and
+                     len(result['productsMissingCategory']) == 0 and
+                     len(result['pointEarningRulesMissing']) == 0)
+        )
+
     def get_customer_points(self, customer_id: int) -> PointsDto:
         """
         Retrieves the total loyalty points for a customer.
@@ -73,3 +248,68 @@ class LoyaltyService:
         if not loyalty_account:
             raise ValueError("Loyalty account not found")
         return PointsDto(points=loyalty_account.points)
+
+    def get_points_etag(self, customer_id: int) -> Optional[str]:
+        """
+        Returns the entity tag of a customer's points balance. It is derived
+        from the loyalty account's ID and version, so it is read without
+        loading the account and changes with every change of the balance.
+
+        Args:
+            customer_id (int): The ID of the customer.
+
+        Returns:
+            Optional[str]: The tag, or None if the customer has no account.
+        """
+        version = self.loyalty_account_repository \
+            .find_id_and_version_by_customer_id(customer_id)
+        if version is None:
+            return None
+        account_id, account_version = version
+        return f'points-{account_id}-{account_version}'
+
+    def get_daily_points(
+        self, customer_id: int, start_date: date, end_date: date
+    ) -> DailyPointsReportDto:
+        """
+        Retrieves the points a customer earned per day between two dates,
+        inclusive.
+
+        The report is read from the daily points rollups, so its cost
+        depends on the number of days, not on the number of transactions.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            start_date (date): The first day of the report.
+            end_date (date): The last day of the report.
+
+        Returns:
+            DailyPointsReportDto: DTO containing the points of every day on
+            which points were earned.
+
+        Raises:
+            ValueError: If the date range is invalid or the loyalty account
+                is not found.
+        """
+        if start_date > end_date:
+            raise ValueError("The start date must not be after the end date")
+        if (end_date - start_date).days >= MAX_DAILY_POINTS_DAYS:
+            raise ValueError(f"The date range must not exceed "
+                             f"{MAX_DAILY_POINTS_DAYS} days")
+        loyalty_account = self.loyalty_account_repository.find_by_customer_id(
+            customer_id)
+        if not loyalty_account:
+            raise ValueError("Loyalty account not found")
+
+        days = [
+            PointDailyRollupMapper.to_dto(rollup)
+            for rollup in self.point_daily_rollup_repository.
+            find_by_loyalty_account_id(
+                loyalty_account.id, start_date, end_date)
+        ]
+        return DailyPointsReportDto(
+            start_date=start_date,
+            end_date=end_date,
+            total_points_earned=sum(day.points_earned for day in days),
+            days=days
+        )
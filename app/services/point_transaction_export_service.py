@@ -0,0 +1,176 @@
+# app/services/point_transaction_export_service.py
+import base64
+import binascii
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+from app.repositories.point_transaction_repository import (
+    PointTransactionRepository
+)
+from app.utils.metrics import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The columns of an exported transaction, in CSV order.
+EXPORT_COLUMNS: Tuple[str, ...] = (
+    'id', 'loyalty_account_id', 'product_id', 'points_earned',
+    'transaction_date', 'cursor'
+)
+
+# The size in characters above which buffered lines are yielded.
+EXPORT_BUFFER_SIZE: int = 64 * 1024
+
+
+class PointTransactionExportService:
+    """
+    Service layer for exporting the point transaction ledger as NDJSON or
+    CSV.
+
+    Exports are generators of text chunks, so they can be streamed to an
+    HTTP response or a file with constant memory use. Every exported
+    transaction carries a cursor token; an export started from that token
+    continues with the next transaction.
+    """
+
+    FORMATS: Tuple[str, ...] = ('ndjson', 'csv')
+
+    def __init__(
+        self,
+        point_transaction_repository: PointTransactionRepository,
+        page_size: int = 5000
+    ):
+        """
+        Initializes the PointTransactionExportService.
+
+        Args:
+            point_transaction_repository (PointTransactionRepository):
+                Repository of the point transaction ledger.
+            page_size (int, optional): The number of rows read per keyset
+                page. Defaults to 5000.
+        """
+        self.point_transaction_repository: PointTransactionRepository = \
+            point_transaction_repository
+        self.page_size: int = page_size
+
+    def export(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        format: str = 'ndjson',
+        cursor: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Exports the point transactions within a date range, in
+        (transaction_date, id) order.
+
+        The arguments are validated before the first chunk is requested,
+        so invalid exports fail before anything is streamed.
+
+        Args:
+            start_date (datetime): The start date of the range.
+            end_date (datetime): The end date of the range.
+            format (str, optional): 'ndjson' or 'csv'. Defaults to 'ndjson'.
+            cursor (Optional[str], optional): The cursor of the last
+                transaction already exported. Defaults to None.
+
+        Returns:
+            Iterator[str]: Chunks of NDJSON lines, or of CSV lines starting
+            with a header line.
+
+        Raises:
+            ValueError: If the format, the date range or the cursor is
+                invalid.
+        """
+        if format not in self.FORMATS:
+            raise ValueError(
+                f"format must be one of {', '.join(self.FORMATS)}")
+        if start_date > end_date:
+            raise ValueError("The start date must not be after the end date")
+        after = self.decode_cursor(cursor) if cursor else None
+        return self._generate(start_date, end_date, format, after)
+
+    def _generate(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        format: str,
+        after: Optional[Tuple[datetime, int]]
+    ) -> Iterator[str]:
+        """Formats the streamed transactions, buffering small lines."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        if format == 'csv':
+            writer.writerow(EXPORT_COLUMNS)
+
+        exported = 0
+        for row in self.point_transaction_repository.iter_by_date_range(
+                start_date, end_date, after=after, page_size=self.page_size):
+            record = self._to_record(row)
+            if format == 'csv':
+                writer.writerow([record[column] for column in EXPORT_COLUMNS])
+            else:
+                buffer.write(json.dumps(record))
+                buffer.write('\n')
+            exported += 1
+            if buffer.tell() >= EXPORT_BUFFER_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+        metrics.increment('point_transactions.export.rows', exported)
+        logger.info(f"Exported {exported} point transactions")
+
+    @classmethod
+    def _to_record(cls, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Converts a ledger row to an exported transaction."""
+        return {
+            'id': row['id'],
+            'loyalty_account_id': row['loyalty_account_id'],
+            'product_id': row['product_id'],
+            'points_earned': row['points_earned'],
+            'transaction_date': row['transaction_date'].isoformat(),
+            'cursor': cls.encode_cursor(row['transaction_date'], row['id'])
+        }
+
+    @staticmethod
+    def encode_cursor(transaction_date: datetime, id: int) -> str:
+        """
+        Encodes the position of a transaction as an opaque cursor token.
+
+        Args:
+            transaction_date (datetime): The date of the transaction.
+            id (int): The ID of the transaction.
+
+        Returns:
+            str: The URL-safe cursor token.
+        """
+        payload = json.dumps([transaction_date.isoformat(), id])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """
+        Decodes a cursor token returned by encode_cursor().
+
+        Args:
+            cursor (str): The cursor token.
+
+        Returns:
+            Tuple[datetime, int]: The date and ID of the transaction.
+
+        Raises:
+            ValueError: If the token is not a valid cursor.
+        """
+        try:
+            transaction_date, id = json.loads(
+                base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(id, int):
+                raise TypeError(id)
+            return datetime.fromisoformat(transaction_date), id
+        except (binascii.Error, TypeError, ValueError):
+            raise ValueError("Invalid cursor")
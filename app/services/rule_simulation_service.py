@@ -0,0 +1,446 @@
+# app/services/rule_simulation_service.py
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import repeat
+from typing import (
+    Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Type
+)
+import numpy as np
+from app.models.domain.point_earning_rule import PointEarningRule
+from app.repositories.point_earning_rule_repository import (
+    PointEarningRuleRepository
+)
+from app.repositories.point_transaction_archive_store import (
+    PointTransactionArchiveStore
+)
+from app.repositories.point_transaction_repository import (
+    PointTransactionRepository
+)
+from app.repositories.product_repository import ProductRepository
+from app.schemas.simulation import (
+    CategoryPointsDeltaDto,
+    DailyPointsDeltaDto,
+    RuleSimulationReportDto
+)
+from app.models.domain.points_engine import PointsEngine, RuleSet
+from app.utils.dates import month_start
+from app.utils.metrics import metrics
+from app.workers.worker_app import init_worker_app, worker_app
+from config.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The ordinal of 1970-01-01, the day 0 of numpy's datetime64[D].
+EPOCH_ORDINAL: int = date(1970, 1, 1).toordinal()
+
+# The number of archived transactions replayed at a time.
+ARCHIVE_BATCH_SIZE: int = 200000
+
+
+class SimulationChunk(NamedTuple):
+    """
+    A unit of work of a simulation: the transactions of the table within a
+    span of days, or those of an archive file within the simulated range.
+    """
+    start_date: datetime
+    end_date: datetime
+    archive_path: Optional[str] = None
+
+
+class ProductColumns(NamedTuple):
+    """
+    The price and category of every product, sorted by product ID for
+    vectorized lookups. Products without a category have category 0.
+    """
+    ids: np.ndarray
+    prices: np.ndarray
+    category_ids: np.ndarray
+
+
+class SimulationTotals(NamedTuple):
+    """
+    Partial sums of a simulation: the number of skipped transactions, and
+    [transaction_count, actual_points, simulated_points] by category ID and
+    by day ordinal.
+    """
+    skipped: int
+    categories: Dict[int, List[int]]
+    days: Dict[int, List[int]]
+
+    def merge(self, other: 'SimulationTotals') -> 'SimulationTotals':
+        """Returns the sums of both totals."""
+        categories = {key: list(sums)
+                      for key, sums in self.categories.items()}
+        days = {key: list(sums) for key, sums in self.days.items()}
+        for merged, sums_by_key in ((categories, other.categories),
+                                    (days, other.days)):
+            for key, sums in sums_by_key.items():
+                current = merged.setdefault(key, [0, 0, 0])
+                for position, value in enumerate(sums):
+                    current[position] += value
+        return SimulationTotals(
+            self.skipped + other.skipped, categories, days)
+
+
+# The product columns of a worker process, loaded by its first chunk.
+_worker_products: Optional[ProductColumns] = None
+
+
+def _simulate_chunk_in_worker_process(
+    chunk: SimulationChunk, rules: List[PointEarningRule]
+) -> SimulationTotals:
+    """Replays a chunk of the ledger in a worker process."""
+    from app.di_container import container
+
+    global _worker_products
+    with worker_app().app_context():
+        simulation_service = container.resolve('rule_simulation_service')
+        if _worker_products is None:
+            _worker_products = simulation_service.load_products()
+        return simulation_service.simulate_chunk(
+            chunk, RuleSet.from_rules(rules), _worker_products)
+
+
+class RuleSimulationService:
+    """
+    Service layer for replaying the point transaction ledger against
+    candidate point earning rules, to see what they would have cost.
+
+    Every transaction is recomputed with the PointsEngine from its quantity
+    and the current price and category of its product. Transactions of the
+    same account at the same time form an order, for spend tiers and caps.
+    The ledger is replayed in chunks of whole days, plus one chunk per
+    archived month, either in the calling thread or on a pool of worker
+    processes.
+    """
+
+    def __init__(
+        self,
+        point_transaction_repository: PointTransactionRepository,
+        point_earning_rule_repository: PointEarningRuleRepository,
+        product_repository: ProductRepository,
+        chunk_days: int = 1,
+        workers: int = 0,
+        config_class: Optional[Type[Config]] = None
+    ):
+        """
+        Initializes the RuleSimulationService.
+
+        Args:
+            point_transaction_repository (PointTransactionRepository):
+                Repository of the replayed ledger.
+            point_earning_rule_repository (PointEarningRuleRepository):
+                Repository of the current rules.
+            product_repository (ProductRepository): Repository of the
+                products' prices and categories.
+            chunk_days (int, optional): The number of days of the table
+                replayed per chunk. Defaults to 1.
+            workers (int, optional): The default number of worker processes.
+                0 replays in the calling thread. Defaults to 0.
+            config_class (Optional[Type[Config]], optional): The
+                configuration of worker processes. Defaults to Config.
+        """
+        self.point_transaction_repository: PointTransactionRepository = \
+            point_transaction_repository
+        self.point_earning_rule_repository: PointEarningRuleRepository = \
+            point_earning_rule_repository
+        self.product_repository: ProductRepository = product_repository
+        self.chunk_days: int = chunk_days
+        self.workers: int = workers
+        self.config_class: Type[Config] = config_class or Config
+
+    def simulate(
+        self,
+        candidate_rules: Iterable[PointEarningRule],
+        start_date: date,
+        end_date: date,
+        replace: bool = False,
+        workers: Optional[int] = None
+    ) -> RuleSimulationReportDto:
+        """
+        Replays the transactions of a date range against candidate rules.
+
+        Args:
+            candidate_rules (Iterable[PointEarningRule]): The rules to try.
+            start_date (date): The first day to replay.
+            end_date (date): The last day to replay.
+            replace (bool, optional): Whether the candidate rules replace
+                the current rules. By default they are added to them, and
+                candidate rate rules take precedence over current ones.
+            workers (Optional[int], optional): The number of worker
+                processes, 0 to replay in the calling thread. Defaults to
+                the service's number of workers.
+
+        Returns:
+            RuleSimulationReportDto: The actual and simulated points per
+            category and per day.
+
+        Raises:
+            ValueError: If the date range is invalid or a candidate rule
+                lacks a field its rule type needs.
+        """
+        if start_date > end_date:
+            raise ValueError("The start date must not be after the end date")
+        rules = list(candidate_rules)
+        for rule in rules:
+            rule.validate()
+        if not replace:
+            rules.extend(self.point_earning_rule_repository.find_all())
+
+        started = time.perf_counter()
+        chunks = self._chunks(start_date, end_date)
+        totals = SimulationTotals(0, {}, {})
+        workers = self.workers if workers is None else workers
+        if workers <= 0:
+            products = self.load_products()
+            rule_set = RuleSet.from_rules(rules)
+            for chunk in chunks:
+                totals = totals.merge(
+                    self.simulate_chunk(chunk, rule_set, products))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker_app,
+                initargs=(self.config_class,)
+            ) as executor:
+                for result in executor.map(
+                        _simulate_chunk_in_worker_process, chunks,
+                        repeat(rules)):
+                    totals = totals.merge(result)
+
+        report = self._report(start_date, end_date, totals)
+        elapsed = time.perf_counter() - started
+        metrics.increment('simulation.transactions',
+                          report.transaction_count)
+        metrics.observe('simulation.seconds', elapsed)
+        logger.info(f"Replayed {report.transaction_count} point "
+                    f"transactions in {elapsed:.1f} s, delta "
+                    f"{report.delta} points")
+        return report
+
+    def simulate_chunk(
+        self,
+        chunk: SimulationChunk,
+        rule_set: RuleSet,
+        products: ProductColumns
+    ) -> SimulationTotals:
+        """
+        Replays one chunk of the ledger.
+
+        Args:
+            chunk (SimulationChunk): The chunk to replay.
+            rule_set (RuleSet): The rules to replay against.
+            products (ProductColumns): Products as returned by
+                load_products().
+
+        Returns:
+            SimulationTotals: The sums of the chunk.
+        """
+        if chunk.archive_path is None:
+            rows = self.point_transaction_repository.find_replay_rows(
+                chunk.start_date, chunk.end_date)
+            return self._replay(rows, rule_set, products)
+
+        # Archived rows are sorted by date, so batches can be cut between
+        # two timestamps without splitting an order.
+        totals = SimulationTotals(0, {}, {})
+        batch: List[Sequence[Any]] = []
+        for row in PointTransactionArchiveStore.read(
+                chunk.archive_path, start_date=chunk.start_date,
+                end_date=chunk.end_date - timedelta(microseconds=1)):
+            if len(batch) >= ARCHIVE_BATCH_SIZE and \
+                    row['transaction_date'] != batch[-1][4]:
+                totals = totals.merge(
+                    self._replay(batch, rule_set, products))
+                batch = []
+            batch.append((
+                row['loyalty_account_id'], row['product_id'],
+                row['quantity'], row['points_earned'],
+                row['transaction_date']))
+        return totals.merge(self._replay(batch, rule_set, products))
+
+    def load_products(self) -> ProductColumns:
+        """
+        Loads the price and category of every product.
+
+        Returns:
+            ProductColumns: The products, sorted by ID.
+        """
+        rows = self.product_repository.find_price_rows()
+        return ProductColumns(
+            ids=np.array([row.id for row in rows], dtype=np.int64),
+            prices=np.array([row.price for row in rows], dtype=np.float64),
+            category_ids=np.array([row.category_id or 0 for row in rows],
+                                  dtype=np.int64)
+        )
+
+    def _chunks(
+        self, start_date: date, end_date: date
+    ) -> List[SimulationChunk]:
+        """
+        Splits a date range into spans of `chunk_days` days of the table,
+        followed by the archived months that overlap the range.
+        """
+        first = datetime.combine(start_date, datetime.min.time())
+        last = datetime.combine(
+            end_date + timedelta(days=1), datetime.min.time())
+        chunks: List[SimulationChunk] = []
+        span = timedelta(days=max(self.chunk_days, 1))
+        day = first
+        while day < last:
+            chunks.append(SimulationChunk(day, min(day + span, last)))
+            day += span
+        for archive in self.point_transaction_repository.find_archives(
+                month_start(start_date), end_date):
+            chunks.append(SimulationChunk(first, last, archive.path))
+        return chunks
+
+    @staticmethod
+    def _replay(
+        rows: Sequence[Sequence[Any]],
+        rule_set: RuleSet,
+        products: ProductColumns
+    ) -> SimulationTotals:
+        """
+        Recomputes the points of ledger rows of whole orders and sums the
+        actual and simulated points by category and by day.
+
+        Args:
+            rows (Sequence[Sequence[Any]]): Rows of (loyalty_account_id,
+                product_id, quantity, points_earned, transaction_date).
+            rule_set (RuleSet): The rules to replay against.
+            products (ProductColumns): The products.
+
+        Returns:
+            SimulationTotals: The sums of the rows.
+        """
+        count = len(rows)
+        quantity = np.fromiter(
+            (-1 if row[2] is None else row[2] for row in rows),
+            dtype=np.int64, count=count)
+        replayed = quantity >= 0
+        skipped = int(count - replayed.sum())
+        account_id = np.fromiter(
+            (row[0] for row in rows), dtype=np.int64, count=count)[replayed]
+        product_id = np.fromiter(
+            (row[1] for row in rows), dtype=np.int64, count=count)[replayed]
+        actual = np.fromiter(
+            (row[3] for row in rows), dtype=np.int64, count=count)[replayed]
+        timestamp = np.array(
+            [row[4] for row in rows], dtype='datetime64[us]')[replayed]
+        quantity = quantity[replayed]
+        if not len(quantity):
+            return SimulationTotals(skipped, {}, {})
+
+        # Join the products.
+        if len(products.ids):
+            positions = np.minimum(
+                np.searchsorted(products.ids, product_id),
+                len(products.ids) - 1)
+            found = products.ids[positions] == product_id
+            price = np.where(found, products.prices[positions], 0.0)
+            category_id = np.where(
+                found, products.category_ids[positions], 0)
+        else:
+            found = np.zeros(len(product_id), dtype=bool)
+            price = np.zeros(len(product_id), dtype=np.float64)
+            category_id = np.zeros(len(product_id), dtype=np.int64)
+
+        # Number the orders: the lines of an account at the same time.
+        ticks = timestamp.astype(np.int64)
+        order = np.lexsort((ticks, account_id))
+        new_order = np.ones(len(order), dtype=bool)
+        new_order[1:] = ((account_id[order][1:] != account_id[order][:-1]) |
+                         (ticks[order][1:] != ticks[order][:-1]))
+        order_index = np.empty(len(order), dtype=np.int64)
+        order_index[order] = np.cumsum(new_order) - 1
+
+        # Recompute the points with the rules of each date bucket.
+        day = timestamp.astype('datetime64[D]').astype(np.int64) + \
+            EPOCH_ORDINAL
+        buckets = rule_set.buckets(day)
+        simulated = np.zeros(len(quantity), dtype=np.int64)
+        for bucket in np.unique(buckets):
+            lines = np.flatnonzero(buckets == bucket)
+            rule_table = rule_set.rule_table(
+                date.fromordinal(int(day[lines[0]])))
+            simulated[lines] = PointsEngine.compute(
+                price=price[lines],
+                quantity=quantity[lines],
+                category_id=category_id[lines],
+                rule_table=rule_table,
+                missing_product=~found[lines],
+                order_index=order_index[lines]
+            ).points
+
+        return SimulationTotals(
+            skipped,
+            RuleSimulationService._sum_by(category_id, actual, simulated),
+            RuleSimulationService._sum_by(day, actual, simulated))
+
+    @staticmethod
+    def _sum_by(
+        keys: np.ndarray, actual: np.ndarray, simulated: np.ndarray
+    ) -> Dict[int, List[int]]:
+        """Sums the lines and their points by key."""
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.ravel()
+        counts = np.bincount(inverse, minlength=len(unique_keys))
+        # Sums of float64 weights are exact below 2 ** 53 points.
+        actual_sums = np.rint(np.bincount(
+            inverse, weights=actual, minlength=len(unique_keys))).astype(
+            np.int64)
+        simulated_sums = np.rint(np.bincount(
+            inverse, weights=simulated, minlength=len(unique_keys))).astype(
+            np.int64)
+        return {
+            key: [count, actual_sum, simulated_sum]
+            for key, count, actual_sum, simulated_sum in zip(
+                unique_keys.tolist(), counts.tolist(),
+                actual_sums.tolist(), simulated_sums.tolist())
+        }
+
+    @staticmethod
+    def _report(
+        start_date: date, end_date: date, totals: SimulationTotals
+    ) -> RuleSimulationReportDto:
+        """Builds the report of a simulation from its totals."""
+        categories = [
+            CategoryPointsDeltaDto(
+                category_id=category_id or None,
+                transaction_count=count,
+                actual_points=actual,
+                simulated_points=simulated,
+                delta=simulated - actual)
+            for category_id, (count, actual, simulated)
+            in sorted(totals.categories.items())
+        ]
+        days = [
+            DailyPointsDeltaDto(
+                day=date.fromordinal(day),
+                transaction_count=count,
+                actual_points=actual,
+                simulated_points=simulated,
+                delta=simulated - actual)
+            for day, (count, actual, simulated)
+            in sorted(totals.days.items())
+        ]
+        actual_points = sum(category.actual_points for category in categories)
+        simulated_points = sum(
+            category.simulated_points for category in categories)
+        return RuleSimulationReportDto(
+            start_date=start_date,
+            end_date=end_date,
+            transaction_count=sum(
+                category.transaction_count for category in categories),
+            skipped_transaction_count=totals.skipped,
+            actual_points=actual_points,
+            simulated_points=simulated_points,
+            delta=simulated_points - actual_points,
+            categories=categories,
+            days=days
+        )
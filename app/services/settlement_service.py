@@ -0,0 +1,189 @@
+# app/services/settlement_service.py
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Type
+from sqlalchemy.engine import Row
+from app.repositories.cart_store import CartStore
+from app.repositories.loyalty_account_repository import (
+    SETTLEMENT_CONFLICT,
+    LoyaltyAccountRepository
+)
+from app.repositories.shopping_cart_repository import ShoppingCartRepository
+from app.services.loyalty_service import LoyaltyService
+from app.schemas.settlement import SettlementResultDto
+from app.utils.metrics import metrics
+from app.workers.worker_app import init_worker_app, worker_app
+from config.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The product map of a worker process, loaded by its first chunk.
+_worker_product_map: Optional[Dict[int, Row]] = None
+
+
+def _settle_chunk_in_worker_process(
+    customer_ids: List[int]
+) -> List[SettlementResultDto]:
+    """Settles a chunk of customers in a worker process."""
+    from app.di_container import container
+
+    global _worker_product_map
+    with worker_app().app_context():
+        settlement_service = container.resolve('settlement_service')
+        if _worker_product_map is None:
+            _worker_product_map = settlement_service. \
+                loyalty_account_repository.load_product_map()
+        return settlement_service.settle_chunk(
+            customer_ids, _worker_product_map)
+
+
+class SettlementService:
+    """
+    Service layer for the end-of-day settlement of many carts at once.
+
+    Customers are checked out in chunks, one transaction per chunk, sharing
+    the rule index and a product map loaded once per run. Chunks run either
+    in the calling thread or on a pool of worker processes; results are
+    yielded in the order of the customer IDs either way.
+    """
+
+    def __init__(
+        self,
+        loyalty_account_repository: LoyaltyAccountRepository,
+        chunk_size: int = 500,
+        workers: int = 0,
+        config_class: Optional[Type[Config]] = None,
+        cart_store: Optional[CartStore] = None
+    ):
+        """
+        Initializes the SettlementService.
+
+        Args:
+            loyalty_account_repository (LoyaltyAccountRepository): Repository
+                checking out the carts.
+            chunk_size (int, optional): The default number of customers per
+                transaction. Defaults to 500.
+            workers (int, optional): The default number of worker processes.
+                0 settles in the calling thread. Defaults to 0.
+            config_class (Optional[Type[Config]], optional): The
+                configuration of worker processes. Defaults to Config.
+            cart_store (Optional[CartStore], optional): Store whose buffered
+                cart changes are written before a chunk is settled. Defaults
+                to a store that buffers nothing.
+        """
+        self.loyalty_account_repository: LoyaltyAccountRepository = \
+            loyalty_account_repository
+        self.chunk_size: int = chunk_size
+        self.workers: int = workers
+        self.config_class: Type[Config] = config_class or Config
+        self.cart_store: CartStore = \
+            cart_store or CartStore(ShoppingCartRepository())
+
+    def settle(
+        self,
+        customer_ids: Iterable[int],
+        chunk_size: Optional[int] = None,
+        workers: Optional[int] = None
+    ) -> Iterator[SettlementResultDto]:
+        """
+        Checks out the carts of many customers.
+
+        `customer_ids` is consumed lazily, so it may be a stream. The
+        buffered changes of each chunk's carts are written before the chunk
+        is settled.
+
+        Args:
+            customer_ids (Iterable[int]): The IDs of the customers.
+            chunk_size (Optional[int], optional): The number of customers
+                per transaction. Defaults to the service's chunk size.
+            workers (Optional[int], optional): The number of worker
+                processes, 0 to settle in the calling thread. Defaults to
+                the service's number of workers.
+
+        Yields:
+            SettlementResultDto: The result of each customer, in order.
+        """
+        chunks = self._chunks(customer_ids, chunk_size or self.chunk_size)
+        workers = self.workers if workers is None else workers
+        if workers <= 0:
+            product_map = self.loyalty_account_repository.load_product_map()
+            for chunk in chunks:
+                self.cart_store.release(chunk)
+                yield from self._record(
+                    self.settle_chunk(chunk, product_map))
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker_app,
+            initargs=(self.config_class,)
+        ) as executor:
+            # Keep a bounded number of chunks in flight so that a stream of
+            # customer IDs is not read ahead without limit.
+            pending: Deque[Future] = deque()
+            for chunk in chunks:
+                self.cart_store.release(chunk)
+                pending.append(executor.submit(
+                    _settle_chunk_in_worker_process, chunk))
+                if len(pending) >= 2 * workers:
+                    yield from self._record(pending.popleft().result())
+            while pending:
+                yield from self._record(pending.popleft().result())
+
+    def settle_chunk(
+        self, customer_ids: List[int], product_map: Dict[int, Row]
+    ) -> List[SettlementResultDto]:
+        """
+        Checks out the carts of a chunk of customers in one transaction.
+
+        Args:
+            customer_ids (List[int]): The IDs of the customers.
+            product_map (Dict[int, Row]): Products as returned by
+                LoyaltyAccountRepository.load_product_map().
+
+        Returns:
+            List[SettlementResultDto]: The result of each customer.
+        """
+        started = time.perf_counter()
+        outcomes = self.loyalty_account_repository.settle_carts(
+            customer_ids, product_map)
+        metrics.observe('settlement.chunk_seconds',
+                        time.perf_counter() - started)
+
+        results: List[SettlementResultDto] = []
+        for customer_id, outcome in outcomes.items():
+            if isinstance(outcome, str):
+                results.append(SettlementResultDto(
+                    customer_id=customer_id, error=outcome))
+            else:
+                results.append(SettlementResultDto(
+                    customer_id=customer_id,
+                    result=LoyaltyService.build_checkout_response(outcome)))
+        return results
+
+    @staticmethod
+    def _record(
+        results: List[SettlementResultDto]
+    ) -> List[SettlementResultDto]:
+        metrics.increment('settlement.customers', len(results))
+        metrics.increment('settlement.errors',
+                          sum(1 for result in results if result.error))
+        metrics.increment('settlement.conflicts', sum(
+            1 for result in results if result.error == SETTLEMENT_CONFLICT))
+        return results
+
+    @staticmethod
+    def _chunks(
+        customer_ids: Iterable[int], chunk_size: int
+    ) -> Iterator[List[int]]:
+        iterator = iter(customer_ids)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield chunk
@@ -1,9 +1,14 @@
 # app/services/shopping_cart_service.py
-from typing import Optional
-from app.repositories.shopping_cart_repository import ShoppingCartRepository
+from typing import List, Optional
+from app.repositories.cart_store import CartStore
+from app.repositories.shopping_cart_repository import (
+    CartOperation,
+    ShoppingCartRepository
+)
 from app.repositories.product_repository import ProductRepository
 from app.models.domain.shopping_cart import ShoppingCart
 from app.schemas.shopping_cart import (
+    CartOperationDto,
     ShoppingCartResponseDto,
     ShoppingCartItemDto
 )
@@ -18,20 +23,31 @@ class ShoppingCartService:
     def __init__(
         self,
         shopping_cart_repository: ShoppingCartRepository,
-        product_repository: ProductRepository
+        product_repository: ProductRepository,
+        cart_store: Optional[CartStore] = None
     ) -> None:
         """
         Initializes the ShoppingCartService with required repositories.
 
+        Cart changes go through the cart store. The default store applies
+        them as single statements on the changed item rows, so they neither
+        load the cart nor conflict with concurrent changes of the same cart;
+        a buffering store writes them in batches behind the edits.
+
         Args:
             shopping_cart_repository (ShoppingCartRepository): Repository for
                 shopping cart operations.
             product_repository (ProductRepository): Repository for
                 product data.
+            cart_store (Optional[CartStore], optional): Store the cart
+                changes are made in. Defaults to a store writing every
+                change to the database at once.
         """
         self.shopping_cart_repository: ShoppingCartRepository = \
             shopping_cart_repository
         self.product_repository: ProductRepository = product_repository
+        self.cart_store: CartStore = \
+            cart_store or CartStore(shopping_cart_repository)
 
     def get_or_create_cart(self, customer_id: int) -> ShoppingCart:
         """
@@ -46,32 +62,32 @@ class ShoppingCartService:
         """
         cart: Optional[ShoppingCart] = \
             self.shopping_cart_repository.find_by_customer_id(customer_id)
-        if not cart:
-            cart = ShoppingCart(id=0, customer_id=customer_id)
-            cart = ShoppingCartMapper.to_persistence_model(cart)
-            cart = self.shopping_cart_repository.create(cart)
+        if cart:
+            return cart
 
-        cart = ShoppingCartMapper.from_persistence(cart)
-        return cart
+        # A new cart has no items to load.
+        cart_table = self.shopping_cart_repository.create(
+            ShoppingCartMapper.to_persistence_model(
+                ShoppingCart(id=None, customer_id=customer_id)))
+        return ShoppingCart(id=cart_table.id, customer_id=customer_id,
+                            version=cart_table.version or 0)
 
     def add_item(
         self, customer_id: int, product_id: int, quantity: int
     ) -> None:
         """
-        Adds an item to the shopping cart.
+        Adds an item to the shopping cart, creating the cart if the customer
+        has none. Unknown products are ignored.
 
         Args:
             customer_id (int): The ID of the customer.
             product_id (int): The ID of the product to add.
             quantity (int): The quantity of the product to add.
         """
-        cart: ShoppingCart = self.get_or_create_cart(customer_id)
         product: Optional[ProductResponseDto] = \
             self.product_repository.find_by_id(product_id)
         if product:
-            cart.add_item(product, quantity)
-            cart = ShoppingCartMapper.to_persistence_model(cart)
-            self.shopping_cart_repository.update(cart)
+            self.cart_store.add_item(customer_id, product_id, quantity)
 
     def remove_item(self, customer_id: int, product_id: int) -> None:
         """
@@ -81,10 +97,7 @@ class ShoppingCartService:
             customer_id (int): The ID of the customer.
             product_id (int): The ID of the product to remove.
         """
-        cart: ShoppingCart = self.get_or_create_cart(customer_id)
-        cart.remove_item(product_id)
-        cart = ShoppingCartMapper.to_persistence_model(cart)
-        self.shopping_cart_repository.update(cart)
+        self.cart_store.remove_item(customer_id, product_id)
 
     def update_item_quantity(
         self, customer_id: int, product_id: int, quantity: int
@@ -97,16 +110,68 @@ class ShoppingCartService:
             product_id (int): The ID of the product to update.
             quantity (int): The new quantity of the product.
         """
-        cart: ShoppingCart = self.get_or_create_cart(customer_id)
-        cart.update_item_quantity(product_id, quantity)
-        cart = ShoppingCartMapper.to_persistence_model(cart)
-        self.shopping_cart_repository.update(cart)
+        self.cart_store.update_item_quantity(customer_id, product_id, quantity)
+
+    def apply_operations(
+        self, customer_id: int, operations: List[CartOperationDto]
+    ) -> Optional[ShoppingCartResponseDto]:
+        """
+        Applies a batch of add, update and remove operations to a customer's
+        cart in one transaction, and returns the resulting cart. Adds of
+        unknown products are ignored.
+
+        Args:
+            customer_id (int): The ID of the customer.
+            operations (List[CartOperationDto]): The operations, applied in
+                order.
+
+        Returns:
+            Optional[ShoppingCartResponseDto]: The resulting cart, or None
+                if the customer has no cart.
+        """
+        known_products = self.product_repository.find_existing_ids(
+            operation.product_id for operation in operations
+            if operation.op == CartOperation.ADD)
+        self.cart_store.apply_operations(customer_id, [
+            CartOperation(operation.op, operation.product_id,
+                          operation.quantity or 0)
+            for operation in operations
+            if operation.op != CartOperation.ADD
+            or operation.product_id in known_products
+        ])
+        return self.get_cart(customer_id)
+
+    def get_cart_etag(self, customer_id: int) -> Optional[str]:
+        """
+        Returns the entity tag of a customer's cart, after writing its
+        buffered changes. It is derived from the cart's ID and version, so
+        it is read without loading the cart and changes with every change
+        of its items.
+
+        Product changes do not change the tag, so it is only sent as a weak
+        tag: two responses with the same tag hold the same items, but not
+        necessarily the same product names and prices.
+
+        Args:
+            customer_id (int): The ID of the customer.
+
+        Returns:
+            Optional[str]: The tag, or None if the customer has no cart.
+        """
+        self.cart_store.flush([customer_id])
+        version = self.shopping_cart_repository \
+            .find_id_and_version_by_customer_id(customer_id)
+        if version is None:
+            return None
+        cart_id, cart_version = version
+        return f'cart-{cart_id}-{cart_version}'
 
     def get_cart(
         self, customer_id: int
     ) -> Optional[ShoppingCartResponseDto]:
         """
-        Retrieves the shopping cart for a specified customer.
+        Retrieves the shopping cart for a specified customer, after writing
+        its buffered changes.
 
         Args:
             customer_id (int): The ID of the customer.
@@ -115,11 +180,37 @@ class ShoppingCartService:
             Optional[ShoppingCartResponseDto]: The shopping cart data or None
                 if the cart does not exist.
         """
-        cart: Optional[ShoppingCart] = \
-            self.shopping_cart_repository.find_by_customer_id(customer_id)
+        cart: Optional[ShoppingCart] = self.find_cart(customer_id)
         if not cart:
             return None
+        return self.build_cart_response(cart)
+
+    def find_cart(self, customer_id: int) -> Optional[ShoppingCart]:
+        """
+        Loads the shopping cart of a customer with its items and products,
+        after writing its buffered changes.
 
+        Args:
+            customer_id (int): The ID of the customer.
+
+        Returns:
+            Optional[ShoppingCart]: The cart, or None if the customer has
+                no cart.
+        """
+        self.cart_store.flush([customer_id])
+        return self.shopping_cart_repository.find_by_customer_id(customer_id)
+
+    @staticmethod
+    def build_cart_response(cart: ShoppingCart) -> ShoppingCartResponseDto:
+        """
+        Builds the response of a loaded shopping cart.
+
+        Args:
+            cart (ShoppingCart): The cart, with its items and products.
+
+        Returns:
+            ShoppingCartResponseDto: The shopping cart data.
+        """
         items: list[ShoppingCartItemDto] = []
         for item in cart.items:
             product: ProductResponseDto = item.product
@@ -147,9 +238,5 @@ class ShoppingCartService:
         Args:
             customer_id (int): The ID of the customer.
         """
-        cart: ShoppingCart = self.get_or_create_cart(customer_id)
-        cart.clear()
-        self.shopping_cart_repository.update(
-            ShoppingCartMapper.to_persistence_model(cart)
-        )
+        self.cart_store.clear(customer_id)
         logger.debug(f"Cleared cart for customer {customer_id}")
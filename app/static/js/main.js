@@ -77,21 +77,32 @@ document.addEventListener("DOMContentLoaded", () => {
 
   async function handleAddToCart(event) {
     const productId = event.target.getAttribute("data-product-id");
+    const ok = await patchCart([
+      { op: "add", product_id: parseInt(productId), quantity: 1 },
+    ]);
+    if (!ok) {
+      alert("Failed to add item to cart. Please try again.");
+    }
+  }
+
+  // Applies cart operations in one request and shows the returned cart.
+  async function patchCart(operations) {
     try {
       const response = await fetch("/cart", {
-        method: "POST",
+        method: "PATCH",
         headers: {
           "Content-Type": "application/json",
         },
-        body: JSON.stringify({ productId: parseInt(productId), quantity: 1 }),
+        body: JSON.stringify({ operations: operations }),
       });
-      if (response.ok) {
-        loadShoppingCart();
-      } else {
-        alert("Failed to add item to cart. Please try again.");
+      if (!response.ok) {
+        return false;
       }
+      updateShoppingCartDisplay(await response.json());
+      return true;
     } catch (error) {
       console.error("Error:", error);
+      return false;
     }
   }
 
@@ -155,39 +166,23 @@ document.addEventListener("DOMContentLoaded", () => {
         ? currentQuantity + 1
         : Math.max(0, currentQuantity - 1);
 
-    try {
-      const response = await fetch(`/cart/${productId}`, {
-        method: "PUT",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({ quantity: newQuantity }),
-      });
-
-      if (response.ok) {
-        quantityDisplay.textContent = `Quantity: ${newQuantity}`;
-        loadShoppingCart();
-      } else {
-        alert("Failed to update quantity. Please try again.");
-      }
-    } catch (error) {
-      console.error("Error:", error);
+    const ok = await patchCart([
+      newQuantity > 0
+        ? { op: "update", product_id: parseInt(productId), quantity: newQuantity }
+        : { op: "remove", product_id: parseInt(productId) },
+    ]);
+    if (!ok) {
+      alert("Failed to update quantity. Please try again.");
     }
   }
 
   async function handleRemoveFromCart(event) {
     const productId = event.target.getAttribute("data-product-id");
-    try {
-      const response = await fetch(`/cart/${productId}`, {
-        method: "DELETE",
-      });
-      if (response.ok) {
-        loadShoppingCart();
-      } else {
-        alert("Failed to remove item from cart. Please try again.");
-      }
-    } catch (error) {
-      console.error("Error:", error);
+    const ok = await patchCart([
+      { op: "remove", product_id: parseInt(productId) },
+    ]);
+    if (!ok) {
+      alert("Failed to remove item from cart. Please try again.");
     }
   }
 
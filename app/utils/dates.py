@@ -0,0 +1,28 @@
+# app/utils/dates.py
+from datetime import date
+
+
+def month_start(day: date) -> date:
+    """
+    Returns the first day of the month of a date.
+
+    Args:
+        day (date): Any day of the month. Datetimes are accepted too.
+
+    Returns:
+        date: The first day of the month.
+    """
+    return date(day.year, day.month, 1)
+
+
+def next_month(day: date) -> date:
+    """
+    Returns the first day of the month after the month of a date.
+
+    Args:
+        day (date): Any day of the month. Datetimes are accepted too.
+
+    Returns:
+        date: The first day of the next month.
+    """
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
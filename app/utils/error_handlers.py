@@ -1,7 +1,9 @@
 # app/utils/error_handlers.py
+import json
 from flask import jsonify, Response
 from pydantic import ValidationError
 from typing import Tuple
+from app.utils.exceptions import ConflictError
 
 
 def handle_validation_error(e: ValidationError) -> Tuple[Response, int]:
@@ -15,7 +17,10 @@ def handle_validation_error(e: ValidationError) -> Tuple[Response, int]:
         Tuple[Response, int]: A Flask response object with error details and
         the HTTP status code.
     """
-    return jsonify({"error": "Validation error", "details": e.errors()}), 400
+    # e.json() renders the exceptions raised by validators as strings,
+    # which e.errors() leaves in the error context.
+    return jsonify({"error": "Validation error",
+                    "details": json.loads(e.json())}), 400
 
 
 def handle_value_error(e: ValueError) -> Tuple[Response, int]:
@@ -30,3 +35,21 @@ def handle_value_error(e: ValueError) -> Tuple[Response, int]:
         the HTTP status code.
     """
     return jsonify({"error": str(e)}), 400
+
+
+def handle_conflict_error(e: ConflictError) -> Tuple[Response, int]:
+    """
+    Handles conflicts with the current state of a resource.
+
+    Args:
+        e (ConflictError): The exception raised.
+
+    Returns:
+        Tuple[Response, int]: A Flask response object with error details and
+        the HTTP status code. A Retry-After header is set if the exception
+        carries one.
+    """
+    response = jsonify({"error": e.message})
+    if e.retry_after is not None:
+        response.headers['Retry-After'] = str(e.retry_after)
+    return response, 409
@@ -0,0 +1,36 @@
+# app/utils/exceptions.py
+from typing import Optional
+
+
+class ConflictError(Exception):
+    """
+    Raised when a request conflicts with the current state of a resource,
+    for example while another request with the same Idempotency-Key is
+    still being processed.
+
+    Attributes:
+        message (str): A description of the conflict.
+        retry_after (Optional[int]): Seconds after which the client may
+            retry, if known.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.message: str = message
+        self.retry_after: Optional[int] = retry_after
+
+
+class ConcurrencyConflictError(ConflictError):
+    """
+    Raised when a row changed between being read and being written, i.e.
+    when the version it was read at is no longer its current version.
+
+    Attributes:
+        message (str): A description of the conflict.
+        retry_after (Optional[int]): Seconds after which the client may
+            retry. Defaults to 1, as the conflicting change is usually
+            already committed.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[int] = 1):
+        super().__init__(message, retry_after)
@@ -0,0 +1,100 @@
+# app/utils/lru_cache.py
+import threading
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar, Callable
+
+V = TypeVar('V')
+
+
+class LRUCache(Generic[V]):
+    """
+    Thread-safe, size-bounded cache that evicts the least recently used
+    entry once `max_size` entries are stored.
+
+    Attributes:
+        max_size (int): The maximum number of entries kept.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_size (int): The maximum number of entries kept. A size of 0
+                disables the cache.
+        """
+        self.max_size: int = max_size
+        self._entries: 'OrderedDict[Hashable, V]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """
+        Returns the entry stored under a key and marks it as recently used.
+
+        Args:
+            key (Hashable): The key of the entry.
+
+        Returns:
+            Optional[V]: The entry, or None if the key is not cached.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        """
+        Stores an entry, evicting the least recently used one if the cache
+        is full.
+
+        Args:
+            key (Hashable): The key of the entry.
+            value (V): The entry to store.
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        """
+        Removes the entry stored under a key.
+
+        Args:
+            key (Hashable): The key of the entry.
+
+        Returns:
+            Optional[V]: The removed entry, or None if the key was not cached.
+        """
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def remove_if(self, predicate: Callable[[V], bool]) -> int:
+        """
+        Removes every entry matching a predicate.
+
+        Args:
+            predicate (Callable[[V], bool]): Returns True for entries to
+                remove.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        with self._lock:
+            keys = [key for key, value in self._entries.items()
+                    if predicate(value)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
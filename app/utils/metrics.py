@@ -0,0 +1,141 @@
+# app/utils/metrics.py
+import threading
+from bisect import bisect_left
+from typing import Dict, Any, List, Tuple
+
+# Upper bounds of the histogram buckets, chosen to cover both latencies in
+# seconds and larger values such as row counts or throughput.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000,
+    5000, 10000, 50000, 100000, float('inf')
+)
+
+
+class Histogram:
+    """
+    A fixed-bucket histogram that also tracks count, sum, min and max.
+
+    Attributes:
+        buckets (Tuple[float, ...]): The upper bounds of the buckets.
+        counts (List[int]): The number of observations in each bucket.
+        count (int): The total number of observations.
+        sum (float): The sum of all observations.
+        min (float): The smallest observation.
+        max (float): The largest observation.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets: Tuple[float, ...] = buckets
+        self.counts: List[int] = [0] * len(buckets)
+        self.count: int = 0
+        self.sum: float = 0.0
+        self.min: float = float('inf')
+        self.max: float = float('-inf')
+
+    def observe(self, value: float) -> None:
+        """
+        Records one observation.
+
+        Args:
+            value (float): The observed value.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the histogram as a dictionary.
+
+        Returns:
+            Dict[str, Any]: The count, sum, min, max, mean and the
+            non-empty buckets keyed by their upper bound.
+        """
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'mean': self.sum / self.count if self.count else None,
+            'buckets': {
+                str(bound): count
+                for bound, count in zip(self.buckets, self.counts) if count
+            }
+        }
+
+
+class MetricsRegistry:
+    """Process-local registry of counters, gauges and histograms."""
+
+    def __init__(self) -> None:
+        """Initializes an empty registry."""
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """
+        Increments a counter.
+
+        Args:
+            name (str): The name of the counter.
+            value (float, optional): The amount to add. Defaults to 1.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        Sets a gauge to a value.
+
+        Args:
+            name (str): The name of the gauge.
+            value (float): The current value.
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        Records an observation in a histogram.
+
+        Args:
+            name (str): The name of the histogram.
+            value (float): The observed value.
+        """
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the current value of every metric.
+
+        Returns:
+            Dict[str, Any]: Counters, gauges and histograms by name.
+        """
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'histograms': {
+                    name: histogram.to_dict()
+                    for name, histogram in self._histograms.items()
+                }
+            }
+
+    def reset(self) -> None:
+        """Removes every metric."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+# Create a global instance of the registry
+metrics = MetricsRegistry()
@@ -0,0 +1,60 @@
+# app/utils/retry.py
+import logging
+import random
+import time
+from typing import Callable, TypeVar
+from app.utils.exceptions import ConcurrencyConflictError
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+def retry_on_conflict(
+    operation: Callable[[], T],
+    name: str,
+    max_retries: int = 3,
+    backoff_seconds: float = 0.01
+) -> T:
+    """
+    Runs a read-modify-write operation, running it again from the start
+    when it fails with a ConcurrencyConflictError.
+
+    Every conflict is counted in the ``concurrency.conflicts.<name>``
+    counter, every new attempt in ``concurrency.retries.<name>`` and every
+    conflict left after the last attempt in
+    ``concurrency.retries_exhausted.<name>``. Attempts are spaced by an
+    exponential, jittered backoff so that the conflicting writers do not
+    collide again.
+
+    Args:
+        operation (Callable[[], T]): The operation. It must read everything
+            it writes, so that running it again sees the conflicting change.
+        name (str): The name of the operation in the metrics.
+        max_retries (int, optional): Attempts after the first one.
+            Defaults to 3.
+        backoff_seconds (float, optional): The delay before the first
+            retry, doubled for every further retry. Defaults to 0.01.
+
+    Returns:
+        T: The result of the first attempt without a conflict.
+
+    Raises:
+        ConcurrencyConflictError: If the last attempt conflicted as well.
+    """
+    attempt = 0
+    while True:
+        try:
+            return operation()
+        except ConcurrencyConflictError:
+            metrics.increment(f'concurrency.conflicts.{name}')
+            if attempt >= max_retries:
+                metrics.increment(f'concurrency.retries_exhausted.{name}')
+                logger.warning(f"{name} conflicted {attempt + 1} times, "
+                               f"giving up")
+                raise
+            delay = backoff_seconds * 2 ** attempt
+            time.sleep(random.uniform(delay / 2, delay))
+            attempt += 1
+            metrics.increment(f'concurrency.retries.{name}')
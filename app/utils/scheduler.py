@@ -0,0 +1,57 @@
+# app/utils/scheduler.py
+import threading
+from typing import Callable, Any, Optional
+from flask import Flask
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs a function every `interval` seconds on a daemon thread, inside the
+    application context of a Flask app.
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        name: str,
+        interval: float,
+        task: Callable[[], Any]
+    ) -> None:
+        """
+        Initializes the task without starting it.
+
+        Args:
+            app (Flask): The application whose context the task runs in.
+            name (str): The name of the task, used for the thread and logs.
+            interval (float): Seconds between two runs.
+            task (Callable[[], Any]): The function to run.
+        """
+        self.app: Flask = app
+        self.name: str = name
+        self.interval: float = interval
+        self.task: Callable[[], Any] = task
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Starts the background thread."""
+        self._thread = threading.Thread(
+            target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the background thread after the current run."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    self.task()
+                except Exception as e:
+                    logger.error(f"Periodic task {self.name} failed: {e}")
@@ -0,0 +1,177 @@
+# app/utils/tracing.py
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """
+    A timed stage of a traced operation, with the stages it ran as its
+    children.
+
+    Attributes:
+        name (str): The name of the stage.
+        parent (Optional[Span]): The enclosing stage, or None for the root.
+        attributes (Dict[str, Any]): Details such as row counts.
+        children (List[Span]): The finished stages run within this one.
+        started (float): The time.perf_counter() value at the start.
+        duration (Optional[float]): Seconds taken, once finished.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        parent: Optional['Span'] = None,
+        attributes: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Initializes and starts a span.
+
+        Args:
+            name (str): The name of the stage.
+            parent (Optional[Span], optional): The enclosing stage.
+                Defaults to None for a root span.
+            attributes (Optional[Dict[str, Any]], optional): Initial
+                details. Defaults to none.
+        """
+        self.name: str = name
+        self.parent: Optional[Span] = parent
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.children: List[Span] = []
+        self.started: float = time.perf_counter()
+        self.duration: Optional[float] = None
+
+    @property
+    def path(self) -> str:
+        """The names of the span and its ancestors, joined by dots."""
+        if self.parent is None:
+            return self.name
+        return f'{self.parent.path}.{self.name}'
+
+    def set(self, **attributes: Any) -> None:
+        """
+        Adds details to the span. Numeric details are recorded in the
+        ``<path>.<detail>`` histogram when the span finishes.
+
+        Args:
+            **attributes (Any): The details, e.g. ``rows=12``.
+        """
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the span and its children as a dictionary.
+
+        Returns:
+            Dict[str, Any]: The name, duration, attributes and children.
+        """
+        return {
+            'name': self.name,
+            'seconds': self.duration,
+            'attributes': dict(self.attributes),
+            'children': [child.to_dict() for child in self.children]
+        }
+
+    def format(self, depth: int = 0) -> str:
+        """
+        Formats the span and its children as an indented breakdown, one
+        stage per line.
+
+        Args:
+            depth (int, optional): The indentation level of this span.
+                Defaults to 0.
+
+        Returns:
+            str: The breakdown.
+        """
+        details = ''.join(
+            f' {key}={value}' for key, value in self.attributes.items())
+        line = f"{'  ' * depth}{self.name} {self.duration or 0:.6f}s{details}"
+        return '\n'.join(
+            [line] + [child.format(depth + 1) for child in self.children])
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar(
+    'current_span', default=None)
+
+
+@contextmanager
+def trace(
+    name: str,
+    slow_seconds: Optional[float] = None,
+    log_tree: bool = False,
+    **attributes: Any
+) -> Iterator[Span]:
+    """
+    Times an operation as a span. Inside another trace the span is a child
+    of the current span; otherwise it is the root of a new span tree.
+
+    When the span finishes, its duration is recorded in the
+    ``<path>.seconds`` histogram and its numeric attributes in
+    ``<path>.<attribute>``.
+
+    Args:
+        name (str): The name of the operation.
+        slow_seconds (Optional[float], optional): For a root span, the
+            duration from which the whole span tree is logged as a warning.
+            Defaults to None, never.
+        log_tree (bool, optional): For a root span, whether to log the span
+            tree of every run at INFO level. Defaults to False.
+        **attributes (Any): Initial details of the span.
+
+    Yields:
+        Span: The span, to add details to.
+    """
+    parent = _current_span.get()
+    current = Span(name, parent, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        _current_span.reset(token)
+        _finish(current)
+        if parent is None:
+            if slow_seconds is not None and current.duration >= slow_seconds:
+                logger.warning(f"Slow {name} took {current.duration:.3f}s:\n"
+                               f"{current.format()}")
+            elif log_tree:
+                logger.info(f"Trace of {name}:\n{current.format()}")
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Times a stage of the current trace as a child span. Outside of a trace
+    nothing is recorded, so shared code can mark its stages without
+    producing metrics for callers that do not trace.
+
+    Args:
+        name (str): The name of the stage.
+        **attributes (Any): Initial details of the span.
+
+    Yields:
+        Span: The span, to add details to. Outside of a trace it is
+        discarded.
+    """
+    if _current_span.get() is None:
+        yield Span(name, attributes=attributes)
+        return
+    with trace(name, **attributes) as current:
+        yield current
+
+
+def _finish(current: Span) -> None:
+    """Stops a span, attaches it to its parent and records its metrics."""
+    current.duration = time.perf_counter() - current.started
+    if current.parent is not None:
+        current.parent.children.append(current)
+    path = current.path
+    metrics.observe(f'{path}.seconds', current.duration)
+    for key, value in current.attributes.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics.observe(f'{path}.{key}', value)
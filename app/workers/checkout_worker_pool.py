@@ -0,0 +1,161 @@
+# app/workers/checkout_worker_pool.py
+import multiprocessing
+import threading
+import time
+from concurrent.futures import (
+    Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+)
+from typing import Optional, Type
+from flask import Flask
+from app.di_container import container
+from app.models.domain.checkout_job import CheckoutJob
+from app.utils.metrics import metrics
+from app.workers.worker_app import init_worker_app, worker_app
+from config.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _execute(app: Flask, job_id: int, customer_id: int) -> str:
+    """Runs a claimed checkout job inside the context of `app`."""
+    with app.app_context():
+        checkout_job_service = container.resolve('checkout_job_service')
+        return checkout_job_service.execute(job_id, customer_id)
+
+
+def _execute_in_worker_process(job_id: int, customer_id: int) -> str:
+    """Runs a claimed checkout job in a worker process."""
+    return _execute(worker_app(), job_id, customer_id)
+
+
+class CheckoutWorkerPool:
+    """
+    Runs queued checkouts on a pool of threads or processes.
+
+    A dispatcher thread claims jobs from the checkout_jobs table and hands
+    them to the pool, keeping at most `workers` jobs in flight. It polls the
+    table every `poll_interval` seconds, or sooner when notify() is called
+    after a job was queued. In process mode every worker process creates its
+    own application from `config_class`.
+    """
+
+    THREAD: str = 'thread'
+    PROCESS: str = 'process'
+
+    def __init__(
+        self,
+        app: Flask,
+        config_class: Type[Config],
+        workers: int,
+        mode: str = THREAD,
+        poll_interval: float = 1.0,
+        job_timeout: float = 300
+    ) -> None:
+        """
+        Initializes the pool without starting it.
+
+        Args:
+            app (Flask): The application the dispatcher runs in.
+            config_class (Type[Config]): The configuration of worker
+                processes.
+            workers (int): The number of jobs run concurrently.
+            mode (str, optional): THREAD or PROCESS. Defaults to THREAD.
+            poll_interval (float, optional): Seconds between two polls of an
+                empty queue. Defaults to 1.0.
+            job_timeout (float, optional): Seconds after which a job left
+                running by a dead worker is requeued on start. Defaults to
+                300.
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in (self.THREAD, self.PROCESS):
+            raise ValueError(f"Unknown checkout worker mode: {mode}")
+        self.app: Flask = app
+        self.config_class: Type[Config] = config_class
+        self.workers: int = workers
+        self.mode: str = mode
+        self.poll_interval: float = poll_interval
+        self.job_timeout: float = job_timeout
+        self._slots = threading.BoundedSemaphore(workers)
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._executor: Optional[Executor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Requeues stale jobs and starts the dispatcher and the pool."""
+        with self.app.app_context():
+            container.resolve('checkout_job_service').requeue_stale(
+                self.job_timeout)
+        if self.mode == self.PROCESS:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker_app,
+                initargs=(self.config_class,)
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix='checkout-worker')
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name='checkout-dispatcher', daemon=True)
+        self._dispatcher.start()
+        logger.info(f"Started {self.workers} checkout workers "
+                    f"in {self.mode} mode")
+
+    def notify(self) -> None:
+        """Wakes the dispatcher up after a job was queued."""
+        self._wakeup.set()
+
+    def stop(self) -> None:
+        """Stops dispatching and waits for the jobs in flight."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def _dispatch(self) -> None:
+        while not self._stopped.is_set():
+            if not self._slots.acquire(timeout=self.poll_interval):
+                continue
+            try:
+                with self.app.app_context():
+                    job = container.resolve(
+                        'checkout_job_service').claim_next()
+            except Exception as e:
+                logger.error(f"Failed to claim a checkout job: {e}")
+                job = None
+            if job is None:
+                self._slots.release()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._submit(job)
+
+    def _submit(self, job: CheckoutJob) -> None:
+        job_id = job.id
+        if self.mode == self.PROCESS:
+            future = self._executor.submit(
+                _execute_in_worker_process, job_id, job.customer_id)
+        else:
+            future = self._executor.submit(
+                _execute, self.app, job_id, job.customer_id)
+        started = time.perf_counter()
+
+        def done(future: Future) -> None:
+            self._slots.release()
+            metrics.observe('checkout_jobs.run_seconds',
+                            time.perf_counter() - started)
+            error = future.exception()
+            if error is not None:
+                logger.error(f"Checkout job {job_id} crashed: {error}")
+                metrics.increment('checkout_jobs.crashed')
+            else:
+                metrics.increment(f"checkout_jobs.{future.result()}")
+
+        future.add_done_callback(done)
@@ -0,0 +1,44 @@
+# app/workers/worker_app.py
+from typing import Optional, Type
+from flask import Flask
+from config.config import Config
+
+# The application of the current worker process, created by init_worker_app.
+_worker_app: Optional[Flask] = None
+
+
+def init_worker_app(config_class: Type[Config]) -> None:
+    """
+    Creates the application of a pool worker process. Meant to be used as
+    the initializer of a ProcessPoolExecutor.
+
+    Background jobs are disabled in the worker's application, so that the
+    worker does not start pools, purges or sweeps of its own. An in-process
+    cart store belongs to the parent, which writes the carts it hands to
+    workers first, so workers read and write carts in the database.
+
+    Args:
+        config_class (Type[Config]): The configuration of the parent
+            application.
+    """
+    from app import create_app
+
+    global _worker_app
+    worker_config = type('WorkerConfig', (config_class,), {
+        'CHECKOUT_ASYNC_ENABLED': False,
+        'IDEMPOTENCY_PURGE_INTERVAL_SECONDS': 0,
+        'CART_SWEEP_INTERVAL_SECONDS': 0,
+        'CART_STORE': 'database' if config_class.CART_STORE == 'memory'
+        else config_class.CART_STORE
+    })
+    _worker_app = create_app(worker_config)
+
+
+def worker_app() -> Flask:
+    """
+    Returns the application of the current worker process.
+
+    Returns:
+        Flask: The application created by init_worker_app().
+    """
+    return _worker_app
@@ -0,0 +1,121 @@
+# benchmarks/bench_cart.py
+"""
+Benchmark for the ShoppingCart domain model against the list-backed cart it
+replaced.
+
+For carts of 10 to 10,000 items, every product is added, has its quantity
+updated and is removed again, and the memory held by a full cart is
+measured with tracemalloc. Both carts are checked to hold the same items
+before timings are reported. Run it from the repository root:
+
+    python -m benchmarks.bench_cart
+"""
+import statistics
+import time
+import tracemalloc
+from typing import Callable, List
+from app.models.domain.product import Product
+from app.models.domain.shopping_cart import ShoppingCart
+
+ITEM_COUNTS: List[int] = [10, 100, 1_000, 10_000]
+REPEAT: int = 3
+
+
+class ListCartItem:
+    """The cart item before ShoppingCartItem used __slots__."""
+
+    def __init__(self, product: Product, quantity: int) -> None:
+        self.product = product
+        self.quantity = quantity
+
+
+class ListCart:
+    """The list-backed cart ShoppingCart replaced, with its linear scans."""
+
+    def __init__(self, id: int, customer_id: int) -> None:
+        self.id = id
+        self.customer_id = customer_id
+        self.items: List[ListCartItem] = []
+
+    def add_item(self, product: Product, quantity: int) -> None:
+        for item in self.items:
+            if item.product.id == product.id:
+                item.quantity += quantity
+                return
+        self.items.append(ListCartItem(product, quantity))
+
+    def remove_item(self, product_id: int) -> None:
+        self.items = [
+            item for item in self.items if item.product.id != product_id]
+
+    def update_item_quantity(self, product_id: int, quantity: int) -> None:
+        for item in self.items:
+            if item.product.id == product_id:
+                item.quantity = quantity
+                return
+
+    @property
+    def subtotal(self) -> float:
+        return sum(item.product.price * item.quantity for item in self.items)
+
+
+def fill(cart_class: Callable, products: List[Product]):
+    cart = cart_class(1, 1)
+    for product in products:
+        cart.add_item(product, 1)
+    return cart
+
+
+def exercise(cart_class: Callable, products: List[Product]) -> None:
+    cart = fill(cart_class, products)
+    for product in products:
+        cart.update_item_quantity(product.id, 2)
+        cart.subtotal
+    for product in products:
+        cart.remove_item(product.id)
+
+
+def median_ms(function: Callable[[], None]) -> float:
+    timings: List[float] = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def held_bytes(cart_class: Callable, products: List[Product]) -> int:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        cart = fill(cart_class, products)
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del cart
+    return held
+
+
+def run() -> None:
+    print(f"{'items':>6} {'list ms':>9} {'mapped ms':>10} {'speedup':>8} "
+          f"{'list B/item':>12} {'mapped B/item':>14}")
+    for count in ITEM_COUNTS:
+        products = [Product(id=i, name=f"Product {i}", price=i % 50 + 0.99,
+                            category_id=1) for i in range(count)]
+        listed = fill(ListCart, products)
+        mapped = fill(ShoppingCart, products)
+        assert [(item.product.id, item.quantity) for item in listed.items] \
+            == [(item.product.id, item.quantity) for item in mapped.items]
+        assert round(listed.subtotal, 2) == round(mapped.subtotal, 2)
+
+        list_ms = median_ms(lambda: exercise(ListCart, products))
+        mapped_ms = median_ms(lambda: exercise(ShoppingCart, products))
+        list_bytes = held_bytes(ListCart, products) / count
+        mapped_bytes = held_bytes(ShoppingCart, products) / count
+        print(f"{count:>6} {list_ms:>9.2f} {mapped_ms:>10.2f} "
+              f"{list_ms / mapped_ms:>7.1f}x {list_bytes:>12.0f} "
+              f"{mapped_bytes:>14.0f}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,127 @@
+# benchmarks/bench_checkout.py
+"""
+Benchmark for LoyaltyAccountRepository.checkout_transaction.
+
+Measures checkout latency and the number of SQL statements issued for carts
+of 1 to 1,000 items against an in-memory SQLite database. The cart is filled
+again before each run, outside the timing, since a checkout clears it. Run
+it from the repository root:
+
+    python -m benchmarks.bench_checkout
+"""
+import statistics
+import time
+from datetime import date
+from typing import List, Tuple
+from sqlalchemy import event
+from app import create_app, db
+from app.models.database.category import CategoryTable
+from app.models.database.customer import CustomerTable
+from app.models.database.loyalty_account import LoyaltyAccountTable
+from app.models.database.point_earning_rule import PointEarningRuleTable
+from app.models.database.product import ProductTable
+from app.models.database.shopping_cart import (
+    ShoppingCartTable,
+    ShoppingCartItemTable
+)
+from app.repositories.loyalty_account_repository import (
+    LoyaltyAccountRepository
+)
+from config.config import Config
+
+CART_SIZES: List[int] = [1, 10, 100, 1000]
+REPEAT: int = 5
+
+
+class BenchmarkConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+
+def seed_customer(size: int) -> Tuple[int, List[int]]:
+    """
+    Creates a customer with a loyalty account, an empty cart and `size`
+    products earning points.
+
+    Args:
+        size (int): The number of distinct products.
+
+    Returns:
+        Tuple[int, List[int]]: The ID of the created customer and the IDs
+        of the products.
+    """
+    category = CategoryTable(name=f"Category {size}")
+    customer = CustomerTable(name="Bench", email=f"bench{size}@example.com")
+    db.session.add_all([category, customer])
+    db.session.commit()
+
+    db.session.add(PointEarningRuleTable(
+        category_id=category.id, points_per_dollar=2,
+        start_date=date(1900, 1, 1), end_date=None))
+    db.session.add(LoyaltyAccountTable(customer_id=customer.id, points=0))
+    products = [
+        ProductTable(name=f"Product {i}", price=9.99,
+                     category_id=category.id)
+        for i in range(size)
+    ]
+    db.session.add_all(
+        [ShoppingCartTable(customer_id=customer.id)] + products)
+    db.session.commit()
+    seeded = (customer.id, [product.id for product in products])
+    db.session.remove()
+    return seeded
+
+
+def fill_cart(customer_id: int, product_ids: List[int]) -> None:
+    """
+    Puts every product in the customer's cart. A checkout clears the cart,
+    so it is filled again before each run.
+
+    Args:
+        customer_id (int): The ID of the customer.
+        product_ids (List[int]): The IDs of the products.
+    """
+    cart_id = db.session.query(ShoppingCartTable.id).filter(
+        ShoppingCartTable.customer_id == customer_id).scalar()
+    db.session.add_all([
+        ShoppingCartItemTable(cart_id=cart_id, product_id=product_id,
+                              quantity=2)
+        for product_id in product_ids
+    ])
+    db.session.commit()
+    db.session.remove()
+
+
+def run() -> None:
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        db.create_all()
+        repository = LoyaltyAccountRepository()
+        statements: List[str] = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute',
+                     before_cursor_execute)
+
+        print(f"{'items':>6} {'median ms':>10} {'statements':>11} "
+              f"{'selects':>8}")
+        for size in CART_SIZES:
+            customer_id, product_ids = seed_customer(size)
+            # Rules were seeded directly, not through the repository.
+            repository.rule_index.invalidate()
+            timings: List[float] = []
+            for _ in range(REPEAT):
+                fill_cart(customer_id, product_ids)
+                statements.clear()
+                started = time.perf_counter()
+                repository.checkout_transaction(customer_id)
+                timings.append((time.perf_counter() - started) * 1000)
+                db.session.remove()
+            selects = [s for s in statements if s.startswith('SELECT')]
+            print(f"{size:>6} {statistics.median(timings):>10.2f} "
+                  f"{len(statements):>11} {len(selects):>8}")
+
+
+if __name__ == '__main__':
+    run()
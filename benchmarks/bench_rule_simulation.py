@@ -0,0 +1,83 @@
+# benchmarks/bench_rule_simulation.py
+"""
+Benchmark for the replay step of RuleSimulationService.
+
+Ledger rows of 5,000 products in 50 categories, spread over 30 days in
+orders of five lines, are generated with a fixed seed and replayed against
+stacked rate, bonus, tier, multiplier and cap rules without a database.
+The throughput shows how long a worker needs for a chunk; divide the ledger
+size by rows per second and by the number of workers to estimate a full
+simulation. Run it from the repository root:
+
+    python -m benchmarks.bench_rule_simulation
+"""
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+import numpy as np
+from app.models.domain.point_earning_rule import PointEarningRule
+from app.models.domain.points_engine import RuleSet
+from app.services.rule_simulation_service import (
+    ProductColumns,
+    RuleSimulationService
+)
+
+ROW_COUNTS: List[int] = [100_000, 1_000_000]
+PRODUCTS: int = 5_000
+CATEGORIES: int = 50
+LINES_PER_ORDER: int = 5
+
+
+def make_rules() -> List[PointEarningRule]:
+    def rule(rule_type, category_id, points_per_dollar=0, **fields):
+        return PointEarningRule(
+            id=None, category=None, category_id=category_id,
+            points_per_dollar=points_per_dollar,
+            start_date=date(2024, 1, 1), end_date=date(2024, 1, 15),
+            rule_type=rule_type, **fields)
+
+    return [
+        rule('rate', None, 1),
+        rule('bonus', 3, 2),
+        rule('tier', None, 1, min_spend=500.0),
+        rule('multiplier', None, multiplier=1.5),
+        rule('cap', 7, max_points=200),
+    ]
+
+
+def make_rows(rng: np.random.Generator, count: int) -> List[tuple]:
+    orders = count // LINES_PER_ORDER
+    account_id = np.repeat(rng.integers(1, 100_000, orders), LINES_PER_ORDER)
+    seconds = np.repeat(
+        rng.integers(0, 30 * 86400, orders), LINES_PER_ORDER)
+    start = datetime(2024, 1, 1)
+    timestamps = [start + timedelta(seconds=int(second))
+                  for second in seconds]
+    return list(zip(
+        account_id.tolist(),
+        rng.integers(1, PRODUCTS + 1, len(account_id)).tolist(),
+        rng.integers(1, 10, len(account_id)).tolist(),
+        rng.integers(0, 1000, len(account_id)).tolist(),
+        timestamps))
+
+
+def run() -> None:
+    rng = np.random.default_rng(42)
+    products = ProductColumns(
+        ids=np.arange(1, PRODUCTS + 1, dtype=np.int64),
+        prices=np.round(rng.uniform(0.5, 500, PRODUCTS), 2),
+        category_ids=rng.integers(1, CATEGORIES + 1, PRODUCTS))
+    rule_set = RuleSet.from_rules(make_rules())
+
+    print(f"{'rows':>9} {'seconds':>8} {'rows/s':>10}")
+    for count in ROW_COUNTS:
+        rows = make_rows(rng, count)
+        started = time.perf_counter()
+        totals = RuleSimulationService._replay(rows, rule_set, products)
+        elapsed = time.perf_counter() - started
+        assert sum(sums[0] for sums in totals.days.values()) == len(rows)
+        print(f"{len(rows):>9} {elapsed:>8.2f} {len(rows) / elapsed:>10.0f}")
+
+
+if __name__ == '__main__':
+    run()
@@ -16,6 +16,75 @@ class Config:
         SQLALCHEMY_DATABASE_URI (str): The URI for the database connection.
         SQLALCHEMY_TRACK_MODIFICATIONS (bool): Flag to enable/disable
         SQLAlchemy modification tracking.
+        RULE_INDEX_MAX_AGE_SECONDS (float): Seconds after which the
+        in-memory point earning rule index is rebuilt from the database.
+        IDEMPOTENCY_KEY_TTL_SECONDS (float): Seconds a stored Idempotency-Key
+        and its response are kept.
+        IDEMPOTENCY_CACHE_SIZE (int): Maximum number of completed
+        Idempotency-Keys cached in memory.
+        IDEMPOTENCY_PROCESSING_TIMEOUT_SECONDS (float): Seconds after which a
+        key whose request never finished may be claimed again.
+        IDEMPOTENCY_PURGE_INTERVAL_SECONDS (float): Seconds between two runs
+        of the background purge of expired keys. 0, the default, disables
+        the purge; set it in a single process only, since every application
+        instance, CLI commands included, would otherwise start its own.
+        CHECKOUT_ASYNC_ENABLED (bool): Whether /checkout queues the checkout
+        and answers 202 instead of running it in the request.
+        CHECKOUT_WORKERS (int): Number of checkouts run concurrently in
+        asynchronous mode.
+        CHECKOUT_WORKER_MODE (str): 'thread' or 'process' worker pool.
+        CHECKOUT_POLL_INTERVAL_SECONDS (float): Seconds between two polls of
+        an empty checkout queue.
+        CHECKOUT_JOB_TIMEOUT_SECONDS (float): Seconds after which a checkout
+        job left running by a dead worker is requeued.
+        CHECKOUT_SLOW_SECONDS (float): Duration from which the stage
+        breakdown of a checkout is logged as a warning.
+        CHECKOUT_TRACE_ENABLED (bool): Whether to log the stage breakdown of
+        every checkout.
+        SETTLEMENT_CHUNK_SIZE (int): Customers checked out per transaction
+        by the bulk settlement.
+        SETTLEMENT_WORKERS (int): Worker processes of the bulk settlement.
+        0 settles in the calling process.
+        QUOTE_CACHE_SIZE (int): Maximum number of customers whose last cart
+        points quote is cached in memory.
+        CONFLICT_MAX_RETRIES (int): How often a checkout that conflicts
+        with a concurrent change of the same account or cart is run again
+        before answering 409.
+        LEDGER_ARCHIVE_DIR (str): Directory of the compressed archive files
+        of old point transactions.
+        LEDGER_HOT_MONTHS (int): Number of months, the current one included,
+        kept in the point_transactions table by `flask ledger archive`.
+        EXPORT_PAGE_SIZE (int): Rows read per keyset page by the point
+        transaction export.
+        SIMULATION_CHUNK_DAYS (int): Days of point transactions replayed per
+        chunk by `flask rules simulate`.
+        SIMULATION_WORKERS (int): Worker processes of `flask rules
+        simulate`. 0 replays in the calling process.
+        ADMIN_TOKEN (str): Token expected in the X-Admin-Token header of
+        admin routes. Admin routes are disabled when it is not set.
+        CART_STORE (str): Where cart edits go: 'database' writes every edit
+        at once, 'memory' buffers them in this process and 'server' in the
+        process run by `flask carts serve`.
+        CART_FLUSH_INTERVAL_SECONDS (float): Seconds between two writes of
+        the buffered cart edits to the database.
+        CART_FLUSH_BATCH_SIZE (int): Carts written per transaction by a
+        flush of the buffered cart edits.
+        CART_JOURNAL_DIR (str): Directory of the journal of buffered cart
+        edits, replayed on restart.
+        CART_JOURNAL_FSYNC (bool): Whether every journaled cart edit is
+        synced to disk.
+        CART_STORE_ADDRESS (str): The host:port of the cart store server.
+        CART_STORE_AUTHKEY (str): The key of the cart store server. It has
+        no default: the cart store server and the processes run with
+        CART_STORE=server refuse to start without it.
+        CART_TTL_SECONDS (float): Seconds after its last change from which a
+        shopping cart is abandoned and deleted by the cart sweep.
+        CART_SWEEP_INTERVAL_SECONDS (float): Seconds between two background
+        sweeps of abandoned carts. 0, the default, disables the background
+        sweep; set it in a single process only, since every application
+        instance, CLI commands included, would otherwise start its own.
+        CART_SWEEP_BATCH_SIZE (int): Carts deleted per transaction by a
+        sweep.
     """
 
     SECRET_KEY: str = os.environ.get('SECRET_KEY') or 'you-will-never-guess'
@@ -24,3 +93,60 @@ class Config:
         os.path.join(os.path.abspath(
             os.path.dirname(__file__)), '..', 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
+    RULE_INDEX_MAX_AGE_SECONDS: float = float(
+        os.environ.get('RULE_INDEX_MAX_AGE_SECONDS') or 300)
+    IDEMPOTENCY_KEY_TTL_SECONDS: float = float(
+        os.environ.get('IDEMPOTENCY_KEY_TTL_SECONDS') or 86400)
+    IDEMPOTENCY_CACHE_SIZE: int = int(
+        os.environ.get('IDEMPOTENCY_CACHE_SIZE') or 10000)
+    IDEMPOTENCY_PROCESSING_TIMEOUT_SECONDS: float = float(
+        os.environ.get('IDEMPOTENCY_PROCESSING_TIMEOUT_SECONDS') or 60)
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: float = float(
+        os.environ.get('IDEMPOTENCY_PURGE_INTERVAL_SECONDS') or 0)
+    CHECKOUT_ASYNC_ENABLED: bool = os.environ.get(
+        'CHECKOUT_ASYNC_ENABLED', '').lower() in ('1', 'true', 'yes')
+    CHECKOUT_WORKERS: int = int(os.environ.get('CHECKOUT_WORKERS') or 4)
+    CHECKOUT_WORKER_MODE: str = os.environ.get(
+        'CHECKOUT_WORKER_MODE') or 'thread'
+    CHECKOUT_POLL_INTERVAL_SECONDS: float = float(
+        os.environ.get('CHECKOUT_POLL_INTERVAL_SECONDS') or 1)
+    CHECKOUT_JOB_TIMEOUT_SECONDS: float = float(
+        os.environ.get('CHECKOUT_JOB_TIMEOUT_SECONDS') or 300)
+    CHECKOUT_SLOW_SECONDS: float = float(
+        os.environ.get('CHECKOUT_SLOW_SECONDS') or 1)
+    CHECKOUT_TRACE_ENABLED: bool = os.environ.get(
+        'CHECKOUT_TRACE_ENABLED', '').lower() in ('1', 'true', 'yes')
+    SETTLEMENT_CHUNK_SIZE: int = int(
+        os.environ.get('SETTLEMENT_CHUNK_SIZE') or 500)
+    SETTLEMENT_WORKERS: int = int(os.environ.get('SETTLEMENT_WORKERS') or 0)
+    QUOTE_CACHE_SIZE: int = int(os.environ.get('QUOTE_CACHE_SIZE') or 10000)
+    CONFLICT_MAX_RETRIES: int = int(
+        os.environ.get('CONFLICT_MAX_RETRIES') or 3)
+    LEDGER_ARCHIVE_DIR: str = os.environ.get('LEDGER_ARCHIVE_DIR') or \
+        os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '..', 'archive')
+    LEDGER_HOT_MONTHS: int = int(os.environ.get('LEDGER_HOT_MONTHS') or 12)
+    EXPORT_PAGE_SIZE: int = int(os.environ.get('EXPORT_PAGE_SIZE') or 5000)
+    SIMULATION_CHUNK_DAYS: int = int(
+        os.environ.get('SIMULATION_CHUNK_DAYS') or 1)
+    SIMULATION_WORKERS: int = int(os.environ.get('SIMULATION_WORKERS') or 0)
+    ADMIN_TOKEN: str = os.environ.get('ADMIN_TOKEN')
+    CART_STORE: str = os.environ.get('CART_STORE') or 'database'
+    CART_FLUSH_INTERVAL_SECONDS: float = float(
+        os.environ.get('CART_FLUSH_INTERVAL_SECONDS') or 1)
+    CART_FLUSH_BATCH_SIZE: int = int(
+        os.environ.get('CART_FLUSH_BATCH_SIZE') or 500)
+    CART_JOURNAL_DIR: str = os.environ.get('CART_JOURNAL_DIR') or \
+        os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '..', 'journal')
+    CART_JOURNAL_FSYNC: bool = os.environ.get(
+        'CART_JOURNAL_FSYNC', '').lower() in ('1', 'true', 'yes')
+    CART_STORE_ADDRESS: str = os.environ.get('CART_STORE_ADDRESS') or \
+        '127.0.0.1:5055'
+    CART_STORE_AUTHKEY: str = os.environ.get('CART_STORE_AUTHKEY')
+    CART_TTL_SECONDS: float = float(
+        os.environ.get('CART_TTL_SECONDS') or 30 * 86400)
+    CART_SWEEP_INTERVAL_SECONDS: float = float(
+        os.environ.get('CART_SWEEP_INTERVAL_SECONDS') or 0)
+    CART_SWEEP_BATCH_SIZE: int = int(
+        os.environ.get('CART_SWEEP_BATCH_SIZE') or 500)
@@ -1,14 +1,33 @@
 # tests/e2e/base_test.py
 
 import unittest
+from contextlib import contextmanager
+from sqlalchemy import event
 from app import create_app
 from app import db as _db
 from config.config import Config
 
 
+@contextmanager
+def count_queries(engine):
+    """Counts the SQL statements sent to the database inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
 class TestConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS = 0
+    CART_SWEEP_INTERVAL_SECONDS = 0
 
 
 class BaseTestCase(unittest.TestCase):
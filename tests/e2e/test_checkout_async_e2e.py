@@ -0,0 +1,170 @@
+# tests/e2e/test_checkout_async_e2e.py
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from datetime import date
+from app import create_app, db
+from app.di_container import container
+from app.models.database.category import CategoryTable
+from app.models.database.customer import CustomerTable
+from app.models.database.loyalty_account import LoyaltyAccountTable
+from app.models.database.point_earning_rule import PointEarningRuleTable
+from app.models.database.product import ProductTable
+from app.models.database.shopping_cart import (
+    ShoppingCartTable,
+    ShoppingCartItemTable
+)
+from tests.e2e.base_test import TestConfig
+
+ADMIN_TOKEN = 'secret'
+
+
+class FileDatabaseTestConfig(TestConfig):
+    """Uses a file database shared by the request and worker threads."""
+    DATABASE_PATH = os.path.join(
+        tempfile.gettempdir(), 'checkout_async_test.db')
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + DATABASE_PATH
+
+
+class AsyncCheckoutTestConfig(FileDatabaseTestConfig):
+    CHECKOUT_ASYNC_ENABLED = True
+    CHECKOUT_WORKERS = 2
+    CHECKOUT_POLL_INTERVAL_SECONDS = 0.05
+    ADMIN_TOKEN = ADMIN_TOKEN
+
+
+class ProcessAsyncCheckoutTestConfig(AsyncCheckoutTestConfig):
+    CHECKOUT_WORKER_MODE = 'process'
+
+
+class AsyncCheckoutTestCase(unittest.TestCase):
+    config_class = AsyncCheckoutTestConfig
+
+    def setUp(self):
+        # Create the schema before the worker pool starts polling it.
+        schema_app = create_app(FileDatabaseTestConfig)
+        with schema_app.app_context():
+            db.drop_all()
+            db.create_all()
+            category = CategoryTable(name="Books")
+            customer = CustomerTable(
+                name="Test Customer", email="test@example.com")
+            db.session.add_all([category, customer])
+            db.session.commit()
+            product = ProductTable(
+                name="Book", price=15.99, category_id=category.id)
+            cart = ShoppingCartTable(customer_id=customer.id)
+            db.session.add_all([
+                product, cart,
+                LoyaltyAccountTable(customer_id=customer.id, points=0),
+                PointEarningRuleTable(
+                    category_id=category.id, points_per_dollar=2,
+                    start_date=date(1900, 1, 1), end_date=None)
+            ])
+            db.session.commit()
+            db.session.add(ShoppingCartItemTable(
+                cart_id=cart.id, product_id=product.id, quantity=2))
+            db.session.commit()
+            self.customer_id = customer.id
+            self.cart_id = cart.id
+            db.engine.dispose()
+
+        self.app = create_app(self.config_class)
+        self.client = self.app.test_client()
+        self.client.set_cookie('customer_id', str(self.customer_id))
+
+    def tearDown(self):
+        container.resolve('checkout_worker_pool').stop()
+        with self.app.app_context():
+            db.engine.dispose()
+        os.remove(FileDatabaseTestConfig.DATABASE_PATH)
+
+    def _wait_for(self, location, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            data = json.loads(self.client.get(location).data)
+            if data['status'] in ('succeeded', 'failed'):
+                return data
+            time.sleep(0.05)
+        self.fail(f"Checkout job {location} did not finish")
+
+
+class TestCheckoutAsyncE2E(AsyncCheckoutTestCase):
+    def test_checkout_is_queued_and_run_by_worker(self):
+        # Act
+        response = self.client.post('/checkout')
+        job = self._wait_for(response.headers['Location'])
+
+        # Assert
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(json.loads(response.data)['status'], 'queued')
+        self.assertEqual(job['status'], 'succeeded')
+        expected_points = int(15.99 * 2 * 2)
+        self.assertEqual(job['result']['total_points_earned'],
+                         expected_points)
+        with self.app.app_context():
+            account = LoyaltyAccountTable.query.filter_by(
+                customer_id=self.customer_id).first()
+            self.assertEqual(account.points, expected_points)
+            self.assertEqual(ShoppingCartItemTable.query.filter_by(
+                cart_id=self.cart_id).count(), 0)
+
+    def test_failed_checkout_is_reported(self):
+        # Arrange
+        self.client.post('/checkout')
+        self._wait_for('/checkout/1')
+
+        # Act
+        response = self.client.post('/checkout')
+        job = self._wait_for(response.headers['Location'])
+
+        # Assert
+        self.assertEqual(job['status'], 'failed')
+        self.assertIn('empty', job['error'])
+
+    def test_checkout_job_of_other_customer_is_not_found(self):
+        # Arrange
+        self.client.post('/checkout')
+        self.client.set_cookie('customer_id', str(self.customer_id + 1))
+
+        # Act
+        response = self.client.get('/checkout/1')
+
+        # Assert
+        self.assertEqual(response.status_code, 404)
+
+    def test_metrics_are_exported(self):
+        # Arrange
+        response = self.client.post('/checkout')
+        self._wait_for(response.headers['Location'])
+
+        # Act
+        response = self.client.get(
+            '/metrics', headers={'X-Admin-Token': ADMIN_TOKEN})
+        without_token = self.client.get('/metrics')
+
+        # Assert
+        self.assertEqual(without_token.status_code, 403)
+        data = json.loads(response.data)
+        self.assertIn('checkout_jobs.queue_depth', data['gauges'])
+        self.assertGreaterEqual(
+            data['histograms']['checkout_jobs.wait_seconds']['count'], 1)
+        self.assertGreaterEqual(
+            data['histograms']['checkout_jobs.run_seconds']['count'], 1)
+
+
+class TestCheckoutProcessPoolE2E(AsyncCheckoutTestCase):
+    config_class = ProcessAsyncCheckoutTestConfig
+
+    def test_checkout_is_run_by_worker_process(self):
+        # Act
+        response = self.client.post('/checkout')
+        job = self._wait_for(response.headers['Location'])
+
+        # Assert
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['result']['total_points_earned'],
+                         int(15.99 * 2 * 2))
@@ -0,0 +1,98 @@
+# tests/e2e/test_export_e2e.py
+
+import csv
+import io
+import json
+from datetime import datetime
+from tests.e2e.base_test import BaseTestCase, TestConfig
+from app import create_app, db
+from app.models.database.category import CategoryTable
+from app.models.database.customer import CustomerTable
+from app.models.database.loyalty_account import LoyaltyAccountTable
+from app.models.database.point_transaction import PointTransactionTable
+from app.models.database.product import ProductTable
+
+ADMIN_TOKEN = 'secret'
+
+
+class ExportTestConfig(TestConfig):
+    ADMIN_TOKEN = ADMIN_TOKEN
+    EXPORT_PAGE_SIZE = 4
+
+
+class TestPointTransactionExportE2E(BaseTestCase):
+    def setUp(self):
+        self.app = create_app(ExportTestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        category = CategoryTable(name="Books")
+        customer = CustomerTable(name="Test", email="test@example.com")
+        db.session.add_all([category, customer])
+        db.session.commit()
+        product = ProductTable(name="Book", price=10,
+                               category_id=category.id)
+        account = LoyaltyAccountTable(customer_id=customer.id, points=0)
+        db.session.add_all([product, account])
+        db.session.commit()
+        db.session.add_all([
+            PointTransactionTable(
+                loyalty_account_id=account.id, product_id=product.id,
+                points_earned=day, transaction_date=datetime(2024, 1, day))
+            for day in range(1, 11)
+        ])
+        db.session.commit()
+        db.session.remove()
+
+    def _export(self, **params):
+        params.setdefault('start_date', '2024-01-01')
+        params.setdefault('end_date', '2024-01-31')
+        return self.client.get('/admin/point-transactions',
+                               query_string=params,
+                               headers={'X-Admin-Token': ADMIN_TOKEN})
+
+    def test_export_ndjson_and_resume(self):
+        # Act
+        response = self._export()
+        records = [json.loads(line) for line in
+                   response.get_data(as_text=True).splitlines()]
+        resumed = self._export(cursor=records[5]['cursor'])
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual([record['points_earned'] for record in records],
+                         list(range(1, 11)))
+        self.assertEqual(
+            [json.loads(line) for line in
+             resumed.get_data(as_text=True).splitlines()],
+            records[6:])
+
+    def test_export_csv_end_date_includes_whole_day(self):
+        # Act
+        response = self._export(format='csv', end_date='2024-01-03')
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/csv')
+        rows = list(csv.DictReader(
+            io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual([row['points_earned'] for row in rows],
+                         ['1', '2', '3'])
+
+    def test_export_rejects_invalid_requests(self):
+        # Act
+        no_token = self.client.get(
+            '/admin/point-transactions?start_date=2024-01-01'
+            '&end_date=2024-01-31')
+        bad_cursor = self._export(cursor='garbage')
+        bad_format = self._export(format='xml')
+        missing_date = self._export(start_date='')
+
+        # Assert
+        self.assertEqual(no_token.status_code, 403)
+        self.assertEqual(bad_cursor.status_code, 400)
+        self.assertEqual(bad_format.status_code, 400)
+        self.assertEqual(missing_date.status_code, 400)
@@ -1,8 +1,9 @@
 # tests/e2e/test_loyalty_e2e.py
 
 import json
-from datetime import date
-from tests.e2e.base_test import BaseTestCase
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+from tests.e2e.base_test import BaseTestCase, count_queries
 from app.models.database.customer import CustomerTable
 from app.models.database.loyalty_account import LoyaltyAccountTable
 from app.models.database.product import ProductTable
@@ -11,8 +12,11 @@ from app.models.database.shopping_cart import (
     ShoppingCartItemTable
 )
 from app import db
+from app.di_container import container
 from app.models.database.category import CategoryTable
 from app.models.database.point_earning_rule import PointEarningRuleTable
+from app.utils.exceptions import ConcurrencyConflictError
+from app.utils.metrics import metrics
 
 
 class TestLoyaltyE2E(BaseTestCase):
@@ -150,6 +154,93 @@ class TestLoyaltyE2E(BaseTestCase):
             cart_id=cart.id).all()
         self.assertEqual(len(cart_items), 0)
 
+    def test_checkout_with_idempotency_key_is_replayed(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+        cart = ShoppingCartTable(customer_id=self.customer.id)
+        db.session.add(cart)
+        db.session.commit()
+        db.session.add(ShoppingCartItemTable(
+            cart_id=cart.id, product_id=self.product1.id, quantity=1))
+        db.session.commit()
+        headers = {'Idempotency-Key': 'checkout-1'}
+
+        # Act
+        first = self.client.post('/checkout', headers=headers)
+        retry = self.client.post('/checkout', headers=headers)
+
+        # Assert
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(retry.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', first.headers)
+        self.assertEqual(retry.headers['Idempotent-Replayed'], 'true')
+        self.assertEqual(json.loads(retry.data), json.loads(first.data))
+        account = LoyaltyAccountTable.query.filter_by(
+            customer_id=self.customer.id).first()
+        self.assertEqual(account.points, 1200 * 2)
+
+    def test_checkout_with_idempotency_key_is_retried_after_error(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+        headers = {'Idempotency-Key': 'checkout-2'}
+
+        # Act
+        first = self.client.post('/checkout', headers=headers)
+        retry = self.client.post('/checkout', headers=headers)
+
+        # Assert
+        self.assertEqual(first.status_code, 400)
+        self.assertEqual(retry.status_code, 400)
+        self.assertNotIn('Idempotent-Replayed', retry.headers)
+
+    def test_get_cart_quote(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+        cart = ShoppingCartTable(customer_id=self.customer.id)
+        db.session.add(cart)
+        db.session.commit()
+        db.session.add(ShoppingCartItemTable(
+            cart_id=cart.id, product_id=self.product1.id, quantity=1))
+        db.session.commit()
+
+        # Act
+        quote = self.client.get('/cart/quote')
+        self.client.post('/cart', json={
+            'productId': self.product2.id, 'quantity': 2})
+        updated_quote = self.client.get('/cart/quote')
+        # The test shares one session with the requests; end the read
+        # transaction of the quote like the end of a real request would.
+        db.session.remove()
+        checkout = self.client.post('/checkout')
+
+        # Assert
+        self.assertEqual(quote.status_code, 200)
+        self.assertEqual(json.loads(quote.data)['total_points_earned'],
+                         1200 * 2)
+        self.assertEqual(json.loads(updated_quote.data),
+                         json.loads(checkout.data))
+
+    def test_get_cart_quote_does_not_write(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+        cart = ShoppingCartTable(customer_id=self.customer.id)
+        db.session.add(cart)
+        db.session.commit()
+        db.session.add(ShoppingCartItemTable(
+            cart_id=cart.id, product_id=self.product1.id, quantity=1))
+        db.session.commit()
+
+        # Act
+        response = self.client.get('/cart/quote')
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        account = LoyaltyAccountTable.query.filter_by(
+            customer_id=self.customer.id).first()
+        self.assertEqual(account.points, 0)
+        self.assertEqual(ShoppingCartItemTable.query.filter_by(
+            cart_id=cart.id).count(), 1)
+
     def test_get_points(self):
         # Arrange
         self.client.set_cookie('customer_id', str(self.customer.id))
@@ -164,6 +255,67 @@ class TestLoyaltyE2E(BaseTestCase):
         data = json.loads(response.data.decode())
         self.assertEqual(data['points'], 100)
 
+    def test_get_points_is_conditional(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+        first = self.client.get('/points')
+        etag = first.headers['ETag']
+
+        # Act
+        with count_queries(db.engine) as statements:
+            unchanged = self.client.get(
+                '/points', headers={'If-None-Match': etag})
+        container.resolve('loyalty_account_repository').increment_points(
+            self.loyalty_account.id, 5)
+        changed = self.client.get('/points', headers={'If-None-Match': etag})
+
+        # Assert
+        self.assertFalse(etag.startswith('W/'))
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.headers['ETag'], etag)
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+        self.assertEqual(changed.json['points'], 5)
+
+    def test_get_daily_points(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+        cart = ShoppingCartTable(customer_id=self.customer.id)
+        db.session.add(cart)
+        db.session.commit()
+        db.session.add(ShoppingCartItemTable(
+            cart_id=cart.id, product_id=self.product1.id, quantity=1))
+        db.session.commit()
+        db.session.remove()
+        self.client.post('/checkout')
+        today = datetime.now(timezone.utc).date().isoformat()
+
+        # Act
+        response = self.client.get('/points/daily')
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data.decode())
+        self.assertEqual(data['end_date'], today)
+        self.assertEqual(data['total_points_earned'], 1200 * 2)
+        self.assertEqual(data['days'], [{
+            'day': today, 'points_earned': 1200 * 2, 'transaction_count': 1
+        }])
+
+    def test_get_daily_points_invalid_range(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+
+        # Act
+        reversed_range = self.client.get(
+            '/points/daily?start_date=2024-02-01&end_date=2024-01-01')
+        malformed = self.client.get('/points/daily?start_date=yesterday')
+
+        # Assert
+        self.assertEqual(reversed_range.status_code, 400)
+        self.assertEqual(malformed.status_code, 400)
+
     def test_add_to_cart(self):
         # Arrange
         self.client.set_cookie('customer_id', str(self.customer.id))
@@ -214,6 +366,34 @@ class TestLoyaltyE2E(BaseTestCase):
         self.assertEqual(data['items'][0]['product']['id'], self.product1.id)
         self.assertEqual(data['items'][0]['quantity'], 1)
 
+    def test_get_cart_is_conditional(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+        self.client.post('/cart', json={
+            "productId": self.product1.id, "quantity": 1})
+        first = self.client.get('/cart')
+        etag = first.headers['ETag']
+
+        # Act
+        with count_queries(db.engine) as statements:
+            unchanged = self.client.get(
+                '/cart', headers={'If-None-Match': etag})
+        self.client.post('/cart', json={
+            "productId": self.product2.id, "quantity": 1})
+        changed = self.client.get('/cart', headers={'If-None-Match': etag})
+
+        # Assert
+        self.assertEqual(first.headers['Cache-Control'], 'private, no-cache')
+        self.assertTrue(etag.startswith('W/'))
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.data, b'')
+        self.assertEqual(unchanged.headers['ETag'], etag)
+        # Only the cart's ID and version are read.
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+        self.assertEqual(len(changed.json['items']), 2)
+
     def test_update_cart_item(self):
         # Arrange
         self.client.set_cookie('customer_id', str(self.customer.id))
@@ -243,6 +423,175 @@ class TestLoyaltyE2E(BaseTestCase):
             cart_id=cart.id, product_id=self.product1.id).first()
         self.assertEqual(updated_cart_item.quantity, 3)
 
+    def test_cart_changes_reject_quantities_below_one(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+        product_id = self.product1.id
+        self.client.post('/cart', json={
+            "productId": product_id, "quantity": 1})
+
+        # Act
+        negative = self.client.post('/cart', json={
+            "productId": product_id, "quantity": -5})
+        zero = self.client.put(f'/cart/{product_id}', json={"quantity": 0})
+
+        # Assert
+        self.assertEqual(negative.status_code, 400)
+        self.assertEqual(zero.status_code, 400)
+        item = ShoppingCartItemTable.query.filter_by(
+            product_id=product_id).one()
+        self.assertEqual(item.quantity, 1)
+
+    def test_patch_cart_applies_operations_and_returns_cart(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+        self.client.post('/cart', json={
+            "productId": self.product1.id, "quantity": 1})
+        operations = [
+            {"op": "add", "product_id": self.product2.id, "quantity": 2},
+            {"op": "update", "product_id": self.product2.id, "quantity": 3},
+            {"op": "remove", "product_id": self.product1.id}
+        ]
+
+        # Act
+        response = self.client.patch('/cart', json={"operations": operations})
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data.decode())
+        self.assertEqual(
+            [(item['product']['id'], item['quantity'])
+             for item in data['items']],
+            [(self.product2.id, 3)])
+        self.assertEqual(ShoppingCartTable.query.filter_by(
+            customer_id=self.customer.id).one().version, 3)
+
+    def test_patch_cart_rejects_invalid_operations(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+
+        # Act
+        missing_quantity = self.client.patch('/cart', json={
+            "operations": [{"op": "add", "product_id": self.product1.id}]})
+        unknown_op = self.client.patch('/cart', json={
+            "operations": [{"op": "move", "product_id": self.product1.id}]})
+        zero_quantity = self.client.patch('/cart', json={
+            "operations": [
+                {"op": "add", "product_id": self.product1.id, "quantity": 1},
+                {"op": "update", "product_id": self.product1.id,
+                 "quantity": 0}]})
+
+        # Assert
+        self.assertEqual(missing_quantity.status_code, 400)
+        self.assertEqual(unknown_op.status_code, 400)
+        self.assertEqual(zero_quantity.status_code, 400)
+        self.assertIsNone(ShoppingCartTable.query.filter_by(
+            customer_id=self.customer.id).first())
+
+    def test_cart_changes_return_cart_and_quote_on_request(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+
+        # Act
+        added = self.client.post('/cart?return=cart', json={
+            "productId": self.product1.id, "quantity": 1})
+        quote = self.client.get('/cart/quote')
+        updated = self.client.put(f'/cart/{self.product1.id}?return=cart',
+                                  json={"quantity": 3})
+        removed = self.client.delete(f'/cart/{self.product1.id}?return=cart')
+
+        # Assert
+        self.assertEqual(added.status_code, 200)
+        data = json.loads(added.data)
+        self.assertTrue(data['success'])
+        self.assertEqual(
+            [(item['product']['id'], item['quantity'])
+             for item in data['cart']['items']],
+            [(self.product1.id, 1)])
+        self.assertEqual(data['quote'], json.loads(quote.data))
+        data = json.loads(updated.data)
+        self.assertEqual(data['cart']['items'][0]['quantity'], 3)
+        self.assertEqual(data['quote']['total_points_earned'],
+                         3 * json.loads(quote.data)['total_points_earned'])
+        data = json.loads(removed.data)
+        self.assertEqual(data['cart']['items'], [])
+        self.assertIsNone(data['quote'])
+
+    def test_cart_change_returns_cart_with_one_cart_read(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+        product_id = self.product1.id
+        # Also loads the rule index, which later quotes reuse.
+        self.client.post('/cart?return=cart', json={
+            "productId": product_id, "quantity": 1})
+        with count_queries(db.engine) as plain:
+            self.client.put(f'/cart/{product_id}', json={"quantity": 2})
+
+        # Act
+        with count_queries(db.engine) as returning:
+            self.client.put(f'/cart/{product_id}?return=cart',
+                            json={"quantity": 3})
+
+        # Assert
+        # The cart and its items with their products, and nothing else.
+        self.assertEqual(len(returning) - len(plain), 2, returning)
+
+    def test_cart_change_rejects_unknown_return_value(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+
+        # Act
+        response = self.client.post('/cart?return=points', json={
+            "productId": self.product1.id, "quantity": 1})
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(ShoppingCartTable.query.filter_by(
+            customer_id=self.customer.id).first())
+
+    def test_carts_sweep_command_deletes_abandoned_carts(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+        self.client.post('/cart', json={
+            "productId": self.product1.id, "quantity": 1})
+        db.session.query(ShoppingCartTable).update(
+            {'updated_at': datetime.utcnow() - timedelta(days=2)})
+        db.session.commit()
+        runner = self.app.test_cli_runner()
+
+        # Act
+        kept = runner.invoke(args=['carts', 'sweep'])
+        swept = runner.invoke(
+            args=['carts', 'sweep', '--ttl-seconds', '86400'])
+
+        # Assert
+        self.assertEqual(kept.exit_code, 0, kept.output)
+        self.assertIn("Swept 0 carts and 0 items", kept.output)
+        self.assertEqual(swept.exit_code, 0, swept.output)
+        self.assertIn("Swept 1 carts and 1 items in 1 batches",
+                      swept.output)
+        self.assertEqual(ShoppingCartTable.query.count(), 0)
+        self.assertEqual(self.client.get('/cart').status_code, 404)
+
+    def test_checkout_conflict_returns_409(self):
+        # Arrange
+        self.client.set_cookie('customer_id', str(self.customer.id))
+        conflicts = metrics.snapshot()['counters'].get(
+            'concurrency.conflicts.checkout', 0)
+        repository = container.resolve('loyalty_account_repository')
+
+        # Act
+        with patch.object(repository, 'checkout_transaction', side_effect=(
+                ConcurrencyConflictError("Loyalty account was changed"))):
+            response = self.client.post('/checkout')
+
+        # Assert
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.headers['Retry-After'], '1')
+        self.assertEqual(
+            metrics.snapshot()['counters']['concurrency.conflicts.checkout'],
+            conflicts + self.app.config['CONFLICT_MAX_RETRIES'] + 1)
+
     def test_remove_from_cart(self):
         # Arrange
         self.client.set_cookie('customer_id', str(self.customer.id))
@@ -0,0 +1,185 @@
+# tests/e2e/test_settlement_e2e.py
+
+import json
+import os
+import tempfile
+from datetime import date
+from tests.e2e.base_test import BaseTestCase, TestConfig
+from app import create_app, db
+from app.models.database.category import CategoryTable
+from app.models.database.customer import CustomerTable
+from app.models.database.loyalty_account import LoyaltyAccountTable
+from app.models.database.point_earning_rule import PointEarningRuleTable
+from app.models.database.point_transaction import PointTransactionTable
+from app.models.database.product import ProductTable
+from app.models.database.shopping_cart import (
+    ShoppingCartTable,
+    ShoppingCartItemTable
+)
+
+ADMIN_TOKEN = 'secret'
+
+
+class AdminTestConfig(TestConfig):
+    ADMIN_TOKEN = ADMIN_TOKEN
+
+
+class ProcessPoolAdminTestConfig(AdminTestConfig):
+    DATABASE_PATH = os.path.join(
+        tempfile.gettempdir(), 'settlement_test.db')
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + DATABASE_PATH
+
+
+class SettlementTestCase(BaseTestCase):
+    config_class = AdminTestConfig
+
+    def setUp(self):
+        self.app = create_app(self.config_class)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.drop_all()
+        db.create_all()
+
+        books = CategoryTable(name="Books")
+        garden = CategoryTable(name="Garden")
+        db.session.add_all([books, garden])
+        db.session.commit()
+        book = ProductTable(name="Book", price=15.99, category_id=books.id)
+        tool = ProductTable(name="Tool", price=20, category_id=garden.id)
+        db.session.add_all([book, tool, PointEarningRuleTable(
+            category_id=books.id, points_per_dollar=2,
+            start_date=date(1900, 1, 1), end_date=None)])
+        db.session.commit()
+
+        # Customer 1 buys two books, customer 2 a book and a tool without a
+        # rule, customer 3 has an empty cart and customer 4 no account.
+        self.customer_ids = []
+        for i, products in enumerate(
+                [[(book, 2)], [(book, 1), (tool, 1)], [], [(book, 1)]]):
+            customer = CustomerTable(
+                name=f"Customer {i}", email=f"customer{i}@example.com")
+            db.session.add(customer)
+            db.session.commit()
+            if i < 3:
+                db.session.add(LoyaltyAccountTable(
+                    customer_id=customer.id, points=0))
+            cart = ShoppingCartTable(customer_id=customer.id)
+            db.session.add(cart)
+            db.session.commit()
+            db.session.add_all([
+                ShoppingCartItemTable(
+                    cart_id=cart.id, product_id=product.id, quantity=quantity)
+                for product, quantity in products
+            ])
+            db.session.commit()
+            self.customer_ids.append(customer.id)
+        self.tool_id = tool.id
+        db.session.remove()
+
+    def _settle(self, **kwargs):
+        return self.client.post(
+            '/admin/settlements',
+            headers={'X-Admin-Token': ADMIN_TOKEN},
+            **kwargs)
+
+    def _assert_settled(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        results = [json.loads(line) for line in response.data.splitlines()]
+        self.assertEqual([r['customer_id'] for r in results],
+                         self.customer_ids)
+
+        book_points = int(15.99 * 2 * 1)
+        two_books_points = int(15.99 * 2 * 2)
+        self.assertEqual(results[0]['result']['total_points_earned'],
+                         two_books_points)
+        self.assertTrue(results[0]['result']['success'])
+        self.assertEqual(results[1]['result']['total_points_earned'],
+                         book_points)
+        self.assertEqual(
+            results[1]['result']['point_earning_rules_missing'],
+            [self.tool_id])
+        self.assertEqual(results[2]['error'],
+                         "Shopping cart is empty or not found")
+        self.assertEqual(results[3]['error'], "Loyalty account not found")
+
+        points = [
+            db.session.query(LoyaltyAccountTable.points).filter_by(
+                customer_id=customer_id).scalar()
+            for customer_id in self.customer_ids
+        ]
+        self.assertEqual(points, [two_books_points, book_points, 0, None])
+        self.assertEqual(db.session.query(PointTransactionTable).count(), 2)
+        # Only the successful checkout clears its cart.
+        remaining_items = db.session.query(
+            ShoppingCartTable.customer_id
+        ).join(ShoppingCartItemTable).distinct().all()
+        self.assertEqual(
+            sorted(row.customer_id for row in remaining_items),
+            [self.customer_ids[1], self.customer_ids[3]])
+
+
+class TestSettlementE2E(SettlementTestCase):
+    def test_settle_json(self):
+        # Act
+        response = self._settle(
+            json={'customer_ids': self.customer_ids},
+            query_string={'chunk_size': 2})
+
+        # Assert
+        self._assert_settled(response)
+
+    def test_settle_ndjson_stream(self):
+        # Arrange
+        body = ''.join(f"{customer_id}\n" for customer_id in self.customer_ids)
+
+        # Act
+        response = self._settle(
+            data=body, content_type='application/x-ndjson')
+
+        # Assert
+        self._assert_settled(response)
+
+    def test_settle_cli(self):
+        # Arrange
+        runner = self.app.test_cli_runner()
+        ids = ''.join(f"{customer_id}\n" for customer_id in self.customer_ids)
+
+        # Act
+        result = runner.invoke(
+            args=['settlement', 'run', '--chunk-size', '3'], input=ids)
+
+        # Assert
+        self.assertEqual(result.exit_code, 0, result.output)
+        lines = [json.loads(line) for line in result.output.splitlines()]
+        self.assertEqual([line['customer_id'] for line in lines],
+                         self.customer_ids)
+
+    def test_settle_requires_admin_token(self):
+        # Act
+        response = self.client.post(
+            '/admin/settlements',
+            headers={'X-Admin-Token': 'wrong'},
+            json={'customer_ids': self.customer_ids})
+
+        # Assert
+        self.assertEqual(response.status_code, 403)
+
+
+class TestSettlementProcessPoolE2E(SettlementTestCase):
+    config_class = ProcessPoolAdminTestConfig
+
+    def tearDown(self):
+        db.engine.dispose()
+        super().tearDown()
+        os.remove(ProcessPoolAdminTestConfig.DATABASE_PATH)
+
+    def test_settle_in_worker_processes(self):
+        # Act
+        response = self._settle(
+            json={'customer_ids': self.customer_ids},
+            query_string={'chunk_size': 1, 'workers': 2})
+
+        # Assert
+        self._assert_settled(response)
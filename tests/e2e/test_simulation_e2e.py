@@ -0,0 +1,138 @@
+# tests/e2e/test_simulation_e2e.py
+
+import json
+import os
+import tempfile
+from datetime import date, datetime, timezone
+from tests.e2e.base_test import BaseTestCase, TestConfig
+from app import create_app, db
+from app.di_container import container
+from app.models.database.category import CategoryTable
+from app.models.database.customer import CustomerTable
+from app.models.database.loyalty_account import LoyaltyAccountTable
+from app.models.database.point_earning_rule import PointEarningRuleTable
+from app.models.database.point_transaction import PointTransactionTable
+from app.models.database.product import ProductTable
+from app.models.database.shopping_cart import (
+    ShoppingCartTable,
+    ShoppingCartItemTable
+)
+
+
+class ProcessPoolTestConfig(TestConfig):
+    DATABASE_PATH = os.path.join(
+        tempfile.gettempdir(), 'simulation_test.db')
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + DATABASE_PATH
+
+
+class SimulationTestCase(BaseTestCase):
+    config_class = TestConfig
+
+    def setUp(self):
+        self.app = create_app(self.config_class)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.drop_all()
+        db.create_all()
+
+        books = CategoryTable(name="Books")
+        garden = CategoryTable(name="Garden")
+        db.session.add_all([books, garden])
+        db.session.commit()
+        book = ProductTable(name="Book", price=15.99, category_id=books.id)
+        tool = ProductTable(name="Tool", price=20, category_id=garden.id)
+        db.session.add_all([book, tool, PointEarningRuleTable(
+            category_id=books.id, points_per_dollar=2,
+            start_date=date(1900, 1, 1), end_date=None)])
+        db.session.commit()
+        self.books_id = books.id
+        self.garden_id = garden.id
+
+        customer = CustomerTable(name="Customer", email="c@example.com")
+        db.session.add(customer)
+        db.session.commit()
+        db.session.add(LoyaltyAccountTable(customer_id=customer.id, points=0))
+        cart = ShoppingCartTable(customer_id=customer.id)
+        db.session.add(cart)
+        db.session.commit()
+        db.session.add_all([
+            ShoppingCartItemTable(
+                cart_id=cart.id, product_id=book.id, quantity=3),
+            ShoppingCartItemTable(
+                cart_id=cart.id, product_id=tool.id, quantity=1),
+        ])
+        db.session.commit()
+        customer_id = customer.id
+        db.session.remove()
+
+        list(container.resolve('settlement_service').settle([customer_id]))
+        db.session.remove()
+
+    def _simulate(self, *args):
+        runner = self.app.test_cli_runner()
+        today = datetime.now(timezone.utc).date().isoformat()
+        rules = json.dumps([
+            {'category_id': self.garden_id, 'points_per_dollar': 1,
+             'start_date': '2000-01-01'},
+            {'rule_type': 'multiplier', 'multiplier': 2.0,
+             'start_date': '2000-01-01'},
+        ])
+        result = runner.invoke(args=[
+            'rules', 'simulate', '-', '--start-date', today,
+            '--end-date', today, *args], input=rules)
+        self.assertEqual(result.exit_code, 0, result.output)
+        return json.loads(result.output)
+
+    def _assert_report(self, report):
+        book_points = int(15.99 * 2 * 3)
+        self.assertEqual(report['transaction_count'], 1)
+        self.assertEqual(report['actual_points'], book_points)
+        # The tool earned nothing, so it is not in the ledger to replay.
+        self.assertEqual(report['simulated_points'], int(15.99 * 2 * 3 * 2.0))
+        self.assertEqual(
+            [(category['category_id'], category['delta'])
+             for category in report['categories']],
+            [(self.books_id, int(15.99 * 2 * 3 * 2.0) - book_points)])
+        self.assertEqual(len(report['days']), 1)
+
+
+class TestSimulationE2E(SimulationTestCase):
+    def test_settlement_records_quantities(self):
+        # Assert
+        self.assertEqual(
+            db.session.query(PointTransactionTable.quantity).scalar(), 3)
+
+    def test_simulate_cli(self):
+        # Act
+        report = self._simulate()
+
+        # Assert
+        self._assert_report(report)
+
+    def test_simulate_cli_rejects_invalid_rules(self):
+        # Arrange
+        runner = self.app.test_cli_runner()
+
+        # Act
+        result = runner.invoke(args=[
+            'rules', 'simulate', '-', '--start-date', '2024-01-01',
+            '--end-date', '2024-01-31'], input='[{"rule_type": "tier"}]')
+
+        # Assert
+        self.assertNotEqual(result.exit_code, 0)
+
+
+class TestSimulationProcessPoolE2E(SimulationTestCase):
+    config_class = ProcessPoolTestConfig
+
+    def tearDown(self):
+        db.engine.dispose()
+        super().tearDown()
+        os.remove(ProcessPoolTestConfig.DATABASE_PATH)
+
+    def test_simulate_in_worker_processes(self):
+        # Act
+        report = self._simulate('--workers', '2')
+
+        # Assert
+        self._assert_report(report)
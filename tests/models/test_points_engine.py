@@ -0,0 +1,246 @@
+# tests/models/test_points_engine.py
+import random
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from app.models.domain.point_earning_rule import (
+    PointEarningRule,
+    PointEarningRuleTimeline
+)
+from app.models.domain.points_engine import PointsEngine, RuleTable
+
+SEEDS = range(50)
+
+
+def _scalar_points(lines, rules_by_category, current_date):
+    """The reference implementation: the per-line loop of the checkout."""
+    total = 0
+    points, missing_product, missing_category, missing_rule = [], [], [], []
+    for index, (price, quantity, category_id, product_exists) in \
+            enumerate(lines):
+        if not product_exists:
+            missing_product.append(index)
+            continue
+        if not category_id:
+            missing_category.append(index)
+            continue
+        timeline = rules_by_category.get(category_id)
+        rule = timeline.find(current_date) if timeline else None
+        if not rule:
+            missing_rule.append(index)
+            continue
+        earned = int(price * rule.points_per_dollar * quantity)
+        total += earned
+        points.append((index, earned))
+    return total, points, missing_product, missing_category, missing_rule
+
+
+def _random_case(rng):
+    today = date(2024, 6, 1)
+    categories = list(range(1, rng.randint(2, 40)))
+    rules_by_category = {}
+    for category_id in categories:
+        rules = []
+        for rule_id in range(rng.randint(0, 3)):
+            start = today + timedelta(days=rng.randint(-30, 30))
+            end = (None if rng.random() < 0.3
+                   else start + timedelta(days=rng.randint(0, 60)))
+            rules.append(PointEarningRule(
+                id=rule_id, category=None, category_id=category_id,
+                points_per_dollar=rng.randint(0, 100),
+                start_date=start, end_date=end))
+        rules_by_category[category_id] = PointEarningRuleTimeline(rules)
+
+    lines = []
+    for _ in range(rng.randint(0, 500)):
+        price = rng.choice([
+            round(rng.uniform(0, 1000), 2),
+            rng.uniform(0, 1e6),
+            rng.choice([0.1, 0.7, 15.99, 19.99, 0.29, 1e-9]),
+        ])
+        lines.append((
+            price,
+            rng.randint(1, 10000),
+            rng.choice(categories + [0, max(categories) + 1]),
+            rng.random() > 0.05
+        ))
+    return lines, rules_by_category, today
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_compute_matches_scalar_formula(seed):
+    # Arrange
+    rng = random.Random(seed)
+    lines, rules_by_category, current_date = _random_case(rng)
+    expected = _scalar_points(lines, rules_by_category, current_date)
+
+    # Act
+    breakdown = PointsEngine.compute(
+        price=np.array([line[0] for line in lines], dtype=np.float64),
+        quantity=np.array([line[1] for line in lines], dtype=np.int64),
+        category_id=np.array([line[2] for line in lines], dtype=np.int64),
+        rule_table=RuleTable.from_timelines(rules_by_category, current_date),
+        missing_product=np.array([not line[3] for line in lines], dtype=bool)
+    )
+
+    # Assert
+    total, points, missing_product, missing_category, missing_rule = \
+        expected
+    assert breakdown.total == total
+    earned = np.flatnonzero(breakdown.earned).tolist()
+    assert list(zip(earned, breakdown.points[earned].tolist())) == points
+    assert np.flatnonzero(breakdown.missing_product).tolist() == \
+        missing_product
+    assert np.flatnonzero(breakdown.missing_category).tolist() == \
+        missing_category
+    assert np.flatnonzero(breakdown.missing_rule).tolist() == missing_rule
+    assert not breakdown.points[~breakdown.earned].any()
+
+
+def test_compute_truncates_like_int():
+    # Arrange
+    rule_table = RuleTable({1: 3})
+
+    # Act
+    breakdown = PointsEngine.compute(
+        price=np.array([0.1, 15.99, 19.99]),
+        quantity=np.array([3, 1, 7]),
+        category_id=np.array([1, 1, 1]),
+        rule_table=rule_table
+    )
+
+    # Assert
+    assert breakdown.points.tolist() == [
+        int(0.1 * 3 * 3), int(15.99 * 3 * 1), int(19.99 * 3 * 7)]
+
+
+def test_compute_without_rules():
+    # Act
+    breakdown = PointsEngine.compute(
+        price=np.array([10.0]),
+        quantity=np.array([1]),
+        category_id=np.array([5]),
+        rule_table=RuleTable({})
+    )
+
+    # Assert
+    assert breakdown.total == 0
+    assert breakdown.missing_rule.tolist() == [True]
+
+
+@pytest.mark.parametrize('large_id', [8, 10 ** 12])
+def test_rule_table_lookup(large_id):
+    # Arrange
+    rule_table = RuleTable({7: 2, 3: 5, large_id: 9})
+
+    # Act
+    result = rule_table.lookup(np.array([3, 4, 7, 100, 0, large_id]))
+
+    # Assert
+    assert result.tolist() == [5, -1, 2, -1, -1, 9]
+
+
+def _modifier(rule_type, category_id=None, points_per_dollar=0, **fields):
+    return PointEarningRule(
+        id=None, category=None, category_id=category_id,
+        points_per_dollar=points_per_dollar, start_date=date(2024, 1, 1),
+        end_date=date(2024, 1, 31), rule_type=rule_type, **fields)
+
+
+def test_rule_table_stacks_base_rate_bonuses_and_multipliers():
+    # Arrange
+    timelines = {
+        None: PointEarningRuleTimeline([_modifier('rate', None, 1)]),
+        2: PointEarningRuleTimeline([_modifier('rate', 2, 3)]),
+    }
+    modifiers = [
+        _modifier('bonus', 2, 2),
+        _modifier('bonus', None, 1),
+        _modifier('multiplier', None, multiplier=2.0),
+        _modifier('multiplier', 3, multiplier=1.5),
+    ]
+
+    # Act
+    rule_table = RuleTable.from_timelines(
+        timelines, date(2024, 1, 15), modifiers)
+    expired = RuleTable.from_timelines(
+        timelines, date(2024, 2, 1), modifiers)
+
+    # Assert
+    category_ids = np.array([1, 2, 3])
+    assert rule_table.lookup(category_ids).tolist() == [2, 6, 2]
+    assert rule_table.lookup_multipliers(category_ids).tolist() == [
+        2.0, 2.0, 3.0]
+    assert expired.lookup(category_ids).tolist() == [-1, -1, -1]
+
+
+def test_compute_applies_highest_spend_tier():
+    # Arrange
+    rule_table = RuleTable({1: 1}, tiers={50.0: 1, 100.0: 2})
+
+    # Act
+    below = PointsEngine.compute(
+        np.array([10.0]), np.array([4]), np.array([1]), rule_table)
+    first = PointsEngine.compute(
+        np.array([10.0, 20.0]), np.array([4, 1]), np.array([1, 7]),
+        rule_table)
+    second = PointsEngine.compute(
+        np.array([10.0, 20.0]), np.array([4, 3]), np.array([1, 1]),
+        rule_table)
+
+    # Assert
+    assert below.points.tolist() == [40]
+    # The line without a rule does not count toward the tier.
+    assert first.points.tolist() == [40, 0]
+    assert second.points.tolist() == [120, 180]
+
+
+def test_compute_applies_multipliers_before_truncating():
+    # Arrange
+    rule_table = RuleTable({1: 3}, multipliers={1: 1.5})
+
+    # Act
+    breakdown = PointsEngine.compute(
+        np.array([19.99]), np.array([7]), np.array([1]), rule_table)
+
+    # Assert
+    assert breakdown.points.tolist() == [int(19.99 * 3 * 7 * 1.5)]
+
+
+def test_compute_caps_categories_then_order():
+    # Arrange
+    rule_table = RuleTable(
+        {1: 1, 2: 1, 3: 1}, max_points={1: 25, 2: 100},
+        order_max_points=60)
+
+    # Act
+    breakdown = PointsEngine.compute(
+        price=np.array([10.0, 10.0, 30.0, 20.0, 10.0]),
+        quantity=np.array([1, 2, 1, 1, 3]),
+        category_id=np.array([1, 2, 1, 3, 1]),
+        rule_table=rule_table
+    )
+
+    # Assert
+    assert breakdown.points.tolist() == [10, 20, 15, 15, 0]
+    assert breakdown.total == 60
+    assert breakdown.earned.all()
+
+
+def test_compute_applies_tiers_and_caps_per_order():
+    # Arrange
+    rule_table = RuleTable(
+        {1: 1}, tiers={50.0: 1}, max_points={1: 70}, order_max_points=90)
+
+    # Act
+    breakdown = PointsEngine.compute(
+        price=np.array([30.0, 10.0, 30.0, 40.0]),
+        quantity=np.array([1, 1, 1, 1]),
+        category_id=np.array([1, 1, 1, 1]),
+        rule_table=rule_table,
+        order_index=np.array([0, 1, 0, 1])
+    )
+
+    # Assert
+    # Both orders reach the tier; the category cap applies to each.
+    assert breakdown.points.tolist() == [60, 20, 10, 50]
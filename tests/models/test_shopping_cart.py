@@ -0,0 +1,60 @@
+# tests/models/test_shopping_cart.py
+from app.models.domain.product import Product
+from app.models.domain.shopping_cart import ShoppingCart, ShoppingCartItem
+
+
+def _product(id, price):
+    return Product(id=id, name=f"Product {id}", price=price, category_id=1)
+
+
+def test_items_keep_insertion_order_and_merge_by_product():
+    # Arrange
+    book, pen = _product(1, 15.99), _product(2, 0.1)
+
+    # Act
+    cart = ShoppingCart(id=1, customer_id=1, items=[
+        ShoppingCartItem(pen, 1), ShoppingCartItem(book, 2),
+        ShoppingCartItem(pen, 3)])
+    cart.add_item(book, 1)
+
+    # Assert
+    assert [(item.product.id, item.quantity) for item in cart.items] == [
+        (2, 4), (1, 3)]
+    assert 1 in cart
+    assert cart.get_item(3) is None
+
+
+def test_totals_follow_every_change():
+    # Arrange
+    book, pen = _product(1, 15.99), _product(2, 0.1)
+    cart = ShoppingCart(id=1, customer_id=1)
+
+    # Act & Assert
+    for _ in range(10):
+        cart.add_item(pen, 1)
+    cart.add_item(book, 2)
+    assert (cart.subtotal, cart.item_count) == (32.98, 12)
+
+    cart.update_item_quantity(book.id, 1)
+    cart.get_item(pen.id).quantity = 5
+    assert (cart.subtotal, cart.item_count) == (16.49, 6)
+
+    cart.remove_item(pen.id)
+    assert (cart.subtotal, cart.item_count) == (15.99, 1)
+
+    cart.clear()
+    assert (cart.subtotal, cart.item_count, cart.items) == (0, 0, [])
+
+
+def test_removed_item_no_longer_changes_the_cart():
+    # Arrange
+    cart = ShoppingCart(id=1, customer_id=1)
+    cart.add_item(_product(1, 2.5), 2)
+    item = cart.get_item(1)
+    cart.remove_item(1)
+
+    # Act
+    item.quantity = 10
+
+    # Assert
+    assert (cart.subtotal, cart.item_count) == (0, 0)
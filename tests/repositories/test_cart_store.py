@@ -0,0 +1,250 @@
+# tests/repositories/test_cart_store.py
+
+import shutil
+import tempfile
+import threading
+from unittest.mock import Mock, patch
+from tests.e2e.base_test import BaseTestCase, TestConfig
+from app import create_app, db
+from app.models.database.category import CategoryTable
+from app.models.database.customer import CustomerTable
+from app.models.database.product import ProductTable
+from app.models.database.shopping_cart import (
+    ShoppingCartTable,
+    ShoppingCartItemTable
+)
+from app.models.domain.checkout_job import CheckoutJob
+from app.repositories.cart_store import CartStore, MemoryCartStore
+from app.repositories.cart_store_server import (
+    CartStoreServer,
+    RemoteCartStore
+)
+from app.repositories.shopping_cart_repository import (
+    CartOperation,
+    ShoppingCartRepository
+)
+from app.services.checkout_job_service import CheckoutJobService
+from app.utils.metrics import metrics
+
+
+class TestMemoryCartStore(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.journal_dir = tempfile.mkdtemp()
+        self.repository = ShoppingCartRepository()
+
+        category = CategoryTable(name="Books")
+        customer = CustomerTable(name="Customer", email="c@example.com")
+        db.session.add_all([category, customer])
+        db.session.commit()
+        products = [
+            ProductTable(name=f"Book {i}", price=10, category_id=category.id)
+            for i in range(2)
+        ]
+        db.session.add_all(products)
+        db.session.commit()
+        self.customer_id = customer.id
+        self.book_id, self.other_book_id = [
+            product.id for product in products]
+        db.session.remove()
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            if store.journal is not None:
+                store.journal.close()
+        shutil.rmtree(self.journal_dir)
+        super().tearDown()
+
+    def _start_store(self):
+        store = MemoryCartStore(
+            self.app, self.repository, self.journal_dir, flush_interval=0)
+        store.start()
+        self.stores.append(store)
+        return store
+
+    def _crash(self, store):
+        # Drops the store without writing its buffered edits.
+        store.journal.close()
+        store.journal = None
+
+    def _quantities(self):
+        quantities = self.repository.find_item_quantities(self.customer_id)
+        db.session.remove()
+        return quantities
+
+    def test_edits_are_written_in_one_flush(self):
+        # Arrange
+        store = self._start_store()
+
+        # Act
+        for _ in range(3):
+            store.add_item(self.customer_id, self.book_id, 1)
+        store.add_item(self.customer_id, self.other_book_id, 2)
+        store.remove_item(self.customer_id, self.other_book_id)
+        buffered = self._quantities()
+        flushed = store.flush()
+
+        # Assert
+        self.assertEqual(buffered, {})
+        self.assertEqual(flushed, 1)
+        self.assertEqual(self._quantities(), {self.book_id: 3})
+        self.assertEqual(db.session.query(ShoppingCartTable.version).scalar(),
+                         2)
+
+    def test_operations_are_applied_to_one_loaded_cart(self):
+        # Arrange
+        store = self._start_store()
+        store.add_item(self.customer_id, self.book_id, 1)
+        store.flush()
+        misses = metrics.snapshot()['counters'].get('cart_store.misses', 0)
+
+        # Act
+        store.apply_operations(self.customer_id, [
+            CartOperation(CartOperation.ADD, self.other_book_id, 2),
+            CartOperation(CartOperation.UPDATE, self.other_book_id, 5),
+            CartOperation(CartOperation.REMOVE, self.book_id),
+            CartOperation(CartOperation.UPDATE, self.book_id, 3)
+        ])
+        store.flush()
+
+        # Assert
+        self.assertEqual(
+            metrics.snapshot()['counters'].get('cart_store.misses', 0),
+            misses)
+        self.assertEqual(self._quantities(), {self.other_book_id: 5})
+
+    def test_edits_survive_a_restart(self):
+        # Arrange
+        store = self._start_store()
+        store.add_item(self.customer_id, self.book_id, 2)
+        store.flush()
+        store.clear(self.customer_id)
+        store.add_item(self.customer_id, self.other_book_id, 1)
+        store.update_item_quantity(self.customer_id, self.other_book_id, 4)
+        self._crash(store)
+
+        # Act
+        self._start_store()
+
+        # Assert
+        self.assertEqual(self._quantities(), {self.other_book_id: 4})
+
+    def test_released_carts_are_not_replayed(self):
+        # Arrange
+        store = self._start_store()
+        store.add_item(self.customer_id, self.book_id, 2)
+        store.release([self.customer_id])
+        # A checkout empties the cart in the database.
+        db.session.query(ShoppingCartItemTable).delete()
+        db.session.commit()
+        self._crash(store)
+
+        # Act
+        self._start_store()
+
+        # Assert
+        self.assertEqual(self._quantities(), {})
+
+    def test_edits_after_a_queued_checkout_start_from_the_database(self):
+        # Arrange
+        store = self._start_store()
+        checkout_jobs = Mock()
+        checkout_jobs.count_queued.return_value = 0
+        checkout_jobs.enqueue.return_value = CheckoutJob(
+            id=1, customer_id=self.customer_id, status=CheckoutJob.QUEUED)
+        service = CheckoutJobService(checkout_jobs, Mock(), store)
+        store.add_item(self.customer_id, self.book_id, 2)
+        service.enqueue(self.customer_id)
+        # A worker process checks out on the database and empties the cart.
+        db.session.query(ShoppingCartItemTable).delete()
+        db.session.commit()
+
+        # Act
+        store.add_item(self.customer_id, self.book_id, 1)
+        store.flush()
+
+        # Assert
+        self.assertEqual(self._quantities(), {self.book_id: 1})
+
+    def test_stores_reject_the_same_quantities(self):
+        # Arrange
+        stores = [CartStore(self.repository), self._start_store()]
+
+        for store in stores:
+            store.add_item(self.customer_id, self.book_id, 2)
+
+            # Act & Assert
+            with self.assertRaises(ValueError):
+                store.update_item_quantity(
+                    self.customer_id, self.book_id, 0)
+            with self.assertRaises(ValueError):
+                store.add_item(self.customer_id, self.other_book_id, -5)
+            store.flush()
+            self.assertEqual(self._quantities(), {self.book_id: 2})
+            store.remove_item(self.customer_id, self.book_id)
+            store.flush()
+
+    def test_failed_flush_keeps_the_edits(self):
+        # Arrange
+        store = self._start_store()
+        store.add_item(self.customer_id, self.book_id, 2)
+
+        # Act
+        with patch.object(self.repository, 'write_changes',
+                          side_effect=RuntimeError("database is down")):
+            with self.assertRaises(RuntimeError):
+                store.flush()
+        store.add_item(self.customer_id, self.book_id, 1)
+        store.flush()
+
+        # Assert
+        self.assertEqual(self._quantities(), {self.book_id: 3})
+
+    def test_store_writes_through_when_journal_is_in_use(self):
+        # Arrange
+        self._start_store()
+
+        # Act
+        second = self._start_store()
+        second.add_item(self.customer_id, self.book_id, 2)
+
+        # Assert
+        self.assertIsNone(second.journal)
+        self.assertEqual(self._quantities(), {self.book_id: 2})
+
+    def test_remote_store_edits_the_served_store(self):
+        # Arrange
+        store = MemoryCartStore(
+            self.app, self.repository, self.journal_dir, flush_interval=0)
+        server = CartStoreServer(store, ('127.0.0.1', 0), b'secret')
+        serving = threading.Thread(target=server.serve_forever, daemon=True)
+        serving.start()
+        remote = RemoteCartStore(server.address, b'secret')
+
+        # Act
+        try:
+            remote.add_item(self.customer_id, self.book_id, 2)
+            remote.add_item(self.customer_id, self.book_id, 1)
+            flushed = remote.flush([self.customer_id])
+        finally:
+            server.stop()
+            serving.join()
+
+        # Assert
+        self.assertEqual(flushed, 1)
+        self.assertEqual(self._quantities(), {self.book_id: 3})
+
+    def test_server_store_requires_a_key(self):
+        # Arrange
+        class ServerConfig(TestConfig):
+            CART_STORE = 'server'
+            CART_STORE_AUTHKEY = None
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            create_app(ServerConfig)
+        self.app.config['CART_STORE_AUTHKEY'] = None
+        result = self.app.test_cli_runner().invoke(args=['carts', 'serve'])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn('CART_STORE_AUTHKEY', result.output)
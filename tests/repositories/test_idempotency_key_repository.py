@@ -0,0 +1,77 @@
+# tests/repositories/test_idempotency_key_repository.py
+
+from datetime import datetime, timedelta
+from tests.e2e.base_test import BaseTestCase
+from app import db
+from app.models.database.customer import CustomerTable
+from app.models.database.idempotency_key import IdempotencyKeyTable
+from app.models.domain.idempotency_key import IdempotencyKey
+from app.repositories.idempotency_key_repository import (
+    IdempotencyKeyRepository
+)
+
+
+class TestIdempotencyKeyRepository(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repository = IdempotencyKeyRepository()
+        customer = CustomerTable(name="Test Customer", email="t@example.com")
+        db.session.add(customer)
+        db.session.commit()
+        self.customer_id = customer.id
+        self.now = datetime.utcnow()
+        self.expires_at = self.now + timedelta(hours=1)
+
+    def test_reserve_claims_key_once(self):
+        # Act
+        first = self.repository.reserve(
+            self.customer_id, 'abc', self.expires_at, self.now)
+        second = self.repository.reserve(
+            self.customer_id, 'abc', self.expires_at, self.now)
+
+        # Assert
+        self.assertIsNone(first)
+        self.assertEqual(second.status, IdempotencyKey.PROCESSING)
+
+    def test_reserve_takes_over_stale_key(self):
+        # Arrange
+        self.repository.reserve(
+            self.customer_id, 'abc', self.expires_at, self.now)
+
+        # Act
+        result = self.repository.reserve(
+            self.customer_id, 'abc', self.expires_at,
+            self.now + timedelta(minutes=5))
+
+        # Assert
+        self.assertIsNone(result)
+
+    def test_complete_stores_response(self):
+        # Arrange
+        self.repository.reserve(
+            self.customer_id, 'abc', self.expires_at, self.now)
+
+        # Act
+        self.repository.complete(self.customer_id, 'abc', 200, '{}')
+
+        # Assert
+        stored = self.repository.find_by_key(self.customer_id, 'abc')
+        self.assertTrue(stored.is_completed())
+        self.assertEqual(stored.status_code, 200)
+        self.assertEqual(stored.response_body, '{}')
+
+    def test_purge_expired_deletes_in_batches(self):
+        # Arrange
+        for i in range(5):
+            self.repository.reserve(
+                self.customer_id, f"old-{i}", self.now, self.now)
+        self.repository.reserve(
+            self.customer_id, 'new', self.expires_at, self.now)
+
+        # Act
+        purged = self.repository.purge_expired(self.now, batch_size=2)
+
+        # Assert
+        self.assertEqual(purged, 5)
+        keys = [row.key for row in db.session.query(IdempotencyKeyTable)]
+        self.assertEqual(keys, ['new'])
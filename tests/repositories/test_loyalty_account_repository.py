@@ -0,0 +1,312 @@
+# tests/repositories/test_loyalty_account_repository.py
+
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from tests.e2e.base_test import BaseTestCase, TestConfig, count_queries
+from app import create_app, db
+from app.models.database.category import CategoryTable
+from app.models.database.customer import CustomerTable
+from app.models.database.loyalty_account import LoyaltyAccountTable
+from app.models.database.point_earning_rule import PointEarningRuleTable
+from app.models.database.point_transaction import PointTransactionTable
+from app.models.database.product import ProductTable
+from app.models.database.shopping_cart import (
+    ShoppingCartTable,
+    ShoppingCartItemTable
+)
+from app.repositories.loyalty_account_repository import (
+    SETTLEMENT_CONFLICT,
+    LoyaltyAccountRepository
+)
+from app.utils.exceptions import ConcurrencyConflictError
+from app.utils.metrics import metrics
+from app.utils.tracing import trace
+from sqlalchemy import update
+
+
+class TestLoyaltyAccountRepository(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repository = LoyaltyAccountRepository()
+
+        self.books = CategoryTable(name="Books")
+        self.garden = CategoryTable(name="Garden")
+        db.session.add_all([self.books, self.garden])
+        db.session.commit()
+
+        self.customer = CustomerTable(
+            name="Test Customer", email="test@example.com")
+        db.session.add(self.customer)
+        db.session.commit()
+
+        self.loyalty_account = LoyaltyAccountTable(
+            customer_id=self.customer.id, points=0)
+        self.cart = ShoppingCartTable(customer_id=self.customer.id)
+        db.session.add_all([self.loyalty_account, self.cart])
+        db.session.add(PointEarningRuleTable(
+            category_id=self.books.id,
+            points_per_dollar=2,
+            start_date=date(1900, 1, 1),
+            end_date=None
+        ))
+        db.session.commit()
+        self.customer_id = self.customer.id
+        self.loyalty_account_id = self.loyalty_account.id
+        self.cart_id = self.cart.id
+        self.books_id = self.books.id
+        self.garden_id = self.garden.id
+        self.repository.rule_index.rebuild()
+
+    def _add_products(self, count, category_id, price=10.0):
+        products = [
+            ProductTable(name=f"Product {i}", price=price,
+                         category_id=category_id)
+            for i in range(count)
+        ]
+        db.session.add_all(products)
+        db.session.commit()
+        db.session.add_all([
+            ShoppingCartItemTable(
+                cart_id=self.cart_id, product_id=product.id, quantity=1)
+            for product in products
+        ])
+        db.session.commit()
+        return [product.id for product in products]
+
+    def _checkout(self):
+        db.session.remove()
+        return self.repository.checkout_transaction(self.customer_id)
+
+    def test_checkout_transaction_breakdown(self):
+        # Arrange
+        book_id, = self._add_products(1, self.books_id, price=15.99)
+        tool_id, = self._add_products(1, self.garden_id)
+        db.session.add(ShoppingCartItemTable(
+            cart_id=self.cart_id, product_id=9999, quantity=1))
+        db.session.commit()
+
+        # Act
+        result = self._checkout()
+
+        # Assert
+        self.assertEqual(result['totalPointsEarned'], int(15.99 * 2 * 1))
+        self.assertEqual(result['invalidProducts'], [9999])
+        self.assertEqual(result['productsMissingCategory'], [])
+        self.assertEqual(result['pointEarningRulesMissing'], [tool_id])
+        account = db.session.get(LoyaltyAccountTable, self.loyalty_account_id)
+        self.assertEqual(account.points, int(15.99 * 2 * 1))
+        transactions = db.session.query(PointTransactionTable).all()
+        self.assertEqual([t.product_id for t in transactions], [book_id])
+        # Lines that could not be priced keep the cart in place.
+        self.assertEqual(db.session.query(ShoppingCartItemTable).count(), 3)
+
+    def test_checkout_transaction_clears_settled_cart(self):
+        # Arrange
+        self._add_products(2, self.books_id)
+
+        # Act
+        result = self._checkout()
+
+        # Assert
+        self.assertEqual(result['totalPointsEarned'], 40)
+        self.assertEqual(db.session.query(ShoppingCartItemTable).count(), 0)
+        self.assertEqual(db.session.query(PointTransactionTable).count(), 2)
+
+    def test_checkout_transaction_query_count_is_constant(self):
+        # Arrange
+        # The garden products have no rule, so the cart is never cleared.
+        self._add_products(1, self.books_id)
+        self._add_products(1, self.garden_id)
+        with count_queries(db.engine) as small_cart:
+            self._checkout()
+
+        self._add_products(50, self.books_id)
+        self._add_products(10, self.garden_id)
+
+        # Act
+        with count_queries(db.engine) as large_cart:
+            self._checkout()
+
+        # Assert
+        self.assertEqual(len(large_cart), len(small_cart))
+
+    def test_checkout_transaction_conflicts_with_concurrent_change(self):
+        # Arrange
+        self._add_products(1, self.books_id)
+        price_cart_lines = self.repository._price_cart_lines
+
+        def price_and_change_account(*args):
+            # Stands in for a checkout of the same account committed while
+            # this one was pricing the cart.
+            db.session.execute(update(LoyaltyAccountTable).values(
+                version=LoyaltyAccountTable.version + 1))
+            return price_cart_lines(*args)
+
+        self.repository._price_cart_lines = price_and_change_account
+
+        # Act & Assert
+        with self.assertRaises(ConcurrencyConflictError):
+            self._checkout()
+        self.assertEqual(db.session.query(PointTransactionTable).count(), 0)
+        account = db.session.get(LoyaltyAccountTable, self.loyalty_account_id)
+        self.assertEqual(account.points, 0)
+
+    def test_checkout_transaction_bumps_account_and_cart_versions(self):
+        # Arrange
+        self._add_products(1, self.books_id)
+        account_version = db.session.get(
+            LoyaltyAccountTable, self.loyalty_account_id).version
+        cart_version = db.session.get(ShoppingCartTable, self.cart_id).version
+
+        # Act
+        self._checkout()
+
+        # Assert
+        self.assertEqual(db.session.get(
+            LoyaltyAccountTable, self.loyalty_account_id).version,
+            account_version + 1)
+        self.assertEqual(db.session.get(
+            ShoppingCartTable, self.cart_id).version, cart_version + 1)
+
+    def _settle_while_changing(self, table):
+        """Settles the cart while a concurrent change bumps `table`."""
+        price_cart_lines = self.repository._price_cart_lines
+
+        def price_and_change(*args):
+            # Stands in for a change committed while the settlement was
+            # pricing the cart.
+            db.session.execute(update(table).values(
+                version=table.version + 1))
+            return price_cart_lines(*args)
+
+        self.repository._price_cart_lines = price_and_change
+        db.session.remove()
+        return self.repository.settle_carts(
+            [self.customer_id], self.repository.load_product_map())
+
+    def test_settle_carts_skips_carts_changed_concurrently(self):
+        # Arrange
+        self._add_products(2, self.books_id)
+
+        # Act
+        cart_changed = self._settle_while_changing(ShoppingCartTable)
+        account_changed = self._settle_while_changing(LoyaltyAccountTable)
+
+        # Assert
+        self.assertEqual(cart_changed[self.customer_id], SETTLEMENT_CONFLICT)
+        self.assertEqual(account_changed[self.customer_id],
+                         SETTLEMENT_CONFLICT)
+        self.assertEqual(db.session.query(PointTransactionTable).count(), 0)
+        self.assertEqual(db.session.query(ShoppingCartItemTable).count(), 2)
+        account = db.session.get(LoyaltyAccountTable, self.loyalty_account_id)
+        self.assertEqual(account.points, 0)
+
+    def test_settle_carts_bumps_account_and_cart_versions(self):
+        # Arrange
+        self._add_products(2, self.books_id)
+        account_version = db.session.get(
+            LoyaltyAccountTable, self.loyalty_account_id).version
+        cart_version = db.session.get(ShoppingCartTable, self.cart_id).version
+        db.session.remove()
+
+        # Act
+        outcomes = self.repository.settle_carts(
+            [self.customer_id], self.repository.load_product_map())
+
+        # Assert
+        self.assertEqual(outcomes[self.customer_id]['totalPointsEarned'], 40)
+        account = db.session.get(LoyaltyAccountTable, self.loyalty_account_id)
+        self.assertEqual(account.points, 40)
+        self.assertEqual(account.version, account_version + 1)
+        self.assertEqual(db.session.get(
+            ShoppingCartTable, self.cart_id).version, cart_version + 1)
+        self.assertEqual(db.session.query(ShoppingCartItemTable).count(), 0)
+
+    def test_checkout_transaction_traces_stages(self):
+        # Arrange
+        self._add_products(3, self.books_id)
+
+        # Act
+        with trace('checkout') as root:
+            self._checkout()
+
+        # Assert
+        transaction, = root.children
+        self.assertEqual(
+            [stage.name for stage in transaction.children],
+            ['load_account', 'load_cart', 'rules', 'points', 'ledger',
+             'balance', 'commit'])
+        rows = {stage.name: stage.attributes.get('rows')
+                for stage in transaction.children}
+        self.assertEqual(
+            (rows['load_cart'], rows['points'], rows['ledger']), (3, 3, 3))
+        self.assertIn('checkout.checkout_transaction.commit.seconds',
+                      metrics.snapshot()['histograms'])
+
+    def test_checkout_transaction_empty_cart(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            self._checkout()
+
+
+class FileDatabaseTestConfig(TestConfig):
+    """Uses a file database so that every thread gets its own connection."""
+    DATABASE_PATH = os.path.join(
+        tempfile.gettempdir(), 'loyalty_concurrency_test.db')
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + DATABASE_PATH
+
+
+class TestLoyaltyAccountRepositoryConcurrency(unittest.TestCase):
+    INCREMENTS = 400
+
+    def setUp(self):
+        self.app = create_app(FileDatabaseTestConfig)
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            customer = CustomerTable(
+                name="Test Customer", email="test@example.com")
+            db.session.add(customer)
+            db.session.commit()
+            account = LoyaltyAccountTable(customer_id=customer.id, points=0)
+            db.session.add(account)
+            db.session.commit()
+            self.loyalty_account_id = account.id
+        self.repository = LoyaltyAccountRepository()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.engine.dispose()
+        os.remove(FileDatabaseTestConfig.DATABASE_PATH)
+
+    def _increment(self, _):
+        with self.app.app_context():
+            return self.repository.increment_points(
+                self.loyalty_account_id, 1)
+
+    def test_parallel_increments_are_not_lost(self):
+        # Act
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            balances = list(executor.map(
+                self._increment, range(self.INCREMENTS)))
+
+        # Assert
+        self.assertEqual(sorted(balances),
+                         list(range(1, self.INCREMENTS + 1)))
+        with self.app.app_context():
+            account = db.session.get(
+                LoyaltyAccountTable, self.loyalty_account_id)
+            self.assertEqual(account.points, self.INCREMENTS)
+
+    def test_add_points_returns_new_balance(self):
+        # Act
+        with self.app.app_context():
+            account = self.repository.add_points(self.loyalty_account_id, 5)
+            missing = self.repository.add_points(9999, 5)
+
+        # Assert
+        self.assertEqual(account.points, 5)
+        self.assertIsNone(missing)
@@ -0,0 +1,126 @@
+# tests/repositories/test_point_daily_rollup_repository.py
+
+from datetime import date, datetime
+from tests.e2e.base_test import BaseTestCase, count_queries
+from app import db
+from app.models.database.category import CategoryTable
+from app.models.database.customer import CustomerTable
+from app.models.database.loyalty_account import LoyaltyAccountTable
+from app.models.database.point_daily_rollup import PointDailyRollupTable
+from app.models.database.point_transaction import PointTransactionTable
+from app.models.database.product import ProductTable
+from app.repositories.point_daily_rollup_repository import (
+    PointDailyRollupRepository
+)
+
+
+class TestPointDailyRollupRepository(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repository = PointDailyRollupRepository()
+        category = CategoryTable(name="Books")
+        customers = [
+            CustomerTable(name=f"Customer {i}", email=f"c{i}@example.com")
+            for i in range(3)
+        ]
+        db.session.add(category)
+        db.session.add_all(customers)
+        db.session.commit()
+        product = ProductTable(name="Book", price=10,
+                               category_id=category.id)
+        accounts = [
+            LoyaltyAccountTable(customer_id=customer.id, points=0)
+            for customer in customers
+        ]
+        db.session.add(product)
+        db.session.add_all(accounts)
+        db.session.commit()
+        self.product_id = product.id
+        self.account_ids = [account.id for account in accounts]
+
+    def _ledger_row(self, account_id, points, transaction_date):
+        return {
+            'loyalty_account_id': account_id,
+            'product_id': self.product_id,
+            'points_earned': points,
+            'transaction_date': transaction_date
+        }
+
+    def _rollups(self):
+        return [
+            (rollup.loyalty_account_id, rollup.day, rollup.points_earned,
+             rollup.transaction_count)
+            for rollup in db.session.query(PointDailyRollupTable).order_by(
+                PointDailyRollupTable.loyalty_account_id,
+                PointDailyRollupTable.day)
+        ]
+
+    def test_add_ledger_rows_sums_per_account_and_day(self):
+        # Arrange
+        account_id = self.account_ids[0]
+        rows = [
+            self._ledger_row(account_id, hour + 1, datetime(2024, 1, 1, hour))
+            for hour in range(24)
+        ] + [self._ledger_row(account_id, 7, datetime(2024, 1, 2, 9))]
+
+        # Act
+        with count_queries(db.engine) as statements:
+            written = self.repository.add_ledger_rows(rows)
+        self.repository.add_ledger_rows(
+            [self._ledger_row(account_id, 3, datetime(2024, 1, 2, 18))])
+        db.session.commit()
+
+        # Assert
+        self.assertEqual(written, 2)
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(self._rollups(), [
+            (account_id, date(2024, 1, 1), sum(range(1, 25)), 24),
+            (account_id, date(2024, 1, 2), 10, 2)
+        ])
+
+    def test_find_by_loyalty_account_id_filters_days(self):
+        # Arrange
+        account_id, other_account_id = self.account_ids[:2]
+        self.repository.add_ledger_rows([
+            self._ledger_row(account_id, 1, datetime(2024, 1, 1)),
+            self._ledger_row(account_id, 2, datetime(2024, 1, 5)),
+            self._ledger_row(account_id, 4, datetime(2024, 2, 1)),
+            self._ledger_row(other_account_id, 8, datetime(2024, 1, 5))
+        ])
+        db.session.commit()
+
+        # Act
+        rollups = self.repository.find_by_loyalty_account_id(
+            account_id, date(2024, 1, 1), date(2024, 1, 31))
+
+        # Assert
+        self.assertEqual([(r.day, r.points_earned) for r in rollups],
+                         [(date(2024, 1, 1), 1), (date(2024, 1, 5), 2)])
+
+    def test_rebuild_matches_ledger(self):
+        # Arrange
+        db.session.add_all([
+            PointTransactionTable(
+                loyalty_account_id=account_id, product_id=self.product_id,
+                points_earned=points,
+                transaction_date=datetime(2024, 3, day, 12))
+            for account_id in self.account_ids
+            for day, points in ((1, 5), (1, 6), (2, 7))
+        ])
+        stale = PointDailyRollupTable(
+            loyalty_account_id=self.account_ids[0], day=date(2024, 3, 9),
+            points_earned=99, transaction_count=1)
+        db.session.add(stale)
+        db.session.commit()
+
+        # Act
+        written = self.repository.rebuild(batch_size=2)
+
+        # Assert
+        self.assertEqual(written, 6)
+        self.assertEqual(self._rollups(), [
+            (account_id, day, points, count)
+            for account_id in self.account_ids
+            for day, points, count in ((date(2024, 3, 1), 11, 2),
+                                       (date(2024, 3, 2), 7, 1))
+        ])
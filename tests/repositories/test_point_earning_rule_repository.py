@@ -0,0 +1,216 @@
+# tests/repositories/test_point_earning_rule_repository.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import numpy as np
+from tests.e2e.base_test import BaseTestCase
+from app import db
+from app.mappers.point_earning_rule_mapper import PointEarningRuleMapper
+from app.models.database.category import CategoryTable
+from app.models.database.point_earning_rule import PointEarningRuleTable
+from app.models.domain.point_earning_rule import PointEarningRule
+from app.repositories.point_earning_rule_index import PointEarningRuleIndex
+from app.repositories.point_earning_rule_repository import (
+    PointEarningRuleRepository
+)
+
+
+def make_rule(id, points_per_dollar, start_date, end_date=None):
+    return PointEarningRule(
+        id=id, category=None, category_id=1,
+        points_per_dollar=points_per_dollar,
+        start_date=start_date, end_date=end_date)
+
+
+def test_find_active_rule_first_rule_wins_on_overlap():
+    # Arrange
+    rules = [
+        make_rule(1, 2, date(2024, 3, 1), date(2024, 3, 31)),
+        make_rule(2, 5, date(2024, 1, 1), None),
+    ]
+
+    # Act & Assert
+    assert PointEarningRuleMapper.find_active_rule(
+        rules, date(2023, 12, 31)) is None
+    assert PointEarningRuleMapper.find_active_rule(
+        rules, date(2024, 2, 29)).id == 2
+    assert PointEarningRuleMapper.find_active_rule(
+        rules, date(2024, 3, 1)).id == 1
+    assert PointEarningRuleMapper.find_active_rule(
+        rules, date(2024, 3, 31)).id == 1
+    assert PointEarningRuleMapper.find_active_rule(
+        rules, date(2030, 1, 1)).id == 2
+
+
+def test_find_active_rule_gap_between_rules():
+    # Arrange
+    rules = [
+        make_rule(1, 1, date(2024, 1, 1), date(2024, 1, 31)),
+        make_rule(2, 1, date(2024, 3, 1), date(2024, 3, 31)),
+    ]
+
+    # Act & Assert
+    assert PointEarningRuleMapper.find_active_rule(
+        rules, date(2024, 2, 15)) is None
+    assert PointEarningRuleMapper.find_active_rule(
+        rules, date(2024, 4, 1)) is None
+
+
+def test_concurrent_lookups_of_a_stale_index_rebuild_it_once():
+    # Arrange
+    index = PointEarningRuleIndex()
+    both_waiting = threading.Barrier(2)
+
+    def load_rules(category_ids=None):
+        # Holds the first rebuild until the second lookup found the index
+        # empty too.
+        time.sleep(0.05)
+        return []
+
+    index._load_rules = load_rules
+    index._load_modifiers = lambda: []
+
+    def lookup(_):
+        both_waiting.wait()
+        return index.timelines()
+
+    # Act
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(lookup, range(2)))
+
+    # Assert
+    assert results[0] is results[1]
+    stats = index.stats()
+    assert stats['rebuilds'] == 1
+    assert stats['misses'] == 1
+    assert stats['hits'] == 1
+
+
+class TestPointEarningRuleRepository(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repository = PointEarningRuleRepository()
+        books = CategoryTable(name="Books")
+        garden = CategoryTable(name="Garden")
+        db.session.add_all([books, garden])
+        db.session.commit()
+        self.books_id = books.id
+        self.garden_id = garden.id
+        db.session.add(PointEarningRuleTable(
+            category_id=self.books_id, points_per_dollar=1,
+            start_date=date(2024, 1, 1), end_date=None))
+        db.session.commit()
+
+    def test_lookups_are_served_from_the_index(self):
+        # Act
+        first = self.repository.find_active_rule_for_category(
+            self.books_id, date(2024, 6, 1))
+        second = self.repository.find_active_rule_for_category(
+            self.books_id, date(2024, 6, 2))
+
+        # Assert
+        self.assertEqual(first.points_per_dollar, 1)
+        self.assertIs(first, second)
+        stats = self.repository.rule_index.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['rebuilds'], 1)
+
+    def test_writes_rebuild_affected_categories(self):
+        # Arrange
+        self.repository.find_active_rule_for_category(
+            self.books_id, date(2024, 6, 1))
+
+        # Act
+        created = self.repository.create(PointEarningRule(
+            id=None, category=None, category_id=self.garden_id,
+            points_per_dollar=3, start_date=date(2024, 1, 1)))
+        garden_rule = self.repository.find_active_rule_for_category(
+            self.garden_id, date(2024, 6, 1))
+
+        created.points_per_dollar = 4
+        self.repository.update(created)
+        updated_rule = self.repository.find_active_rule_for_category(
+            self.garden_id, date(2024, 6, 1))
+
+        self.repository.delete(created.id)
+        deleted_rule = self.repository.find_active_rule_for_category(
+            self.garden_id, date(2024, 6, 1))
+
+        # Assert
+        self.assertEqual(garden_rule.points_per_dollar, 3)
+        self.assertEqual(updated_rule.points_per_dollar, 4)
+        self.assertIsNone(deleted_rule)
+        stats = self.repository.rule_index.stats()
+        self.assertEqual(stats['rebuilds'], 1)
+        self.assertEqual(stats['category_rebuilds'], 3)
+
+    def test_rule_tables_are_compiled_once_per_date_bucket(self):
+        # Arrange
+        self.repository.create(PointEarningRule(
+            id=None, category=None, category_id=None, points_per_dollar=0,
+            start_date=date(2024, 6, 1), end_date=date(2024, 6, 30),
+            rule_type='multiplier', multiplier=2.0))
+        rule_index = self.repository.rule_index
+
+        # Act
+        first = rule_index.rule_table(date(2024, 6, 1))
+        second = rule_index.rule_table(date(2024, 6, 30))
+        after = rule_index.rule_table(date(2024, 7, 1))
+
+        # Assert
+        self.assertIs(first, second)
+        self.assertEqual(
+            first.lookup_multipliers(np.array([self.books_id])).tolist(),
+            [2.0])
+        self.assertEqual(
+            after.lookup_multipliers(np.array([self.books_id])).tolist(),
+            [1.0])
+        self.assertEqual(rule_index.stats()['compiles'], 2)
+
+    def test_writes_recompile_rule_tables(self):
+        # Arrange
+        rule_index = self.repository.rule_index
+        before = rule_index.rule_table(date(2024, 6, 1))
+
+        # Act
+        self.repository.create(PointEarningRule(
+            id=None, category=None, category_id=None, points_per_dollar=2,
+            start_date=date(2024, 1, 1)))
+        self.repository.create(PointEarningRule(
+            id=None, category=None, category_id=self.books_id,
+            points_per_dollar=0, start_date=date(2024, 1, 1),
+            rule_type='cap', max_points=50))
+        after = rule_index.rule_table(date(2024, 6, 1))
+
+        # Assert
+        category_ids = np.array([self.books_id, self.garden_id])
+        self.assertEqual(before.lookup(category_ids).tolist(), [1, -1])
+        self.assertEqual(after.lookup(category_ids).tolist(), [1, 2])
+        self.assertEqual(
+            after.lookup_max_points(category_ids).tolist(), [50, -1])
+        self.assertEqual(
+            self.repository.find_active_rule_for_category(
+                self.garden_id, date(2024, 6, 1)).points_per_dollar, 2)
+
+    def test_find_by_category_returns_domain_rules(self):
+        # Act
+        books_rules = self.repository.find_by_category(self.books_id)
+        garden_rules = self.repository.find_by_category(self.garden_id)
+
+        # Assert
+        self.assertEqual(len(books_rules), 1)
+        self.assertIsInstance(books_rules[0], PointEarningRule)
+        self.assertEqual(books_rules[0].category_id, self.books_id)
+        self.assertEqual(books_rules[0].points_per_dollar, 1)
+        self.assertEqual(garden_rules, [])
+
+    def test_create_rejects_incomplete_rules(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            self.repository.create(PointEarningRule(
+                id=None, category=None, category_id=None,
+                points_per_dollar=1, start_date=date(2024, 1, 1),
+                rule_type='tier'))
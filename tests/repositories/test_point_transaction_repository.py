@@ -0,0 +1,236 @@
+# tests/repositories/test_point_transaction_repository.py
+
+import os
+import shutil
+import stat
+import tempfile
+from datetime import date, datetime
+from unittest.mock import patch
+from tests.e2e.base_test import BaseTestCase, count_queries
+from app import db
+from app.models.database.category import CategoryTable
+from app.models.database.customer import CustomerTable
+from app.models.database.loyalty_account import LoyaltyAccountTable
+from app.models.database.point_daily_rollup import PointDailyRollupTable
+from app.models.database.point_transaction import PointTransactionTable
+from app.models.database.product import ProductTable
+from app.models.domain.loyalty_account import LoyaltyAccount
+from app.models.domain.point_transaction import PointTransaction
+from app.models.domain.product import Product
+from app.repositories.point_daily_rollup_repository import (
+    PointDailyRollupRepository
+)
+from app.repositories.point_transaction_archive_store import (
+    PointTransactionArchiveStore
+)
+from app.repositories.point_transaction_repository import (
+    PointTransactionRepository
+)
+from app.utils.metrics import metrics
+
+
+class TestPointTransactionRepository(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repository = PointTransactionRepository()
+        category = CategoryTable(name="Books")
+        customer = CustomerTable(name="Test", email="test@example.com")
+        db.session.add_all([category, customer])
+        db.session.commit()
+        product = ProductTable(name="Book", price=10,
+                               category_id=category.id)
+        account = LoyaltyAccountTable(customer_id=customer.id, points=0)
+        db.session.add_all([product, account])
+        db.session.commit()
+        self.account = LoyaltyAccount(
+            id=account.id, customer_id=customer.id, points=0)
+        self.product = Product(id=product.id, name="Book", price=10,
+                               category_id=category.id)
+        metrics.reset()
+
+    def test_bulk_create_uses_one_statement(self):
+        # Arrange
+        transactions = [
+            PointTransaction(id=None, loyalty_account=self.account,
+                             product=self.product, points_earned=i,
+                             transaction_date=datetime(2024, 1, 1))
+            for i in range(100)
+        ]
+
+        # Act
+        with count_queries(db.engine) as statements:
+            inserted = self.repository.bulk_create(transactions)
+
+        # Assert
+        self.assertEqual(inserted, 100)
+        self.assertEqual(
+            len([s for s in statements if s.startswith('INSERT')]), 1)
+        self.assertEqual(db.session.query(PointTransactionTable).count(), 100)
+        snapshot = metrics.snapshot()
+        self.assertEqual(
+            snapshot['counters']['point_transactions.bulk_insert.rows'], 100)
+        self.assertEqual(snapshot['histograms'][
+            'point_transactions.bulk_insert.rows_per_second']['count'], 1)
+
+    def test_bulk_create_empty(self):
+        # Act & Assert
+        self.assertEqual(self.repository.bulk_create([]), 0)
+
+
+class TestPointTransactionArchive(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.archive_dir = tempfile.mkdtemp()
+        self.repository = PointTransactionRepository(
+            PointTransactionArchiveStore(self.archive_dir))
+        category = CategoryTable(name="Books")
+        customers = [
+            CustomerTable(name=f"Customer {i}", email=f"c{i}@example.com")
+            for i in range(2)
+        ]
+        db.session.add(category)
+        db.session.add_all(customers)
+        db.session.commit()
+        product = ProductTable(name="Book", price=10,
+                               category_id=category.id)
+        accounts = [
+            LoyaltyAccountTable(customer_id=customer.id, points=0)
+            for customer in customers
+        ]
+        db.session.add(product)
+        db.session.add_all(accounts)
+        db.session.commit()
+        self.product_id = product.id
+        self.account_ids = [account.id for account in accounts]
+
+    def tearDown(self):
+        shutil.rmtree(self.archive_dir)
+        super().tearDown()
+
+    def _add_transactions(self, *transaction_dates, account_index=0):
+        rows = [
+            {
+                'loyalty_account_id': self.account_ids[account_index],
+                'product_id': self.product_id,
+                'points_earned': 10,
+                'transaction_date': transaction_date
+            }
+            for transaction_date in transaction_dates
+        ]
+        self.repository.bulk_insert_rows(rows, commit=False)
+        PointDailyRollupRepository().add_ledger_rows(rows)
+        db.session.commit()
+
+    def test_archive_month_moves_transactions(self):
+        # Arrange
+        self._add_transactions(datetime(2024, 1, 5), datetime(2024, 1, 31, 23))
+        self._add_transactions(datetime(2024, 2, 1))
+
+        # Act
+        archive = self.repository.archive_month(date(2024, 1, 20))
+
+        # Assert
+        self.assertEqual(archive.month, date(2024, 1, 1))
+        self.assertEqual(archive.row_count, 2)
+        self.assertEqual(archive.points_earned, 20)
+        self.assertEqual(db.session.query(PointTransactionTable).count(), 1)
+        self.assertFalse(os.stat(archive.path).st_mode & stat.S_IWUSR)
+        self.assertEqual(
+            [t.transaction_date for t in self.repository.find_by_date_range(
+                datetime(2024, 1, 1), datetime(2024, 2, 28))],
+            [datetime(2024, 1, 5), datetime(2024, 1, 31, 23),
+             datetime(2024, 2, 1)])
+        history = self.repository.find_by_loyalty_account_id(
+            self.account_ids[0])
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history[0].loyalty_account.id, self.account_ids[0])
+        self.assertEqual(history[0].product.id, self.product_id)
+
+    def test_queries_skip_archives_that_cannot_match(self):
+        # Arrange
+        self._add_transactions(datetime(2024, 1, 5))
+        self._add_transactions(datetime(2024, 3, 5), account_index=1)
+        self.repository.archive_before(date(2024, 6, 1))
+
+        # Act
+        with patch.object(PointTransactionArchiveStore, 'read',
+                          wraps=PointTransactionArchiveStore.read) as read:
+            in_march = self.repository.find_by_date_range(
+                datetime(2024, 3, 1), datetime(2024, 3, 31))
+            of_first_account = self.repository.find_by_loyalty_account_id(
+                self.account_ids[0])
+
+        # Assert
+        self.assertEqual(len(in_march), 1)
+        self.assertEqual(len(of_first_account), 1)
+        self.assertEqual(read.call_count, 2)
+
+    def test_rearchiving_merges_late_transactions(self):
+        # Arrange
+        self._add_transactions(datetime(2024, 1, 5))
+        first = self.repository.archive_month(date(2024, 1, 1))
+        self._add_transactions(datetime(2024, 1, 6))
+
+        # Act
+        second = self.repository.archive_month(date(2024, 1, 1))
+
+        # Assert
+        self.assertEqual(second.row_count, 2)
+        self.assertFalse(os.path.exists(first.path))
+        self.assertEqual(len(self.repository.find_archives()), 1)
+        self.assertEqual(db.session.query(PointTransactionTable).count(), 0)
+
+    def test_archived_rollups_survive_rebuild(self):
+        # Arrange
+        self._add_transactions(datetime(2024, 1, 5), datetime(2024, 1, 5))
+        self._add_transactions(datetime(2024, 2, 5))
+        self.repository.archive_month(date(2024, 1, 1))
+
+        # Act
+        PointDailyRollupRepository().rebuild()
+
+        # Assert
+        rollups = db.session.query(PointDailyRollupTable).order_by(
+            PointDailyRollupTable.day).all()
+        self.assertEqual(
+            [(r.day, r.points_earned, r.transaction_count) for r in rollups],
+            [(date(2024, 1, 5), 20, 2), (date(2024, 2, 5), 10, 1)])
+
+    def test_archive_before_keeps_recent_months(self):
+        # Arrange
+        self._add_transactions(datetime(2023, 12, 1), datetime(2024, 2, 1),
+                               datetime(2024, 3, 1))
+
+        # Act
+        archives = self.repository.archive_before(date(2024, 3, 15))
+
+        # Assert
+        self.assertEqual([archive.month for archive in archives],
+                         [date(2023, 12, 1), date(2024, 2, 1)])
+        self.assertEqual(db.session.query(PointTransactionTable).count(), 1)
+
+    def test_iter_by_date_range_pages_and_resumes(self):
+        # Arrange
+        self._add_transactions(*[datetime(2024, 1, day) for day in (1, 2)])
+        self.repository.archive_month(date(2024, 1, 1))
+        self._add_transactions(
+            *[datetime(2024, 2, day) for day in range(1, 8)])
+        self._add_transactions(datetime(2024, 2, 3), account_index=1)
+
+        # Act
+        with count_queries(db.engine) as statements:
+            rows = list(self.repository.iter_by_date_range(
+                datetime(2024, 1, 1), datetime(2024, 2, 28), page_size=3))
+        resumed = list(self.repository.iter_by_date_range(
+            datetime(2024, 1, 1), datetime(2024, 2, 28),
+            after=(rows[4]['transaction_date'], rows[4]['id']),
+            page_size=3))
+
+        # Assert
+        keys = [(row['transaction_date'], row['id']) for row in rows]
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(
+            len([s for s in statements
+                 if 'FROM point_transactions' in s]), 3)
+        self.assertEqual(resumed, rows[5:])
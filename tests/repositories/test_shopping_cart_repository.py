@@ -0,0 +1,238 @@
+# tests/repositories/test_shopping_cart_repository.py
+
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from tests.e2e.base_test import BaseTestCase, count_queries
+from app import db
+from app.mappers.shopping_cart_mapper import ShoppingCartMapper
+from app.models.database.category import CategoryTable
+from app.models.database.customer import CustomerTable
+from app.models.database.product import ProductTable
+from app.models.database.shopping_cart import (
+    ShoppingCartTable,
+    ShoppingCartItemTable
+)
+from app.repositories.product_repository import ProductRepository
+from app.repositories.shopping_cart_repository import (
+    CartOperation,
+    ShoppingCartRepository
+)
+from app.utils.exceptions import ConcurrencyConflictError
+
+
+class TestShoppingCartRepository(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repository = ShoppingCartRepository()
+
+        category = CategoryTable(name="Books")
+        customer = CustomerTable(name="Customer", email="c@example.com")
+        db.session.add_all([category, customer])
+        db.session.commit()
+        product = ProductTable(name="Book", price=10, category_id=category.id)
+        cart = ShoppingCartTable(customer_id=customer.id)
+        db.session.add_all([product, cart])
+        db.session.commit()
+        self.customer_id = customer.id
+        self.category_id = category.id
+        self.product_id = product.id
+        self.cart_id = cart.id
+        db.session.remove()
+
+    def _read_cart(self):
+        cart = self.repository.find_by_customer_id(self.customer_id)
+        db.session.remove()
+        return cart
+
+    def _add_product(self, cart, quantity):
+        cart.add_item(
+            ProductRepository().find_by_id(self.product_id), quantity)
+        db.session.remove()
+        self.repository.update(ShoppingCartMapper.to_persistence_model(cart))
+        db.session.remove()
+
+    def test_update_bumps_version_when_only_items_change(self):
+        # Arrange
+        cart = self._read_cart()
+
+        # Act
+        self._add_product(cart, 2)
+
+        # Assert
+        updated = self._read_cart()
+        self.assertEqual(updated.version, cart.version + 1)
+        self.assertEqual([item.quantity for item in updated.items], [2])
+
+    def test_update_of_stale_cart_raises_conflict(self):
+        # Arrange
+        first = self._read_cart()
+        second = self._read_cart()
+        self._add_product(first, 2)
+
+        # Act & Assert
+        with self.assertRaises(ConcurrencyConflictError):
+            self._add_product(second, 5)
+        self.assertEqual(
+            [item.quantity for item in self._read_cart().items], [2])
+
+    def _item_quantities(self):
+        quantities = [
+            quantity for quantity, in db.session.query(
+                ShoppingCartItemTable.quantity).filter(
+                ShoppingCartItemTable.cart_id == self.cart_id)]
+        db.session.remove()
+        return quantities
+
+    def test_add_item_upserts_the_item_row(self):
+        # Act
+        self.repository.add_item(self.cart_id, self.product_id, 2)
+        self.repository.add_item(self.cart_id, self.product_id, 3)
+
+        # Assert
+        self.assertEqual(self._item_quantities(), [5])
+        self.assertEqual(self._read_cart().version, 3)
+
+    def test_cart_holds_one_row_per_product(self):
+        # Arrange
+        self.repository.add_item(self.cart_id, self.product_id, 2)
+
+        # Act & Assert
+        db.session.add(ShoppingCartItemTable(
+            cart_id=self.cart_id, product_id=self.product_id, quantity=1))
+        with self.assertRaises(IntegrityError):
+            db.session.commit()
+
+    def test_update_item_quantity_of_missing_item_keeps_version(self):
+        # Act
+        self.repository.update_item_quantity(self.cart_id, self.product_id, 4)
+
+        # Assert
+        self.assertEqual(self._item_quantities(), [])
+        self.assertEqual(self._read_cart().version, 1)
+
+    def test_apply_operations_runs_one_statement_per_operation(self):
+        # Arrange
+        operations = [
+            CartOperation(CartOperation.ADD, self.product_id, 2),
+            CartOperation(CartOperation.ADD, self.product_id, 1),
+            CartOperation(CartOperation.UPDATE, self.product_id, 5)
+        ]
+
+        # Act
+        with count_queries(db.engine) as statements:
+            changed = self.repository.apply_operations(
+                self.cart_id, operations)
+        db.session.remove()
+
+        # Assert
+        self.assertEqual(changed, 3)
+        # One statement per operation and one version bump, with no read
+        # of the cart.
+        self.assertEqual(len(statements), len(operations) + 1)
+        self.assertFalse(any(
+            statement.startswith('SELECT') for statement in statements))
+        self.assertEqual(self._item_quantities(), [5])
+        self.assertEqual(self._read_cart().version, 2)
+
+    def _fill_cart(self, count):
+        products = [
+            ProductTable(name=f"Book {i}", price=10,
+                         category_id=self.category_id)
+            for i in range(count)
+        ]
+        db.session.add_all(products)
+        db.session.commit()
+        db.session.add_all([
+            ShoppingCartItemTable(
+                cart_id=self.cart_id, product_id=product.id, quantity=1)
+            for product in products
+        ])
+        db.session.commit()
+        db.session.remove()
+
+    def test_cart_reads_do_not_depend_on_cart_size(self):
+        # Arrange
+        def read_cart():
+            with count_queries(db.engine) as statements:
+                by_customer = self.repository.find_by_customer_id(
+                    self.customer_id)
+                by_id = self.repository.get_cart_with_items(self.cart_id)
+                names = [item.product.name
+                         for cart in (by_customer, by_id)
+                         for item in cart.items]
+            db.session.remove()
+            return len(statements), len(names)
+
+        self._fill_cart(1)
+        small_cart = read_cart()
+        self._fill_cart(50)
+
+        # Act
+        large_cart = read_cart()
+
+        # Assert
+        # Per read, one query for the cart and one for its items and
+        # products.
+        self.assertEqual(small_cart, (4, 2))
+        self.assertEqual(large_cart, (4, 102))
+
+    def test_item_changes_do_not_depend_on_cart_size(self):
+        # Arrange
+        def change_item():
+            with count_queries(db.engine) as statements:
+                self.repository.add_item(self.cart_id, self.product_id, 1)
+                self.repository.update_item_quantity(
+                    self.cart_id, self.product_id, 3)
+                self.repository.remove_item(self.cart_id, self.product_id)
+            db.session.remove()
+            return len(statements)
+
+        small_cart = change_item()
+        self._fill_cart(50)
+
+        # Act
+        large_cart = change_item()
+
+        # Assert
+        self.assertEqual(large_cart, small_cart)
+        self.assertEqual(len(self._item_quantities()), 50)
+
+    def _age_cart(self, days):
+        db.session.query(ShoppingCartTable).filter(
+            ShoppingCartTable.id == self.cart_id
+        ).update({'updated_at': datetime.utcnow() - timedelta(days=days)},
+                 synchronize_session=False)
+        db.session.commit()
+
+    def test_item_changes_touch_the_cart(self):
+        # Arrange
+        self._age_cart(40)
+        cutoff = datetime.utcnow() - timedelta(days=30)
+
+        # Act
+        self.repository.add_item(self.cart_id, self.product_id, 1)
+
+        # Assert
+        self.assertEqual(self.repository.find_abandoned(cutoff, 10), [])
+
+    def test_delete_abandoned_skips_carts_changed_since_found(self):
+        # Arrange
+        self._fill_cart(3)
+        self._age_cart(40)
+        cutoff = datetime.utcnow() - timedelta(days=30)
+        abandoned = [row.id for row in
+                     self.repository.find_abandoned(cutoff, 10)]
+        self.repository.add_item(self.cart_id, self.product_id, 1)
+
+        # Act
+        kept = self.repository.delete_abandoned(abandoned, cutoff)
+        self._age_cart(40)
+        deleted = self.repository.delete_abandoned(abandoned, cutoff)
+
+        # Assert
+        self.assertEqual(abandoned, [self.cart_id])
+        self.assertEqual(kept, (0, 0))
+        self.assertEqual(deleted, (1, 4))
+        self.assertIsNone(self.repository.find_by_customer_id(
+            self.customer_id))
+        self.assertEqual(db.session.query(ShoppingCartItemTable).count(), 0)
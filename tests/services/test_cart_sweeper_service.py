@@ -0,0 +1,55 @@
+# app/tests/services/test_cart_sweeper_service.py
+import pytest
+from collections import namedtuple
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from app.services.cart_sweeper_service import CartSweeperService
+
+CartRow = namedtuple('CartRow', ['id', 'customer_id'])
+
+
+@pytest.fixture
+def cart_sweeper_service():
+    return CartSweeperService(
+        Mock(), Mock(), ttl_seconds=3600, batch_size=2)
+
+
+def test_sweep_deletes_in_batches_until_a_short_batch(cart_sweeper_service):
+    # Arrange
+    repository = cart_sweeper_service.shopping_cart_repository
+    repository.find_abandoned.side_effect = [
+        [CartRow(1, 10), CartRow(2, 20)],
+        [CartRow(3, 30)]
+    ]
+    repository.delete_abandoned.side_effect = [(2, 5), (1, 0)]
+
+    # Act
+    result = cart_sweeper_service.sweep()
+
+    # Assert
+    assert (result.carts, result.items, result.batches) == (3, 5, 2)
+    assert repository.find_abandoned.call_count == 2
+    cutoff = repository.find_abandoned.call_args[0][0]
+    assert abs(cutoff - (datetime.utcnow() - timedelta(hours=1))) < \
+        timedelta(minutes=1)
+    assert repository.delete_abandoned.call_args_list[0][0] == (
+        [1, 2], cutoff)
+
+
+def test_sweep_releases_carts_before_deleting_them(cart_sweeper_service):
+    # Arrange
+    repository = cart_sweeper_service.shopping_cart_repository
+    repository.find_abandoned.return_value = [CartRow(1, 10)]
+    calls = []
+    cart_sweeper_service.cart_store.release.side_effect = \
+        lambda customer_ids: calls.append('release')
+    repository.delete_abandoned.side_effect = \
+        lambda cart_ids, cutoff: calls.append('delete') or (1, 1)
+
+    # Act
+    cart_sweeper_service.sweep(ttl_seconds=60, batch_size=10)
+
+    # Assert
+    assert calls == ['release', 'delete']
+    repository.find_abandoned.assert_called_once()
+    assert repository.find_abandoned.call_args[0][1] == 10
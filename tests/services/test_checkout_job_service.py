@@ -0,0 +1,140 @@
+# app/tests/services/test_checkout_job_service.py
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from app.services.checkout_job_service import CheckoutJobService
+from app.models.domain.checkout_job import CheckoutJob
+from app.schemas.checkout import CheckoutResponseDto
+from app.schemas.checkout_job import CheckoutJobDto
+
+
+@pytest.fixture
+def mock_checkout_job_repository():
+    repository = Mock()
+    repository.count_queued.return_value = 0
+    return repository
+
+
+@pytest.fixture
+def mock_loyalty_service():
+    return Mock()
+
+
+@pytest.fixture
+def checkout_job_service(mock_checkout_job_repository, mock_loyalty_service):
+    return CheckoutJobService(mock_checkout_job_repository,
+                              mock_loyalty_service)
+
+
+def _checkout_response(success=True):
+    return CheckoutResponseDto(
+        total_points_earned=10,
+        invalid_products=[],
+        products_missing_category=[],
+        point_earning_rules_missing=[] if success else [1],
+        success=success
+    )
+
+
+def test_enqueue(checkout_job_service, mock_checkout_job_repository):
+    # Arrange
+    mock_checkout_job_repository.enqueue.return_value = CheckoutJob(
+        id=1, customer_id=1, status=CheckoutJob.QUEUED)
+
+    # Act
+    result = checkout_job_service.enqueue(1)
+
+    # Assert
+    assert isinstance(result, CheckoutJobDto)
+    assert result.job_id == 1
+    assert result.status == CheckoutJob.QUEUED
+    mock_checkout_job_repository.enqueue.assert_called_once_with(1)
+
+
+def test_get_job_with_result(checkout_job_service,
+                             mock_checkout_job_repository):
+    # Arrange
+    mock_checkout_job_repository.find_by_id.return_value = CheckoutJob(
+        id=1, customer_id=1, status=CheckoutJob.SUCCEEDED,
+        result=_checkout_response().model_dump_json())
+
+    # Act
+    result = checkout_job_service.get_job(1, 1)
+
+    # Assert
+    assert result.result.total_points_earned == 10
+
+
+def test_get_job_of_other_customer(checkout_job_service,
+                                   mock_checkout_job_repository):
+    # Arrange
+    mock_checkout_job_repository.find_by_id.return_value = CheckoutJob(
+        id=1, customer_id=2, status=CheckoutJob.QUEUED)
+
+    # Act
+    result = checkout_job_service.get_job(1, 1)
+
+    # Assert
+    assert result is None
+
+
+def test_claim_next(checkout_job_service, mock_checkout_job_repository):
+    # Arrange
+    created_at = datetime.utcnow()
+    mock_checkout_job_repository.claim_next.return_value = CheckoutJob(
+        id=1, customer_id=1, status=CheckoutJob.RUNNING,
+        created_at=created_at, started_at=created_at + timedelta(seconds=1))
+
+    # Act
+    result = checkout_job_service.claim_next()
+
+    # Assert
+    assert result.id == 1
+    mock_checkout_job_repository.count_queued.assert_called_once()
+
+
+def test_execute_succeeds(checkout_job_service, mock_checkout_job_repository,
+                          mock_loyalty_service):
+    # Arrange
+    mock_loyalty_service.checkout.return_value = _checkout_response()
+
+    # Act
+    result = checkout_job_service.execute(1, 2)
+
+    # Assert
+    assert result == CheckoutJob.SUCCEEDED
+    mock_loyalty_service.checkout.assert_called_once_with(2)
+    mock_checkout_job_repository.finish.assert_called_once_with(
+        1, CheckoutJob.SUCCEEDED,
+        result=_checkout_response().model_dump_json())
+
+
+def test_execute_records_unsuccessful_checkout(
+    checkout_job_service, mock_checkout_job_repository, mock_loyalty_service
+):
+    # Arrange
+    mock_loyalty_service.checkout.return_value = _checkout_response(
+        success=False)
+
+    # Act
+    result = checkout_job_service.execute(1, 2)
+
+    # Assert
+    assert result == CheckoutJob.SUCCEEDED
+    mock_checkout_job_repository.finish.assert_called_once_with(
+        1, CheckoutJob.SUCCEEDED,
+        result=_checkout_response(success=False).model_dump_json())
+
+
+def test_execute_fails(checkout_job_service, mock_checkout_job_repository,
+                       mock_loyalty_service):
+    # Arrange
+    mock_loyalty_service.checkout.side_effect = ValueError("Empty cart")
+
+    # Act
+    result = checkout_job_service.execute(1, 2)
+
+    # Assert
+    assert result == CheckoutJob.FAILED
+    mock_checkout_job_repository.finish.assert_called_once_with(
+        1, CheckoutJob.FAILED, error="Empty cart")
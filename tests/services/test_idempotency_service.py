@@ -0,0 +1,138 @@
+# app/tests/services/test_idempotency_service.py
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from app.services.idempotency_service import IdempotencyService
+from app.models.domain.idempotency_key import IdempotencyKey
+from app.utils.exceptions import ConflictError
+
+
+@pytest.fixture
+def mock_repository():
+    return Mock()
+
+
+@pytest.fixture
+def idempotency_service(mock_repository):
+    return IdempotencyService(
+        mock_repository,
+        ttl_seconds=3600,
+        cache_size=2,
+        processing_timeout_seconds=60
+    )
+
+
+def _stored_key(status, expires_in=3600):
+    return IdempotencyKey(
+        id=1,
+        customer_id=1,
+        key='abc',
+        status=status,
+        expires_at=datetime.utcnow() + timedelta(seconds=expires_in),
+        status_code=200,
+        response_body='{"success": true}'
+    )
+
+
+def test_begin_claims_new_key(idempotency_service, mock_repository):
+    # Arrange
+    mock_repository.reserve.return_value = None
+
+    # Act
+    result = idempotency_service.begin(1, 'abc')
+
+    # Assert
+    assert result is None
+    mock_repository.reserve.assert_called_once()
+
+
+def test_begin_replays_completed_key_from_cache(
+    idempotency_service, mock_repository
+):
+    # Arrange
+    idempotency_service.complete(1, 'abc', 200, '{"success": true}')
+
+    # Act
+    result = idempotency_service.begin(1, 'abc')
+
+    # Assert
+    assert result.is_completed()
+    assert result.response_body == '{"success": true}'
+    mock_repository.reserve.assert_not_called()
+
+
+def test_begin_replays_completed_key_from_database(
+    idempotency_service, mock_repository
+):
+    # Arrange
+    mock_repository.reserve.return_value = _stored_key(
+        IdempotencyKey.COMPLETED)
+
+    # Act
+    first = idempotency_service.begin(1, 'abc')
+    second = idempotency_service.begin(1, 'abc')
+
+    # Assert
+    assert first is second
+    mock_repository.reserve.assert_called_once()
+
+
+def test_begin_conflicts_while_processing(
+    idempotency_service, mock_repository
+):
+    # Arrange
+    mock_repository.reserve.return_value = _stored_key(
+        IdempotencyKey.PROCESSING)
+
+    # Act & Assert
+    with pytest.raises(ConflictError) as excinfo:
+        idempotency_service.begin(1, 'abc')
+    assert excinfo.value.retry_after == 1
+
+
+def test_begin_reclaims_expired_key(idempotency_service, mock_repository):
+    # Arrange
+    mock_repository.reserve.side_effect = [
+        _stored_key(IdempotencyKey.COMPLETED, expires_in=-1), None]
+
+    # Act
+    result = idempotency_service.begin(1, 'abc')
+
+    # Assert
+    assert result is None
+    mock_repository.release.assert_called_once_with(1, 'abc')
+    assert mock_repository.reserve.call_count == 2
+
+
+def test_abandon_releases_key(idempotency_service, mock_repository):
+    # Arrange
+    idempotency_service.complete(1, 'abc', 200, '{}')
+
+    # Act
+    idempotency_service.abandon(1, 'abc')
+
+    # Assert
+    mock_repository.release.assert_called_once_with(1, 'abc')
+    assert len(idempotency_service.cache) == 0
+
+
+def test_cache_evicts_least_recently_used(idempotency_service):
+    # Act
+    for key in ('a', 'b', 'c'):
+        idempotency_service.complete(1, key, 200, '{}')
+
+    # Assert
+    assert idempotency_service.cache.get((1, 'a')) is None
+    assert idempotency_service.cache.get((1, 'c')) is not None
+
+
+def test_purge_expired(idempotency_service, mock_repository):
+    # Arrange
+    mock_repository.purge_expired.return_value = 3
+
+    # Act
+    result = idempotency_service.purge_expired()
+
+    # Assert
+    assert result == 3
+    mock_repository.purge_expired.assert_called_once()
@@ -1,10 +1,15 @@
 # app/tests/services/test_loyalty_service.py
 import pytest
+from datetime import date
 from unittest.mock import Mock
 from app.services.loyalty_service import LoyaltyService
 from app.models.domain.loyalty_account import LoyaltyAccount
+from app.models.domain.point_daily_rollup import PointDailyRollup
+from app.models.domain.shopping_cart import ShoppingCart
 from app.schemas.checkout import CheckoutResponseDto
 from app.schemas.points import PointsDto
+from app.utils.exceptions import ConcurrencyConflictError
+from app.utils.metrics import metrics
 
 
 @pytest.fixture
@@ -37,6 +42,99 @@ def test_checkout(customer_id=1):
         assert_called_once_with(customer_id)
 
 
+def test_checkout_writes_buffered_cart_changes_first(customer_id=1):
+    # Arrange
+    calls = []
+    mock_loyalty_account_repository = Mock()
+    mock_loyalty_account_repository.checkout_transaction.side_effect = \
+        lambda customer_id: calls.append('checkout') or {
+            'totalPointsEarned': 0,
+            'invalidProducts': [],
+            'productsMissingCategory': [],
+            'pointEarningRulesMissing': []
+        }
+    mock_cart_store = Mock()
+    mock_cart_store.release.side_effect = \
+        lambda customer_ids: calls.append(('release', customer_ids))
+    loyalty_service = LoyaltyService(
+        mock_loyalty_account_repository, cart_store=mock_cart_store)
+
+    # Act
+    loyalty_service.checkout(customer_id)
+
+    # Assert
+    assert calls == [('release', [customer_id]), 'checkout']
+
+
+def test_checkout_retries_conflicts(customer_id=1):
+    # Arrange
+    mock_loyalty_account_repository = Mock()
+    loyalty_service = LoyaltyService(mock_loyalty_account_repository)
+    mock_loyalty_account_repository.checkout_transaction.side_effect = [
+        ConcurrencyConflictError("conflict"),
+        {
+            'totalPointsEarned': 100,
+            'invalidProducts': [],
+            'productsMissingCategory': [],
+            'pointEarningRulesMissing': []
+        }
+    ]
+    retries = metrics.snapshot()['counters'].get(
+        'concurrency.retries.checkout', 0)
+
+    # Act
+    result = loyalty_service.checkout(customer_id)
+
+    # Assert
+    assert result.total_points_earned == 100
+    assert mock_loyalty_account_repository.checkout_transaction. \
+        call_count == 2
+    assert metrics.snapshot()['counters'][
+        'concurrency.retries.checkout'] == retries + 1
+
+
+def test_checkout_gives_up_after_max_conflict_retries(customer_id=1):
+    # Arrange
+    mock_loyalty_account_repository = Mock()
+    loyalty_service = LoyaltyService(
+        mock_loyalty_account_repository, max_conflict_retries=2)
+    mock_loyalty_account_repository.checkout_transaction.side_effect = \
+        ConcurrencyConflictError("conflict")
+
+    # Act & Assert
+    with pytest.raises(ConcurrencyConflictError):
+        loyalty_service.checkout(customer_id)
+    assert mock_loyalty_account_repository.checkout_transaction. \
+        call_count == 3
+
+
+def test_checkout_logs_stage_breakdown_of_slow_checkout(
+    caplog, customer_id=1
+):
+    # Arrange
+    mock_loyalty_account_repository = Mock()
+    loyalty_service = LoyaltyService(
+        mock_loyalty_account_repository, slow_checkout_seconds=0)
+    mock_loyalty_account_repository.checkout_transaction.return_value = {
+        'totalPointsEarned': 100,
+        'invalidProducts': [],
+        'productsMissingCategory': [],
+        'pointEarningRulesMissing': []
+    }
+    count = metrics.snapshot()['histograms'].get(
+        'checkout.response.seconds', {}).get('count', 0)
+
+    # Act
+    with caplog.at_level('WARNING', logger='app.utils.tracing'):
+        loyalty_service.checkout(customer_id)
+
+    # Assert
+    assert 'Slow checkout' in caplog.text
+    assert '  response ' in caplog.text
+    assert metrics.snapshot()['histograms'][
+        'checkout.response.seconds']['count'] == count + 1
+
+
 def test_get_customer_points_existing_account(customer_id=1):
     # Arrange
     mock_loyalty_account_repository = Mock()
@@ -67,3 +165,120 @@ def test_get_customer_points_non_existing_account(customer_id=999):
         loyalty_service.get_customer_points(customer_id)
     mock_loyalty_account_repository.find_by_customer_id. \
         assert_called_once_with(customer_id)
+
+
+def _quote_service(cart_version=(1, 1), rule_version=1):
+    mock_loyalty_account_repository = Mock()
+    mock_loyalty_account_repository.rule_index.version = rule_version
+    mock_loyalty_account_repository.quote_transaction.return_value = {
+        'totalPointsEarned': 30,
+        'invalidProducts': [],
+        'productsMissingCategory': [],
+        'pointEarningRulesMissing': []
+    }
+    mock_shopping_cart_repository = Mock()
+    mock_shopping_cart_repository.find_id_and_version_by_customer_id. \
+        return_value = cart_version
+    return LoyaltyService(mock_loyalty_account_repository,
+                          mock_shopping_cart_repository)
+
+
+def test_quote_is_cached_per_version(customer_id=1):
+    # Arrange
+    loyalty_service = _quote_service()
+
+    # Act
+    first = loyalty_service.quote(customer_id)
+    second = loyalty_service.quote(customer_id)
+
+    # Assert
+    assert first.total_points_earned == 30
+    assert second is first
+    loyalty_service.loyalty_account_repository.quote_transaction. \
+        assert_called_once_with(customer_id)
+
+
+def test_quote_is_recalculated_when_versions_change(customer_id=1):
+    # Arrange
+    loyalty_service = _quote_service()
+    repository = loyalty_service.loyalty_account_repository
+    loyalty_service.quote(customer_id)
+
+    # Act
+    loyalty_service.shopping_cart_repository. \
+        find_id_and_version_by_customer_id.return_value = (1, 2)
+    loyalty_service.quote(customer_id)
+    repository.rule_index.version = 2
+    loyalty_service.quote(customer_id)
+    # A new cart at the version of the cart it replaces.
+    loyalty_service.shopping_cart_repository. \
+        find_id_and_version_by_customer_id.return_value = (2, 2)
+    loyalty_service.quote(customer_id)
+
+    # Assert
+    assert repository.quote_transaction.call_count == 4
+
+
+def test_quote_cart_prices_the_loaded_cart(customer_id=1):
+    # Arrange
+    loyalty_service = _quote_service(cart_version=(1, 1))
+    repository = loyalty_service.loyalty_account_repository
+    repository.quote_cart.return_value = \
+        repository.quote_transaction.return_value
+    cart = ShoppingCart(id=1, customer_id=customer_id, version=1)
+
+    # Act
+    first = loyalty_service.quote_cart(cart)
+    second = loyalty_service.quote(customer_id)
+
+    # Assert
+    assert first.total_points_earned == 30
+    assert second is first
+    repository.quote_cart.assert_called_once_with(cart)
+    repository.quote_transaction.assert_not_called()
+
+
+def test_quote_without_cart(customer_id=1):
+    # Arrange
+    loyalty_service = _quote_service(cart_version=None)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Shopping cart is empty"):
+        loyalty_service.quote(customer_id)
+
+
+def test_get_daily_points(customer_id=1):
+    # Arrange
+    mock_loyalty_account_repository = Mock()
+    mock_loyalty_account_repository.find_by_customer_id.return_value = \
+        LoyaltyAccount(id=7, customer_id=customer_id, points=30)
+    mock_point_daily_rollup_repository = Mock()
+    mock_point_daily_rollup_repository.find_by_loyalty_account_id. \
+        return_value = [
+            PointDailyRollup(7, date(2024, 1, 1), 10, 1),
+            PointDailyRollup(7, date(2024, 1, 3), 20, 2)
+        ]
+    loyalty_service = LoyaltyService(
+        mock_loyalty_account_repository, Mock(),
+        mock_point_daily_rollup_repository)
+
+    # Act
+    report = loyalty_service.get_daily_points(
+        customer_id, date(2024, 1, 1), date(2024, 1, 31))
+
+    # Assert
+    assert report.total_points_earned == 30
+    assert [day.day for day in report.days] == [date(2024, 1, 1),
+                                                date(2024, 1, 3)]
+    mock_point_daily_rollup_repository.find_by_loyalty_account_id. \
+        assert_called_once_with(7, date(2024, 1, 1), date(2024, 1, 31))
+
+
+def test_get_daily_points_rejects_long_ranges(customer_id=1):
+    # Arrange
+    loyalty_service = LoyaltyService(Mock(), Mock(), Mock())
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="must not exceed"):
+        loyalty_service.get_daily_points(
+            customer_id, date(2020, 1, 1), date(2024, 1, 1))
@@ -0,0 +1,89 @@
+# app/tests/services/test_point_transaction_export_service.py
+import json
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+from app.services.point_transaction_export_service import (
+    PointTransactionExportService
+)
+
+
+def _row(id, transaction_date):
+    return {
+        'id': id,
+        'loyalty_account_id': 1,
+        'product_id': 2,
+        'points_earned': 10,
+        'transaction_date': transaction_date
+    }
+
+
+@pytest.fixture
+def export_service():
+    mock_point_transaction_repository = Mock()
+    mock_point_transaction_repository.iter_by_date_range.side_effect = \
+        lambda *args, **kwargs: iter([
+            _row(1, datetime(2024, 1, 1, 12)),
+            _row(2, datetime(2024, 1, 2, 12))
+        ])
+    return PointTransactionExportService(
+        mock_point_transaction_repository, page_size=100)
+
+
+def test_export_ndjson(export_service):
+    # Act
+    lines = ''.join(export_service.export(
+        datetime(2024, 1, 1), datetime(2024, 1, 31))).splitlines()
+
+    # Assert
+    records = [json.loads(line) for line in lines]
+    assert [record['id'] for record in records] == [1, 2]
+    assert records[0]['transaction_date'] == '2024-01-01T12:00:00'
+    assert PointTransactionExportService.decode_cursor(
+        records[1]['cursor']) == (datetime(2024, 1, 2, 12), 2)
+
+
+def test_export_csv(export_service):
+    # Act
+    lines = ''.join(export_service.export(
+        datetime(2024, 1, 1), datetime(2024, 1, 31),
+        format='csv')).splitlines()
+
+    # Assert
+    assert lines[0] == ('id,loyalty_account_id,product_id,points_earned,'
+                        'transaction_date,cursor')
+    assert lines[1].startswith('1,1,2,10,2024-01-01T12:00:00,')
+    assert len(lines) == 3
+
+
+def test_export_resumes_after_cursor(export_service):
+    # Arrange
+    cursor = PointTransactionExportService.encode_cursor(
+        datetime(2024, 1, 1, 12), 1)
+
+    # Act
+    list(export_service.export(
+        datetime(2024, 1, 1), datetime(2024, 1, 31), cursor=cursor))
+
+    # Assert
+    export_service.point_transaction_repository.iter_by_date_range. \
+        assert_called_once_with(
+            datetime(2024, 1, 1), datetime(2024, 1, 31),
+            after=(datetime(2024, 1, 1, 12), 1), page_size=100)
+
+
+@pytest.mark.parametrize('arguments', [
+    {'format': 'xml'},
+    {'cursor': 'not-a-cursor'},
+    {'end_date': datetime(2023, 12, 31)},
+])
+def test_export_rejects_invalid_arguments(export_service, arguments):
+    # Arrange
+    arguments = {'start_date': datetime(2024, 1, 1),
+                 'end_date': datetime(2024, 1, 31), **arguments}
+
+    # Act & Assert
+    with pytest.raises(ValueError):
+        export_service.export(**arguments)
+    export_service.point_transaction_repository.iter_by_date_range. \
+        assert_not_called()
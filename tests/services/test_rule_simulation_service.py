@@ -0,0 +1,117 @@
+# app/tests/services/test_rule_simulation_service.py
+import pytest
+from collections import namedtuple
+from datetime import date, datetime
+from unittest.mock import Mock
+from app.models.domain.point_earning_rule import PointEarningRule
+from app.repositories.point_transaction_archive_store import (
+    PointTransactionArchiveStore
+)
+from app.services.rule_simulation_service import RuleSimulationService
+
+ProductRow = namedtuple('ProductRow', 'id price category_id')
+
+# (loyalty_account_id, product_id, quantity, points_earned, transaction_date)
+LEDGER = [
+    (1, 10, 2, 20, datetime(2024, 1, 1, 9)),
+    (1, 20, 1, 5, datetime(2024, 1, 1, 9)),
+    (2, 10, 1, 10, datetime(2024, 1, 1, 12)),
+    (2, 30, 1, 0, datetime(2024, 1, 2, 8)),
+    (3, 10, None, 10, datetime(2024, 1, 2, 9)),
+]
+
+
+def _rule(rule_type='rate', category_id=1, points_per_dollar=1, **fields):
+    return PointEarningRule(
+        id=None, category=None, category_id=category_id,
+        points_per_dollar=points_per_dollar, start_date=date(2023, 1, 1),
+        rule_type=rule_type, **fields)
+
+
+@pytest.fixture
+def simulation_service():
+    mock_point_transaction_repository = Mock()
+    mock_point_transaction_repository.find_replay_rows.side_effect = \
+        lambda start_date, end_date: [
+            row for row in LEDGER if start_date <= row[4] < end_date]
+    mock_point_transaction_repository.find_archives.return_value = []
+    mock_point_earning_rule_repository = Mock()
+    mock_point_earning_rule_repository.find_all.return_value = [
+        _rule(category_id=1, points_per_dollar=1),
+        _rule(category_id=2, points_per_dollar=1),
+    ]
+    mock_product_repository = Mock()
+    mock_product_repository.find_price_rows.return_value = [
+        ProductRow(10, 10.0, 1),
+        ProductRow(20, 5.0, 2),
+        ProductRow(30, 7.0, None),
+    ]
+    return RuleSimulationService(
+        mock_point_transaction_repository,
+        mock_point_earning_rule_repository,
+        mock_product_repository)
+
+
+def test_simulate_adds_candidate_rules_to_current_rules(simulation_service):
+    # Act
+    report = simulation_service.simulate(
+        [_rule('bonus', category_id=1, points_per_dollar=1)],
+        date(2024, 1, 1), date(2024, 1, 2))
+
+    # Assert
+    assert report.transaction_count == 4
+    assert report.skipped_transaction_count == 1
+    assert (report.actual_points, report.simulated_points) == (35, 65)
+    assert [(category.category_id, category.actual_points,
+             category.simulated_points, category.delta)
+            for category in report.categories] == [
+        (None, 0, 0, 0), (1, 30, 60, 30), (2, 5, 5, 0)]
+    assert [(day.day, day.transaction_count, day.delta)
+            for day in report.days] == [
+        (date(2024, 1, 1), 3, 30), (date(2024, 1, 2), 1, 0)]
+
+
+def test_simulate_applies_tiers_per_order(simulation_service):
+    # Act
+    report = simulation_service.simulate(
+        [_rule(category_id=None, points_per_dollar=1),
+         _rule('tier', category_id=None, points_per_dollar=2,
+               min_spend=25.0)],
+        date(2024, 1, 1), date(2024, 1, 1), replace=True)
+
+    # Assert
+    # Only the first order, 25 dollars, reaches the tier.
+    assert [(category.category_id, category.simulated_points)
+            for category in report.categories] == [(1, 70), (2, 15)]
+
+
+def test_simulate_replays_archived_months(simulation_service, tmp_path):
+    # Arrange
+    store = PointTransactionArchiveStore(str(tmp_path))
+    path, _ = store.write(date(2023, 12, 1), [{
+        'id': 1, 'loyalty_account_id': 1, 'product_id': 10,
+        'points_earned': 30, 'transaction_date': datetime(2023, 12, 31, 9),
+        'quantity': 3
+    }])
+    simulation_service.point_transaction_repository.find_archives \
+        .return_value = [Mock(path=path)]
+
+    # Act
+    report = simulation_service.simulate(
+        [_rule(category_id=1, points_per_dollar=3)],
+        date(2023, 12, 31), date(2023, 12, 31))
+
+    # Assert
+    assert report.transaction_count == 1
+    assert (report.actual_points, report.simulated_points) == (30, 90)
+
+
+def test_simulate_rejects_invalid_arguments(simulation_service):
+    # Act & Assert
+    with pytest.raises(ValueError):
+        simulation_service.simulate(
+            [], date(2024, 1, 2), date(2024, 1, 1))
+    with pytest.raises(ValueError):
+        simulation_service.simulate(
+            [_rule('cap', max_points=None)],
+            date(2024, 1, 1), date(2024, 1, 2))
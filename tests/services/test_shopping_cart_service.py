@@ -3,17 +3,20 @@ import pytest
 from unittest.mock import Mock
 from app.services.shopping_cart_service import ShoppingCartService
 from app.models.domain.shopping_cart import ShoppingCart
-from app.models.database.shopping_cart import ShoppingCartTable
+from app.repositories.shopping_cart_repository import CartOperation
 from app.schemas.product import ProductResponseDto
+from app.schemas.shopping_cart import CartOperationDto
 
 
 @pytest.fixture
 def shopping_cart_service():
     mock_shopping_cart_repository = Mock()
     mock_product_repository = Mock()
+    mock_cart_store = Mock()
     return ShoppingCartService(
         mock_shopping_cart_repository,
-        mock_product_repository
+        mock_product_repository,
+        mock_cart_store
     )
 
 
@@ -54,31 +57,19 @@ def test_get_or_create_cart_no_existing_cart(shopping_cart_service):
 
 
 def test_clear_cart(shopping_cart_service):
-    # Arrange
-    mock_cart = ShoppingCart(id=1, customer_id=123)
-    shopping_cart_service.get_or_create_cart = Mock(return_value=mock_cart)
-
     # Act
     shopping_cart_service.clear_cart(123)
 
     # Assert
-    assert mock_cart.items == []
-    shopping_cart_service.shopping_cart_repository.update.assert_called_once()
-    cart_arg = shopping_cart_service.shopping_cart_repository.update.\
-        call_args[0][0]
-    assert isinstance(cart_arg, ShoppingCartTable)
-    assert cart_arg.id == 1
-    assert cart_arg.customer_id == 123
-    shopping_cart_service.get_or_create_cart.assert_called_once_with(123)
+    shopping_cart_service.cart_store.clear.assert_called_once_with(123)
+    shopping_cart_service.shopping_cart_repository.update.assert_not_called()
 
 
 def test_add_item(shopping_cart_service):
     # Arrange
-    mock_cart = ShoppingCart(id=1, customer_id=123)
     mock_product = ProductResponseDto(
         id=1, name="Test Product", price=100, category_id=1,
         image_url="test.jpg")
-    shopping_cart_service.get_or_create_cart = Mock(return_value=mock_cart)
     shopping_cart_service.product_repository.find_by_id = Mock(
         return_value=mock_product)
 
@@ -86,53 +77,113 @@ def test_add_item(shopping_cart_service):
     shopping_cart_service.add_item(123, 1, 2)
 
     # Assert
-    assert len(mock_cart.items) == 1
-    assert mock_cart.items[0].product == mock_product
-    assert mock_cart.items[0].quantity == 2
-    shopping_cart_service.shopping_cart_repository.update.assert_called_once()
-    cart_arg = shopping_cart_service.shopping_cart_repository.\
-        update.call_args[0][0]
-    assert isinstance(cart_arg, ShoppingCartTable)
-    assert cart_arg.id == 1
-    assert cart_arg.customer_id == 123
+    shopping_cart_service.cart_store.add_item.assert_called_once_with(
+        123, 1, 2)
+    shopping_cart_service.shopping_cart_repository.find_by_customer_id \
+        .assert_not_called()
 
 
-def test_remove_item(shopping_cart_service):
+def test_add_item_ignores_unknown_product(shopping_cart_service):
     # Arrange
-    mock_cart = ShoppingCart(id=1, customer_id=123)
-    mock_cart.add_item(Mock(id=1), 2)  # Adding an item to be removed
-    shopping_cart_service.get_or_create_cart = Mock(return_value=mock_cart)
+    shopping_cart_service.product_repository.find_by_id = Mock(
+        return_value=None)
 
+    # Act
+    shopping_cart_service.add_item(123, 1, 2)
+
+    # Assert
+    shopping_cart_service.cart_store.add_item.assert_not_called()
+
+
+def test_remove_item(shopping_cart_service):
     # Act
     shopping_cart_service.remove_item(123, 1)
 
     # Assert
-    assert len(mock_cart.items) == 0
-    shopping_cart_service.shopping_cart_repository.update.assert_called_once()
-    cart_arg = shopping_cart_service.shopping_cart_repository.update.\
-        call_args[0][0]
-    assert isinstance(cart_arg, ShoppingCartTable)
-    assert cart_arg.id == 1
-    assert cart_arg.customer_id == 123
-    shopping_cart_service.get_or_create_cart.assert_called_once_with(123)
+    shopping_cart_service.cart_store.remove_item.assert_called_once_with(
+        123, 1)
 
 
 def test_update_item_quantity(shopping_cart_service):
+    # Act
+    shopping_cart_service.update_item_quantity(123, 1, 5)
+
+    # Assert
+    shopping_cart_service.cart_store.update_item_quantity \
+        .assert_called_once_with(123, 1, 5)
+
+
+def test_apply_operations_skips_adds_of_unknown_products(
+        shopping_cart_service):
     # Arrange
-    mock_cart = ShoppingCart(id=1, customer_id=123)
-    mock_product = Mock(id=1)
-    mock_cart.add_item(mock_product, 2)  # Adding an item to update
-    shopping_cart_service.get_or_create_cart = Mock(return_value=mock_cart)
+    shopping_cart_service.product_repository.find_existing_ids \
+        .return_value = {1}
+    shopping_cart_service.shopping_cart_repository.find_by_customer_id \
+        .return_value = ShoppingCart(id=7, customer_id=123)
+    operations = [
+        CartOperationDto(op='add', product_id=1, quantity=2),
+        CartOperationDto(op='add', product_id=9, quantity=1),
+        CartOperationDto(op='update', product_id=3, quantity=4),
+        CartOperationDto(op='remove', product_id=5)
+    ]
 
     # Act
+    result = shopping_cart_service.apply_operations(123, operations)
+
+    # Assert
+    shopping_cart_service.cart_store.apply_operations \
+        .assert_called_once_with(123, [
+            CartOperation(CartOperation.ADD, 1, 2),
+            CartOperation(CartOperation.UPDATE, 3, 4),
+            CartOperation(CartOperation.REMOVE, 5)
+        ])
+    shopping_cart_service.cart_store.flush.assert_called_once_with([123])
+    assert result.id == 7
+    assert result.items == []
+
+
+def test_get_cart_flushes_buffered_changes_first(shopping_cart_service):
+    # Arrange
+    calls = []
+    shopping_cart_service.cart_store.flush.side_effect = \
+        lambda customer_ids: calls.append(('flush', customer_ids))
+    shopping_cart_service.shopping_cart_repository.find_by_customer_id \
+        .side_effect = lambda customer_id: calls.append(('read', customer_id))
+
+    # Act
+    shopping_cart_service.get_cart(123)
+
+    # Assert
+    assert calls == [('flush', [123]), ('read', 123)]
+
+
+def test_get_cart_etag_reads_only_the_version(shopping_cart_service):
+    # Arrange
+    repository = shopping_cart_service.shopping_cart_repository
+    repository.find_id_and_version_by_customer_id.return_value = (7, 3)
+
+    # Act
+    etag = shopping_cart_service.get_cart_etag(123)
+
+    # Assert
+    assert etag == 'cart-7-3'
+    shopping_cart_service.cart_store.flush.assert_called_once_with([123])
+    repository.find_by_customer_id.assert_not_called()
+
+
+def test_default_cart_store_writes_through():
+    # Arrange
+    mock_shopping_cart_repository = Mock()
+    mock_shopping_cart_repository.find_or_create_id.return_value = 7
+    mock_shopping_cart_repository.find_id_by_customer_id.return_value = None
+    shopping_cart_service = ShoppingCartService(
+        mock_shopping_cart_repository, Mock())
+
+    # Act
+    shopping_cart_service.add_item(123, 1, 2)
     shopping_cart_service.update_item_quantity(123, 1, 5)
 
     # Assert
-    assert mock_cart.items[0].quantity == 5
-    shopping_cart_service.shopping_cart_repository.update.assert_called_once()
-    cart_arg = shopping_cart_service.shopping_cart_repository.update.\
-        call_args[0][0]
-    assert isinstance(cart_arg, ShoppingCartTable)
-    assert cart_arg.id == 1
-    assert cart_arg.customer_id == 123
-    shopping_cart_service.get_or_create_cart.assert_called_once_with(123)
+    mock_shopping_cart_repository.add_item.assert_called_once_with(7, 1, 2)
+    mock_shopping_cart_repository.update_item_quantity.assert_not_called()
+    mock_shopping_cart_repository.create.assert_not_called()